@@ -0,0 +1,370 @@
+# izhbet/api/server.py
+"""
+HTTP-сервер (WSGI, Flask) для StatisticsAPI.
+
+Ответы кэшируются в памяти процесса по эндпоинту и нормализованным
+параметрам запроса (период по умолчанию разрешается в конкретные даты до
+построения ключа). Версия данных агрегатов - время последнего обновления
+сводки statistics_rollups, деталей матча - версия строк statistics матча
+(get_match_version): от нее зависят ключ кэша и ETag, поэтому после
+обновления данных кэш не отдает устаревшие ответы, а клиент с актуальным
+If-None-Match получает 304 без обращения к базе. Ошибки базы возвращаются
+как 503 и не кэшируются. Большие ответы сжимаются gzip.
+
+Переменные окружения:
+    STATISTICS_API_DATABASE_URL - URL базы (по умолчанию MySQL из config)
+    STATISTICS_API_POOL_SIZE, STATISTICS_API_MAX_OVERFLOW - пул соединений
+    STATISTICS_API_CACHE_TTL - время жизни ответа в кэше, сек
+    STATISTICS_API_VERSION_TTL - как часто проверять версию данных, сек
+
+Пример:
+    python -m api.server --host 0.0.0.0 --port 8000
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date
+from typing import Any, Callable, Dict, Optional
+
+from flask import Flask, Response, request
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+
+from config import Session_pool, settings
+from core.cache import MemoryTTLCache
+from api.statistics_api import StatisticsAPI, DEFAULT_PAGE_SIZE, decode_cursor, default_period
+from db.queries.statistics import get_match_version
+from db.queries.statistics_rollup import get_rollup_version
+
+logger = logging.getLogger(__name__)
+
+# Ответы короче не сжимаются
+GZIP_MIN_SIZE = 512
+
+
+class ParamError(ValueError):
+    """Некорректный параметр запроса."""
+
+
+def _parse_date(value: str) -> date:
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ParamError(f'ожидается дата YYYY-MM-DD: {value}')
+
+
+def _parse_int(value: str) -> int:
+    try:
+        return int(value)
+    except ValueError:
+        raise ParamError(f'ожидается целое число: {value}')
+
+
+def _parse_cursor(value: str) -> str:
+    try:
+        decode_cursor(value)
+    except ValueError:
+        raise ParamError(f'некорректный курсор страницы: {value}')
+    return value
+
+
+# Параметры запроса эндпоинтов (имя -> разбор)
+PERIOD_PARAMS: Dict[str, Callable[[str], Any]] = {
+    'start_date': _parse_date,
+    'end_date': _parse_date,
+    'championship_id': _parse_int,
+    'sport_id': _parse_int
+}
+SUMMARY_PARAMS: Dict[str, Callable[[str], Any]] = {
+    **PERIOD_PARAMS,
+    'forecast_type': lambda value: value.lower(),
+    'model_name': str
+}
+PAGE_PARAMS: Dict[str, Callable[[str], Any]] = {
+    'limit': _parse_int,
+    'cursor': _parse_cursor
+}
+
+
+def normalize_params(args, spec: Dict[str, Callable[[str], Any]]) -> Dict[str, Any]:
+    """
+    Разбирает параметры запроса по спецификации эндпоинта.
+
+    Неизвестные и пустые параметры отбрасываются, поэтому запросы с разным
+    порядком или лишними параметрами попадают в одну запись кэша.
+    """
+    params = {}
+    for name, parse in spec.items():
+        value = args.get(name, '').strip()
+        if value:
+            params[name] = parse(value)
+    # Период по умолчанию зависит от текущей даты - в ключ кэша и ETag
+    # попадают разрешенные даты, а не их отсутствие
+    if 'start_date' in spec and 'end_date' in spec:
+        params['start_date'], params['end_date'] = default_period(
+            params.get('start_date'), params.get('end_date')
+        )
+    return params
+
+
+def params_key(params: Dict[str, Any]) -> str:
+    return '&'.join(f'{name}={params[name]}' for name in sorted(params))
+
+
+def create_pooled_engine(database_url: str):
+    """Движок с пулом соединений (config.engine работает без пула)."""
+    if database_url.startswith('sqlite'):
+        return create_engine(database_url, connect_args={'check_same_thread': False})
+    return create_engine(
+        database_url,
+        poolclass=QueuePool,
+        pool_size=int(os.getenv('STATISTICS_API_POOL_SIZE', '5')),
+        max_overflow=int(os.getenv('STATISTICS_API_MAX_OVERFLOW', '10')),
+        pool_pre_ping=True,
+        pool_recycle=3600
+    )
+
+
+def bind_session_pool(engine) -> None:
+    """Переключает Session_pool на движок сервера."""
+    Session_pool.remove()
+    Session_pool.configure(bind=engine)
+
+
+class DataVersion:
+    """Версия данных с проверкой не чаще раза в ttl секунд."""
+
+    def __init__(self, ttl: float = 5.0, loader: Callable[[], Optional[str]] = get_rollup_version):
+        self.ttl = ttl
+        self.loader = loader
+        self._value = ''
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> str:
+        with self._lock:
+            now = time.monotonic()
+            if now - self._checked_at >= self.ttl:
+                try:
+                    self._value = str(self.loader() or '')
+                except Exception as e:
+                    logger.warning(f'Ошибка получения версии данных API: {e}')
+                self._checked_at = now
+            return self._value
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    tags = [tag.strip() for tag in header.split(',')]
+    return etag in tags or f'W/{etag}' in tags
+
+
+def _accepts_gzip() -> bool:
+    return 'gzip' in request.headers.get('Accept-Encoding', '').lower()
+
+
+def create_app(
+    api: Optional[StatisticsAPI] = None,
+    database_url: Optional[str] = None,
+    cache_ttl: Optional[float] = None,
+    version_ttl: Optional[float] = None
+) -> Flask:
+    """
+    Создает WSGI-приложение для StatisticsAPI.
+
+    Args:
+        api: Экземпляр StatisticsAPI
+        database_url: URL базы (по умолчанию STATISTICS_API_DATABASE_URL или MySQL из config)
+        cache_ttl: Время жизни ответа в кэше, сек (0 - без кэша)
+        version_ttl: Интервал проверки версии данных, сек
+
+    Returns:
+        Flask: Приложение
+    """
+    api = api or StatisticsAPI()
+    database_url = (
+        database_url
+        or os.getenv('STATISTICS_API_DATABASE_URL')
+        or settings.DATABASE_URL_mysql
+    )
+    if cache_ttl is None:
+        cache_ttl = float(os.getenv('STATISTICS_API_CACHE_TTL', '60'))
+    if version_ttl is None:
+        version_ttl = float(os.getenv('STATISTICS_API_VERSION_TTL', '5'))
+
+    bind_session_pool(create_pooled_engine(database_url))
+
+    app = Flask(__name__)
+    cache = MemoryTTLCache(ttl=cache_ttl, stale_ttl=0.0, maxsize=2048)
+    version = DataVersion(version_ttl)
+    counters = {'requests': 0, 'cache_hits': 0, 'not_modified': 0, 'errors': 0}
+    app.config['RESPONSE_CACHE'] = cache
+    app.config['COUNTERS'] = counters
+
+    key_locks: Dict[str, threading.Lock] = {}
+    key_locks_guard = threading.Lock()
+
+    @contextmanager
+    def key_lock(cache_key: str):
+        with key_locks_guard:
+            lock = key_locks.setdefault(cache_key, threading.Lock())
+        try:
+            with lock:
+                yield
+        finally:
+            with key_locks_guard:
+                if not lock.locked():
+                    key_locks.pop(cache_key, None)
+
+    def cached_response(cache_key: str):
+        if cache_ttl <= 0:
+            return None
+        entry = cache.get(cache_key)
+        if entry is not None and entry.is_fresh:
+            counters['cache_hits'] += 1
+            return entry.value
+        return None
+
+    @app.teardown_appcontext
+    def remove_session(exception=None):
+        Session_pool.remove()
+
+    def respond(endpoint: str, spec: Dict[str, Callable[[str], Any]],
+                handler: Callable[[Dict[str, Any]], Any], empty_status: int = 200,
+                data_version: Optional[Callable[[], str]] = None) -> Response:
+        counters['requests'] += 1
+        try:
+            params = normalize_params(request.args, spec)
+        except ParamError as e:
+            return _json_response({'error': str(e)}, 400)
+
+        try:
+            data_version = data_version() if data_version else version.get()
+        except Exception as e:
+            logger.error(f'Ошибка получения версии данных {endpoint}: {e}')
+            counters['errors'] += 1
+            return _json_response({'error': 'данные временно недоступны'}, 503)
+        key = f'{endpoint}?{params_key(params)}'
+        etag = '"' + hashlib.sha1(f'{data_version}|{key}'.encode('utf-8')).hexdigest()[:24] + '"'
+
+        if _etag_matches(request.headers.get('If-None-Match'), etag):
+            counters['not_modified'] += 1
+            return _with_headers(Response(status=304), etag)
+
+        cache_key = f'{data_version}|{key}'
+        cached = cached_response(cache_key)
+        if cached is None:
+            # Одинаковые запросы ждут первый расчет, а не идут в базу параллельно
+            with key_lock(cache_key):
+                cached = cached_response(cache_key)
+                if cached is None:
+                    try:
+                        result = handler(params)
+                    except Exception as e:
+                        # Ошибка не кэшируется и отдается без ETag
+                        logger.error(f'Ошибка обработки запроса {key}: {e}')
+                        counters['errors'] += 1
+                        return _json_response({'error': 'данные временно недоступны'}, 503)
+                    status = empty_status if result == {} else 200
+                    body = json.dumps(result, ensure_ascii=False, default=str).encode('utf-8')
+                    compressed = gzip.compress(body, 6) if len(body) >= GZIP_MIN_SIZE else None
+                    cached = (body, compressed, status)
+                    if cache_ttl > 0:
+                        cache.set(cache_key, cached, endpoint)
+        body, compressed, status = cached
+
+        if compressed is not None and _accepts_gzip():
+            response = Response(compressed, status=status, mimetype='application/json')
+            response.headers['Content-Encoding'] = 'gzip'
+        else:
+            response = Response(body, status=status, mimetype='application/json')
+        return _with_headers(response, etag if status == 200 else None)
+
+    @app.get('/api/statistics/summary')
+    def statistics_summary():
+        return respond('summary', SUMMARY_PARAMS, lambda params: api.get_statistics_summary(**params))
+
+    @app.get('/api/statistics/types')
+    def statistics_by_type():
+        return respond('types', PERIOD_PARAMS, lambda params: api.get_statistics_by_type(**params))
+
+    @app.get('/api/statistics/models')
+    def statistics_by_model():
+        return respond('models', PERIOD_PARAMS, lambda params: api.get_statistics_by_model(**params))
+
+    @app.get('/api/statistics/daily')
+    def daily_statistics():
+        return respond('daily', PERIOD_PARAMS, lambda params: api.get_daily_statistics(**params))
+
+    @app.get('/api/championships')
+    def championship_list():
+        return respond('championships', {}, lambda params: api.get_championship_list())
+
+    @app.get('/api/sports')
+    def sport_list():
+        return respond('sports', {}, lambda params: api.get_sport_list())
+
+    @app.get('/api/matches/<int:match_id>')
+    def match_details(match_id: int):
+        return respond(
+            f'matches/{match_id}', PAGE_PARAMS,
+            lambda params: api.get_match_details(
+                match_id, params.get('limit', DEFAULT_PAGE_SIZE), params.get('cursor')
+            ),
+            empty_status=404,
+            data_version=lambda: f'match:{get_match_version(match_id)}'
+        )
+
+    @app.get('/health')
+    def health():
+        return _json_response({
+            'status': 'ok',
+            'version': version.get(),
+            'cache': cache.info(),
+            **counters
+        })
+
+    return app
+
+
+def _with_headers(response: Response, etag: Optional[str]) -> Response:
+    response.headers['Vary'] = 'Accept-Encoding'
+    if etag:
+        response.headers['ETag'] = etag
+        # Клиент переспрашивает каждый раз, но с If-None-Match получает 304
+        response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def _json_response(data: Any, status: int = 200) -> Response:
+    return Response(
+        json.dumps(data, ensure_ascii=False, default=str),
+        status=status,
+        mimetype='application/json'
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='HTTP-сервер статистики прогнозов')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--database-url', help='URL базы (по умолчанию MySQL из config)')
+    args = parser.parse_args()
+
+    app = create_app(database_url=args.database_url)
+    logger.info(f'Сервер статистики запущен на {args.host}:{args.port}')
+    app.run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,18 +1,69 @@
 """
 API для работы со статистикой прогнозов.
 Предоставляет эндпоинты для фронтенда.
+
+Агрегаты (сводка, типы, модели, дни, чемпионаты, виды спорта) берутся из
+дневной сводки statistics_rollups, поэтому время ответа зависит от периода,
+а не от размера истории statistics. Прогнозы матча отдаются страницами
+(keyset-пагинация по (forecast_type, id)).
+
+Ошибки базы не перехватываются: HTTP-сервер отвечает на них 5xx и не
+кэширует ответ, вместо того чтобы отдавать пустой результат как данные.
 """
 
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, date, timedelta
-from sqlalchemy import text, func
-from sqlalchemy.orm import Session
 
-from config import Session_pool
+from db.queries.statistics import get_match_overview, get_match_predictions_page
+from db.queries.statistics_rollup import (
+    get_rollup_summary,
+    get_rollup_by_type,
+    get_rollup_by_model,
+    get_rollup_by_date,
+    get_rollup_by_championship,
+    get_rollup_by_sport
+)
 
 logger = logging.getLogger(__name__)
 
+# Размер страницы прогнозов матча
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+def _rollup_average(total_sum, count) -> float:
+    """Среднее по сумме и количеству из сводки (0.0 при отсутствии данных)."""
+    return float(total_sum) / count if count and total_sum is not None else 0.0
+
+
+def _accuracy_percentage(correct: int, total: int) -> float:
+    return round((correct / total * 100) if total > 0 else 0.0, 2)
+
+
+def default_period(start_date: Optional[date], end_date: Optional[date]) -> Tuple[date, date]:
+    """Период по умолчанию - последние 30 дней."""
+    if not end_date:
+        end_date = date.today()
+    if not start_date:
+        start_date = end_date - timedelta(days=30)
+    return start_date, end_date
+
+
+def encode_cursor(forecast_type: str, statistic_id: int) -> str:
+    """Курсор страницы из ключа последней строки."""
+    return f'{forecast_type}:{statistic_id}'
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """Ключ (forecast_type, id) из курсора страницы."""
+    forecast_type, _, statistic_id = cursor.rpartition(':')
+    return forecast_type, int(statistic_id)
+
+
+def _optional_float(value) -> Optional[float]:
+    return float(value) if value else None
+
 
 class StatisticsAPI:
     """API для работы со статистикой прогнозов."""
@@ -43,84 +94,35 @@ class StatisticsAPI:
         Returns:
             Dict с сводной статистикой
         """
-        try:
-            with Session_pool() as db_session:
-                # Устанавливаем даты по умолчанию
-                if not end_date:
-                    end_date = date.today()
-                if not start_date:
-                    start_date = end_date - timedelta(days=30)
-                
-                # Базовый запрос
-                base_query = """
-                    SELECT 
-                        COUNT(*) as total_predictions,
-                        SUM(CASE WHEN prediction_correct = 1 THEN 1 ELSE 0 END) as correct_predictions,
-                        AVG(prediction_accuracy) as avg_accuracy,
-                        COUNT(DISTINCT match_id) as unique_matches,
-                        COUNT(DISTINCT championship_id) as unique_championships,
-                        COUNT(DISTINCT sport_id) as unique_sports
-                    FROM statistics_optimized
-                    WHERE match_date BETWEEN :start_date AND :end_date
-                """
-                
-                params = {
-                    'start_date': start_date,
-                    'end_date': end_date
-                }
-                
-                # Добавляем фильтры
-                if championship_id:
-                    base_query += " AND championship_id = :championship_id"
-                    params['championship_id'] = championship_id
-                
-                if sport_id:
-                    base_query += " AND sport_id = :sport_id"
-                    params['sport_id'] = sport_id
-                
-                if forecast_type:
-                    base_query += " AND forecast_type = :forecast_type"
-                    params['forecast_type'] = forecast_type
-                
-                if model_name:
-                    base_query += " AND model_name = :model_name"
-                    params['model_name'] = model_name
-                
-                result = db_session.execute(text(base_query), params).fetchone()
-                
-                if not result or result[0] == 0:
-                    return {
-                        'total_predictions': 0,
-                        'correct_predictions': 0,
-                        'accuracy_percentage': 0.0,
-                        'avg_accuracy': 0.0,
-                        'unique_matches': 0,
-                        'unique_championships': 0,
-                        'unique_sports': 0
-                    }
-                
-                total_predictions = result[0]
-                correct_predictions = result[1] or 0
-                avg_accuracy = float(result[2]) if result[2] else 0.0
-                unique_matches = result[3]
-                unique_championships = result[4]
-                unique_sports = result[5]
-                
-                accuracy_percentage = (correct_predictions / total_predictions * 100) if total_predictions > 0 else 0.0
-                
-                return {
-                    'total_predictions': total_predictions,
-                    'correct_predictions': correct_predictions,
-                    'accuracy_percentage': round(accuracy_percentage, 2),
-                    'avg_accuracy': round(avg_accuracy, 4),
-                    'unique_matches': unique_matches,
-                    'unique_championships': unique_championships,
-                    'unique_sports': unique_sports
-                }
-                
-        except Exception as e:
-            self.logger.error(f"Ошибка получения сводной статистики: {e}")
-            return {}
+        start_date, end_date = default_period(start_date, end_date)
+        
+        row = get_rollup_summary(
+            start_date, end_date, championship_id, sport_id, forecast_type, model_name
+        )
+        
+        total_predictions = int(row['row_count'] or 0)
+        if total_predictions == 0:
+            return {
+                'total_predictions': 0,
+                'correct_predictions': 0,
+                'accuracy_percentage': 0.0,
+                'avg_accuracy': 0.0,
+                'unique_matches': 0,
+                'unique_championships': 0,
+                'unique_sports': 0
+            }
+        
+        correct_predictions = int(row['correct_count'] or 0)
+        
+        return {
+            'total_predictions': total_predictions,
+            'correct_predictions': correct_predictions,
+            'accuracy_percentage': _accuracy_percentage(correct_predictions, total_predictions),
+            'avg_accuracy': round(_rollup_average(row['accuracy_sum'], row['accuracy_count']), 4),
+            'unique_matches': int(row['unique_matches'] or 0),
+            'unique_championships': int(row['unique_championships'] or 0),
+            'unique_sports': int(row['unique_sports'] or 0)
+        }
     
     def get_statistics_by_type(
         self,
@@ -141,64 +143,26 @@ class StatisticsAPI:
         Returns:
             List с статистикой по типам
         """
-        try:
-            with Session_pool() as db_session:
-                # Устанавливаем даты по умолчанию
-                if not end_date:
-                    end_date = date.today()
-                if not start_date:
-                    start_date = end_date - timedelta(days=30)
-                
-                query = """
-                    SELECT 
-                        forecast_type,
-                        COUNT(*) as total_predictions,
-                        SUM(CASE WHEN prediction_correct = 1 THEN 1 ELSE 0 END) as correct_predictions,
-                        AVG(prediction_accuracy) as avg_accuracy,
-                        AVG(prediction_error) as avg_error,
-                        AVG(prediction_residual) as avg_residual
-                    FROM statistics_optimized
-                    WHERE match_date BETWEEN :start_date AND :end_date
-                """
-                
-                params = {
-                    'start_date': start_date,
-                    'end_date': end_date
-                }
-                
-                if championship_id:
-                    query += " AND championship_id = :championship_id"
-                    params['championship_id'] = championship_id
-                
-                if sport_id:
-                    query += " AND sport_id = :sport_id"
-                    params['sport_id'] = sport_id
-                
-                query += " GROUP BY forecast_type ORDER BY total_predictions DESC"
-                
-                results = db_session.execute(text(query), params).fetchall()
-                
-                statistics = []
-                for row in results:
-                    total = row[1]
-                    correct = row[2] or 0
-                    accuracy_percentage = (correct / total * 100) if total > 0 else 0.0
-                    
-                    statistics.append({
-                        'forecast_type': row[0],
-                        'total_predictions': total,
-                        'correct_predictions': correct,
-                        'accuracy_percentage': round(accuracy_percentage, 2),
-                        'avg_accuracy': round(float(row[3]) if row[3] else 0.0, 4),
-                        'avg_error': round(float(row[4]) if row[4] else 0.0, 3),
-                        'avg_residual': round(float(row[5]) if row[5] else 0.0, 3)
-                    })
-                
-                return statistics
-                
-        except Exception as e:
-            self.logger.error(f"Ошибка получения статистики по типам: {e}")
-            return []
+        start_date, end_date = default_period(start_date, end_date)
+        
+        rows = get_rollup_by_type(start_date, end_date, championship_id, sport_id)
+        
+        statistics = []
+        for row in rows:
+            total = int(row['row_count'] or 0)
+            correct = int(row['correct_count'] or 0)
+            
+            statistics.append({
+                'forecast_type': row['forecast_type'],
+                'total_predictions': total,
+                'correct_predictions': correct,
+                'accuracy_percentage': _accuracy_percentage(correct, total),
+                'avg_accuracy': round(_rollup_average(row['accuracy_sum'], row['accuracy_count']), 4),
+                'avg_error': round(_rollup_average(row['error_sum'], row['error_count']), 3),
+                'avg_residual': round(_rollup_average(row['residual_sum'], row['residual_count']), 3)
+            })
+        
+        return statistics
     
     def get_statistics_by_model(
         self,
@@ -219,66 +183,27 @@ class StatisticsAPI:
         Returns:
             List с статистикой по моделям
         """
-        try:
-            with Session_pool() as db_session:
-                # Устанавливаем даты по умолчанию
-                if not end_date:
-                    end_date = date.today()
-                if not start_date:
-                    start_date = end_date - timedelta(days=30)
-                
-                query = """
-                    SELECT 
-                        model_name,
-                        model_version,
-                        model_type,
-                        COUNT(*) as total_predictions,
-                        SUM(CASE WHEN prediction_correct = 1 THEN 1 ELSE 0 END) as correct_predictions,
-                        AVG(prediction_accuracy) as avg_accuracy,
-                        AVG(prediction_error) as avg_error
-                    FROM statistics_optimized
-                    WHERE match_date BETWEEN :start_date AND :end_date
-                """
-                
-                params = {
-                    'start_date': start_date,
-                    'end_date': end_date
-                }
-                
-                if championship_id:
-                    query += " AND championship_id = :championship_id"
-                    params['championship_id'] = championship_id
-                
-                if sport_id:
-                    query += " AND sport_id = :sport_id"
-                    params['sport_id'] = sport_id
-                
-                query += " GROUP BY model_name, model_version, model_type ORDER BY total_predictions DESC"
-                
-                results = db_session.execute(text(query), params).fetchall()
-                
-                statistics = []
-                for row in results:
-                    total = row[3]
-                    correct = row[4] or 0
-                    accuracy_percentage = (correct / total * 100) if total > 0 else 0.0
-                    
-                    statistics.append({
-                        'model_name': row[0],
-                        'model_version': row[1],
-                        'model_type': row[2],
-                        'total_predictions': total,
-                        'correct_predictions': correct,
-                        'accuracy_percentage': round(accuracy_percentage, 2),
-                        'avg_accuracy': round(float(row[5]) if row[5] else 0.0, 4),
-                        'avg_error': round(float(row[6]) if row[6] else 0.0, 3)
-                    })
-                
-                return statistics
-                
-        except Exception as e:
-            self.logger.error(f"Ошибка получения статистики по моделям: {e}")
-            return []
+        start_date, end_date = default_period(start_date, end_date)
+        
+        rows = get_rollup_by_model(start_date, end_date, championship_id, sport_id)
+        
+        statistics = []
+        for row in rows:
+            total = int(row['row_count'] or 0)
+            correct = int(row['correct_count'] or 0)
+            
+            statistics.append({
+                'model_name': row['model_name'],
+                'model_version': row['model_version'],
+                'model_type': row['model_type'],
+                'total_predictions': total,
+                'correct_predictions': correct,
+                'accuracy_percentage': _accuracy_percentage(correct, total),
+                'avg_accuracy': round(_rollup_average(row['accuracy_sum'], row['accuracy_count']), 4),
+                'avg_error': round(_rollup_average(row['error_sum'], row['error_count']), 3)
+            })
+        
+        return statistics
     
     def get_daily_statistics(
         self,
@@ -299,244 +224,129 @@ class StatisticsAPI:
         Returns:
             List с ежедневной статистикой
         """
-        try:
-            with Session_pool() as db_session:
-                # Устанавливаем даты по умолчанию
-                if not end_date:
-                    end_date = date.today()
-                if not start_date:
-                    start_date = end_date - timedelta(days=30)
-                
-                query = """
-                    SELECT 
-                        match_date,
-                        COUNT(*) as total_predictions,
-                        SUM(CASE WHEN prediction_correct = 1 THEN 1 ELSE 0 END) as correct_predictions,
-                        AVG(prediction_accuracy) as avg_accuracy,
-                        COUNT(DISTINCT match_id) as unique_matches
-                    FROM statistics_optimized
-                    WHERE match_date BETWEEN :start_date AND :end_date
-                """
-                
-                params = {
-                    'start_date': start_date,
-                    'end_date': end_date
-                }
-                
-                if championship_id:
-                    query += " AND championship_id = :championship_id"
-                    params['championship_id'] = championship_id
-                
-                if sport_id:
-                    query += " AND sport_id = :sport_id"
-                    params['sport_id'] = sport_id
-                
-                query += " GROUP BY match_date ORDER BY match_date DESC"
-                
-                results = db_session.execute(text(query), params).fetchall()
-                
-                statistics = []
-                for row in results:
-                    total = row[1]
-                    correct = row[2] or 0
-                    accuracy_percentage = (correct / total * 100) if total > 0 else 0.0
-                    
-                    statistics.append({
-                        'date': row[0].isoformat() if row[0] else None,
-                        'total_predictions': total,
-                        'correct_predictions': correct,
-                        'accuracy_percentage': round(accuracy_percentage, 2),
-                        'avg_accuracy': round(float(row[3]) if row[3] else 0.0, 4),
-                        'unique_matches': row[4]
-                    })
-                
-                return statistics
-                
-        except Exception as e:
-            self.logger.error(f"Ошибка получения ежедневной статистики: {e}")
-            return []
+        start_date, end_date = default_period(start_date, end_date)
+        
+        rows = get_rollup_by_date(start_date, end_date, championship_id, sport_id)
+        
+        statistics = []
+        for row in rows:
+            total = int(row['row_count'] or 0)
+            correct = int(row['correct_count'] or 0)
+            
+            statistics.append({
+                'date': row['match_date'].isoformat() if row['match_date'] else None,
+                'total_predictions': total,
+                'correct_predictions': correct,
+                'accuracy_percentage': _accuracy_percentage(correct, total),
+                'avg_accuracy': round(_rollup_average(row['accuracy_sum'], row['accuracy_count']), 4),
+                'unique_matches': int(row['unique_matches'] or 0)
+            })
+        
+        return statistics
     
     def get_match_details(
         self,
-        match_id: int
+        match_id: int,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Получает детали прогнозов для конкретного матча.
         
+        Прогнозы отдаются страницами: next_cursor передается в следующий
+        вызов, None означает последнюю страницу.
+        
         Args:
             match_id: ID матча
+            limit: Размер страницы прогнозов (не больше MAX_PAGE_SIZE)
+            cursor: Курсор страницы из next_cursor предыдущего ответа
         
         Returns:
             Dict с деталями матча
         """
-        try:
-            with Session_pool() as db_session:
-                # Получаем основную информацию о матче
-                match_query = """
-                    SELECT 
-                        s.match_id,
-                        s.match_date,
-                        s.championship_id,
-                        s.sport_id,
-                        ch.championshipName,
-                        sp.sportName,
-                        m.numOfHeadsHome,
-                        m.numOfHeadsAway,
-                        th.teamName as team_home_name,
-                        ta.teamName as team_away_name
-                    FROM statistics_optimized s
-                    LEFT JOIN matchs m ON s.match_id = m.id
-                    LEFT JOIN championships ch ON s.championship_id = ch.id
-                    LEFT JOIN sports sp ON s.sport_id = sp.id
-                    LEFT JOIN teams th ON m.teamHome_id = th.id
-                    LEFT JOIN teams ta ON m.teamAway_id = ta.id
-                    WHERE s.match_id = :match_id
-                    LIMIT 1
-                """
-                
-                match_result = db_session.execute(text(match_query), {'match_id': match_id}).fetchone()
-                
-                if not match_result:
-                    return {}
-                
-                # Получаем все прогнозы для матча
-                predictions_query = """
-                    SELECT 
-                        s.id,
-                        s.forecast_type,
-                        s.forecast_subtype,
-                        s.model_name,
-                        s.prediction_correct,
-                        s.prediction_accuracy,
-                        s.prediction_error,
-                        s.prediction_residual,
-                        o.probability,
-                        o.confidence,
-                        o.uncertainty,
-                        o.lower_bound,
-                        o.upper_bound
-                    FROM statistics_optimized s
-                    LEFT JOIN outcomes o ON s.outcome_id = o.id
-                    WHERE s.match_id = :match_id
-                    ORDER BY s.forecast_type, s.id
-                """
-                
-                predictions_results = db_session.execute(text(predictions_query), {'match_id': match_id}).fetchall()
-                
-                predictions = []
-                for row in predictions_results:
-                    predictions.append({
-                        'id': row[0],
-                        'forecast_type': row[1],
-                        'forecast_subtype': row[2],
-                        'model_name': row[3],
-                        'prediction_correct': row[4],
-                        'prediction_accuracy': float(row[5]) if row[5] else None,
-                        'prediction_error': float(row[6]) if row[6] else None,
-                        'prediction_residual': float(row[7]) if row[7] else None,
-                        'probability': float(row[8]) if row[8] else None,
-                        'confidence': float(row[9]) if row[9] else None,
-                        'uncertainty': float(row[10]) if row[10] else None,
-                        'lower_bound': float(row[11]) if row[11] else None,
-                        'upper_bound': float(row[12]) if row[12] else None
-                    })
-                
-                return {
-                    'match_id': match_result[0],
-                    'match_date': match_result[1].isoformat() if match_result[1] else None,
-                    'championship_id': match_result[2],
-                    'sport_id': match_result[3],
-                    'championship_name': match_result[4],
-                    'sport_name': match_result[5],
-                    'goal_home': match_result[6],
-                    'goal_away': match_result[7],
-                    'team_home_name': match_result[8],
-                    'team_away_name': match_result[9],
-                    'predictions': predictions
-                }
-                
-        except Exception as e:
-            self.logger.error(f"Ошибка получения деталей матча {match_id}: {e}")
+        match = get_match_overview(match_id)
+        if not match:
             return {}
+        
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        after = decode_cursor(cursor) if cursor else None
+        
+        # Лишняя строка показывает, есть ли следующая страница
+        rows = get_match_predictions_page(match_id, limit + 1, after)
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        
+        predictions = []
+        for row in rows:
+            predictions.append({
+                'id': row['id'],
+                'forecast_type': row['forecast_type'],
+                'forecast_subtype': row['forecast_subtype'],
+                'model_name': row['model_name'],
+                'prediction_correct': row['prediction_correct'],
+                'prediction_accuracy': _optional_float(row['prediction_accuracy']),
+                'prediction_error': _optional_float(row['prediction_error']),
+                'prediction_residual': _optional_float(row['prediction_residual']),
+                'probability': _optional_float(row['probability']),
+                'confidence': _optional_float(row['confidence']),
+                'uncertainty': _optional_float(row['uncertainty']),
+                'lower_bound': _optional_float(row['lower_bound']),
+                'upper_bound': _optional_float(row['upper_bound'])
+            })
+        
+        next_cursor = None
+        if has_more:
+            next_cursor = encode_cursor(rows[-1]['forecast_type'], rows[-1]['id'])
+        
+        return {
+            'match_id': match['match_id'],
+            'match_date': match['match_date'].isoformat() if match['match_date'] else None,
+            'championship_id': match['championship_id'],
+            'sport_id': match['sport_id'],
+            'championship_name': match['championshipName'],
+            'sport_name': match['sportName'],
+            'goal_home': match['numOfHeadsHome'],
+            'goal_away': match['numOfHeadsAway'],
+            'team_home_name': match['team_home_name'],
+            'team_away_name': match['team_away_name'],
+            'predictions': predictions,
+            'next_cursor': next_cursor
+        }
     
     def get_championship_list(self) -> List[Dict[str, Any]]:
         """Получает список чемпионатов с количеством прогнозов."""
-        try:
-            with Session_pool() as db_session:
-                query = """
-                    SELECT 
-                        s.championship_id,
-                        ch.championshipName,
-                        sp.sportName,
-                        COUNT(*) as total_predictions,
-                        SUM(CASE WHEN prediction_correct = 1 THEN 1 ELSE 0 END) as correct_predictions
-                    FROM statistics_optimized s
-                    LEFT JOIN championships ch ON s.championship_id = ch.id
-                    LEFT JOIN sports sp ON s.sport_id = sp.id
-                    GROUP BY s.championship_id, ch.championshipName, sp.sportName
-                    ORDER BY total_predictions DESC
-                """
-                
-                results = db_session.execute(text(query)).fetchall()
-                
-                championships = []
-                for row in results:
-                    total = row[3]
-                    correct = row[4] or 0
-                    accuracy_percentage = (correct / total * 100) if total > 0 else 0.0
-                    
-                    championships.append({
-                        'championship_id': row[0],
-                        'championship_name': row[1],
-                        'sport_name': row[2],
-                        'total_predictions': total,
-                        'correct_predictions': correct,
-                        'accuracy_percentage': round(accuracy_percentage, 2)
-                    })
-                
-                return championships
-                
-        except Exception as e:
-            self.logger.error(f"Ошибка получения списка чемпионатов: {e}")
-            return []
+        championships = []
+        for row in get_rollup_by_championship():
+            total = int(row['row_count'] or 0)
+            correct = int(row['correct_count'] or 0)
+            
+            championships.append({
+                'championship_id': row['championship_id'],
+                'championship_name': row['championshipName'],
+                'sport_name': row['sportName'],
+                'total_predictions': total,
+                'correct_predictions': correct,
+                'accuracy_percentage': _accuracy_percentage(correct, total)
+            })
+        
+        return championships
     
     def get_sport_list(self) -> List[Dict[str, Any]]:
         """Получает список видов спорта с количеством прогнозов."""
-        try:
-            with Session_pool() as db_session:
-                query = """
-                    SELECT 
-                        s.sport_id,
-                        sp.sportName,
-                        COUNT(*) as total_predictions,
-                        SUM(CASE WHEN prediction_correct = 1 THEN 1 ELSE 0 END) as correct_predictions
-                    FROM statistics_optimized s
-                    LEFT JOIN sports sp ON s.sport_id = sp.id
-                    GROUP BY s.sport_id, sp.sportName
-                    ORDER BY total_predictions DESC
-                """
-                
-                results = db_session.execute(text(query)).fetchall()
-                
-                sports = []
-                for row in results:
-                    total = row[2]
-                    correct = row[3] or 0
-                    accuracy_percentage = (correct / total * 100) if total > 0 else 0.0
-                    
-                    sports.append({
-                        'sport_id': row[0],
-                        'sport_name': row[1],
-                        'total_predictions': total,
-                        'correct_predictions': correct,
-                        'accuracy_percentage': round(accuracy_percentage, 2)
-                    })
-                
-                return sports
-                
-        except Exception as e:
-            self.logger.error(f"Ошибка получения списка видов спорта: {e}")
-            return []
+        sports = []
+        for row in get_rollup_by_sport():
+            total = int(row['row_count'] or 0)
+            correct = int(row['correct_count'] or 0)
+            
+            sports.append({
+                'sport_id': row['sport_id'],
+                'sport_name': row['sportName'],
+                'total_predictions': total,
+                'correct_predictions': correct,
+                'accuracy_percentage': _accuracy_percentage(correct, total)
+            })
+        
+        return sports
 
 
 # Создаем экземпляр API для использования
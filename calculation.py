@@ -4,6 +4,7 @@ import logging
 import pandas as pd
 
 from core.constants import TIME_FRAME
+from core import telemetry
 from calculation.tournament import (
     CalculationDataPipeline, DatabaseSource, CreatingStandings,
     FileStorage
@@ -62,7 +63,8 @@ def main():
     CalculationDataPipeline.select_data = select_data
 
     # Запустите конвейер (внутри теперь формируются snapshots)
-    pipeline.process_data(time_frame)
+    with telemetry.run('calculation', mode=time_frame):
+        pipeline.process_data(time_frame)
 
     # После обработки экспортируем агрегированный индекс snapshot-файлов
     # try:
@@ -21,6 +21,9 @@ class Tournament:
     Attributes:
         _instance: Экземпляр класса (singleton)
         teams: Словарь команд в турнире
+        table: Сыгранные матчи турнира (MatchTable)
+        _bucket_order: Порядок команд по очкам для текущих групп силы
+        _buckets: Маски групп силы по Team.index
     """
     _instance = None
 
@@ -28,6 +31,9 @@ class Tournament:
         if cls._instance is None:
             cls._instance = super(Tournament, cls).__new__(cls)
             cls._instance.teams = {}
+            cls._instance.table = MatchTable()
+            cls._instance._bucket_order = None
+            cls._instance._buckets = None
         return cls._instance
 
     @classmethod
@@ -45,7 +51,9 @@ class Tournament:
             team_name: Название команды
         """
         if team_name not in self.teams:
-            self.teams[team_name] = Team(team_name)
+            team = Team(team_name)
+            team.index = len(self.teams)
+            self.teams[team_name] = team
 
     def get_team(self, team_name):
         """
@@ -99,6 +107,42 @@ class Tournament:
                 away_goals, overtime, season_id, stages_id
             )
             match.play()
+            self.table.append(home_team, home_team.matches[-1])
+            self.table.append(away_team, away_team.matches[-1])
+
+    def strength_buckets(self):
+        """
+        Группы силы команд: верхняя, средняя и нижняя трети по очкам
+        (при равенстве очков - в порядке добавления команд).
+
+        Маски по Team.index общие для всех стратегий по соперникам и
+        пересчитываются только при изменении порядка команд по очкам.
+
+        Returns:
+            dict: {'strong'|'medium'|'weak': np.ndarray[bool]}
+        """
+        points = np.fromiter(
+            (team.points for team in self.teams.values()),
+            dtype=np.float64, count=len(self.teams)
+        )
+        order = np.argsort(-points, kind='stable')
+        if (
+            self._buckets is None
+            or not np.array_equal(order, self._bucket_order)
+        ):
+            total_teams = len(order)
+            bounds = {
+                'strong': order[:total_teams // 3],
+                'medium': order[total_teams // 3:2 * total_teams // 3],
+                'weak': order[2 * total_teams // 3:],
+            }
+            self._buckets = {}
+            for name, indexes in bounds.items():
+                mask = np.zeros(total_teams, dtype=bool)
+                mask[indexes] = True
+                self._buckets[name] = mask
+            self._bucket_order = order
+        return self._buckets
 
     @staticmethod
     def calculate_ratings(table_strategy):
@@ -447,9 +491,26 @@ class Team:
         power_rating - Рейтинг силы
         matches - Все матчи
         filtered_matches - Для хранения фильтрованных матчей
+        index - Номер команды в турнире (строки MatchTable)
     """
+    __slots__ = (
+        'name', 'games_played', 'games_wins', 'games_draws', 'games_losses',
+        'overtime_wins', 'overtime_losses', 'goals_scored', 'goals_conceded',
+        'points', 'tb_points', 'tm_points', 'itb_points', 'itm_points',
+        'tb05_points', 'tb15_points', 'tb25_points', 'tb35_points',
+        'tb45_points', 'tb55_points', 'itb05_points', 'itb15_points',
+        'itb25_points', 'itb35_points', 'itb45_points', 'itb55_points',
+        'tm05_points', 'tm15_points', 'tm25_points', 'tm35_points',
+        'tm45_points', 'tm55_points', 'itm05_points', 'itm15_points',
+        'itm25_points', 'itm35_points', 'itm45_points', 'itm55_points',
+        'oz_points', 'ozn_points', 'victory_dry', 'lossing_dry',
+        'elo_rating', 'vo_rating', 'dif_rating', 'potemkin_rating',
+        'power_rating', 'matches', 'filtered_matches', 'index'
+    )
+
     def __init__(self, name: str):
         self.name = name
+        self.index = -1
         self.games_played = 0
         self.games_wins = 0
         self.games_draws = 0
@@ -704,6 +765,12 @@ class Match:
         season_id: ID сезона
         stages_id: ID этапа
     """
+    __slots__ = (
+        'match_id', 'sport_id', 'country_id', 'tournament_id', 'game_data',
+        'home_team', 'away_team', 'home_goals', 'away_goals', 'overtime',
+        'season_id', 'stages_id'
+    )
+
     def __init__(self,
         match_id: int,
         sport_id: int,
@@ -767,23 +834,123 @@ class Match:
         )
 
 
+# Коды результата матча в MatchTable
+RESULT_CODES = {'win': 1, 'draw': 0, 'loss': -1}
+RESULT_WIN, RESULT_DRAW, RESULT_LOSS = 1, 0, -1
+
+# Пороги ТБ/ТМ и ИТБ/ИТМ турнирной таблицы (суффикс поля -> порог)
+TOTAL_THRESHOLDS = (
+    ('05', 0.5), ('15', 1.5), ('25', 2.5), ('35', 3.5), ('45', 4.5), ('55', 5.5)
+)
+
+MATCH_DTYPE = np.dtype([
+    ('team', np.int32),
+    ('opponent', np.int32),
+    ('goals_scored', np.float64),
+    ('goals_conceded', np.float64),
+    ('result', np.int8),
+    ('is_home', np.bool_),
+    ('match_id', np.int64),
+    ('position', np.int32),
+])
+
+
+class MatchTable:
+    """
+    Сыгранные матчи турнира в структурированном массиве NumPy.
+
+    На каждый матч две строки - с точки зрения хозяев и гостей; команда и
+    соперник хранятся индексами Team.index, position - номер матча в
+    Team.matches. Стратегии отбирают строки булевыми масками.
+    """
+    __slots__ = ('_data', 'size', 'game_data')
+
+    def __init__(self, capacity: int = 256):
+        self._data = np.zeros(capacity, dtype=MATCH_DTYPE)
+        self.size = 0
+        self.game_data = []
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def rows(self):
+        """Заполненная часть массива (view)."""
+        return self._data[:self.size]
+
+    def append(self, team, match):
+        """
+        Добавление матча команды
+
+        Args:
+            team: Команда турнира
+            match: Кортеж матча из Team.matches
+        """
+        if self.size == len(self._data):
+            self._data = np.concatenate(
+                [self._data, np.zeros(len(self._data), dtype=MATCH_DTYPE)]
+            )
+        (goals_scored, goals_conceded, result, is_home_game,
+         opponent, match_id, game_data) = match
+        self._data[self.size] = (
+            team.index, opponent.index, goals_scored, goals_conceded,
+            RESULT_CODES[result], bool(is_home_game), match_id,
+            len(team.matches) - 1
+        )
+        self.game_data.append(game_data)
+        self.size += 1
+
+
 class TableStrategy(ABC):
     """
-    Абстрактный класс для стратегий фильтрации матчей и расчета таблиц
+    Абстрактный класс для стратегий фильтрации матчей и расчета таблиц.
+
+    Отбор задается атрибутами home_games (None - все матчи, True - только
+    домашние, False - только гостевые) и bucket - группа силы соперников
+    из Tournament.strength_buckets (None - любые соперники).
     """
+    home_games = None
+    bucket = None
+
+    def __init__(self):
+        self.mask = None
+
     def filter_matches(self, teams):
         """
-        Фильтрация матчей для расчета статистики
+        Фильтрация матчей для расчета статистики: маска строк
+        MatchTable турнира.
 
         Args:
             teams: Словарь команд
         """
-        raise NotImplementedError(
-            'Метод filter_matches должен быть переопределен.'
-        )
+        rows = Tournament().table.rows
+        mask = np.ones(len(rows), dtype=bool)
+        if self.home_games is not None:
+            mask &= rows['is_home'] == self.home_games
+        if self.bucket is not None:
+            # Маска группы по индексу соперника - векторный isin
+            mask &= Tournament().strength_buckets()[self.bucket][
+                rows['opponent']
+            ]
+        self.mask = mask
 
-    @staticmethod
-    def calculate_ratings():
+    def get_filtered_matches(self, team):
+        """
+        Отфильтрованные матчи команды в виде кортежей Team.matches
+
+        Args:
+            team: Команда турнира
+
+        Returns:
+            list: Матчи команды, прошедшие фильтр
+        """
+        rows = Tournament().table.rows
+        selected = rows['team'] == team.index
+        if self.mask is not None:
+            selected &= self.mask
+        return [team.matches[position] for position in rows['position'][selected]]
+
+    def calculate_ratings(self):
         """
         Расчет рейтингов для всех стратегий
         """
@@ -794,7 +961,12 @@ class TableStrategy(ABC):
             # PotemkinRatingStrategy(),
             # PowerRatingStrategy()
         ]
+        if not rating_strategies:
+            return
         tournament = Tournament()
+        # Рейтинги работают с кортежами матчей, список строится только для них
+        for team in tournament.teams.values():
+            team.filtered_matches = self.get_filtered_matches(team)
         for strategy in rating_strategies:
             strategy.calculate_ratings(
                 [
@@ -803,199 +975,127 @@ class TableStrategy(ABC):
                 ]
             )
 
-    @staticmethod
-    def get_standings():
+    def get_standings(self):
         """
-        Получение турнирной таблицы
+        Получение турнирной таблицы по отфильтрованным матчам
+        (агрегаты по командам считаются np.bincount по строкам маски)
 
         Returns:
             dict: Словарь с данными турнирной таблицы
         """
         tournament = Tournament()
+        table = tournament.table
+        teams = list(tournament.teams.values())
+        count_teams = len(teams)
+
+        indexes = np.arange(table.size)
+        if self.mask is not None:
+            indexes = indexes[self.mask]
+        rows = table.rows[indexes]
+        team_index = rows['team']
+        if not len(rows):
+            return {}
+
+        # Первый отфильтрованный матч команды задает match_id и дату
+        present, first = np.unique(team_index, return_index=True)
+
+        size_total = np.zeros(count_teams)
+        size_itotal = np.zeros(count_teams)
+        for index in present:
+            sport_name = teams[index].name.sports.sportName
+            size_total[index] = SIZE_TOTAL[sport_name]
+            size_itotal[index] = SIZE_ITOTAL[sport_name]
+
+        scored = rows['goals_scored']
+        conceded = rows['goals_conceded']
+        amount = scored + conceded
+        result = rows['result']
+        win = result == RESULT_WIN
+        draw = result == RESULT_DRAW
+        loss = result == RESULT_LOSS
+        thresholds = np.array(
+            [threshold for _, threshold in TOTAL_THRESHOLDS]
+        )[:, None]
+
+        conditions = {
+            'games_played': np.ones(len(rows), dtype=bool),
+            'games_wins': win,
+            'games_draws': draw,
+            'games_losses': loss,
+            'victory_dry': win & (conceded == 0),
+            'lossing_dry': loss & (scored == 0),
+            'tb_points': amount >= size_total[team_index],
+            'tm_points': amount < size_total[team_index],
+            'itb_points': scored >= size_itotal[team_index],
+            'itm_points': scored < size_itotal[team_index],
+            'overtime_losses': draw & (scored < conceded),
+            'overtime_wins': draw & (scored > conceded),
+            'oz_points': (scored > 0) & (conceded > 0),
+            'ozn_points': (scored == 0) | (conceded == 0),
+        }
+        for prefix, values, above in (
+            ('tb', amount, True), ('tm', amount, False),
+            ('itb', scored, True), ('itm', scored, False)
+        ):
+            reached = values >= thresholds if above else values < thresholds
+            for (suffix, _), condition in zip(TOTAL_THRESHOLDS, reached):
+                conditions[f'{prefix}{suffix}_points'] = condition
+
+        # Все счетчики одним np.bincount по ключу (условие, команда)
+        condition_index, row_index = np.nonzero(
+            np.vstack(list(conditions.values()))
+        )
+        counts = np.bincount(
+            condition_index * count_teams + team_index[row_index],
+            minlength=len(conditions) * count_teams
+        ).reshape(len(conditions), count_teams)
+        counts = dict(zip(conditions, counts))
+
+        goals_scored = np.bincount(
+            team_index, weights=scored, minlength=count_teams
+        )
+        goals_conceded = np.bincount(
+            team_index, weights=conceded, minlength=count_teams
+        )
+        columns = {
+            'goals_scored': goals_scored,
+            'goals_conceded': goals_conceded,
+            'goals_difference': goals_scored - goals_conceded,
+            'goals_amount': goals_scored + goals_conceded,
+            'points': 3 * counts['games_wins'] + counts['games_draws'],
+            **counts
+        }
+        # Значения переводятся в типы Python один раз для всех команд
+        names = list(columns)
+        values = list(zip(*(columns[name].tolist() for name in names)))
+
         standings = {}
-        for team in tournament.teams.values():
-            matches = team.filtered_matches
-            if len(matches) > 0:
-                match_id = matches[0][5]
-                game_data = matches[0][6]
-                pass
-            else:
-                continue
-            sport_name = team.name.sports.sportName
-            goals_scored = sum(match[0] for match in matches)
-            goals_conceded = sum(match[1] for match in matches)
-            goal_difference = goals_scored - goals_conceded
-            goal_amount = goals_scored + goals_conceded
-            games_wins = sum(
-                1 for t in matches for s in t if s == 'win'
-            )
-            games_draws = sum(
-                1 for t in matches for s in t if s == 'draw'
+        for index, first_row in zip(present.tolist(), first.tolist()):
+            team = teams[index]
+            standing = dict(zip(names, values[index]))
+            scored_total = standing['goals_scored']
+            conceded_total = standing['goals_conceded']
+            standing['match_id'] = int(rows['match_id'][first_row])
+            standing['team'] = team.name
+            standing['goals_ratio'] = round(
+                scored_total / conceded_total
+                    if conceded_total != 0 else scored_total, 2
             )
-            games_losses = sum(
-                1 for t in matches for s in t if s == 'loss'
-            )
-            goal_ratio = round(
-                goals_scored / goals_conceded
-                    if goals_conceded != 0 else goals_scored, 2
-            )
-            points = sum(
-                3 if match[2] == 'win' else 1
-                    if match[2] == 'draw' else 0 for match in matches
-            )
-            tb_points = len([
-                t for t in matches
-                    if t[0] + t[1] >= SIZE_TOTAL[sport_name]
-            ])
-            tb05_points = len(
-                [t for t in matches if t[0] + t[1] >= 0.5]
-            )
-            tb15_points = len(
-                [t for t in matches if t[0] + t[1] >= 1.5]
-            )
-            tb25_points = len(
-                [t for t in matches if t[0] + t[1] >= 2.5]
-            )
-            tb35_points = len(
-                [t for t in matches if t[0] + t[1] >= 3.5]
-            )
-            tb45_points = len(
-                [t for t in matches if t[0] + t[1] >= 4.5]
-            )
-            tb55_points = len(
-                [t for t in matches if t[0] + t[1] >= 5.5]
-            )
-            tm_points = len([
-                t for t in matches
-                    if t[0] + t[1] < SIZE_TOTAL[sport_name]
-            ])
-            tm05_points = len(
-                [t for t in matches if t[0] + t[1] < 0.5]
-            )
-            tm15_points = len(
-                [t for t in matches if t[0] + t[1] < 1.5]
-            )
-            tm25_points = len(
-                [t for t in matches if t[0] + t[1] < 2.5]
-            )
-            tm35_points = len(
-                [t for t in matches if t[0] + t[1] < 3.5]
-            )
-            tm45_points = len(
-                [t for t in matches if t[0] + t[1] < 4.5]
-            )
-            tm55_points = len(
-                [t for t in matches if t[0] + t[1] < 5.5]
-            )
-            itb_points = len([
-                t for t in matches if t[0] >= SIZE_ITOTAL[sport_name]
-            ])
-            itb05_points = len([t for t in matches if t[0] >= 0.5])
-            itb15_points = len([t for t in matches if t[0] >= 1.5])
-            itb25_points = len([t for t in matches if t[0] >= 2.5])
-            itb35_points = len([t for t in matches if t[0] >= 3.5])
-            itb45_points = len([t for t in matches if t[0] >= 4.5])
-            itb55_points = len([t for t in matches if t[0] >= 5.5])
-            itm_points = len([
-                t for t in matches if t[0] < SIZE_ITOTAL[sport_name]
-            ])
-            itm05_points = len([t for t in matches if t[0] < 0.5])
-            itm15_points = len([t for t in matches if t[0] < 1.5])
-            itm25_points = len([t for t in matches if t[0] < 2.5])
-            itm35_points = len([t for t in matches if t[0] < 3.5])
-            itm45_points = len([t for t in matches if t[0] < 4.5])
-            itm55_points = len([t for t in matches if t[0] < 5.5])
-            oz_points = len([
-                t for t in matches if t[0] > 0 and t[1] > 0
-            ])
-            ozn_points = len([
-                t for t in matches if t[0] == 0 or t[1] == 0
-            ])
-            average_scoring = round(
-                goals_scored / team.games_played
+            standing['average_scoring'] = round(
+                scored_total / team.games_played
                     if team.games_played != 0 else 0, 2
             )
-            average_throughput = round(
-                goals_conceded / team.games_played
+            standing['average_throughput'] = round(
+                conceded_total / team.games_played
                     if team.games_played != 0 else 0, 2
             )
-            victory_dry = sum(
-                1 for t in matches for s in t
-                    if s == 'win' and t[1] == 0
-            )
-            lossing_dry = sum(
-                1 for t in matches for s in t
-                    if s == 'loss' and t[0] == 0
-            )
-            overtime_losses = sum(
-                1 for t in matches for s in t
-                    if s == 'draw' and t[0] < t[1]
-            )
-            overtime_wins = sum(
-                1 for t in matches for s in t
-                    if s == 'draw' and t[0] > t[1]
-            )
-            standings[team.name.id] = {
-                'match_id': match_id,
-                'team': team.name,
-                'games_played': len(matches),
-                'games_wins': games_wins,
-                'games_draws': games_draws,
-                'games_losses': games_losses,
-                'goals_scored': goals_scored,
-                'goals_conceded': goals_conceded,
-                'goals_difference': goal_difference,
-                'goals_amount': goal_amount,
-                'goals_ratio': goal_ratio,
-                'points': points,
-                'average_scoring': average_scoring,
-                'average_throughput': average_throughput,
-                'victory_dry': victory_dry,
-                'lossing_dry': lossing_dry,
-                'tb_points': tb_points,
-                'tb05_points': tb05_points,
-                'tb15_points': tb15_points,
-                'tb25_points': tb25_points,
-                'tb35_points': tb35_points,
-                'tb45_points': tb45_points,
-                'tb55_points': tb55_points,
-                'tm_points': tm_points,
-                'tm05_points': tm05_points,
-                'tm15_points': tm15_points,
-                'tm25_points': tm25_points,
-                'tm35_points': tm35_points,
-                'tm45_points': tm45_points,
-                'tm55_points': tm55_points,
-                'itb_points': itb_points,
-                'itb05_points': itb05_points,
-                'itb15_points': itb15_points,
-                'itb25_points': itb25_points,
-                'itb35_points': itb35_points,
-                'itb45_points': itb45_points,
-                'itb55_points': itb55_points,
-                'itm_points': itm_points,
-                'itm05_points': itm05_points,
-                'itm15_points': itm15_points,
-                'itm25_points': itm25_points,
-                'itm35_points': itm35_points,
-                'itm45_points': itm45_points,
-                'itm55_points': itm55_points,
-                'overtime_losses': overtime_losses,
-                'overtime_wins': overtime_wins,
-                'oz_points': oz_points,
-                'ozn_points': ozn_points,
-                'dif_rating': round(team.dif_rating, 2),
-                'vo_rating': round(team.vo_rating, 2),
-                'elo_rating': round(team.elo_rating, 2),
-                'potemkin_rating': round(team.potemkin_rating, 2),
-                'power_rating': round(team.power_rating, 2),
-                'gameData': game_data
-            }
-        # return sorted(
-        #     standings, key=lambda x: (
-        #         -x['points'], x['goals_difference'], -x['goals_scored']
-        #     )
-        # )
+            standing['dif_rating'] = round(team.dif_rating, 2)
+            standing['vo_rating'] = round(team.vo_rating, 2)
+            standing['elo_rating'] = round(team.elo_rating, 2)
+            standing['potemkin_rating'] = round(team.potemkin_rating, 2)
+            standing['power_rating'] = round(team.power_rating, 2)
+            standing['gameData'] = table.game_data[indexes[first_row]]
+            standings[team.name.id] = standing
         return standings
 
     def get_standings_elo(self):
@@ -1005,126 +1105,48 @@ class TableStrategy(ABC):
 
 
 class GeneralTableStrategy(TableStrategy):
-    """Стратегия общих данных"""
-
-    def filter_matches(self, teams):
-        """
-        Фильтрация матчей - выбираются все матчи
-
-        Args:
-            teams: Словарь команд
-        """
-        for team in teams.values():
-            team.filtered_matches = team.matches
+    """Стратегия общих данных - выбираются все матчи"""
 
 
 class HomeGamesTableStrategy(GeneralTableStrategy):
     """
     Класс для выполнения расчетов турнирной таблицы и рейтингов.
-    Параметры отбора: игры дома, игры в гостях и
-    итоговая турнирная таблица.
+    Параметры отбора: только домашние матчи.
     """
-    def filter_matches(self, teams):
-        """
-        Отбор только домашних матчей.
-        Весь расчет будет основан на этом списке команд.
-
-        Args:
-            teams: Словарь команд
-        """
-        for team in teams.values():
-            team.filtered_matches = [
-                match for match in team.matches if match[3]
-            ]
+    home_games = True
 
 
 class AwayGamesTableStrategy(GeneralTableStrategy):
     """Стратегия фильтрации гостевых матчей"""
-
-    def filter_matches(self, teams):
-        """
-         Отбор только гостевых матчей.
-
-         Args:
-             teams: Словарь команд
-         """
-        for team in teams.values():
-            team.filtered_matches = [
-                match for match in team.matches if not match[3]
-            ]
+    home_games = False
 
 
 class StrongOpponentsTableStrategy(TableStrategy):
     """Стратегия фильтрации матчей с сильными соперниками"""
+    bucket = 'strong'
 
     def get_strong_teams(self, teams):
         """
-        Отбор команд из верхней части турнирной таблицы.
+        Отбор команд группы силы стратегии (bucket).
 
         Args:
             teams: Словарь команд
 
         Returns:
-            list: Сильные команды
+            list: Команды группы
         """
-        total_teams = len(teams)
-        sorted_teams = sorted(teams.values(), key=lambda x: -x.points)
-        strong_teams = sorted_teams[:total_teams // 3]
-        return strong_teams
-
-    def filter_matches(self, teams):
-        """
-        Фильтрация матчей с сильными соперниками.
-
-        Args:
-            teams: Словарь команд
-        """
-        strong_teams = self.get_strong_teams(teams)
-        for team in teams.values():
-            team.filtered_matches = [
-                match for match in team.matches
-                    if match[4] in strong_teams
-            ]
+        mask = Tournament().strength_buckets()[self.bucket]
+        return [team for team in teams.values() if mask[team.index]]
 
 
 class MediumOpponentsTableStrategy(StrongOpponentsTableStrategy):
     """Стратегия фильтрации матчей со средними соперниками"""
-
-    def get_strong_teams(self, teams):
-        """
-        Отбор команд из средней части турнирной таблицы.
-
-        Args:
-            teams: Словарь команд
-
-        Returns:
-            list: Средние команды
-        """
-        total_teams = len(teams)
-        sorted_teams = sorted(teams.values(), key=lambda x: -x.points)
-        medium_teams = sorted_teams[
-                       total_teams // 3:2 * total_teams // 3
-                       ]
-        return medium_teams
+    bucket = 'medium'
 
 
 class WeakOpponentsTableStrategy(StrongOpponentsTableStrategy):
     """Стратегия фильтрации матчей со слабыми соперниками"""
-
-    def get_strong_teams(self, teams):
-        """
-        Отбор команд из нижней части турнирной таблицы.
-
-        Args:
-            teams: Словарь команд
-
-        Returns:
-            list: Слабые команды
-        """
-        total_teams = len(teams)
-        sorted_teams = sorted(teams.values(), key=lambda x: -x.points)
-        weak_teams = sorted_teams[2 * total_teams // 3:]
-        return weak_teams
+    bucket = 'weak'
 
 
 class HomeGamesStrongOpponentsTableStrategy(
@@ -1132,35 +1154,7 @@ class HomeGamesStrongOpponentsTableStrategy(
     StrongOpponentsTableStrategy
 ):
     """Стратегия фильтрации домашних матчей с сильными соперниками"""
-
-    def get_strong_teams(self, teams):
-        """
-        Отбор команд из верхней части турнирной таблицы.
-
-        Args:
-            teams: Словарь команд
-
-        Returns:
-            list: Сильные команды
-        """
-        total_teams = len(teams)
-        sorted_teams = sorted(teams.values(), key=lambda x: -x.points)
-        strong_teams = sorted_teams[:total_teams // 3]
-        return strong_teams
-
-    def filter_matches(self, teams):
-        """
-        Фильтрация домашних матчей с сильными соперниками.
-
-        Args:
-            teams: Словарь команд
-        """
-        strong_teams = self.get_strong_teams(teams)
-        for team in teams.values():
-            team.filtered_matches = [
-                match for match in team.matches
-                    if match[4] in strong_teams and match[3]
-            ]
+    home_games = True
 
 
 class HomeGamesMediumOpponentsTableStrategy(
@@ -1168,37 +1162,8 @@ class HomeGamesMediumOpponentsTableStrategy(
     StrongOpponentsTableStrategy
 ):
     """Стратегия фильтрации домашних матчей со средними соперниками"""
-
-    def get_strong_teams(self, teams):
-        """
-        Отбор команд из средней части турнирной таблицы.
-
-        Args:
-            teams: Словарь команд
-
-        Returns:
-            list: Средние команды
-        """
-        total_teams = len(teams)
-        sorted_teams = sorted(teams.values(), key=lambda x: -x.points)
-        medium_teams = sorted_teams[
-                       total_teams // 3:2 * total_teams // 3
-                       ]
-        return medium_teams
-
-    def filter_matches(self, teams):
-        """
-        Фильтрация домашних матчей со средними соперниками.
-
-        Args:
-            teams: Словарь команд
-        """
-        medium_teams = self.get_strong_teams(teams)
-        for team in teams.values():
-            team.filtered_matches = [
-                match for match in team.matches
-                    if match[4] in medium_teams and match[3]
-            ]
+    home_games = True
+    bucket = 'medium'
 
 
 class HomeGamesWeakOpponentsTableStrategy(
@@ -1206,35 +1171,8 @@ class HomeGamesWeakOpponentsTableStrategy(
     StrongOpponentsTableStrategy
 ):
     """Стратегия фильтрации домашних матчей со слабыми соперниками"""
-
-    def get_strong_teams(self, teams):
-        """
-        Отбор команд из нижней части турнирной таблицы.
-
-        Args:
-            teams: Словарь команд
-
-        Returns:
-            list: Слабые команды
-        """
-        total_teams = len(teams)
-        sorted_teams = sorted(teams.values(), key=lambda x: -x.points)
-        weak_teams = sorted_teams[2 * total_teams // 3:]
-        return weak_teams
-
-    def filter_matches(self, teams):
-        """
-        Фильтрация домашних матчей со слабыми соперниками.
-
-        Args:
-            teams: Словарь команд
-        """
-        weak_teams = self.get_strong_teams(teams)
-        for team in teams.values():
-            team.filtered_matches = [
-                match for match in team.matches
-                    if match[4] in weak_teams and match[3]
-            ]
+    home_games = True
+    bucket = 'weak'
 
 
 class AwayGamesStrongOpponentsTableStrategy(
@@ -1242,35 +1180,7 @@ class AwayGamesStrongOpponentsTableStrategy(
     StrongOpponentsTableStrategy
 ):
     """Стратегия фильтрации гостевых матчей с сильными соперниками"""
-
-    def get_strong_teams(self, teams):
-        """
-        Отбор команд из верхней части турнирной таблицы.
-
-        Args:
-            teams: Словарь команд
-
-        Returns:
-            list: Сильные команды
-        """
-        total_teams = len(teams)
-        sorted_teams = sorted(teams.values(), key=lambda x: -x.points)
-        strong_teams = sorted_teams[:total_teams // 3]
-        return strong_teams
-
-    def filter_matches(self, teams):
-        """
-        Фильтрация гостевых матчей с сильными соперниками.
-
-        Args:
-            teams: Словарь команд
-        """
-        strong_teams = self.get_strong_teams(teams)
-        for team in teams.values():
-            team.filtered_matches = [
-                match for match in team.matches
-                    if match[4] in strong_teams and not match[3]
-            ]
+    home_games = False
 
 
 class AwayGamesMediumOpponentsTableStrategy(
@@ -1278,37 +1188,8 @@ class AwayGamesMediumOpponentsTableStrategy(
     StrongOpponentsTableStrategy
 ):
     """Стратегия фильтрации гостевых матчей со средними соперниками"""
-
-    def get_strong_teams(self, teams):
-        """
-        Отбор команд из средней части турнирной таблицы.
-
-        Args:
-            teams: Словарь команд
-
-        Returns:
-            list: Средние команды
-        """
-        total_teams = len(teams)
-        sorted_teams = sorted(teams.values(), key=lambda x: -x.points)
-        medium_teams = sorted_teams[
-                       total_teams // 3:2 * total_teams // 3
-                       ]
-        return medium_teams
-
-    def filter_matches(self, teams):
-        """
-        Фильтрация гостевых матчей со средними соперниками.
-
-        Args:
-            teams: Словарь команд
-        """
-        medium_teams = self.get_strong_teams(teams)
-        for team in teams.values():
-            team.filtered_matches = [
-                match for match in team.matches
-                    if match[4] in medium_teams and not match[3]
-            ]
+    home_games = False
+    bucket = 'medium'
 
 
 class AwayGamesWeakOpponentsTableStrategy(
@@ -1316,32 +1197,5 @@ class AwayGamesWeakOpponentsTableStrategy(
     StrongOpponentsTableStrategy
 ):
     """Стратегия фильтрации гостевых матчей со слабыми соперниками"""
-
-    def get_strong_teams(self, teams):
-        """
-        Отбор команд из нижней части турнирной таблицы.
-
-        Args:
-            teams: Словарь команд
-
-        Returns:
-            list: Слабые команды
-        """
-        total_teams = len(teams)
-        sorted_teams = sorted(teams.values(), key=lambda x: -x.points)
-        weak_teams = sorted_teams[2 * total_teams // 3:]
-        return weak_teams
-
-    def filter_matches(self, teams):
-        """
-        Фильтрация гостевых матчей со слабыми соперниками.
-
-        Args:
-            teams: Словарь команд
-        """
-        weak_teams = self.get_strong_teams(teams)
-        for team in teams.values():
-            team.filtered_matches = [
-                match for match in team.matches
-                    if match[4] in weak_teams and not match[3]
-            ]
\ No newline at end of file
+    home_games = False
+    bucket = 'weak'
@@ -0,0 +1,197 @@
+import pytest
+from types import SimpleNamespace
+from datetime import datetime
+from standings import (
+    Tournament, Team, Match, MatchTable, GeneralTableStrategy,
+    HomeGamesTableStrategy, AwayGamesTableStrategy,
+    StrongOpponentsTableStrategy, HomeGamesStrongOpponentsTableStrategy
+)
+
+
+class TeamRecord:
+    """Команда БД с видом спорта (как объект ORM)"""
+
+    def __init__(self, team_id):
+        self.id = team_id
+        self.sports = SimpleNamespace(sportName='Soccer')
+
+
+def make_team(team_id):
+    return TeamRecord(team_id)
+
+
+@pytest.fixture
+def tournament():
+    """Турнир из трех команд и трех сыгранных матчей"""
+    Tournament.clean()
+    tournament = Tournament()
+    teams = [make_team(i) for i in range(1, 4)]
+    for team in teams:
+        tournament.add_team(team)
+    tournament.add_match(
+        10, 1, 1, 1, datetime(2023, 1, 1), teams[0], teams[1], 2, 0, '', 1, 1
+    )
+    tournament.add_match(
+        11, 1, 1, 1, datetime(2023, 1, 8), teams[1], teams[2], 1, 1, '', 1, 1
+    )
+    tournament.add_match(
+        12, 1, 1, 1, datetime(2023, 1, 15), teams[2], teams[0], 3, 1, '', 1, 1
+    )
+    yield tournament, teams
+    Tournament.clean()
+
+
+def test_slots():
+    """Team и Match хранят атрибуты в __slots__"""
+    team = Team("Team A")
+    assert not hasattr(team, '__dict__')
+    with pytest.raises(AttributeError):
+        team.unknown_attribute = 1
+    assert 'match_id' in Match.__slots__
+
+
+def test_match_table_rows(tournament):
+    """На каждый матч две строки: хозяева и гости"""
+    tournament, teams = tournament
+    rows = tournament.table.rows
+    assert len(tournament.table) == 6
+    assert rows['team'].tolist() == [0, 1, 1, 2, 2, 0]
+    assert rows['opponent'].tolist() == [1, 0, 2, 1, 0, 2]
+    assert rows['is_home'].tolist() == [True, False] * 3
+    assert rows['result'].tolist() == [1, -1, 0, 0, 1, -1]
+    assert rows['position'].tolist() == [0, 0, 1, 0, 1, 1]
+
+
+def test_match_table_grows():
+    """Массив расширяется при заполнении"""
+    table = MatchTable(capacity=1)
+    home, away = Team("A"), Team("B")
+    home.index, away.index = 0, 1
+    for match_id in range(5):
+        home.matches.append((1, 0, 'win', True, away, match_id, None))
+        table.append(home, home.matches[-1])
+    assert len(table) == 5
+    assert table.rows['match_id'].tolist() == list(range(5))
+    assert table.rows['position'].tolist() == list(range(5))
+
+
+def test_home_and_away_masks(tournament):
+    """Фильтры домашних и гостевых матчей - маски строк"""
+    tournament, teams = tournament
+    home = HomeGamesTableStrategy()
+    home.filter_matches(tournament.teams)
+    away = AwayGamesTableStrategy()
+    away.filter_matches(tournament.teams)
+    assert home.mask.tolist() == [True, False] * 3
+    assert (home.mask ^ away.mask).all()
+
+    team = tournament.get_team(teams[0])
+    assert home.get_filtered_matches(team) == [team.matches[0]]
+    assert away.get_filtered_matches(team) == [team.matches[1]]
+
+
+def test_general_standings(tournament):
+    """Общая таблица по всем матчам"""
+    tournament, teams = tournament
+    strategy = GeneralTableStrategy()
+    strategy.filter_matches(tournament.teams)
+    standings = strategy.get_standings()
+
+    assert set(standings) == {1, 2, 3}
+    first = standings[1]
+    assert first['match_id'] == 10
+    assert first['gameData'] == datetime(2023, 1, 1)
+    assert first['games_played'] == 2
+    assert first['games_wins'] == 1
+    assert first['games_losses'] == 1
+    assert first['goals_scored'] == 3
+    assert first['goals_conceded'] == 3
+    assert first['points'] == 3
+    assert first['tb_points'] == 1
+    assert first['itb_points'] == 1
+    assert first['victory_dry'] == 1
+    assert first['oz_points'] == 1
+    assert first['ozn_points'] == 1
+    assert first['tb25_points'] == 1
+    assert first['itm05_points'] == 0
+
+    second = standings[2]
+    assert second['games_draws'] == 1
+    assert second['points'] == 1
+    assert second['lossing_dry'] == 1
+    assert second['goals_ratio'] == round(1 / 3, 2)
+
+
+def test_strong_opponents_standings(tournament):
+    """Матчи с сильными соперниками (верхняя треть по очкам)"""
+    tournament, teams = tournament
+    strategy = StrongOpponentsTableStrategy()
+    strategy.filter_matches(tournament.teams)
+    strong = strategy.get_strong_teams(tournament.teams)
+    assert len(strong) == 1
+
+    standings = strategy.get_standings()
+    opponent_ids = {
+        match[4].name.id
+            for team in tournament.teams.values()
+            for match in strategy.get_filtered_matches(team)
+    }
+    assert opponent_ids == {strong[0].name.id}
+    assert strong[0].name.id not in standings
+
+    home_strong = HomeGamesStrongOpponentsTableStrategy()
+    home_strong.filter_matches(tournament.teams)
+    assert not (home_strong.mask & ~strategy.mask).any()
+    assert tournament.table.rows['is_home'][home_strong.mask].all()
+
+
+def test_empty_standings():
+    """Без матчей таблица пуста"""
+    Tournament.clean()
+    tournament = Tournament()
+    tournament.add_team(make_team(1))
+    strategy = GeneralTableStrategy()
+    strategy.filter_matches(tournament.teams)
+    assert strategy.get_standings() == {}
+    Tournament.clean()
+
+
+def test_strength_buckets(tournament):
+    """Трети команд по очкам (при равенстве - порядок добавления)"""
+    tournament, teams = tournament
+    buckets = tournament.strength_buckets()
+    assert buckets['strong'].tolist() == [True, False, False]
+    assert buckets['medium'].tolist() == [False, False, True]
+    assert buckets['weak'].tolist() == [False, True, False]
+
+
+def test_strength_buckets_cached(tournament):
+    """Группы пересчитываются только при изменении порядка по очкам"""
+    tournament, teams = tournament
+    buckets = tournament.strength_buckets()
+
+    # Порядок команд не изменился - те же маски
+    for team in tournament.teams.values():
+        team.points += 1
+    assert tournament.strength_buckets() is buckets
+
+    tournament.get_team(teams[1]).points = 100
+    changed = tournament.strength_buckets()
+    assert changed is not buckets
+    assert changed['strong'].tolist() == [False, True, False]
+
+
+def test_opponent_strategies_share_buckets(tournament):
+    """Варианты по соперникам отбирают строки по общей маске группы"""
+    tournament, teams = tournament
+    rows = tournament.table.rows
+    strong = tournament.strength_buckets()['strong'][rows['opponent']]
+
+    for strategy_class, venue in (
+        (StrongOpponentsTableStrategy, None),
+        (HomeGamesStrongOpponentsTableStrategy, True),
+    ):
+        strategy = strategy_class()
+        strategy.filter_matches(tournament.teams)
+        expected = strong if venue is None else strong & (rows['is_home'] == venue)
+        assert strategy.mask.tolist() == expected.tolist()
@@ -5,11 +5,11 @@
 import os
 import logging
 import pandas as pd
-from multiprocessing import JoinableQueue, cpu_count
+from multiprocessing import JoinableQueue, Queue, cpu_count
 
 from db.queries.match import get_match_modeling
 from db.storage.calculation import (
-    save_feature, save_standing
+    save_feature, save_standing, save_target
 )
 from .standings import (
     Tournament,
@@ -32,11 +32,14 @@ from db.queries.sport import get_sport_id
 from db.queries.tournament import get_tournament_id
 from core.constants import TIME_FRAME, MATCH_TYPE
 from core.utils import (
-    convert_standing, create_feature_attr, create_feature_attr_onehot,
-    create_feature_vector, create_feature_vector_new,
+    convert_standing, create_feature_attr,
+    create_feature_vector,
     normalize_features, validate_features, analyze_feature_quality
 )
 from core.consumer import Consumer
+from core.telemetry import get_tracer
+from core.target_utils import build_targets
+from core.feature_vector import FeatureMatrix
 from config import get_db_session
 from db.base import DBSession
 
@@ -112,15 +115,18 @@ class CalculationDataPipeline:
             time_frame: Временной диапазон для обработки данных
         """
         full_time = time_frame == 'ALL_TIME' #TIME_FRAME[0]
-        self.data_source.retrieve(full_time)
+        tracer = get_tracer()
+        with tracer.span('retrieve'):
+            self.data_source.retrieve(full_time)
 
         tournaments = self.data_source.tournaments_id
 
         tasks = JoinableQueue()
+        results = Queue()
 
         number_consumers = cpu_count()
         consumers = [
-            Consumer(tasks, None)
+            Consumer(tasks, results)
                 for _ in range(number_consumers)
         ]
         for consumer in consumers:
@@ -140,7 +146,10 @@ class CalculationDataPipeline:
             tasks.put(None)
 
         tasks.join()
-        
+
+        # Телеметрия турниров (до join, чтобы очередь результатов не блокировала выход)
+        tracer.collect(results, len(tournaments))
+
         # Ждем завершения всех потребителей
         for consumer in consumers:
             consumer.join()
@@ -194,7 +203,7 @@ class DataStorage:
     Базовый класс для реализации логики хранения данных.
     """
 
-    def save(self, tournament_id, standing, vector):
+    def save(self, tournament_id, standing, vector, targets=None):
 
         """
         Сохранение данных
@@ -203,6 +212,7 @@ class DataStorage:
             tournament_id: Идентификатор турнира
             standing: Турнирная таблица
             vector: Вектор признаков
+            targets: Целевые переменные прошедших матчей
         """
         pass
 
@@ -280,7 +290,7 @@ class CreatingStandings(DataProcessor):
         """
         standings = {}
         standing_save = {}
-        features = {}
+        features = FeatureMatrix()
         #snapshots = []  # накопление срезов состояния команды на дату матча
 
         tournament = Tournament()
@@ -354,14 +364,10 @@ class CreatingStandings(DataProcessor):
                 standing_away
             )
             # Из данных ТТ по соперникам создаем относительный вектор параметров ТТ
-            # standing_home и standing_away - это параметры рассчитанные по ТТ
-            # а feature_vector - это расширеная значения фичей (home, away, diff, ratio)
-            # ВАЖНО: передаем текущий match_id, чтобы targets создавались для правильного матча
-            feature_vector = create_feature_vector_new(
-                standing_home,
-                standing_away,
-                row['id']  # Передаем ID текущего обрабатываемого матча
-            )
+            # standing_home и standing_away - это параметры рассчитанные по ТТ,
+            # в матрицу турнира попадают их значения; diff и ratio считаются
+            # векторно для всех матчей турнира при сохранении
+            features.add(row['id'], standing_home, standing_away)
             
             # Применяем нормализацию для улучшения качества моделей
             #feature_vector = normalize_features(feature_vector)
@@ -375,28 +381,14 @@ class CreatingStandings(DataProcessor):
             
             # Сохраняем features для ВСЕХ матчей (прошедших и будущих)
             # Это необходимо для прогнозирования будущих матчей
-            if match_over:
-                # Для прошедших матчей: размечаем данные на основе результата
-                # Присваиваем в зависимости от результата матча значения 
-                # категориальным переменным (One-Hot encoding)
-                # Targets создаются автоматически внутри create_feature_attr_onehot
-                for name_vector in feature_vector:
-                    feature_vector[name_vector] = create_feature_attr_onehot(
-                        feature_vector[name_vector],
-                        row['sport_id'],
-                        row['numOfHeadsHome'],
-                        row['numOfHeadsAway'],
-                        row['typeOutcome']
-                    )
-            else:
+            # Разметка прошедших матчей (targets) рассчитывается пакетно
+            # по счету после цикла и сохраняется вместе с features
+            if not match_over:
                 # Для будущих матчей: target поля остаются пустыми
                 # Это позволяет использовать features для прогнозирования,
                 # но без разметки результата (которого еще нет)
                 logger.debug(f'Создаем features для будущего матча {row["id"]} без разметки результата')
             
-            # Сохраняем features для всех матчей
-            features[row['id']] = feature_vector
-
             # Сохраняем snapshot для домашней и гостевой команд на дату матча
             # try:
             #     def _standing_to_dict(st_obj, side):
@@ -410,6 +402,8 @@ class CreatingStandings(DataProcessor):
 
         tournament.clean()
 
+        targets = self._build_targets(df_match)
+
         # Анализ качества созданных фичей
         # if features:
         #     quality_analysis = analyze_feature_quality(features)
@@ -426,7 +420,22 @@ class CreatingStandings(DataProcessor):
             #     if stats['negative'] > stats['count'] * 0.1:  # Более 10% отрицательных
             #         logger.warning(f"  Фича {feature_name}: {stats['negative']}/{stats['count']} отрицательных значений")
 
-        return standing_save, features #, snapshots
+        return standing_save, features, targets #, snapshots
+
+    @staticmethod
+    def _build_targets(df_match):
+        """
+        Targets прошедших матчей турнира одним векторным расчетом по
+        колонкам счета (по одной записи на матч).
+        """
+        goals_home = pd.to_numeric(df_match['numOfHeadsHome'], errors='coerce')
+        goals_away = pd.to_numeric(df_match['numOfHeadsAway'], errors='coerce')
+        finished = goals_home.notna() & goals_away.notna()
+        return build_targets(
+            df_match.loc[finished, 'id'],
+            goals_home[finished],
+            goals_away[finished]
+        )
 
 
 class FileStorage(DataStorage):
@@ -440,17 +449,20 @@ class FileStorage(DataStorage):
         self.db_session = db_session
 
     #def save(self, tournament_id, standings, features, snapshots=None):
-    def save(self, tournament_id, standings, features):
+    def save(self, tournament_id, standings, features, targets=None):
         """
         Сохранение данных
 
         Args:
             tournament_id: Идентификатор турнира
             standings: Турнирная таблица
-            features: Вектор признаков
+            features: Признаки матчей турнира (FeatureMatrix)
+            targets: Целевые переменные прошедших матчей
         """
         save_standing(self, tournament_id, standings)
         save_feature(self, tournament_id, features)
+        if targets:
+            save_target(self, tournament_id, targets)
         # Экспортируем snapshots в файл (append)
         # try:
         #     if snapshots:
@@ -477,6 +489,7 @@ class TournamentConsumer:
         self.data_processor = data_processor
         self.data_storage = data_storage
         self.tournament_id = tournament_id
+        self.rows = 0
 
     def process(self):
         """Обрабатывает один турнир в отдельном процессе."""
@@ -487,8 +500,9 @@ class TournamentConsumer:
                 self.data_processor.set_db_session(db_session)
 
                 df_team, df_match = self.select_data(self.tournament_id)
+                self.rows = len(df_match)
 
-                standings, feature = self.data_processor.process(
+                standings, feature, targets = self.data_processor.process(
                     df_match,
                     df_team
                 )
@@ -512,7 +526,8 @@ class TournamentConsumer:
                 self.data_storage.save(
                     self.tournament_id,
                     standings,
-                    feature
+                    feature,
+                    targets
                 )
 
         except Exception as e:
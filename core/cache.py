@@ -0,0 +1,345 @@
+# izhbet/core/cache.py
+"""
+Бэкенды кэша с временем жизни (TTL) и инвалидацией по тегам.
+
+MemoryTTLCache - кэш процесса (LRU + TTL).
+SQLiteCache - общий кэш на диске: публикатор, API и дашборд работают
+в разных процессах и используют один файл вместо собственного прогрева.
+TieredCache - память процесса поверх общего SQLite-кэша.
+
+Устаревшие записи хранятся еще stale_ttl секунд после истечения TTL и
+отдаются вызывающему коду, если пересчитать значение не удалось.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheEntry:
+    """Запись кэша."""
+    value: Any
+    stored_at: float
+    expires_at: float
+    tag: str = ''
+
+    @property
+    def is_fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+
+class CacheBackend:
+    """Интерфейс бэкенда кэша."""
+
+    name = 'base'
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Возвращает запись (в том числе устаревшую) или None."""
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, tag: str, computed_at: Optional[float] = None) -> bool:
+        """
+        Сохраняет значение с тегом (computed_at - время начала расчета).
+
+        Возвращает False, если значение рассчитано до инвалидации тега
+        и не записано.
+        """
+        raise NotImplementedError
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        """Удаляет записи с указанными тегами, возвращает их количество."""
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def size(self) -> int:
+        raise NotImplementedError
+
+    def info(self) -> Dict[str, Any]:
+        return {'backend': self.name, 'currsize': self.size()}
+
+
+class MemoryTTLCache(CacheBackend):
+    """Кэш в памяти процесса с TTL и вытеснением по LRU."""
+
+    name = 'memory'
+
+    def __init__(self, ttl: float = 300.0, stale_ttl: float = 3600.0, maxsize: int = 1024):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.maxsize = maxsize
+        self._entries: 'OrderedDict[str, CacheEntry]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.time() >= entry.expires_at + self.stale_ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, value: Any, tag: str, computed_at: Optional[float] = None) -> bool:
+        now = time.time()
+        self.put_entry(key, CacheEntry(value, now, now + self.ttl, tag))
+        return True
+
+    def put_entry(self, key: str, entry: CacheEntry) -> None:
+        """Сохраняет готовую запись (при чтении из общего кэша)."""
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        tags = set(tags)
+        with self._lock:
+            keys = [key for key, entry in self._entries.items() if entry.tag in tags]
+            for key in keys:
+                del self._entries[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def size(self) -> int:
+        return len(self._entries)
+
+    def info(self) -> Dict[str, Any]:
+        return {'backend': self.name, 'currsize': self.size(), 'maxsize': self.maxsize, 'ttl': self.ttl}
+
+
+class SQLiteCache(CacheBackend):
+    """
+    Общий для процессов кэш в файле SQLite (режим WAL).
+
+    Таблица invalidations хранит время последней инвалидации каждого тега:
+    по ней другие процессы сбрасывают свои копии в памяти, а значения,
+    рассчитанные до инвалидации, не записываются.
+    """
+
+    name = 'sqlite'
+
+    def __init__(self, path: str, ttl: float = 3600.0, stale_ttl: float = 86400.0):
+        self.path = path
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        # После fork соединение родителя не используется
+        if self._conn is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS cache_entries ('
+                'key TEXT PRIMARY KEY, tag TEXT NOT NULL, value TEXT NOT NULL, '
+                'stored_at REAL NOT NULL, expires_at REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_cache_entries_tag ON cache_entries (tag)')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS invalidations ('
+                'tag TEXT PRIMARY KEY, invalidated_at REAL NOT NULL)'
+            )
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._connection().execute(
+                'SELECT value, stored_at, expires_at, tag FROM cache_entries WHERE key = ?', (key,)
+            ).fetchone()
+        if row is None or time.time() >= row[2] + self.stale_ttl:
+            return None
+        return CacheEntry(json.loads(row[0]), row[1], row[2], row[3])
+
+    def set(self, key: str, value: Any, tag: str, computed_at: Optional[float] = None) -> bool:
+        now = time.time()
+        payload = json.dumps(value, default=float)
+        with self._lock:
+            conn = self._connection()
+            if computed_at is not None:
+                row = conn.execute(
+                    'SELECT invalidated_at FROM invalidations WHERE tag = ?', (tag,)
+                ).fetchone()
+                if row is not None and row[0] >= computed_at:
+                    return False
+            conn.execute(
+                'INSERT OR REPLACE INTO cache_entries (key, tag, value, stored_at, expires_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (key, tag, payload, now, now + self.ttl)
+            )
+        return True
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        tags = list(set(tags))
+        if not tags:
+            return 0
+        now = time.time()
+        placeholders = ','.join('?' * len(tags))
+        with self._lock:
+            conn = self._connection()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                removed = conn.execute(
+                    f'DELETE FROM cache_entries WHERE tag IN ({placeholders})', tags
+                ).rowcount
+                conn.executemany(
+                    'INSERT OR REPLACE INTO invalidations (tag, invalidated_at) VALUES (?, ?)',
+                    [(tag, now) for tag in tags]
+                )
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        return removed
+
+    def invalidations_since(self, since: float) -> List[Tuple[str, float]]:
+        """Возвращает теги, инвалидированные после since."""
+        with self._lock:
+            return self._connection().execute(
+                'SELECT tag, invalidated_at FROM invalidations WHERE invalidated_at > ?', (since,)
+            ).fetchall()
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connection()
+            tags = [row[0] for row in conn.execute('SELECT DISTINCT tag FROM cache_entries').fetchall()]
+        self.invalidate_tags(tags)
+
+    def size(self) -> int:
+        with self._lock:
+            return self._connection().execute('SELECT COUNT(*) FROM cache_entries').fetchone()[0]
+
+    def info(self) -> Dict[str, Any]:
+        return {'backend': self.name, 'currsize': self.size(), 'path': self.path, 'ttl': self.ttl}
+
+
+class TieredCache(CacheBackend):
+    """
+    Кэш процесса поверх общего SQLite-кэша.
+
+    Инвалидации других процессов подхватываются не чаще раза в
+    sync_interval секунд.
+    """
+
+    name = 'tiered'
+
+    def __init__(self, memory: MemoryTTLCache, shared: SQLiteCache, sync_interval: float = 5.0):
+        self.memory = memory
+        self.shared = shared
+        self.sync_interval = sync_interval
+        self._last_sync = time.time()
+        self._last_check = 0.0
+        self.shared_hits = 0
+
+    def _sync_invalidations(self) -> None:
+        now = time.time()
+        if now - self._last_check < self.sync_interval:
+            return
+        self._last_check = now
+        changed = self.shared.invalidations_since(self._last_sync)
+        if changed:
+            self.memory.invalidate_tags(tag for tag, _ in changed)
+            self._last_sync = max(invalidated_at for _, invalidated_at in changed)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        self._sync_invalidations()
+        entry = self.memory.get(key)
+        if entry is not None and entry.is_fresh:
+            return entry
+
+        shared_entry = self.shared.get(key)
+        if shared_entry is not None and shared_entry.is_fresh:
+            self.shared_hits += 1
+            # В памяти запись живет не дольше собственного TTL
+            expires_at = min(shared_entry.expires_at, time.time() + self.memory.ttl)
+            self.memory.put_entry(key, CacheEntry(
+                shared_entry.value, shared_entry.stored_at, expires_at, shared_entry.tag
+            ))
+            return shared_entry
+        return entry or shared_entry
+
+    def set(self, key: str, value: Any, tag: str, computed_at: Optional[float] = None) -> bool:
+        # Значение, отклоненное общим кэшем (рассчитано до инвалидации тега
+        # в другом процессе), не попадает и в память процесса
+        if not self.shared.set(key, value, tag, computed_at):
+            return False
+        return self.memory.set(key, value, tag, computed_at)
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        tags = list(set(tags))
+        self.memory.invalidate_tags(tags)
+        return self.shared.invalidate_tags(tags)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        self.shared.clear()
+
+    def size(self) -> int:
+        return self.memory.size()
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            'backend': self.name,
+            'currsize': self.memory.size(),
+            'maxsize': self.memory.maxsize,
+            'ttl': self.memory.ttl,
+            'shared_size': self.shared.size(),
+            'shared_ttl': self.shared.ttl,
+            'shared_path': self.shared.path,
+            'shared_hits': self.shared_hits
+        }
+
+
+def create_cache_backend(
+    backend: str = 'tiered',
+    path: str = 'results/cache/statistics.sqlite',
+    ttl: float = 300.0,
+    shared_ttl: float = 3600.0,
+    stale_ttl: float = 86400.0,
+    maxsize: int = 1024
+) -> CacheBackend:
+    """
+    Создает бэкенд кэша по имени: memory, sqlite или tiered.
+
+    Если файл общего кэша недоступен, используется кэш в памяти.
+    """
+    memory = MemoryTTLCache(ttl=ttl, stale_ttl=stale_ttl, maxsize=maxsize)
+    if backend == 'memory':
+        return memory
+
+    try:
+        shared = SQLiteCache(path, ttl=shared_ttl, stale_ttl=stale_ttl)
+        shared.size()
+    except Exception as e:
+        logger.warning(f'Общий кэш {path} недоступен, используется кэш в памяти: {e}')
+        return memory
+
+    if backend == 'sqlite':
+        return shared
+    if backend != 'tiered':
+        logger.warning(f'Неизвестный бэкенд кэша {backend}, используется tiered')
+    return TieredCache(memory, shared)
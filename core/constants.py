@@ -90,6 +90,11 @@ SPR_SPORTS = {1: 'Soccer', 4: 'Ice Hockey'}
 SPR_SPORTS_RU = {'Soccer': '⚽ Футбол', 'Ice Hockey': 'Хоккей'}
 SIZE_TOTAL = {'Soccer': 2.5, 'Ice Hockey': 4.5}
 SIZE_ITOTAL = {'Soccer': 1.5, 'Ice Hockey': 2.5}
+DEFAULT_SIZE_TOTAL = 2.5
+DEFAULT_SIZE_ITOTAL = 1.5
+# Переопределение порогов для отдельных чемпионатов: {championship_id: порог}
+SIZE_TOTAL_CHAMPIONSHIP: dict[int, float] = {}
+SIZE_ITOTAL_CHAMPIONSHIP: dict[int, float] = {}
 
 # One-Hot encoding для категориальных переменных
 # Win/Draw/Loss: [home_win, draw, away_win]
@@ -192,6 +197,20 @@ TARGET_FIELDS = [
     'target_total_amount', 'target_total_home_amount', 'target_total_away_amount',
 ]
 
+# Числовые коды типов прогнозов (outcomes.feature)
+FORECAST_TYPE_TO_FEATURE = {
+    'win_draw_loss': 1,
+    'oz': 2,
+    'goal_home': 3,
+    'goal_away': 4,
+    'total': 5,
+    'total_home': 6,
+    'total_away': 7,
+    'total_amount': 8,
+    'total_home_amount': 9,
+    'total_away_amount': 10
+}
+
 DROP_FIELD_EMBEDDING = [
     'match_id', 'updated_at', 'created_at', 'id'
 ]
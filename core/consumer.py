@@ -7,6 +7,8 @@ import logging
 from multiprocessing import Process, Queue
 from typing import Callable, Any, List
 
+from core.telemetry import get_tracer
+
 logger = logging.getLogger(__name__)
 
 
@@ -15,6 +17,10 @@ class Consumer(Process):
     Класс для управления параллельным выполнением задач в отдельных процессах.
     Использует multiprocessing.
     Process для управления процессами.
+
+    Если передана очередь результатов, для каждой задачи в нее кладется
+    запись интервала телеметрии (время, строки, SQL-запросы турнира)
+    до вызова task_done().
     """
     def __init__(self, task_queue, result_queue):
         """
@@ -39,16 +45,22 @@ class Consumer(Process):
                 self.task_queue.task_done()
                 break
 
+            span = get_tracer().worker_span(
+                'tournament', tournament_id=next_task.tournament_id
+            )
             try:
                 logger.info(
                     f'{self.name} обработка турнира: '
                     f'{next_task.tournament_id}'
                 )
                 # Вызываем метод process() задачи
-                next_task.process()
+                with span:
+                    next_task.process()
+                span.add_rows(getattr(next_task, 'rows', 0))
             except Exception as e:
                 logger.error(f'Ошибка в процессе {self.name}: {e}')
             finally:
+                if self.result_queue is not None:
+                    self.result_queue.put(span.record())
                 # Гарантируем вызов task_done() даже при исключении
                 self.task_queue.task_done()
-
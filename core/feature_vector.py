@@ -0,0 +1,247 @@
+# izhbet/core/feature_vector.py
+"""
+Векторы признаков матчей (home/away/diff/ratio) на массивах NumPy.
+
+Порядок колонок признаков вычисляется один раз по моделям Standing и
+Feature. Значения турнирных таблиц хозяев и гостей укладываются в строки
+массивов, diff и ratio считаются векторно сразу для всего турнира, а
+записи для БД формируются только при сохранении.
+
+FeatureSchema описывает обратное преобразование: колонки объединенной
+строки матча ({признак}_{префикс}) для обучения и прогнозирования.
+"""
+
+import logging
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from core.constants import NOT_IN_FEATURE, TARGET_FIELDS
+
+logger = logging.getLogger(__name__)
+
+FEATURE_PREFIXES = ('home', 'away', 'diff', 'ratio')
+
+# Признаки по снимку общей таблицы: всегда присутствуют в векторе,
+# ratio считается по своим правилам (для позиции - инвертированно)
+EXTRA_FEATURES = (
+    'general_position', 'general_points',
+    'general_goals_scored', 'general_goals_conceded'
+)
+
+# Поля матча без суффикса префикса (по одному на объединенную строку),
+# которые входят в признаки моделей наравне с {признак}_{префикс}
+MATCH_FEATURES = ('sport_id', 'country_id', 'tournament_id', 'team_id', 'gameData')
+
+RATIO_MIN = 0.01
+RATIO_MAX = 100.0
+
+
+class FeatureLayout:
+    """Фиксированный порядок колонок признаков и индекс колонки по имени."""
+
+    def __init__(self, columns: Iterable[str]):
+        self.columns = tuple(columns)
+        self.index = {name: position for position, name in enumerate(self.columns)}
+        self.extra = np.array(
+            [self.index[name] for name in EXTRA_FEATURES if name in self.index], dtype=np.intp
+        )
+        self.position = np.array(
+            [self.index[name] for name in EXTRA_FEATURES if name in self.index and 'position' in name],
+            dtype=np.intp
+        )
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+
+@lru_cache(maxsize=None)
+def get_feature_layout() -> FeatureLayout:
+    """Колонки Standing, которые сохраняются в Feature (кроме служебных и target_*)."""
+    from sqlalchemy import inspect
+    from db.models import Standing, Feature
+
+    excluded = set(NOT_IN_FEATURE) | set(TARGET_FIELDS)
+    feature_columns = {attr.key for attr in inspect(Feature).column_attrs}
+    return FeatureLayout(
+        attr.key for attr in inspect(Standing).column_attrs
+        if attr.key not in excluded and attr.key in feature_columns
+    )
+
+
+class FeatureSchema:
+    """
+    Числовые колонки Feature в объединенном виде: поля матча без суффикса
+    (match_fields), затем по колонке на признак и префикс
+    ({признак}_{префикс}, префиксы во внешнем цикле), как их формирует
+    get_feature_match_ids. Порядок общий для обучения и прогнозирования.
+    """
+
+    def __init__(
+            self,
+            names: Iterable[str],
+            prefixes: Iterable[str] = FEATURE_PREFIXES,
+            match_fields: Iterable[str] = ()
+    ):
+        self.names = tuple(names)
+        self.prefixes = tuple(prefixes)
+        self.match_fields = tuple(match_fields)
+        self.columns = self.match_fields + tuple(
+            f'{name}_{prefix}' for prefix in self.prefixes for name in self.names
+        )
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+
+@lru_cache(maxsize=None)
+def get_feature_schema() -> FeatureSchema:
+    """Поля матча MATCH_FEATURES и числовые колонки Feature (кроме служебных и target_*)."""
+    from sqlalchemy import inspect
+    from db.models import Feature
+
+    excluded = set(NOT_IN_FEATURE) | set(TARGET_FIELDS) | {'prefix', 'created_at', 'updated_at'}
+    feature_columns = inspect(Feature).columns
+    match_fields = [name for name in MATCH_FEATURES if name in feature_columns.keys()]
+    names = []
+    for column in feature_columns:
+        if column.key in excluded:
+            continue
+        try:
+            python_type = column.type.python_type
+        except NotImplementedError:
+            continue
+        if issubclass(python_type, (int, float, Decimal)):
+            names.append(column.key)
+    return FeatureSchema(names, match_fields=match_fields)
+
+
+def compute_relative(home: np.ndarray, away: np.ndarray, layout: FeatureLayout):
+    """
+    Разность и ограниченное отношение признаков хозяев и гостей.
+
+    ratio = home / away при away > 0.1, иначе 10 при home > 0 и 1 при
+    home <= 0; для EXTRA_FEATURES знаменатель 1 при away <= 0.1, а для
+    позиции ratio = 1 при away > 0. Отношение ограничивается
+    [RATIO_MIN, RATIO_MAX].
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: diff, ratio
+    """
+    diff = home - away
+    positive = away > 0.1
+    safe_away = np.where(positive, away, 1.0)
+    ratio = np.where(positive, home / safe_away, np.where(home > 0, 10.0, 1.0))
+
+    if layout.extra.size:
+        ratio[:, layout.extra] = home[:, layout.extra] / safe_away[:, layout.extra]
+    if layout.position.size:
+        position_away = away[:, layout.position]
+        ratio[:, layout.position] = np.where(position_away > 0, 1.0, position_away)
+
+    return diff, np.clip(ratio, RATIO_MIN, RATIO_MAX)
+
+
+class FeatureMatrix:
+    """
+    Признаки матчей турнира.
+
+    Для каждого матча хранятся строки значений хозяев и гостей и маска
+    присутствующих колонок: признак попадает в вектор, если он задан в
+    турнирной таблице хозяев (отсутствующие значения гостей равны 0).
+    """
+
+    def __init__(self, layout: Optional[FeatureLayout] = None):
+        self.layout = layout or get_feature_layout()
+        self.match_ids: List[int] = []
+        self._rows: Dict[int, int] = {}
+        self._home: List[np.ndarray] = []
+        self._away: List[np.ndarray] = []
+        self._present: List[np.ndarray] = []
+        self._computed: Optional[Dict[str, np.ndarray]] = None
+
+    def __len__(self) -> int:
+        return len(self.match_ids)
+
+    def __contains__(self, match_id) -> bool:
+        return int(match_id) in self._rows
+
+    def add(self, match_id, standing_home, standing_away) -> None:
+        """Добавляет матч (повторный match_id заменяет прежнюю строку)."""
+        index = self.layout.index
+        home = np.zeros(len(self.layout))
+        away = np.zeros(len(self.layout))
+        present = np.zeros(len(self.layout), dtype=bool)
+
+        for name, value in vars(standing_home).items():
+            position = index.get(name)
+            if position is not None:
+                present[position] = True
+                if value is not None:
+                    home[position] = value
+        for name, value in vars(standing_away).items():
+            position = index.get(name)
+            if position is not None and value is not None:
+                away[position] = value
+        present[self.layout.extra] = True
+
+        match_id = int(match_id)
+        row = self._rows.get(match_id)
+        if row is None:
+            self._rows[match_id] = len(self.match_ids)
+            self.match_ids.append(match_id)
+            self._home.append(home)
+            self._away.append(away)
+            self._present.append(present)
+        else:
+            self._home[row], self._away[row], self._present[row] = home, away, present
+        self._computed = None
+
+    def values(self) -> Dict[str, np.ndarray]:
+        """Массивы признаков (матчи x колонки) по префиксам и маска 'present'."""
+        if self._computed is None:
+            width = len(self.layout)
+            home = np.vstack(self._home) if self._home else np.empty((0, width))
+            away = np.vstack(self._away) if self._away else np.empty((0, width))
+            diff, ratio = compute_relative(home, away, self.layout)
+            present = np.vstack(self._present) if self._present else np.empty((0, width), dtype=bool)
+            self._computed = {'home': home, 'away': away, 'diff': diff, 'ratio': ratio, 'present': present}
+        return self._computed
+
+    def records(self, match_ids: Optional[Iterable[int]] = None) -> List[Dict[str, Any]]:
+        """
+        Записи для пакетного сохранения в features: по одной на матч и
+        префикс, только присутствующие колонки.
+        """
+        values = self.values()
+        columns = self.layout.columns
+        rows = (
+            range(len(self.match_ids)) if match_ids is None
+            else [self._rows[int(match_id)] for match_id in match_ids]
+        )
+
+        records = []
+        for row in rows:
+            positions = np.flatnonzero(values['present'][row])
+            names = [columns[position] for position in positions]
+            match_id = self.match_ids[row]
+            for prefix in FEATURE_PREFIXES:
+                record = dict(zip(names, values[prefix][row, positions].tolist()))
+                record['match_id'] = match_id
+                record['prefix'] = prefix
+                records.append(record)
+        return records
+
+    def to_features(self, match_id) -> Dict[str, Any]:
+        """ORM-объекты Feature матча по префиксам (для кода, работающего с моделями)."""
+        from db.models import Feature
+
+        features = {}
+        for record in self.records([match_id]):
+            feature = Feature()
+            for name, value in record.items():
+                setattr(feature, name, value)
+            features[record['prefix']] = feature
+        return features
@@ -11,6 +11,8 @@ import subprocess
 import sys
 import os
 
+from core.telemetry import get_tracer
+
 logger = logging.getLogger(__name__)
 
 
@@ -39,6 +41,14 @@ class IntegrationService:
         Returns:
             Dict[str, Any]: Результаты выполнения каждого этапа
         """
+        with get_tracer().run('pipeline', mode=mode, kind='run') as span:
+            results = self._run_full_pipeline(mode)
+            if not results['success']:
+                span.status = 'error'
+        return results
+
+    def _run_full_pipeline(self, mode: str) -> Dict[str, Any]:
+        """Последовательно выполняет этапы processing, forecast и publisher."""
         logger.info(f'Запуск полной цепочки обработки данных в режиме {mode}')
         
         results = {
@@ -90,6 +100,27 @@ class IntegrationService:
         
         return results
     
+    def _run_stage_command(self, stage: str, command: list, timeout: int) -> subprocess.CompletedProcess:
+        """
+        Запускает команду этапа в подпроцессе.
+
+        Время этапа записывается в телеметрию, подпроцесс получает
+        идентификатор запуска и продолжает его своими интервалами.
+        """
+        tracer = get_tracer()
+        with tracer.stage_span(stage, command=' '.join(command)) as span:
+            result = subprocess.run(
+                command,
+                cwd=self.project_root,
+                capture_output=True,
+                text=True,
+                timeout=timeout,
+                env=tracer.subprocess_env()
+            )
+            if result.returncode != 0:
+                span.status = 'error'
+        return result
+
     def _run_processing_stage(self, mode: str) -> Dict[str, Any]:
         """
         Запускает этап processing.
@@ -112,13 +143,7 @@ class IntegrationService:
                 raise ValueError(f'Неподдерживаемый режим для processing: {mode}')
             
             # Запускаем команду
-            result = subprocess.run(
-                command,
-                cwd=self.project_root,
-                capture_output=True,
-                text=True,
-                timeout=3600  # 1 час таймаут
-            )
+            result = self._run_stage_command('processing', command, timeout=3600)  # 1 час таймаут
             
             if result.returncode == 0:
                 logger.info('Этап processing выполнен успешно')
@@ -175,13 +200,7 @@ class IntegrationService:
                 raise ValueError(f'Неподдерживаемый режим для forecast: {mode}')
             
             # Запускаем команду
-            result = subprocess.run(
-                command,
-                cwd=self.project_root,
-                capture_output=True,
-                text=True,
-                timeout=1800  # 30 минут таймаут
-            )
+            result = self._run_stage_command('forecast', command, timeout=1800)  # 30 минут таймаут
             
             if result.returncode == 0:
                 logger.info('Этап forecast выполнен успешно')
@@ -238,13 +257,7 @@ class IntegrationService:
                 raise ValueError(f'Неподдерживаемый режим для publisher: {mode}')
             
             # Запускаем команду
-            result = subprocess.run(
-                command,
-                cwd=self.project_root,
-                capture_output=True,
-                text=True,
-                timeout=300  # 5 минут таймаут
-            )
+            result = self._run_stage_command('publisher', command, timeout=300)  # 5 минут таймаут
             
             if result.returncode == 0:
                 logger.info('Этап publisher выполнен успешно')
@@ -282,18 +295,26 @@ class IntegrationService:
     def run_processing_only(self) -> Dict[str, Any]:
         """Запускает только этап processing."""
         logger.info('Запуск только этапа processing')
-        return self._run_processing_stage('ALL_TIME')
+        return self._run_single_stage('processing', 'ALL_TIME', self._run_processing_stage)
     
     def run_forecast_only(self) -> Dict[str, Any]:
         """Запускает только этап forecast."""
         logger.info('Запуск только этапа forecast')
-        return self._run_forecast_stage('TODAY')
+        return self._run_single_stage('forecast', 'TODAY', self._run_forecast_stage)
     
     def run_publisher_only(self) -> Dict[str, Any]:
         """Запускает только этап publisher."""
         logger.info('Запуск только этапа publisher')
-        return self._run_publisher_stage('TODAY')
+        return self._run_single_stage('publisher', 'TODAY', self._run_publisher_stage)
     
+    def _run_single_stage(self, stage: str, mode: str, runner) -> Dict[str, Any]:
+        """Запускает один этап как отдельный запуск телеметрии."""
+        with get_tracer().run(stage, mode=mode, kind='run') as span:
+            results = runner(mode)
+            if not results['success']:
+                span.status = 'error'
+        return results
+
     def get_pipeline_status(self) -> Dict[str, Any]:
         """
         Получает статус всех компонентов пайплайна.
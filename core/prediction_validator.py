@@ -7,8 +7,14 @@
 """
 
 import logging
-from typing import Optional
+from functools import lru_cache
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
 from db.models.target import Target
+from core.constants import TARGET_FIELDS
 
 logger = logging.getLogger(__name__)
 
@@ -31,83 +37,13 @@ def is_prediction_correct_from_target(
     """
     if not target:
         return False
-    
-    outcome_lower = str(outcome).lower().strip()
-    
-    # Feature 1: WIN_DRAW_LOSS
-    if feature == 1:
-        if outcome_lower == 'п1':
-            return target.target_win_draw_loss_home_win == 1
-        elif outcome_lower == 'х':
-            return target.target_win_draw_loss_draw == 1
-        elif outcome_lower == 'п2':
-            return target.target_win_draw_loss_away_win == 1
-    
-    # Feature 2: OZ (Обе забьют)
-    elif feature == 2:
-        if 'да' in outcome_lower:
-            return target.target_oz_both_score == 1
-        elif 'нет' in outcome_lower:
-            return target.target_oz_not_both_score == 1
-    
-    # Feature 3: GOAL_HOME
-    elif feature == 3:
-        if 'да' in outcome_lower:
-            return target.target_goal_home_yes == 1
-        elif 'нет' in outcome_lower:
-            return target.target_goal_home_no == 1
-    
-    # Feature 4: GOAL_AWAY
-    elif feature == 4:
-        if 'да' in outcome_lower:
-            return target.target_goal_away_yes == 1
-        elif 'нет' in outcome_lower:
-            return target.target_goal_away_no == 1
-    
-    # Feature 5: TOTAL
-    elif feature == 5:
-        if outcome_lower in ['тб', 'больше']:
-            return target.target_total_over == 1
-        elif outcome_lower in ['тм', 'меньше']:
-            return target.target_total_under == 1
-    
-    # Feature 6: TOTAL_HOME
-    elif feature == 6:
-        if outcome_lower == 'ит1б':
-            return target.target_total_home_over == 1
-        elif outcome_lower == 'ит1м':
-            return target.target_total_home_under == 1
-    
-    # Feature 7: TOTAL_AWAY
-    elif feature == 7:
-        if outcome_lower == 'ит2б':
-            return target.target_total_away_over == 1
-        elif outcome_lower == 'ит2м':
-            return target.target_total_away_under == 1
-    
-    # Feature 8: TOTAL_AMOUNT (регрессия, но проверяется как классификация)
-    elif feature == 8:
-        if outcome_lower in ['тм', 'меньше']:
-            return target.target_total_under == 1
-        elif outcome_lower in ['тб', 'больше']:
-            return target.target_total_over == 1
-    
-    # Feature 9: TOTAL_HOME_AMOUNT
-    elif feature == 9:
-        if outcome_lower == 'ит1м':
-            return target.target_total_home_under == 1
-        elif outcome_lower == 'ит1б':
-            return target.target_total_home_over == 1
-    
-    # Feature 10: TOTAL_AWAY_AMOUNT
-    elif feature == 10:
-        if outcome_lower == 'ит2м':
-            return target.target_total_away_under == 1
-        elif outcome_lower == 'ит2б':
-            return target.target_total_away_over == 1
-    
-    logger.warning(f"Не удалось определить правильность прогноза: feature={feature}, outcome={outcome}")
-    return False
+
+    column = resolve_target_column(feature, outcome)
+    if column is None:
+        logger.warning(f"Не удалось определить правильность прогноза: feature={feature}, outcome={outcome}")
+        return False
+
+    return getattr(target, column, None) == 1
 
 
 def get_prediction_status_from_target(
@@ -152,3 +88,195 @@ def get_targets_batch(match_ids: list[int]) -> dict[int, Target]:
         targets = get_target_match_ids(session, match_ids)
         return {t.match_id: t for t in targets}
 
+
+# Формулировки исходов без явного 'да'/'нет' (feature -> (да, нет)).
+# Отрицательные проверяются первыми: 'не забьют' содержит 'забьют'
+_YES_NO_PHRASES = {
+    2: (('обе забьют', 'обезабьют'), ('не забьют', 'незабьют')),
+    3: (('забьет',), ('не забьет', 'незабьет')),
+    4: (('забьет',), ('не забьет', 'незабьет')),
+}
+
+
+@lru_cache(maxsize=512)
+def resolve_target_column(feature: int, outcome: str) -> Optional[str]:
+    """
+    Возвращает колонку таблицы targets, значение 1 в которой означает
+    правильный прогноз (feature, outcome). None — исход не распознан.
+
+    Правила совпадают с is_prediction_correct_from_target.
+    """
+    outcome_lower = str(outcome).lower().strip()
+
+    if feature == 1:
+        return {
+            'п1': 'target_win_draw_loss_home_win',
+            'х': 'target_win_draw_loss_draw',
+            'п2': 'target_win_draw_loss_away_win',
+        }.get(outcome_lower)
+
+    if feature in (2, 3, 4):
+        prefix = {
+            2: ('target_oz_both_score', 'target_oz_not_both_score'),
+            3: ('target_goal_home_yes', 'target_goal_home_no'),
+            4: ('target_goal_away_yes', 'target_goal_away_no'),
+        }[feature]
+        if 'да' in outcome_lower:
+            return prefix[0]
+        if 'нет' in outcome_lower:
+            return prefix[1]
+        yes_phrases, no_phrases = _YES_NO_PHRASES[feature]
+        if any(phrase in outcome_lower for phrase in no_phrases):
+            return prefix[1]
+        if any(phrase in outcome_lower for phrase in yes_phrases):
+            return prefix[0]
+        return None
+
+    if feature in (5, 8):
+        if outcome_lower in ('тб', 'больше'):
+            return 'target_total_over'
+        if outcome_lower in ('тм', 'меньше'):
+            return 'target_total_under'
+        return None
+
+    if feature in (6, 9):
+        return {
+            'ит1б': 'target_total_home_over',
+            'ит1м': 'target_total_home_under',
+        }.get(outcome_lower)
+
+    if feature in (7, 10):
+        return {
+            'ит2б': 'target_total_away_over',
+            'ит2м': 'target_total_away_under',
+        }.get(outcome_lower)
+
+    return None
+
+
+def are_predictions_correct(
+    features: Sequence[int],
+    outcomes: Sequence[str],
+    targets: pd.DataFrame
+) -> np.ndarray:
+    """
+    Векторно определяет правильность набора прогнозов.
+
+    Args:
+        features: Коды feature (1-10) по строкам
+        outcomes: Прогнозы (п1, х, тб, ит1м и т.д.) по строкам
+        targets: DataFrame с колонками target_*, выровненный по строкам
+            с features/outcomes (NaN — target отсутствует)
+
+    Returns:
+        np.ndarray: Булев массив правильности прогнозов
+    """
+    pairs = pd.DataFrame({
+        'feature': pd.to_numeric(pd.Series(features), errors='coerce')
+        .fillna(-1).astype(int).to_numpy(),
+        'outcome': pd.Series(outcomes).astype(str).to_numpy(),
+    })
+    result = np.zeros(len(pairs), dtype=bool)
+    if pairs.empty:
+        return result
+
+    # Правило разрешается один раз на уникальную пару (feature, outcome)
+    columns = pairs.groupby(['feature', 'outcome'], sort=False).ngroup()
+    unique_pairs = pairs.drop_duplicates(['feature', 'outcome'])
+    group_columns = np.array([
+        resolve_target_column(int(feature), outcome)
+        for feature, outcome in zip(unique_pairs['feature'], unique_pairs['outcome'])
+    ], dtype=object)
+    row_columns = group_columns[columns.to_numpy()]
+
+    for column in pd.unique(row_columns):
+        if column is None or column not in targets.columns:
+            continue
+        mask = row_columns == column
+        values = pd.to_numeric(targets[column], errors='coerce').to_numpy()
+        result[mask] = values[mask] == 1
+
+    unresolved = int(sum(column is None for column in group_columns))
+    if unresolved:
+        logger.warning(
+            f'Не удалось определить правильность для {unresolved} '
+            f'комбинаций (feature, outcome)'
+        )
+    return result
+
+
+def evaluate_predictions(
+    frame: pd.DataFrame,
+    feature_column: str = 'feature',
+    outcome_column: str = 'forecast_subtype'
+) -> np.ndarray:
+    """
+    Векторно определяет правильность прогнозов из DataFrame.
+
+    Args:
+        frame: DataFrame с кодом feature, прогнозом и колонками target_*
+            (например, результат merge с align_targets)
+        feature_column: Колонка с кодом feature (1-10)
+        outcome_column: Колонка с прогнозом (forecast_subtype / outcome)
+
+    Returns:
+        np.ndarray: Булев массив правильности прогнозов
+    """
+    return are_predictions_correct(
+        frame[feature_column].to_numpy(),
+        frame[outcome_column].to_numpy(),
+        frame
+    )
+
+
+def get_prediction_statuses(
+    frame: pd.DataFrame,
+    feature_column: str = 'feature',
+    outcome_column: str = 'forecast_subtype'
+) -> np.ndarray:
+    """
+    Векторный аналог get_prediction_status_from_target.
+
+    Строки без target (все колонки target_* пустые) получают '⏳'.
+
+    Returns:
+        np.ndarray: Массив статусов '✅' / '❌' / '⏳'
+    """
+    correct = evaluate_predictions(frame, feature_column, outcome_column)
+    present_columns = [column for column in TARGET_FIELDS if column in frame.columns]
+    if present_columns:
+        has_target = frame[present_columns].notna().any(axis=1).to_numpy()
+    else:
+        has_target = np.zeros(len(frame), dtype=bool)
+    return np.where(has_target, np.where(correct, '✅', '❌'), '⏳')
+
+
+def align_targets(match_ids: Sequence[int], targets) -> pd.DataFrame:
+    """
+    Выравнивает targets по списку match_id (по одной строке на элемент).
+
+    Args:
+        match_ids: ID матчей по строкам прогнозов
+        targets: dict {match_id: Target}, список Target или DataFrame
+            с колонкой match_id
+
+    Returns:
+        pd.DataFrame: Колонки TARGET_FIELDS; NaN для матчей без target
+    """
+    if isinstance(targets, pd.DataFrame):
+        target_frame = targets
+    else:
+        if isinstance(targets, dict):
+            targets = targets.values()
+        target_frame = pd.DataFrame([
+            {'match_id': target.match_id,
+             **{column: getattr(target, column, None) for column in TARGET_FIELDS}}
+            for target in targets
+        ], columns=['match_id', *TARGET_FIELDS])
+
+    target_frame = (
+        target_frame.drop_duplicates('match_id', keep='last')
+        .set_index('match_id')
+        .reindex(columns=TARGET_FIELDS)
+    )
+    return target_frame.reindex(pd.Index(match_ids)).reset_index(drop=True)
@@ -3,7 +3,11 @@
 """
 
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
+
+import numpy as np
+import pandas as pd
+
 from db.models.target import Target
 from db.storage.target_storage import TargetStorage
 
@@ -168,6 +172,105 @@ def create_target_from_match_result(match_id: int, goal_home: Optional[int], goa
         return None
 
 
+def targets_from_goals(home_goals, away_goals) -> pd.DataFrame:
+    """
+    Векторно рассчитывает колонки target_* по счету матчей
+    (те же правила, что create_target_from_match_result).
+
+    Args:
+        home_goals: Голы хозяев по строкам (NaN — матч не состоялся)
+        away_goals: Голы гостей по строкам
+
+    Returns:
+        pd.DataFrame: Колонки target_* (NaN там, где счета нет)
+    """
+    home = pd.to_numeric(pd.Series(home_goals), errors='coerce').to_numpy(dtype=float)
+    away = pd.to_numeric(pd.Series(away_goals), errors='coerce').to_numpy(dtype=float)
+    has_home = ~np.isnan(home)
+    has_away = ~np.isnan(away)
+    has_both = has_home & has_away
+
+    def _flag(condition: np.ndarray, valid: np.ndarray) -> np.ndarray:
+        return np.where(valid, condition.astype(float), np.nan)
+
+    total = home + away
+    return pd.DataFrame({
+        'target_win_draw_loss_home_win': _flag(home > away, has_both),
+        'target_win_draw_loss_draw': _flag(home == away, has_both),
+        'target_win_draw_loss_away_win': _flag(home < away, has_both),
+        'target_oz_both_score': _flag((home > 0) & (away > 0), has_both),
+        'target_oz_not_both_score': _flag(~((home > 0) & (away > 0)), has_both),
+        'target_goal_home_yes': _flag(home > 0, has_home),
+        'target_goal_home_no': _flag(~(home > 0), has_home),
+        'target_goal_away_yes': _flag(away > 0, has_away),
+        'target_goal_away_no': _flag(~(away > 0), has_away),
+        'target_total_over': _flag(total > 2.5, has_both),
+        'target_total_under': _flag(~(total > 2.5), has_both),
+        'target_total_home_over': _flag(home > 1.5, has_home),
+        'target_total_home_under': _flag(~(home > 1.5), has_home),
+        'target_total_away_over': _flag(away > 1.5, has_away),
+        'target_total_away_under': _flag(~(away > 1.5), has_away),
+        'target_total_amount': np.where(has_both, total, np.nan),
+        'target_total_home_amount': home,
+        'target_total_away_amount': away,
+    })
+
+
+# Значение колонки target_* по счету (home, away): скалярный аналог targets_from_goals
+TARGET_RULES = {
+    'target_win_draw_loss_home_win': lambda home, away: home > away,
+    'target_win_draw_loss_draw': lambda home, away: home == away,
+    'target_win_draw_loss_away_win': lambda home, away: home < away,
+    'target_oz_both_score': lambda home, away: home > 0 and away > 0,
+    'target_oz_not_both_score': lambda home, away: not (home > 0 and away > 0),
+    'target_goal_home_yes': lambda home, away: home > 0,
+    'target_goal_home_no': lambda home, away: not home > 0,
+    'target_goal_away_yes': lambda home, away: away > 0,
+    'target_goal_away_no': lambda home, away: not away > 0,
+    'target_total_over': lambda home, away: home + away > 2.5,
+    'target_total_under': lambda home, away: not home + away > 2.5,
+    'target_total_home_over': lambda home, away: home > 1.5,
+    'target_total_home_under': lambda home, away: not home > 1.5,
+    'target_total_away_over': lambda home, away: away > 1.5,
+    'target_total_away_under': lambda home, away: not away > 1.5,
+}
+
+
+def build_targets(match_ids, home_goals, away_goals) -> List[Dict[str, Any]]:
+    """
+    Записи targets для пакетного сохранения по счету матчей.
+
+    Матчи без счета и с отрицательным счетом пропускаются (как в
+    create_feature_attr_onehot), повторы match_id схлопываются
+    (остается последняя строка).
+
+    Args:
+        match_ids: ID матчей
+        home_goals: Голы хозяев
+        away_goals: Голы гостей
+
+    Returns:
+        List[Dict[str, Any]]: Записи с match_id и колонками target_*
+    """
+    frame = targets_from_goals(home_goals, away_goals)
+    frame.insert(0, 'match_id', pd.to_numeric(pd.Series(match_ids), errors='coerce').to_numpy())
+
+    home = frame['target_total_home_amount']
+    away = frame['target_total_away_amount']
+    valid = (
+        frame['match_id'].notna()
+        & (home.notna() | away.notna())
+        & ~((home < 0) | (away < 0))
+    )
+    frame = frame[valid].drop_duplicates('match_id', keep='last')
+    if frame.empty:
+        return []
+
+    # Счет дробным не бывает: приводим к int, NaN -> None
+    frame = frame.astype('Int64').astype(object)
+    return frame.where(frame.notna(), None).to_dict('records')
+
+
 def create_targets_for_features(features_data: list) -> int:
     """
     Создает целевые переменные для списка features.
@@ -178,18 +281,12 @@ def create_targets_for_features(features_data: list) -> int:
     Returns:
         int: Количество созданных целевых переменных
     """
-    created_count = 0
-    target_storage = TargetStorage()
-    
-    for feature_data in features_data:
-        match_id = feature_data.get('match_id')
-        goal_home = feature_data.get('goal_home')
-        goal_away = feature_data.get('goal_away')
-        
-        if match_id and (goal_home is not None or goal_away is not None):
-            target = create_target_from_match_result(match_id, goal_home, goal_away)
-            if target:
-                created_count += 1
+    targets = build_targets(
+        [feature_data.get('match_id') for feature_data in features_data],
+        [feature_data.get('goal_home') for feature_data in features_data],
+        [feature_data.get('goal_away') for feature_data in features_data]
+    )
+    created_count = TargetStorage().save_targets_batch(targets)
     
     logger.info(f"Создано {created_count} целевых переменных из {len(features_data)} features")
     return created_count
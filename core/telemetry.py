@@ -0,0 +1,492 @@
+# izhbet/core/telemetry.py
+"""
+Телеметрия запусков пайплайна: длительность этапов, число строк и
+SQL-запросов.
+
+Интервал (span) измеряет время, число обработанных строк и число/время
+SQL-запросов (обработчики событий SQLAlchemy на всех Engine процесса).
+Интервалы вкладываются друг в друга и сохраняются в локальный файл
+SQLite (режим WAL), куда пишут все процессы запуска:
+
+- run_pipeline.py / IntegrationService открывают запуск и этапы;
+- скрипты этапов (processing.py, forecast.py, ...) запускаются
+  подпроцессами и продолжают тот же запуск через переменные окружения
+  PIPELINE_RUN_ID и PIPELINE_PARENT_SPAN;
+- процессы Consumer измеряют каждый турнир и возвращают интервалы
+  родителю через очередь результатов.
+
+Счетчики запросов общие для процесса: интервал учитывает запросы всех
+потоков, выполненные за время его работы.
+
+Переменные окружения:
+    PIPELINE_TELEMETRY_PATH - файл базы телеметрии
+    PIPELINE_TELEMETRY - 0, чтобы не сохранять телеметрию
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+import pandas as pd
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+RUN_ID_ENV = 'PIPELINE_RUN_ID'
+PARENT_SPAN_ENV = 'PIPELINE_PARENT_SPAN'
+TELEMETRY_PATH_ENV = 'PIPELINE_TELEMETRY_PATH'
+TELEMETRY_ENABLED_ENV = 'PIPELINE_TELEMETRY'
+DEFAULT_TELEMETRY_PATH = 'results/telemetry/telemetry.sqlite'
+
+SPAN_COLUMNS = [
+    'run_id', 'span_id', 'parent_id', 'stage', 'name', 'kind', 'started_at',
+    'duration', 'rows', 'queries', 'query_time', 'status', 'pid', 'attrs'
+]
+RUN_COLUMNS = ['run_id', 'name', 'mode', 'started_at', 'finished_at', 'status']
+
+
+class _QueryCounters:
+    """Счетчики SQL-запросов процесса."""
+
+    def __init__(self):
+        self.queries = 0
+        self.query_time = 0.0
+        self.lock = threading.Lock()
+
+    def snapshot(self):
+        return self.queries, self.query_time
+
+
+_query_counters = _QueryCounters()
+_hooks_installed = False
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('telemetry_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('telemetry_started')
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    with _query_counters.lock:
+        _query_counters.queries += 1
+        _query_counters.query_time += elapsed
+
+
+def _handle_error(exception_context):
+    # Запрос с ошибкой не доходит до after_cursor_execute
+    connection = exception_context.connection
+    if connection is not None and connection.info.get('telemetry_started'):
+        connection.info['telemetry_started'].pop()
+
+
+def install_query_hooks() -> None:
+    """Подключает подсчет SQL-запросов ко всем Engine процесса (один раз)."""
+    global _hooks_installed
+    if _hooks_installed:
+        return
+    event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(Engine, 'handle_error', _handle_error)
+    _hooks_installed = True
+
+
+def _new_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+class Span:
+    """Интервал измерения: время, строки и SQL-запросы."""
+
+    def __init__(
+        self,
+        name: str,
+        kind: str = 'step',
+        run_id: Optional[str] = None,
+        parent_id: Optional[str] = None,
+        stage: str = '',
+        attrs: Optional[Dict[str, Any]] = None
+    ):
+        self.span_id = _new_id()
+        self.name = name
+        self.kind = kind
+        self.run_id = run_id
+        self.parent_id = parent_id
+        self.stage = stage
+        self.attrs = dict(attrs or {})
+        self.rows = 0
+        self.status = 'ok'
+        self.started_at = 0.0
+        self.duration = 0.0
+        self.queries = 0
+        self.query_time = 0.0
+        # Запросы дочерних процессов (обработчиков), в счетчики процесса не попадают
+        self.worker_queries = 0
+        self.worker_query_time = 0.0
+        self._started = 0.0
+        self._counters = (0, 0.0)
+
+    def add_rows(self, count: int) -> None:
+        self.rows += int(count or 0)
+
+    def add_worker_queries(self, queries: int, query_time: float) -> None:
+        self.worker_queries += queries
+        self.worker_query_time += query_time
+
+    def __enter__(self) -> 'Span':
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self._counters = _query_counters.snapshot()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        self.duration = time.perf_counter() - self._started
+        queries, query_time = _query_counters.snapshot()
+        self.queries = queries - self._counters[0] + self.worker_queries
+        self.query_time = query_time - self._counters[1] + self.worker_query_time
+        if exc_type is not None and not (exc_type is SystemExit and not exc_value.code):
+            self.status = 'error'
+        return False
+
+    def record(self) -> Dict[str, Any]:
+        """Запись интервала для хранилища (передается между процессами)."""
+        return {
+            'run_id': self.run_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'stage': self.stage,
+            'name': self.name,
+            'kind': self.kind,
+            'started_at': self.started_at,
+            'duration': self.duration,
+            'rows': self.rows,
+            'queries': self.queries,
+            'query_time': self.query_time,
+            'status': self.status,
+            'pid': os.getpid(),
+            'attrs': json.dumps(self.attrs, ensure_ascii=False, default=str)
+        }
+
+
+class TelemetryStore:
+    """Хранилище запусков и интервалов в файле SQLite (режим WAL)."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS runs ('
+                'run_id TEXT PRIMARY KEY, name TEXT NOT NULL, mode TEXT, '
+                'started_at REAL NOT NULL, finished_at REAL, status TEXT NOT NULL)'
+            )
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS spans ('
+                'run_id TEXT NOT NULL, span_id TEXT PRIMARY KEY, parent_id TEXT, '
+                'stage TEXT NOT NULL, name TEXT NOT NULL, kind TEXT NOT NULL, '
+                'started_at REAL NOT NULL, duration REAL NOT NULL, rows INTEGER NOT NULL, '
+                'queries INTEGER NOT NULL, query_time REAL NOT NULL, status TEXT NOT NULL, '
+                'pid INTEGER, attrs TEXT)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_spans_run ON spans (run_id)')
+            yield conn
+        finally:
+            conn.close()
+
+    def start_run(self, run_id: str, name: str, mode: Optional[str]) -> None:
+        with self._connection() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO runs (run_id, name, mode, started_at, status) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (run_id, name, None if mode is None else str(mode), time.time(), 'running')
+            )
+
+    def finish_run(self, run_id: str, status: str) -> None:
+        with self._connection() as conn:
+            conn.execute(
+                'UPDATE runs SET finished_at = ?, status = ? WHERE run_id = ?',
+                (time.time(), status, run_id)
+            )
+
+    def save_spans(self, records: List[Dict[str, Any]]) -> None:
+        if not records:
+            return
+        placeholders = ', '.join('?' for _ in SPAN_COLUMNS)
+        with self._connection() as conn:
+            conn.executemany(
+                f'INSERT OR REPLACE INTO spans ({", ".join(SPAN_COLUMNS)}) VALUES ({placeholders})',
+                [tuple(record[column] for column in SPAN_COLUMNS) for record in records]
+            )
+
+    def runs(self, limit: int = 10) -> pd.DataFrame:
+        """Последние запуски (новые первыми)."""
+        if not os.path.exists(self.path):
+            return pd.DataFrame(columns=RUN_COLUMNS)
+        with self._connection() as conn:
+            return pd.read_sql_query(
+                f'SELECT {", ".join(RUN_COLUMNS)} FROM runs ORDER BY started_at DESC LIMIT ?',
+                conn, params=(limit,)
+            )
+
+    def spans(self, run_ids: List[str]) -> pd.DataFrame:
+        """Интервалы запусков."""
+        if not run_ids or not os.path.exists(self.path):
+            return pd.DataFrame(columns=SPAN_COLUMNS)
+        placeholders = ', '.join('?' for _ in run_ids)
+        with self._connection() as conn:
+            return pd.read_sql_query(
+                f'SELECT {", ".join(SPAN_COLUMNS)} FROM spans WHERE run_id IN ({placeholders})',
+                conn, params=list(run_ids)
+            )
+
+
+class Tracer:
+    """
+    Интервалы процесса.
+
+    Открытые интервалы хранятся стеком в каждом потоке; завершенные
+    копятся в памяти и записываются в хранилище, когда закрывается
+    внешний интервал потока. Строки считаются в листовых интервалах и
+    суммируются вверх по стеку.
+    """
+
+    def __init__(self, store: Optional[TelemetryStore] = None):
+        self.store = store
+        self.run_id: Optional[str] = os.getenv(RUN_ID_ENV) or None
+        self.parent_id: Optional[str] = os.getenv(PARENT_SPAN_ENV) or None
+        self.stage = ''
+        self._local = threading.local()
+        self._pending: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def _stack(self) -> List[Span]:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def current(self) -> Optional[Span]:
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    def _new_span(self, name: str, kind: str, attrs: Dict[str, Any]) -> Span:
+        current = self.current()
+        return Span(
+            name,
+            kind=kind,
+            run_id=self.run_id,
+            parent_id=current.span_id if current else self.parent_id,
+            stage=self.stage,
+            attrs=attrs
+        )
+
+    @contextmanager
+    def span(self, name: str, kind: str = 'step', **attrs) -> Iterator[Span]:
+        """Измеряет блок кода как вложенный интервал."""
+        span = self._new_span(name, kind, attrs)
+        stack = self._stack()
+        stack.append(span)
+        try:
+            with span:
+                yield span
+        finally:
+            stack.pop()
+            self._add(span.record())
+            if stack:
+                # Строки и запросы обработчиков вложенных интервалов входят в родительский
+                stack[-1].add_rows(span.rows)
+                stack[-1].add_worker_queries(span.worker_queries, span.worker_query_time)
+            else:
+                self.flush()
+
+    def worker_span(self, name: str, **attrs) -> Span:
+        """
+        Интервал для процесса-обработчика: не сохраняется в этом процессе,
+        его запись (record) возвращается родителю через очередь.
+        """
+        install_query_hooks()
+        return self._new_span(name, 'task', attrs)
+
+    def add_rows(self, count: int) -> None:
+        """Добавляет строки к текущему интервалу потока."""
+        current = self.current()
+        if current is not None:
+            current.add_rows(count)
+
+    def collect(self, result_queue, count: int) -> List[Dict[str, Any]]:
+        """
+        Забирает записи интервалов обработчиков из очереди результатов.
+
+        Каждый обработчик кладет запись до task_done, поэтому после
+        JoinableQueue.join() ожидается ровно count записей.
+        """
+        records = [result_queue.get() for _ in range(count)]
+        for record in records:
+            self._add(record)
+        current = self.current()
+        if current is not None:
+            current.add_rows(sum(record['rows'] for record in records))
+            current.add_worker_queries(
+                sum(record['queries'] for record in records),
+                sum(record['query_time'] for record in records)
+            )
+        return records
+
+    def _add(self, record: Dict[str, Any]) -> None:
+        if self.run_id is None:
+            return
+        with self._lock:
+            self._pending.append(record)
+
+    def flush(self) -> None:
+        """Записывает завершенные интервалы в хранилище."""
+        with self._lock:
+            records, self._pending = self._pending, []
+        if not records or self.store is None:
+            return
+        try:
+            self.store.save_spans(records)
+        except Exception as e:
+            logger.warning(f'Ошибка сохранения телеметрии: {e}')
+
+    @contextmanager
+    def run(self, name: str, mode: Optional[str] = None, kind: str = 'stage') -> Iterator[Span]:
+        """
+        Интервал этапа. Без запуска в окружении (PIPELINE_RUN_ID) открывает
+        новый запуск, иначе продолжает запуск родительского процесса.
+        """
+        install_query_hooks()
+        owner = self.run_id is None
+        if owner:
+            self.run_id = uuid.uuid4().hex
+            self._store_call('start_run', self.run_id, name, mode)
+        previous_stage, self.stage = self.stage, self.stage or name
+        status = 'error'
+        try:
+            with self.span(name, kind=kind, mode=mode) as span:
+                yield span
+            status = span.status
+        finally:
+            self.stage = previous_stage
+            if owner:
+                self._store_call('finish_run', self.run_id, status)
+                self.run_id = None
+
+    def _store_call(self, method: str, *args) -> None:
+        if self.store is None:
+            return
+        try:
+            getattr(self.store, method)(*args)
+        except Exception as e:
+            logger.warning(f'Ошибка сохранения телеметрии: {e}')
+
+    @contextmanager
+    def stage_span(self, name: str, **attrs) -> Iterator[Span]:
+        """Интервал этапа, выполняемого подпроцессом."""
+        previous_stage, self.stage = self.stage, name
+        try:
+            with self.span(name, kind='stage', **attrs) as span:
+                yield span
+        finally:
+            self.stage = previous_stage
+
+    def subprocess_env(self) -> Dict[str, str]:
+        """Окружение подпроцесса, продолжающего текущий запуск."""
+        env = dict(os.environ)
+        current = self.current()
+        if self.run_id is not None:
+            env[RUN_ID_ENV] = self.run_id
+        if current is not None:
+            env[PARENT_SPAN_ENV] = current.span_id
+        return env
+
+
+_tracer: Optional[Tracer] = None
+
+
+def get_tracer() -> Tracer:
+    """Трассировщик процесса (процессы Consumer наследуют его при fork)."""
+    global _tracer
+    if _tracer is None:
+        enabled = os.getenv(TELEMETRY_ENABLED_ENV, '1') != '0'
+        path = os.getenv(TELEMETRY_PATH_ENV, DEFAULT_TELEMETRY_PATH)
+        _tracer = Tracer(TelemetryStore(path) if enabled else None)
+    return _tracer
+
+
+def get_store() -> TelemetryStore:
+    return TelemetryStore(os.getenv(TELEMETRY_PATH_ENV, DEFAULT_TELEMETRY_PATH))
+
+
+def span(name: str, kind: str = 'step', **attrs):
+    return get_tracer().span(name, kind=kind, **attrs)
+
+
+def run(name: str, mode: Optional[str] = None, kind: str = 'stage'):
+    return get_tracer().run(name, mode=mode, kind=kind)
+
+
+def add_rows(count: int) -> None:
+    get_tracer().add_rows(count)
+
+
+def perf_report(store: TelemetryStore, limit: int = 5) -> Dict[str, pd.DataFrame]:
+    """
+    Отчет о производительности последних запусков.
+
+    Returns:
+        Dict[str, pd.DataFrame]:
+            runs - запуски (длительность, статус);
+            stages - этапы запусков: время, строки, запросы и время запросов
+            (этап в родителе и корневой интервал подпроцесса объединяются);
+            tasks - турниры обработчиков по этапам: количество, p50/p95/max времени;
+            slowest - самые долгие турниры последнего запуска
+    """
+    runs = store.runs(limit)
+    if runs.empty:
+        empty = pd.DataFrame()
+        return {'runs': runs, 'stages': empty, 'tasks': empty, 'slowest': empty}
+    spans = store.spans(runs['run_id'].tolist())
+    runs = runs.assign(duration=runs['finished_at'] - runs['started_at'])
+
+    stage_spans = spans[spans['kind'].isin(['stage', 'run'])]
+    stages = stage_spans.groupby(['run_id', 'kind', 'name'], sort=False).agg(
+        started_at=('started_at', 'min'),
+        duration=('duration', 'max'),
+        rows=('rows', 'sum'),
+        queries=('queries', 'sum'),
+        query_time=('query_time', 'sum'),
+        status=('status', lambda values: 'error' if (values == 'error').any() else 'ok')
+    ).reset_index().sort_values(['run_id', 'started_at'], kind='mergesort')
+
+    tasks = spans[spans['kind'] == 'task']
+    grouped = tasks.groupby(['run_id', 'stage'], sort=False)
+    task_stats = grouped.agg(
+        count=('duration', 'size'),
+        p50=('duration', 'median'),
+        p95=('duration', lambda values: values.quantile(0.95)),
+        max=('duration', 'max'),
+        rows=('rows', 'sum'),
+        queries=('queries', 'sum'),
+        errors=('status', lambda values: int((values == 'error').sum()))
+    ).reset_index()
+
+    slowest = tasks[tasks['run_id'] == runs['run_id'].iloc[0]].nlargest(10, 'duration')
+
+    return {'runs': runs, 'stages': stages, 'tasks': task_stats, 'slowest': slowest}
@@ -0,0 +1,126 @@
+# tests/test_cache.py
+import pytest
+
+from core import cache as cache_module
+from core.cache import MemoryTTLCache, SQLiteCache, TieredCache
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cache_module.time, "time", fake)
+    return fake
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "cache.sqlite")
+
+
+def make_tiered(db_path, sync_interval=5.0):
+    memory = MemoryTTLCache(ttl=60, stale_ttl=600)
+    shared = SQLiteCache(db_path, ttl=300, stale_ttl=600)
+    return TieredCache(memory, shared, sync_interval=sync_interval)
+
+
+def test_memory_entry_becomes_stale_after_ttl(clock):
+    cache = MemoryTTLCache(ttl=60, stale_ttl=600)
+    cache.set("key", {"value": 1}, "tag")
+    assert cache.get("key").is_fresh
+
+    clock.advance(61)
+    entry = cache.get("key")
+    assert entry is not None
+    assert not entry.is_fresh
+    assert entry.value == {"value": 1}
+
+    clock.advance(600)
+    assert cache.get("key") is None
+
+
+def test_sqlite_entry_expires_after_stale_ttl(clock, db_path):
+    cache = SQLiteCache(db_path, ttl=300, stale_ttl=600)
+    cache.set("key", {"value": 1}, "tag")
+    assert cache.get("key").is_fresh
+
+    clock.advance(301)
+    assert not cache.get("key").is_fresh
+
+    clock.advance(600)
+    assert cache.get("key") is None
+
+
+def test_memory_lru_eviction(clock):
+    cache = MemoryTTLCache(ttl=60, maxsize=2)
+    cache.set("a", 1, "tag")
+    cache.set("b", 2, "tag")
+    cache.get("a")
+    cache.set("c", 3, "tag")
+    assert cache.get("b") is None
+    assert cache.get("a").value == 1
+    assert cache.get("c").value == 3
+
+
+def test_invalidate_tags_removes_only_tagged_entries(clock, db_path):
+    cache = make_tiered(db_path)
+    cache.set("a", 1, "outcome")
+    cache.set("b", 2, "total")
+
+    assert cache.invalidate_tags(["outcome"]) == 1
+    assert cache.get("a") is None
+    assert cache.get("b").value == 2
+
+
+def test_invalidation_in_other_process_drops_memory_copy(clock, db_path):
+    reader = make_tiered(db_path, sync_interval=5.0)
+    writer = make_tiered(db_path)
+    reader.set("key", 1, "outcome")
+    assert reader.get("key").value == 1
+
+    clock.advance(1)
+    writer.invalidate_tags(["outcome"])
+
+    # До синхронизации отдается копия из памяти
+    assert reader.get("key").value == 1
+    clock.advance(5)
+    assert reader.get("key") is None
+
+
+def test_stale_write_after_invalidation_is_rejected(clock, db_path):
+    shared = SQLiteCache(db_path)
+    computed_at = clock()
+    clock.advance(1)
+    shared.invalidate_tags(["outcome"])
+
+    assert shared.set("key", 1, "outcome", computed_at) is False
+    assert shared.get("key") is None
+    clock.advance(1)
+    assert shared.set("key", 2, "outcome", clock()) is True
+    assert shared.get("key").value == 2
+
+
+def test_cross_process_stale_write_does_not_reach_memory(clock, db_path):
+    worker = make_tiered(db_path)
+    other = make_tiered(db_path)
+
+    # Расчет начат до инвалидации тега в другом процессе
+    computed_at = clock()
+    clock.advance(1)
+    other.invalidate_tags(["outcome"])
+    clock.advance(1)
+
+    assert worker.set("key", 1, "outcome", computed_at) is False
+    assert worker.memory.get("key") is None
+    assert worker.get("key") is None
+    assert other.get("key") is None
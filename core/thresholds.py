@@ -0,0 +1,148 @@
+"""
+Единая точка определения порогов тоталов (total / itotal) для матчей.
+
+Пороги зависят от вида спорта (SIZE_TOTAL / SIZE_ITOTAL) и могут быть
+переопределены для отдельных чемпионатов (SIZE_TOTAL_CHAMPIONSHIP /
+SIZE_ITOTAL_CHAMPIONSHIP). Соответствие матч -> вид спорта загружается
+одним запросом на чемпионат, а не запросом на каждый прогноз.
+"""
+
+import logging
+from typing import Dict, Optional, Tuple
+
+from core.constants import (
+    SPR_SPORTS, SIZE_TOTAL, SIZE_ITOTAL,
+    DEFAULT_SIZE_TOTAL, DEFAULT_SIZE_ITOTAL,
+    SIZE_TOTAL_CHAMPIONSHIP, SIZE_ITOTAL_CHAMPIONSHIP
+)
+
+logger = logging.getLogger(__name__)
+
+
+def get_sport_thresholds(
+    sport_id: Optional[int],
+    championship_id: Optional[int] = None
+) -> Tuple[float, float]:
+    """
+    Возвращает пороги (total, itotal) по виду спорта и чемпионату.
+
+    Args:
+        sport_id: ID вида спорта
+        championship_id: ID чемпионата (для переопределения порогов)
+
+    Returns:
+        Tuple[float, float]: (total, itotal)
+    """
+    sport_key = SPR_SPORTS.get(sport_id) if sport_id is not None else None
+    total = SIZE_TOTAL.get(sport_key, DEFAULT_SIZE_TOTAL)
+    itotal = SIZE_ITOTAL.get(sport_key, DEFAULT_SIZE_ITOTAL)
+
+    if championship_id is not None:
+        total = SIZE_TOTAL_CHAMPIONSHIP.get(championship_id, total)
+        itotal = SIZE_ITOTAL_CHAMPIONSHIP.get(championship_id, itotal)
+
+    return total, itotal
+
+
+def get_sport_name_thresholds(
+    sport_name: Optional[str],
+    championship_id: Optional[int] = None
+) -> Tuple[float, float]:
+    """Возвращает пороги (total, itotal) по названию вида спорта ('Soccer', ...)."""
+    sport_ids = {name: sport_id for sport_id, name in SPR_SPORTS.items()}
+    return get_sport_thresholds(sport_ids.get(sport_name), championship_id)
+
+
+class ThresholdResolver:
+    """
+    Определяет пороги тоталов для матчей по заранее загруженной карте
+    {match_id: (sport_id, championship_id)}.
+
+    Если матча нет в карте и передана сессия, он догружается одним запросом
+    и кэшируется; без сессии возвращаются пороги по умолчанию.
+    """
+
+    def __init__(
+        self,
+        match_sports: Optional[Dict[int, Tuple[int, int]]] = None,
+        db_session=None
+    ):
+        self._match_sports = dict(match_sports or {})
+        self._db_session = db_session
+
+    @classmethod
+    def for_tournament(cls, db_session, tournament_id: int) -> 'ThresholdResolver':
+        """Создает резолвер для всех матчей чемпионата одним запросом."""
+        from db.queries.match import get_match_sport_map
+
+        try:
+            match_sports = get_match_sport_map(
+                db_session, tournament_id=tournament_id
+            )
+        except Exception as e:
+            logger.warning(
+                f'Не удалось загрузить виды спорта для чемпионата '
+                f'{tournament_id}: {e}'
+            )
+            match_sports = {}
+        return cls(match_sports, db_session)
+
+    @classmethod
+    def for_matches(cls, db_session, match_ids: list[int]) -> 'ThresholdResolver':
+        """Создает резолвер для списка матчей одним запросом."""
+        from db.queries.match import get_match_sport_map
+
+        try:
+            match_sports = get_match_sport_map(db_session, match_ids=match_ids)
+        except Exception as e:
+            logger.warning(f'Не удалось загрузить виды спорта матчей: {e}')
+            match_sports = {}
+        return cls(match_sports, db_session)
+
+    def __contains__(self, match_id: int) -> bool:
+        return match_id in self._match_sports
+
+    def _resolve_match(self, match_id: int) -> Optional[Tuple[int, int]]:
+        if match_id in self._match_sports:
+            return self._match_sports[match_id]
+        if self._db_session is None:
+            return None
+
+        from db.queries.match import get_match_sport_map
+
+        try:
+            self._match_sports.update(
+                get_match_sport_map(self._db_session, match_ids=[match_id])
+            )
+        except Exception as e:
+            logger.warning(f'Не удалось загрузить вид спорта матча {match_id}: {e}')
+        # Кэшируем и отсутствие матча, чтобы не повторять запрос
+        return self._match_sports.setdefault(match_id, None)
+
+    def get(self, match_id: int) -> Tuple[float, float]:
+        """
+        Возвращает пороги (total, itotal) для матча.
+
+        Args:
+            match_id: ID матча
+
+        Returns:
+            Tuple[float, float]: (total, itotal)
+        """
+        match_sport = self._resolve_match(match_id)
+        if not match_sport:
+            return DEFAULT_SIZE_TOTAL, DEFAULT_SIZE_ITOTAL
+        sport_id, championship_id = match_sport
+        return get_sport_thresholds(sport_id, championship_id)
+
+    def get_for_forecast_type(self, match_id: int, forecast_type: str) -> Optional[float]:
+        """
+        Возвращает порог для регрессионного типа прогноза
+        (total_amount -> total, total_home_amount/total_away_amount -> itotal).
+        """
+        total, itotal = self.get(match_id)
+        if forecast_type == 'total_amount':
+            return total
+        if forecast_type in ('total_home_amount', 'total_away_amount'):
+            return itotal
+        return None
@@ -30,6 +30,18 @@ class ModelData:
     num_classes: int = 1
 
 
+@dataclass
+class MultiTaskData:
+    """Данные многозадачной модели: общие признаки и таргеты по головам."""
+    X_train: np.ndarray
+    X_test: np.ndarray
+    y_train: Dict[str, np.ndarray]
+    y_test: Dict[str, np.ndarray]
+    scaler: Any
+    features: List[str]
+    task_types: Dict[str, str]
+
+
 @dataclass
 class PredictionResult:
     """Результат предсказания."""
@@ -45,4 +57,37 @@ class TournamentTask:
     """Задача обработки турнира."""
     tournament_id: int
     action: str
-    data: Optional[pd.DataFrame] = None
\ No newline at end of file
+    data: Optional[pd.DataFrame] = None
+
+@dataclass
+class PublicationDay:
+    """
+    Данные для публикации прогнозов и итогов за набор дат.
+
+    Все коллекции, кроме matches и targets, сгруппированы по match_id.
+    """
+    matches: List[Dict[str, Any]]
+    outcomes: Dict[int, List[Dict[str, Any]]]
+    statistics: Dict[int, List[Dict[str, Any]]]
+    targets: pd.DataFrame
+
+    def matches_for_date(self, target_date) -> List[Dict[str, Any]]:
+        """Матчи на указанную дату в порядке времени начала."""
+        return [
+            match for match in self.matches
+            if match.get('gameData') is not None and match['gameData'].date() == target_date
+        ]
+
+
+@dataclass
+class AllTimeDay:
+    """
+    Данные ALL_TIME публикации за один день матчей.
+
+    quality - строки statistics, outcomes и predictions - обычные прогнозы;
+    отсутствующие данные представлены пустыми DataFrame.
+    """
+    date: Any
+    quality: pd.DataFrame
+    outcomes: pd.DataFrame
+    predictions: pd.DataFrame
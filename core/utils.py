@@ -7,7 +7,7 @@ import json
 import pandas as pd
 import numpy as np
 from dataclasses import dataclass
-from typing import List, Dict, Tuple, Any
+from typing import List, Dict, Tuple, Any, Optional
 import pickle
 import logging
 from sklearn.preprocessing import (
@@ -28,7 +28,7 @@ from core.constants import (
     FIELDS_FORECAST_TOTAL_AMOUNT, FIELDS_FORECAST_TOTAL_HOME_AMOUNT,
     FIELDS_FORECAST_TOTAL_AWAY_AMOUNT, OUTCOME_YES, OUTCOME_NO,
     FIELD_OUTCOME, SPR_SPORTS, FORECAST_TO_NUMERIC, FORECAST_TO_TYPE,
-    DROP_FIELD_EMBEDDING, DROP_FIELD_BLOWOUTS,
+    DROP_FIELD_BLOWOUTS,
     CATEGORICAL_VARIABLE_P1, CATEGORICAL_VARIABLE_X, CATEGORICAL_VARIABLE_P2,
     CATEGORICAL_VARIABLE_OZY, CATEGORICAL_VARIABLE_OZN,
     CATEGORICAL_VARIABLE_TB, CATEGORICAL_VARIABLE_TM,
@@ -49,6 +49,7 @@ from db.queries.prediction import (
 from core.constants import DIR_PICKLE, LOAD_PICKLE
 from db.models import Match, Prediction, Feature
 from core.target_utils import create_target_from_match_result
+from core.feature_vector import FeatureMatrix, FeatureSchema, get_feature_schema
 from db.queries.match import get_match_tournament_id
 from db.queries.prediction import get_prediction_matchs
 from db.queries.feature import get_match_in_feature_all
@@ -142,100 +143,23 @@ def create_feature_vector_new(standings_team_home, standings_team_away, current_
     """
     Создает вектор признаков для матча на основе статистики домашней и гостевой команд.
     Вместо деления, использует конкатенацию и разность для сохранения максимальной информации.
+
+    Для расчета по турниру используйте core.feature_vector.FeatureMatrix:
+    он считает diff/ratio сразу для всех матчей без ORM-объектов.
     
     Args:
         standings_team_home: Статистика домашней команды
         standings_team_away: Статистика гостевой команды
         current_match_id: ID текущего обрабатываемого матча (если None, берется из standings)
-    """
-    not_in_vector = NOT_IN_FEATURE + TARGET_FIELDS  # Предполагается, что эти константы определены
-
-    feature_vector_home = Feature()
-    feature_vector_away = Feature()
-    feature_vector_diff = Feature()
-    feature_vector_ratio = Feature()
-
-    # Получаем список всех атрибутов, которые будем использовать
-    all_attr_names = [
-        attr for attr in standings_team_home.__dict__.keys()
-            if attr not in not_in_vector and not attr.startswith('_')
-    ]
-
-    for attr_name in all_attr_names:
-        # Извлекаем значения для домашней и гостевой команды
-        home_attr = get_attribute_with_default(standings_team_home, attr_name, default_value=0.0)
-        away_attr = get_attribute_with_default(standings_team_away, attr_name, default_value=0.0)
-        
-        # Валидация значений
-        if home_attr is None or away_attr is None:
-            logger.warning(f"None значения в атрибуте {attr_name}: home={home_attr}, away={away_attr}")
-            home_attr = 0.0 if home_attr is None else home_attr
-            away_attr = 0.0 if away_attr is None else away_attr
-
-        # 1. АБСОЛЮТНЫЕ ЗНАЧЕНИЯ (конкатенация)
-        # Создаем новые имена атрибутов для вектора: {attr_name}_home, {attr_name}_away
-        #setattr(feature_vector, f"{attr_name}_home", home_attr)
-        #setattr(feature_vector, f"{attr_name}_away", away_attr)
-        setattr(feature_vector_home, attr_name, home_attr)
-        setattr(feature_vector_away, attr_name, away_attr)
-
-        # 2. ОТНОСИТЕЛЬНЫЕ ЗНАЧЕНИЯ (разность и, опционально, нормализованное отношение)
-        # Разность - устойчивая и симметричная операция
-        diff_attr = home_attr - away_attr
-        #setattr(feature_vector, f"{attr_name}_diff", diff_attr)
-        setattr(feature_vector_diff, attr_name, diff_attr)
-
-        # Опционально: Добавляем отношение, но с защитой от деления на ноль и ограничением
-        # Это может быть полезно для некоторых признаков (например, average_scoring), но требует осторожности
-        if isinstance(home_attr, (int, float)) and isinstance(away_attr, (int, float)):
-            if away_attr > 0.1:  # Избегаем деления на очень маленькие числа
-                ratio_attr = home_attr / away_attr
-            elif home_attr > 0:
-                ratio_attr = 10.0  # Большое значение для случая, когда away=0, home>0
-            else:
-                ratio_attr = 1.0   # Нейтральное значение когда оба = 0
-            
-            # Ограничиваем слишком большие значения для стабильности
-            ratio_attr = max(0.01, min(100.0, ratio_attr))
-        else:
-            ratio_attr = 1.0  # Нейтральное значение для нечисловых типов
-        
-        setattr(feature_vector_ratio, attr_name, ratio_attr)
-
-    # Добавляем новые поля на основе standings snapshots, если присутствуют
-    # Например: позиция и очки как прямые признаки и их разница
-    for extra_attr in ['general_position', 'general_points', 'general_goals_scored', 'general_goals_conceded']:
-        h = get_attribute_with_default(standings_team_home, extra_attr, default_value=0.0)
-        a = get_attribute_with_default(standings_team_away, extra_attr, default_value=0.0)
-        setattr(feature_vector_home, extra_attr, h)
-        setattr(feature_vector_away, extra_attr, a)
-        setattr(feature_vector_diff, extra_attr, (h - a) if isinstance(h, (int, float)) and isinstance(a, (int, float)) else 0.0)
-        # ratio для позиции инвертируем (меньше — лучше)
-        if 'position' in extra_attr:
-            denom = a if isinstance(a, (int, float)) and a > 0 else 1.0
-            ratio_val = (a / denom) if denom else 1.0
-        else:
-            denom = a if isinstance(a, (int, float)) and a > 0.1 else 1.0
-            ratio_val = h / denom if isinstance(h, (int, float)) else 1.0
-        setattr(feature_vector_ratio, extra_attr, max(0.01, min(100.0, ratio_val)))
-
-    # Возвращаем вектор, содержащий в 3 раза больше признаков, чем раньше,
-    # но зато гораздо более информативный и устойчивый.
-    feature_vector = {}
 
+    Returns:
+        Dict[str, Feature]: Векторы home, away, diff, ratio
+    """
     # Используем переданный match_id или берем из standings (для обратной совместимости)
     match_id = current_match_id if current_match_id is not None else standings_team_home.match_id
-    setattr(feature_vector_home, 'match_id', match_id)
-    setattr(feature_vector_away, 'match_id', match_id)
-    setattr(feature_vector_diff, 'match_id', match_id)
-    setattr(feature_vector_ratio, 'match_id', match_id)
-
-    feature_vector['home'] = feature_vector_home
-    feature_vector['away'] = feature_vector_away
-    feature_vector['diff'] = feature_vector_diff
-    feature_vector['ratio'] = feature_vector_ratio
-
-    return feature_vector
+    matrix = FeatureMatrix()
+    matrix.add(match_id, standings_team_home, standings_team_away)
+    return matrix.to_features(match_id)
 
 def create_feature_vector(standings_team_home, standings_team_away):
     not_in_vector = NOT_IN_FEATURE + TARGET_FIELDS
@@ -1492,40 +1416,56 @@ def process_matches(
     return df_matches
 
 
-def prepare_features(df: pd.DataFrame) -> pd.DataFrame:
+def prepare_features(
+        df: pd.DataFrame,
+        schema: Optional[FeatureSchema] = None
+) -> pd.DataFrame:
     """
-    Подготовка признаков и целевых переменных.
+    Подготовка признаков по схеме Feature.
+
+    Колонки схемы, присутствующие в df (поля матча sport_id, country_id,
+    tournament_id, team_id, gameData и признаки {признак}_{префикс}),
+    за один проход приводятся к float32 в заранее выделенный массив;
+    колонки без значений отбрасываются, пропуски заполняются нулями.
+    Остальные колонки (id, даты записи, target_*) в признаки не попадают,
+    match_id сохраняется для идентификации.
 
     Args:
-        df: Исходный DataFrame
+        df: Исходный DataFrame (строки get_feature_match_ids)
+        schema: Схема признаков (по умолчанию - по модели Feature)
 
     Returns:
         df: признаки
     """
-    # Целевые переменные Выставить вызов получение таргет из таблицы
-    # df_target = df[TARGET_FIELDS].copy()
-
-    # Признаки - исключаем служебные поля и целевые переменные
-    # Исключаем match_id из удаляемых колонок, так как он нужен для идентификации
-    columns_to_drop = [col for col in DROP_FIELD_EMBEDDING if col != 'match_id'] #+ TARGET_FIELDS
-    # Проверяем, какие колонки действительно существуют в DataFrame
-    existing_columns_to_drop = [col for col in columns_to_drop if col in df.columns]
-    
-    df_feature = df.drop(columns=existing_columns_to_drop, axis=1)
-    
-    # Преобразуем только числовые колонки в float
-    # Сначала попробуем преобразовать все колонки в числовые, заменив ошибки на NaN
-    for col in df_feature.columns:
-        df_feature[col] = pd.to_numeric(df_feature[col], errors='coerce')
-    
+    schema = schema or get_feature_schema()
+    columns = [col for col in schema.columns if col in df.columns]
+
+    block = np.empty((len(df), len(columns)), dtype=np.float32)
+    for position, col in enumerate(columns):
+        values = df[col].to_numpy()
+        if values.dtype.kind == 'M':
+            # Дата матча - как в pd.to_numeric: наносекунды эпохи, NaT -> NaN
+            values = np.where(
+                np.isnat(values), np.nan, values.astype('datetime64[ns]').astype(np.int64)
+            )
+        elif values.dtype.kind not in 'biuf':
+            # Decimal/None/строки: нечисловые значения -> NaN
+            values = pd.to_numeric(df[col], errors='coerce').to_numpy(
+                dtype=np.float64, na_value=np.nan
+            )
+        block[:, position] = values
+
+    missing = np.isnan(block)
     # Удаляем колонки, которые полностью состоят из NaN
-    df_feature = df_feature.dropna(axis=1, how='all')
-    
-    # Заполняем оставшиеся NaN значения нулями
-    df_feature = df_feature.fillna(0)
-    
-    # Преобразуем в float
-    df_feature = df_feature.astype(float)
+    present = ~missing.all(axis=0)
+    block[missing] = 0.0
+    if not present.all():
+        block = block[:, present]
+        columns = [col for col, keep in zip(columns, present) if keep]
+
+    df_feature = pd.DataFrame(block, columns=columns, index=df.index, copy=False)
+    if 'match_id' in df.columns:
+        df_feature.insert(0, 'match_id', df['match_id'].to_numpy())
 
     return df_feature
 
@@ -1626,7 +1566,7 @@ def handle_missing_features(df: pd.DataFrame, fill_value: float = 0.0) -> pd.Dat
     # Безопасная проверка на пропущенные значения
     has_nulls = False
     try:
-        has_nulls = df.isnull().values.any()
+        has_nulls = bool(df.isnull().any().any())
     except (ValueError, TypeError):
         has_nulls = False
     
@@ -1705,14 +1645,19 @@ def clean_feature_data(df_features: pd.DataFrame) -> pd.DataFrame:
     # Заполняем пропуски
     df_cleaned = handle_missing_features(df_features)
 
-    # Заменяем бесконечные значения
-    if np.any(np.isinf(df_cleaned.values)):
-        inf_count = np.isinf(df_cleaned.values).sum()
+    # Заменяем бесконечные значения (проверяются только вещественные
+    # колонки, без копии всей таблицы в общий dtype)
+    inf_columns = [
+        col for col, col_data in df_cleaned.items()
+        if col_data.dtype.kind == 'f' and np.isinf(col_data.to_numpy()).any()
+    ]
+    if inf_columns:
+        inf_count = sum(np.isinf(df_cleaned[col].to_numpy()).sum() for col in inf_columns)
         logger.warning(
             f"Обнаружено {inf_count} бесконечных значений в фичах. Заменяем на максимальные/минимальные значения")
 
         # Заменяем +inf на максимальное значение, -inf на минимальное
-        for col in df_cleaned.columns:
+        for col in inf_columns:
             col_data = df_cleaned[col]
             if np.any(np.isinf(col_data)):
                 max_val = col_data[np.isfinite(col_data)].max()
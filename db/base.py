@@ -48,6 +48,9 @@ class DBSession:
     def query(self, *entities, **kwargs):
         return self._session.query(*entities, **kwargs)
 
+    def execute(self, statement, params=None):
+        return self._session.execute(statement, params)
+
     def add_model(self, model, need_flush: bool = False):
         self._session.add(model)
         #self._session.merge(model)
@@ -5,11 +5,11 @@
 
 import logging
 from datetime import datetime, date, timedelta
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterator
 import pandas as pd
 
 from sqlalchemy.orm import Session, aliased
-from sqlalchemy import and_, func, desc, distinct
+from sqlalchemy import and_, func, desc, distinct, text, bindparam
 from config import Session_pool
 
 from db.models.outcome import Outcome
@@ -19,6 +19,7 @@ from db.models.target import Target
 from db.models.team import Team
 from db.models.championship import ChampionShip
 from db.models.sport import Sport
+from core.constants import TARGET_FIELDS
 
 logger = logging.getLogger(__name__)
 
@@ -635,3 +636,205 @@ def get_training_targets() -> pd.DataFrame:
         
         logger.info(f"Загружено {len(df)} целевых переменных для обучения")
         return df
+
+
+# Размер пачки строк при потоковой загрузке исходов за сезон
+SEASON_CHUNK_SIZE = 10000
+
+
+def _season_outcomes_query(
+    session: Session,
+    tournament_ids: List[int],
+    match_dates: Optional[List[date]] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+):
+    """Базовый запрос исходов за сезон (outcomes + matchs с прогнозами)."""
+    has_prediction = (
+        session.query(Prediction.id)
+        .filter(Prediction.match_id == Match.id)
+        .exists()
+    )
+    query = session.query(Outcome).join(
+        Match, Outcome.match_id == Match.id
+    ).filter(
+        Match.tournament_id.in_(tournament_ids),
+        has_prediction
+    )
+    if match_dates is not None:
+        query = query.filter(func.date(Match.gameData).in_(match_dates))
+    if start_date is not None:
+        query = query.filter(func.date(Match.gameData) >= start_date)
+    if end_date is not None:
+        query = query.filter(func.date(Match.gameData) <= end_date)
+    return query
+
+
+def get_season_outcome_fingerprints(
+    tournament_ids: List[int],
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+) -> Dict[str, str]:
+    """
+    Возвращает отпечаток данных по каждой дате сезона одним агрегатным запросом.
+
+    Отпечаток меняется при добавлении/обновлении исходов, результатов
+    матчей или targets и используется для проверки актуальности дискового кэша.
+
+    Returns:
+        Dict[str, str]: {YYYY-MM-DD: отпечаток}
+    """
+    if not tournament_ids:
+        return {}
+
+    with Session_pool() as session:
+        match_date = func.date(Match.gameData)
+        query = _season_outcomes_query(
+            session, tournament_ids, start_date=start_date, end_date=end_date
+        ).outerjoin(
+            Target, Outcome.match_id == Target.match_id
+        ).with_entities(
+            match_date.label('match_date'),
+            func.count(distinct(Outcome.id)).label('outcomes_count'),
+            func.max(Outcome.updated_at).label('outcomes_updated'),
+            func.max(Match.updated_at).label('matches_updated'),
+            func.count(distinct(Target.id)).label('targets_count'),
+            func.max(Target.updated_at).label('targets_updated')
+        ).group_by(match_date)
+
+        fingerprints = {}
+        for row in query.all():
+            if row.match_date is None:
+                continue
+            fingerprints[row.match_date.strftime('%Y-%m-%d')] = (
+                f'{row.outcomes_count}|{row.outcomes_updated}|{row.matches_updated}|'
+                f'{row.targets_count}|{row.targets_updated}'
+            )
+        return fingerprints
+
+
+def iter_season_outcomes(
+    tournament_ids: List[int],
+    match_dates: Optional[List[date]] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    chunk_size: int = SEASON_CHUNK_SIZE
+) -> Iterator[pd.DataFrame]:
+    """
+    Потоково загружает исходы прогнозов за сезон для набора чемпионатов
+    одним запросом (server-side cursor, yield_per).
+
+    Args:
+        tournament_ids: ID чемпионатов (matchs.tournament_id)
+        match_dates: Ограничение по конкретным датам (опционально)
+        start_date: Начальная дата (опционально)
+        end_date: Конечная дата (опционально)
+        chunk_size: Размер пачки строк
+
+    Yields:
+        pd.DataFrame: Пачки строк с колонками, как у get_conformal_forecasts_for_today,
+        плюс match_date и sport_id
+    """
+    if not tournament_ids:
+        return
+
+    with Session_pool() as session:
+        TeamHome = aliased(Team)
+        TeamAway = aliased(Team)
+
+        query = _season_outcomes_query(
+            session, tournament_ids, match_dates, start_date, end_date
+        ).with_entities(
+            Outcome.id,
+            Outcome.match_id,
+            Outcome.feature,
+            Outcome.forecast,
+            Outcome.outcome,
+            Outcome.probability,
+            Outcome.confidence,
+            Outcome.uncertainty,
+            Outcome.lower_bound,
+            Outcome.upper_bound,
+            Outcome.created_at,
+            Match.gameData,
+            func.date(Match.gameData).label('match_date'),
+            Match.tournament_id,
+            Match.sport_id,
+            Match.teamHome_id,
+            Match.teamAway_id,
+            Match.numOfHeadsHome,
+            Match.numOfHeadsAway,
+            Match.typeOutcome,
+            Match.gameComment,
+            TeamHome.teamName.label('teamHome_name'),
+            TeamAway.teamName.label('teamAway_name'),
+            ChampionShip.championshipName,
+            Sport.sportName,
+            *[getattr(Target, column) for column in TARGET_FIELDS]
+        ).outerjoin(
+            TeamHome, Match.teamHome_id == TeamHome.id
+        ).outerjoin(
+            TeamAway, Match.teamAway_id == TeamAway.id
+        ).outerjoin(
+            ChampionShip, Match.tournament_id == ChampionShip.id
+        ).outerjoin(
+            Sport, ChampionShip.sport_id == Sport.id
+        ).outerjoin(
+            Target, Outcome.match_id == Target.match_id
+        ).order_by(
+            Match.gameData, Outcome.match_id, Outcome.feature
+        ).execution_options(
+            stream_results=True
+        ).yield_per(chunk_size)
+
+        rows = []
+        total = 0
+        for row in query:
+            rows.append(row._asdict())
+            if len(rows) >= chunk_size:
+                total += len(rows)
+                yield pd.DataFrame(rows)
+                rows = []
+        if rows:
+            total += len(rows)
+            yield pd.DataFrame(rows)
+
+        logger.info(f'Потоково загружено {total} исходов для {len(tournament_ids)} чемпионатов')
+
+
+def get_championship_season_years(tournament_ids: List[int]) -> Dict[int, List[int]]:
+    """
+    Возвращает календарные годы последнего сезона для каждого чемпионата
+    одним запросом (yearTournament в формате YYYY или XX/XX).
+
+    Returns:
+        Dict[int, List[int]]: {championship_id: [год, ...]}
+    """
+    if not tournament_ids:
+        return {}
+
+    with Session_pool() as session:
+        result = session.execute(text("""
+            SELECT championship_id, MAX(yearTournament) AS yearTournament
+            FROM tournaments
+            WHERE championship_id IN :championship_ids
+            GROUP BY championship_id
+        """).bindparams(bindparam('championship_ids', expanding=True)), {
+            'championship_ids': list(tournament_ids)
+        })
+
+        season_years = {}
+        for championship_id, year_tournament in result.fetchall():
+            year_str = str(year_tournament)
+            try:
+                if '/' in year_str:
+                    # Формат XX/XX: сезон охватывает два календарных года
+                    start_year = int(year_str.split('/')[0]) + 2000
+                    season_years[championship_id] = [start_year, start_year + 1]
+                else:
+                    season_years[championship_id] = [int(year_str)]
+            except ValueError:
+                logger.warning(
+                    f'Некорректный yearTournament {year_str} для championship_id {championship_id}'
+                )
+        return season_years
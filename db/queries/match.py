@@ -1,4 +1,4 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import logging
 from datetime import datetime, timedelta, date
 from sqlalchemy import desc, asc, func
@@ -355,4 +355,29 @@ def get_statistics_for_match(match_id: int) -> List[Dict]:
     with Session_pool() as session:
         query = session.query(Statistic).filter(Statistic.match_id == match_id)
         result = query.all()
-        return [row.to_dict() if hasattr(row, 'to_dict') else row.__dict__ for row in result]
\ No newline at end of file
+        return [row.to_dict() if hasattr(row, 'to_dict') else row.__dict__ for row in result]
+
+def get_match_sport_map(
+    db_session,
+    tournament_id: Optional[int] = None,
+    match_ids: Optional[list[int]] = None
+) -> dict[int, tuple[int, int]]:
+    """
+    Возвращает {match_id: (sport_id, championship_id)} одним запросом.
+
+    Args:
+        db_session: Сессия базы данных
+        tournament_id: ID чемпионата (все матчи чемпионата)
+        match_ids: Список ID матчей (если чемпионат не указан)
+    """
+    query = db_session.query(Match.id, Match.sport_id, Match.tournament_id)
+    if tournament_id is not None:
+        query = query.filter(Match.tournament_id == tournament_id)
+    elif match_ids:
+        query = query.filter(Match.id.in_(match_ids))
+    else:
+        return {}
+    return {
+        match_id: (sport_id, championship_id)
+        for match_id, sport_id, championship_id in query.all()
+    }
@@ -6,13 +6,29 @@
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
-from sqlalchemy import desc, func
+
+import pandas as pd
+from sqlalchemy import desc, func, select
 
 from config import Session_pool
 from db.models import Metric
 
 logger = logging.getLogger(__name__)
 
+# Числовые метрики классификации и регрессии
+METRIC_VALUE_COLUMNS = [
+    'accuracy', 'precision', 'recall', 'f1_score',
+    'precision_binary', 'recall_binary', 'f1_binary',
+    'mae', 'mse', 'rmse', 'r2', 'min_error', 'max_error'
+]
+
+# Колонки metrics для дашборда (отсутствующие в модели пропускаются)
+METRIC_FRAME_COLUMNS = [
+    'id', 'championship_id', 'championship_name', 'model_name', 'model_type',
+    *METRIC_VALUE_COLUMNS,
+    'training_date', 'created_at'
+]
+
 
 def get_metrics_by_championship(
     championship_id: Optional[int] = None,
@@ -337,3 +353,32 @@ def get_championship_stats(championship_id: int) -> Dict[str, Any]:
             logger.error(f"Ошибка получения статистики чемпионата {championship_id}: {e}")
     
     return stats
+
+
+def get_metrics_frame(since: Optional[datetime] = None) -> pd.DataFrame:
+    """
+    Загружает таблицу metrics одним запросом в DataFrame.
+
+    Args:
+        since: Загрузить только записи с training_date >= since
+            (инкрементальное обновление; save_metrics обновляет training_date)
+
+    Returns:
+        pd.DataFrame: Колонки METRIC_FRAME_COLUMNS (отсутствующие в модели - NaN),
+        метрики в float
+    """
+    table_columns = Metric.__table__.columns
+    names = [name for name in METRIC_FRAME_COLUMNS if name in table_columns]
+    query = select(*[table_columns[name] for name in names])
+    if since is not None:
+        query = query.where(Metric.training_date >= since)
+
+    with Session_pool() as session:
+        rows = session.execute(query).all()
+
+    frame = pd.DataFrame.from_records(rows, columns=names).reindex(columns=METRIC_FRAME_COLUMNS)
+    for name in METRIC_VALUE_COLUMNS:
+        frame[name] = pd.to_numeric(frame[name], errors='coerce').astype(float)
+    for name in ('training_date', 'created_at'):
+        frame[name] = pd.to_datetime(frame[name])
+    return frame
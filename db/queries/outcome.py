@@ -1,6 +1,7 @@
 from db.models import Outcome, Match, Team, ChampionShip, Sport
 from config import Session_pool
 from sqlalchemy import func
+from sqlalchemy.orm import Session
 import pandas as pd
 from datetime import date
 import logging
@@ -84,6 +85,48 @@ def get_outcomes_for_date(target_date: date) -> pd.DataFrame:
         return df
 
 
+def build_all_outcomes_query(session: Session):
+    """Запрос всех outcomes с данными матчей (последние созданные - первыми)."""
+    TeamHome = Team.__table__.alias('team_home')
+    TeamAway = Team.__table__.alias('team_away')
+    
+    return session.query(
+        Outcome.id,
+        Outcome.match_id,
+        Outcome.feature,
+        Outcome.forecast,
+        Outcome.outcome,
+        Outcome.probability,
+        Outcome.confidence,
+        Outcome.uncertainty,
+        Outcome.lower_bound,
+        Outcome.upper_bound,
+        Outcome.created_at,
+        Match.gameData,
+        Match.tournament_id,
+        Match.teamHome_id,
+        Match.teamAway_id,
+        Match.numOfHeadsHome,
+        Match.numOfHeadsAway,
+        TeamHome.c.teamName.label('team_home_name'),
+        TeamAway.c.teamName.label('team_away_name'),
+        ChampionShip.championshipName.label('championshipName'),
+        Sport.sportName.label('sportName')
+    ).join(
+        Match, Outcome.match_id == Match.id
+    ).outerjoin(
+        TeamHome, Match.teamHome_id == TeamHome.c.id
+    ).outerjoin(
+        TeamAway, Match.teamAway_id == TeamAway.c.id
+    ).outerjoin(
+        ChampionShip, Match.tournament_id == ChampionShip.id
+    ).outerjoin(
+        Sport, ChampionShip.sport_id == Sport.id
+    ).order_by(
+        Outcome.created_at.desc(), Match.gameData
+    )
+
+
 def get_all_outcomes() -> pd.DataFrame:
     """
     Получает все outcomes.
@@ -92,44 +135,7 @@ def get_all_outcomes() -> pd.DataFrame:
         pd.DataFrame: DataFrame со всеми outcomes
     """
     with Session_pool() as session:
-        TeamHome = Team.__table__.alias('team_home')
-        TeamAway = Team.__table__.alias('team_away')
-        
-        query = session.query(
-            Outcome.id,
-            Outcome.match_id,
-            Outcome.feature,
-            Outcome.forecast,
-            Outcome.outcome,
-            Outcome.probability,
-            Outcome.confidence,
-            Outcome.uncertainty,
-            Outcome.lower_bound,
-            Outcome.upper_bound,
-            Outcome.created_at,
-            Match.gameData,
-            Match.tournament_id,
-            Match.teamHome_id,
-            Match.teamAway_id,
-            Match.numOfHeadsHome,
-            Match.numOfHeadsAway,
-            TeamHome.c.teamName.label('team_home_name'),
-            TeamAway.c.teamName.label('team_away_name'),
-            ChampionShip.championshipName.label('championshipName'),
-            Sport.sportName.label('sportName')
-        ).join(
-            Match, Outcome.match_id == Match.id
-        ).outerjoin(
-            TeamHome, Match.teamHome_id == TeamHome.c.id
-        ).outerjoin(
-            TeamAway, Match.teamAway_id == TeamAway.c.id
-        ).outerjoin(
-            ChampionShip, Match.tournament_id == ChampionShip.id
-        ).outerjoin(
-            Sport, ChampionShip.sport_id == Sport.id
-        ).order_by(
-            Outcome.created_at.desc(), Match.gameData
-        )
+        query = build_all_outcomes_query(session)
         
         result = query.all()
         df = pd.DataFrame([row._asdict() for row in result])
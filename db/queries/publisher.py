@@ -4,23 +4,32 @@
 """
 
 import logging
+from contextlib import ExitStack
 from datetime import datetime, date, timedelta
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterator, Tuple
 import pandas as pd
 
 from sqlalchemy.orm import Session, aliased
 from sqlalchemy import and_, func, desc
-from config import Session_pool
+from config import Session_pool, Session as StreamSession
 
 from db.models.outcome import Outcome
+from db.models.statistics import Statistic
 from db.models.match import Match
 from db.models.target import Target
 from db.models.team import Team
 from db.models.championship import ChampionShip
 from db.models.sport import Sport
+from db.queries.outcome import build_all_outcomes_query
+from db.queries.statistics import build_all_statistics_query, build_all_predictions_query
+from db.queries.target import get_targets_frame
+from core.types import AllTimeDay, PublicationDay
 
 logger = logging.getLogger(__name__)
 
+# Размер пачки строк при потоковой загрузке ALL_TIME
+ALL_TIME_CHUNK_SIZE = 5000
+
 
 def get_all_tournaments(year: Optional[str] = None) -> List[int]:
     """
@@ -155,4 +164,186 @@ def get_targets_by_match_ids(match_ids: List[int]) -> pd.DataFrame:
         df = pd.DataFrame([target.as_dict() for target in result])
         
         logger.info(f"Загружено {len(df)} целевых переменных для {len(match_ids)} матчей")
-        return df
\ No newline at end of file
+        return df
+
+def _group_rows_by_match(rows) -> Dict[int, List[Dict[str, Any]]]:
+    """Группирует строки результата запроса по match_id с сохранением порядка."""
+    grouped: Dict[int, List[Dict[str, Any]]] = {}
+    for row in rows:
+        record = row._asdict()
+        grouped.setdefault(record['match_id'], []).append(record)
+    return grouped
+
+
+def load_publication_day(match_dates: List[date]) -> PublicationDay:
+    """
+    Загружает все данные для ежедневной публикации за набор дат.
+
+    Вместо запросов на каждый матч и каждую строку прогноза выполняется
+    не более четырех запросов: матчи, outcomes, statistics и targets.
+
+    Args:
+        match_dates: Даты матчей (например, [сегодня, вчера])
+
+    Returns:
+        PublicationDay: Матчи и связанные данные, сгруппированные по match_id
+    """
+    with Session_pool() as session:
+        TeamHome = aliased(Team)
+        TeamAway = aliased(Team)
+
+        matches = [
+            row._asdict() for row in session.query(
+                Match.id,
+                Match.gameData,
+                Match.teamHome_id,
+                Match.teamAway_id,
+                Match.numOfHeadsHome,
+                Match.numOfHeadsAway,
+                Match.typeOutcome,
+                Match.tournament_id,
+                TeamHome.teamName.label('team_home_name'),
+                TeamAway.teamName.label('team_away_name'),
+                ChampionShip.championshipName,
+                Sport.sportName
+            ).outerjoin(
+                TeamHome, Match.teamHome_id == TeamHome.id
+            ).outerjoin(
+                TeamAway, Match.teamAway_id == TeamAway.id
+            ).outerjoin(
+                ChampionShip, Match.tournament_id == ChampionShip.id
+            ).outerjoin(
+                Sport, ChampionShip.sport_id == Sport.id
+            ).filter(
+                func.date(Match.gameData).in_(match_dates)
+            ).order_by(
+                Match.gameData
+            ).all()
+        ]
+        match_ids = [match['id'] for match in matches]
+
+        if not match_ids:
+            return PublicationDay(matches, {}, {}, get_targets_frame(session, []))
+
+        outcomes = _group_rows_by_match(
+            session.query(*Outcome.__table__.columns)
+            .filter(Outcome.match_id.in_(match_ids))
+            .order_by(Outcome.match_id, Outcome.id)
+            .all()
+        )
+        statistics = _group_rows_by_match(
+            session.query(*Statistic.__table__.columns)
+            .filter(Statistic.match_id.in_(match_ids))
+            .order_by(Statistic.match_id, Statistic.id)
+            .all()
+        )
+
+        targets = get_targets_frame(session, match_ids)
+
+        logger.info(
+            f'Загружены данные публикации за {len(match_dates)} дат: '
+            f'{len(match_ids)} матчей, {sum(len(v) for v in outcomes.values())} outcomes, '
+            f'{sum(len(v) for v in statistics.values())} statistics, {len(targets)} targets'
+        )
+        return PublicationDay(matches, outcomes, statistics, targets)
+
+
+def _row_day(value: Any) -> Optional[date]:
+    """Дата (без времени) значения даты/времени из строки запроса."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    timestamp = pd.to_datetime(value, errors='coerce')
+    return None if pd.isna(timestamp) else timestamp.date()
+
+
+def _iter_rows_by_day(query, day_column: str, chunk_size: int) -> Iterator[Tuple[date, pd.DataFrame]]:
+    """
+    Читает упорядоченный по дате запрос курсором на стороне сервера и
+    отдает строки пачками по дням. Строки без даты пропускаются.
+    """
+    rows: List[Dict[str, Any]] = []
+    current_day = None
+    for row in query.execution_options(stream_results=True).yield_per(chunk_size):
+        record = row._asdict()
+        day = _row_day(record[day_column])
+        if day is None:
+            continue
+        if rows and day != current_day:
+            yield current_day, pd.DataFrame(rows)
+            rows = []
+        current_day = day
+        rows.append(record)
+    if rows:
+        yield current_day, pd.DataFrame(rows)
+
+
+def iter_all_time_days(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    chunk_size: int = ALL_TIME_CHUNK_SIZE
+) -> Iterator[AllTimeDay]:
+    """
+    Потоково загружает данные ALL_TIME публикации по дням.
+
+    Три запроса (statistics, outcomes, predictions) читаются курсорами на
+    стороне сервера (yield_per) в отдельных сессиях и сливаются по дате,
+    поэтому в памяти одновременно находится только один день.
+
+    Args:
+        start_date: Начальная дата матчей (включительно, опционально)
+        end_date: Конечная дата матчей (включительно, опционально)
+        chunk_size: Размер пачки строк курсора
+
+    Yields:
+        AllTimeDay: Данные за день в порядке возрастания дат
+    """
+    def period(query, day_expression):
+        if start_date is not None:
+            query = query.filter(day_expression >= start_date)
+        if end_date is not None:
+            query = query.filter(day_expression <= end_date)
+        return query
+
+    with ExitStack() as stack:
+        sessions = [stack.enter_context(StreamSession()) for _ in range(3)]
+
+        # Внутри дня сохраняется порядок строк get_all_statistics/get_all_outcomes/get_all_predictions
+        statistics_day = func.date(Statistic.match_date)
+        # Период и группировка по дням - по одной колонке (statistics.match_date)
+        statistics = period(build_all_statistics_query(sessions[0]), statistics_day).order_by(None).order_by(
+            statistics_day, Match.gameData, Statistic.prediction_accuracy.desc()
+        )
+        outcomes_day = func.date(Match.gameData)
+        outcomes = period(build_all_outcomes_query(sessions[1]), outcomes_day).order_by(None).order_by(
+            outcomes_day, Outcome.created_at.desc(), Match.gameData
+        )
+        predictions = period(build_all_predictions_query(sessions[2]), func.date(Match.gameData))
+
+        streams = {
+            'quality': _iter_rows_by_day(statistics, 'match_date', chunk_size),
+            'outcomes': _iter_rows_by_day(outcomes, 'gameData', chunk_size),
+            'predictions': _iter_rows_by_day(predictions, 'gameData', chunk_size)
+        }
+        heads = {name: next(stream, None) for name, stream in streams.items()}
+
+        days = 0
+        while any(head is not None for head in heads.values()):
+            day = min(head[0] for head in heads.values() if head is not None)
+            frames = {}
+            for name, head in heads.items():
+                if head is not None and head[0] == day:
+                    frames[name] = head[1]
+                    heads[name] = next(streams[name], None)
+            days += 1
+            yield AllTimeDay(
+                date=day,
+                quality=frames.get('quality', pd.DataFrame()),
+                outcomes=frames.get('outcomes', pd.DataFrame()),
+                predictions=frames.get('predictions', pd.DataFrame())
+            )
+
+        logger.info(f'Потоково загружены данные ALL_TIME за {days} дней')
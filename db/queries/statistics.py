@@ -5,10 +5,10 @@
 
 import logging
 from datetime import date, datetime
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 import pandas as pd
 
-from sqlalchemy import and_, func
+from sqlalchemy import and_, or_, func
 from sqlalchemy.orm import Session
 
 from config import Session_pool
@@ -20,6 +20,7 @@ from db.models.sport import Sport
 from db.models.prediction import Prediction
 from db.models.outcome import Outcome
 from db.models.target import Target
+from core.constants import TARGET_FIELDS
 
 logger = logging.getLogger(__name__)
 
@@ -293,6 +294,73 @@ def get_statistics_summary() -> dict:
         }
 
 
+def build_all_statistics_query(session: Session):
+    """Запрос всей статистики прогнозов (с полями outcomes) по времени матча."""
+    TeamHome = Team.__table__.alias('team_home')
+    TeamAway = Team.__table__.alias('team_away')
+    
+    return session.query(
+        Statistic.id,
+        Statistic.outcome_id,
+        Statistic.prediction_id,
+        Statistic.match_id,
+        Statistic.championship_id,
+        Statistic.sport_id,
+        Statistic.match_date,
+        Statistic.match_round,
+        Statistic.match_stage,
+        Statistic.forecast_type,
+        Statistic.forecast_subtype,
+        Statistic.model_name,
+        Statistic.model_version,
+        Statistic.model_type,
+        Statistic.actual_result,
+        Statistic.actual_value,
+        Statistic.prediction_correct,
+        Statistic.prediction_accuracy,
+        Statistic.prediction_error,
+        Statistic.prediction_residual,
+        Statistic.coefficient,
+        Statistic.potential_profit,
+        Statistic.actual_profit,
+        Statistic.created_at,
+        Statistic.updated_at,
+        Match.gameData,
+        Match.teamHome_id,
+        Match.teamAway_id,
+        Match.numOfHeadsHome,
+        Match.numOfHeadsAway,
+        Match.typeOutcome,
+        Match.gameComment,
+        TeamHome.c.teamName.label('team_home_name'),
+        TeamAway.c.teamName.label('team_away_name'),
+        ChampionShip.championshipName,
+        Sport.sportName,
+        # Добавляем поля из таблицы outcomes
+        Outcome.probability,
+        Outcome.confidence,
+        Outcome.uncertainty,
+        Outcome.lower_bound,
+        Outcome.upper_bound,
+        Outcome.outcome,
+        Outcome.forecast
+    ).join(
+        Match, Statistic.match_id == Match.id
+    ).outerjoin(
+        TeamHome, Match.teamHome_id == TeamHome.c.id
+    ).outerjoin(
+        TeamAway, Match.teamAway_id == TeamAway.c.id
+    ).outerjoin(
+        ChampionShip, Statistic.championship_id == ChampionShip.id
+    ).outerjoin(
+        Sport, Statistic.sport_id == Sport.id
+    ).outerjoin(
+        Outcome, Statistic.outcome_id == Outcome.id
+    ).order_by(
+        Match.gameData, Statistic.prediction_accuracy.desc()
+    )
+
+
 def get_all_statistics() -> pd.DataFrame:
     """
     Получает всю статистику прогнозов.
@@ -301,69 +369,7 @@ def get_all_statistics() -> pd.DataFrame:
         pd.DataFrame: DataFrame со всей статистикой
     """
     with Session_pool() as session:
-        TeamHome = Team.__table__.alias('team_home')
-        TeamAway = Team.__table__.alias('team_away')
-        
-        query = session.query(
-            Statistic.id,
-            Statistic.outcome_id,
-            Statistic.prediction_id,
-            Statistic.match_id,
-            Statistic.championship_id,
-            Statistic.sport_id,
-            Statistic.match_date,
-            Statistic.match_round,
-            Statistic.match_stage,
-            Statistic.forecast_type,
-            Statistic.forecast_subtype,
-            Statistic.model_name,
-            Statistic.model_version,
-            Statistic.model_type,
-            Statistic.actual_result,
-            Statistic.actual_value,
-            Statistic.prediction_correct,
-            Statistic.prediction_accuracy,
-            Statistic.prediction_error,
-            Statistic.prediction_residual,
-            Statistic.coefficient,
-            Statistic.potential_profit,
-            Statistic.actual_profit,
-            Statistic.created_at,
-            Statistic.updated_at,
-            Match.gameData,
-            Match.teamHome_id,
-            Match.teamAway_id,
-            Match.numOfHeadsHome,
-            Match.numOfHeadsAway,
-            Match.typeOutcome,
-            Match.gameComment,
-            TeamHome.c.teamName.label('team_home_name'),
-            TeamAway.c.teamName.label('team_away_name'),
-            ChampionShip.championshipName,
-            Sport.sportName,
-            # Добавляем поля из таблицы outcomes
-            Outcome.probability,
-            Outcome.confidence,
-            Outcome.uncertainty,
-            Outcome.lower_bound,
-            Outcome.upper_bound,
-            Outcome.outcome,
-            Outcome.forecast
-        ).join(
-            Match, Statistic.match_id == Match.id
-        ).outerjoin(
-            TeamHome, Match.teamHome_id == TeamHome.c.id
-        ).outerjoin(
-            TeamAway, Match.teamAway_id == TeamAway.c.id
-        ).outerjoin(
-            ChampionShip, Statistic.championship_id == ChampionShip.id
-        ).outerjoin(
-            Sport, Statistic.sport_id == Sport.id
-        ).outerjoin(
-            Outcome, Statistic.outcome_id == Outcome.id
-        ).order_by(
-            Match.gameData, Statistic.prediction_accuracy.desc()
-        )
+        query = build_all_statistics_query(session)
         
         result = query.all()
         df = pd.DataFrame([row._asdict() for row in result])
@@ -508,6 +514,60 @@ def get_predictions_for_date(target_date: date) -> pd.DataFrame:
         return df
 
 
+def build_all_predictions_query(session: Session):
+    """Запрос всех обычных прогнозов (predictions) по времени матча."""
+    TeamHome = Team.__table__.alias('team_home')
+    TeamAway = Team.__table__.alias('team_away')
+    
+    return session.query(
+        Prediction.id,
+        Prediction.match_id,
+        Prediction.win_draw_loss_home_win,
+        Prediction.win_draw_loss_draw,
+        Prediction.win_draw_loss_away_win,
+        Prediction.oz_yes,
+        Prediction.oz_no,
+        Prediction.goal_home_yes,
+        Prediction.goal_home_no,
+        Prediction.goal_away_yes,
+        Prediction.goal_away_no,
+        Prediction.total_yes,
+        Prediction.total_no,
+        Prediction.total_home_yes,
+        Prediction.total_home_no,
+        Prediction.total_away_yes,
+        Prediction.total_away_no,
+        Prediction.forecast_total_amount,
+        Prediction.forecast_total_home_amount,
+        Prediction.forecast_total_away_amount,
+        Prediction.created_at,
+        Match.gameData,
+        Match.tournament_id,
+        Match.teamHome_id,
+        Match.teamAway_id,
+        Match.numOfHeadsHome,
+        Match.numOfHeadsAway,
+        Match.typeOutcome,
+        Match.gameComment,
+        TeamHome.c.teamName.label('team_home_name'),
+        TeamAway.c.teamName.label('team_away_name'),
+        ChampionShip.championshipName,
+        Sport.sportName
+    ).join(
+        Match, Prediction.match_id == Match.id
+    ).outerjoin(
+        TeamHome, Match.teamHome_id == TeamHome.c.id
+    ).outerjoin(
+        TeamAway, Match.teamAway_id == TeamAway.c.id
+    ).outerjoin(
+        ChampionShip, Match.tournament_id == ChampionShip.id
+    ).outerjoin(
+        Sport, ChampionShip.sport_id == Sport.id
+    ).order_by(
+        Match.gameData, Prediction.created_at.desc()
+    )
+
+
 def get_all_predictions() -> pd.DataFrame:
     """
     Получает все обычные прогнозы.
@@ -516,56 +576,7 @@ def get_all_predictions() -> pd.DataFrame:
         pd.DataFrame: DataFrame со всеми обычными прогнозами
     """
     with Session_pool() as session:
-        TeamHome = Team.__table__.alias('team_home')
-        TeamAway = Team.__table__.alias('team_away')
-        
-        query = session.query(
-            Prediction.id,
-            Prediction.match_id,
-            Prediction.win_draw_loss_home_win,
-            Prediction.win_draw_loss_draw,
-            Prediction.win_draw_loss_away_win,
-            Prediction.oz_yes,
-            Prediction.oz_no,
-            Prediction.goal_home_yes,
-            Prediction.goal_home_no,
-            Prediction.goal_away_yes,
-            Prediction.goal_away_no,
-            Prediction.total_yes,
-            Prediction.total_no,
-            Prediction.total_home_yes,
-            Prediction.total_home_no,
-            Prediction.total_away_yes,
-            Prediction.total_away_no,
-            Prediction.forecast_total_amount,
-            Prediction.forecast_total_home_amount,
-            Prediction.forecast_total_away_amount,
-            Prediction.created_at,
-            Match.gameData,
-            Match.tournament_id,
-            Match.teamHome_id,
-            Match.teamAway_id,
-            Match.numOfHeadsHome,
-            Match.numOfHeadsAway,
-            Match.typeOutcome,
-            Match.gameComment,
-            TeamHome.c.teamName.label('team_home_name'),
-            TeamAway.c.teamName.label('team_away_name'),
-            ChampionShip.championshipName,
-            Sport.sportName
-        ).join(
-            Match, Prediction.match_id == Match.id
-        ).outerjoin(
-            TeamHome, Match.teamHome_id == TeamHome.c.id
-        ).outerjoin(
-            TeamAway, Match.teamAway_id == TeamAway.c.id
-        ).outerjoin(
-            ChampionShip, Match.tournament_id == ChampionShip.id
-        ).outerjoin(
-            Sport, ChampionShip.sport_id == Sport.id
-        ).order_by(
-            Match.gameData, Prediction.created_at.desc()
-        )
+        query = build_all_predictions_query(session)
         
         result = query.all()
         df = pd.DataFrame([row._asdict() for row in result])
@@ -732,3 +743,190 @@ def get_all_outcomes() -> pd.DataFrame:
         df = pd.DataFrame([row._asdict() for row in result])
         logger.info(f'Загружено {len(df)} записей из всех итогов матчей')
         return df
+
+
+def get_statistics_for_settlement(
+    session: Session,
+    match_ids: Optional[List[int]] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+) -> pd.DataFrame:
+    """
+    Получает записи statistics завершенных матчей вместе со счетом
+    и targets одним запросом (для пакетного расчета правильности).
+
+    Args:
+        session: Сессия базы данных
+        match_ids: Список ID матчей (опционально)
+        start_date: Начальная дата матчей (включительно, опционально)
+        end_date: Конечная дата матчей (включительно, опционально)
+
+    Returns:
+        pd.DataFrame: statistics + numOfHeadsHome/numOfHeadsAway + target_*
+    """
+    target_columns = [
+        getattr(Target, name) for name in TARGET_FIELDS
+    ]
+    query = session.query(
+        Statistic.id,
+        Statistic.match_id,
+        Statistic.outcome_id,
+        Statistic.forecast_type,
+        Statistic.forecast_subtype,
+        Match.numOfHeadsHome,
+        Match.numOfHeadsAway,
+        Target.match_id.label('target_match_id'),
+        *target_columns
+    ).join(
+        Match, Statistic.match_id == Match.id
+    ).outerjoin(
+        Target, Statistic.match_id == Target.match_id
+    ).filter(
+        Match.numOfHeadsHome.isnot(None),
+        Match.numOfHeadsAway.isnot(None)
+    )
+
+    if match_ids is not None:
+        query = query.filter(Statistic.match_id.in_(match_ids))
+    if start_date is not None:
+        query = query.filter(Statistic.match_date >= start_date)
+    if end_date is not None:
+        query = query.filter(Statistic.match_date <= end_date)
+
+    result = query.all()
+    df = pd.DataFrame(
+        [row._asdict() for row in result],
+        columns=[
+            'id', 'match_id', 'outcome_id', 'forecast_type',
+            'forecast_subtype', 'numOfHeadsHome', 'numOfHeadsAway',
+            'target_match_id', *TARGET_FIELDS
+        ]
+    )
+    logger.info(f'Загружено {len(df)} записей statistics для расчета результатов')
+    return df
+
+
+def get_match_overview(match_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Получает основную информацию о матче из statistics (одна строка).
+
+    Args:
+        match_id: ID матча
+
+    Returns:
+        Optional[Dict[str, Any]]: Поля матча, чемпионата и команд или None
+    """
+    TeamHome = Team.__table__.alias('team_home')
+    TeamAway = Team.__table__.alias('team_away')
+
+    with Session_pool() as session:
+        row = session.query(
+            Statistic.match_id,
+            Statistic.match_date,
+            Statistic.championship_id,
+            Statistic.sport_id,
+            ChampionShip.championshipName,
+            Sport.sportName,
+            Match.numOfHeadsHome,
+            Match.numOfHeadsAway,
+            TeamHome.c.teamName.label('team_home_name'),
+            TeamAway.c.teamName.label('team_away_name')
+        ).outerjoin(
+            Match, Statistic.match_id == Match.id
+        ).outerjoin(
+            ChampionShip, Statistic.championship_id == ChampionShip.id
+        ).outerjoin(
+            Sport, Statistic.sport_id == Sport.id
+        ).outerjoin(
+            TeamHome, Match.teamHome_id == TeamHome.c.id
+        ).outerjoin(
+            TeamAway, Match.teamAway_id == TeamAway.c.id
+        ).filter(
+            Statistic.match_id == match_id
+        ).limit(1).first()
+        return row._asdict() if row else None
+
+
+def get_match_predictions_page(
+    match_id: int,
+    limit: int,
+    after: Optional[Tuple[str, int]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Получает страницу прогнозов матча с keyset-пагинацией.
+
+    Прогнозы упорядочены по (forecast_type, id); следующая страница
+    начинается после ключа последней строки, поэтому запрос читает по
+    индексу (match_id, forecast_type, id) только limit строк.
+
+    Args:
+        match_id: ID матча
+        limit: Размер страницы
+        after: Ключ (forecast_type, id) последней строки предыдущей страницы
+
+    Returns:
+        List[Dict[str, Any]]: Прогнозы statistics с полями outcomes
+    """
+    with Session_pool() as session:
+        query = session.query(
+            Statistic.id,
+            Statistic.forecast_type,
+            Statistic.forecast_subtype,
+            Statistic.model_name,
+            Statistic.prediction_correct,
+            Statistic.prediction_accuracy,
+            Statistic.prediction_error,
+            Statistic.prediction_residual,
+            Outcome.probability,
+            Outcome.confidence,
+            Outcome.uncertainty,
+            Outcome.lower_bound,
+            Outcome.upper_bound
+        ).outerjoin(
+            Outcome, Statistic.outcome_id == Outcome.id
+        ).filter(
+            Statistic.match_id == match_id
+        )
+
+        if after is not None:
+            after_type, after_id = after
+            query = query.filter(or_(
+                Statistic.forecast_type > after_type,
+                and_(Statistic.forecast_type == after_type, Statistic.id > after_id)
+            ))
+
+        query = query.order_by(Statistic.forecast_type, Statistic.id).limit(limit)
+        return [row._asdict() for row in query.all()]
+
+
+def get_match_version(match_id: int) -> str:
+    """
+    Версия данных матча для ETag деталей матча.
+
+    Меняется при добавлении или изменении строк statistics матча и при
+    появлении счета: детали читают эти данные напрямую, а не из сводки.
+
+    Args:
+        match_id: ID матча
+
+    Returns:
+        str: Строка версии (пустая для матча без данных)
+    """
+    with Session_pool() as session:
+        count, max_id, max_updated_at = session.query(
+            func.count(Statistic.id),
+            func.max(Statistic.id),
+            func.max(Statistic.updated_at)
+        ).filter(
+            Statistic.match_id == match_id
+        ).one()
+        score = session.query(
+            Match.numOfHeadsHome, Match.numOfHeadsAway
+        ).filter(
+            Match.id == match_id
+        ).first()
+    if not count:
+        return ''
+    updated_at = max_updated_at.isoformat() if hasattr(max_updated_at, 'isoformat') else max_updated_at
+    home, away = score if score else (None, None)
+    return f'{count}:{max_id}:{updated_at}:{home}:{away}'
@@ -1,24 +1,87 @@
 """
 Кеширование статистики для ускорения публикации отчетов.
+
+Бэкенд кеша задается переменными окружения:
+    STATISTICS_CACHE_BACKEND - memory, sqlite или tiered (по умолчанию)
+    STATISTICS_CACHE_PATH - файл общего кеша процессов (SQLite)
+    STATISTICS_CACHE_TTL - время жизни записи в памяти процесса, сек
+    STATISTICS_CACHE_SHARED_TTL - время жизни записи в общем кеше, сек
+    STATISTICS_CACHE_STALE_TTL - сколько хранить устаревшие записи, сек
+
+Записи помечаются тегом forecast_type и удаляются при расчете результатов
+матчей (invalidate_forecast_types).
 """
 
 import logging
-from typing import Dict, Any, Optional
-from functools import lru_cache
+import os
+import threading
+import time
+from typing import Dict, Any, Optional, Iterable
 
-from db.queries.statistics_metrics import (
-    get_historical_accuracy_regular,
-    get_recent_accuracy,
-    get_calibration,
-    get_stability,
-    get_confidence_bounds
-)
+from core.cache import CacheBackend, create_cache_backend
+from db.queries.statistics_rollup import get_complete_statistics_from_rollup
 
 logger = logging.getLogger(__name__)
 
+# Значения при ошибке получения статистики (не кешируются)
+DEFAULT_STATISTICS = {
+    'calibration': 0.75,
+    'stability': 0.80,
+    'confidence': 0.75,
+    'uncertainty': 0.25,
+    'lower_bound': 0.5,
+    'upper_bound': 0.9,
+    'historical_correct': 0,
+    'historical_total': 0,
+    'historical_accuracy': 0.0,
+    'recent_correct': 0,
+    'recent_total': 0,
+    'recent_accuracy': 0.0
+}
+
+_backend: Optional[CacheBackend] = None
+_backend_lock = threading.Lock()
+_counters = {'hits': 0, 'misses': 0, 'stale_serves': 0, 'errors': 0, 'invalidations': 0}
+
+
+def get_cache_backend() -> CacheBackend:
+    """Возвращает бэкенд кеша статистики (создается при первом обращении)."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_cache_backend(
+                    backend=os.getenv('STATISTICS_CACHE_BACKEND', 'tiered'),
+                    path=os.getenv('STATISTICS_CACHE_PATH', 'results/cache/statistics.sqlite'),
+                    ttl=float(os.getenv('STATISTICS_CACHE_TTL', '300')),
+                    shared_ttl=float(os.getenv('STATISTICS_CACHE_SHARED_TTL', '3600')),
+                    stale_ttl=float(os.getenv('STATISTICS_CACHE_STALE_TTL', '86400'))
+                )
+    return _backend
+
+
+def set_cache_backend(backend: CacheBackend) -> None:
+    """Подменяет бэкенд кеша (например, на MemoryTTLCache в тестах)."""
+    global _backend
+    _backend = backend
+
+
+def _cache_tag(forecast_type: str) -> str:
+    return str(forecast_type).lower()
+
+
+def _cache_key(
+    forecast_type: str,
+    forecast_subtype: str,
+    championship_id: Optional[int],
+    sport_id: Optional[int]
+) -> str:
+    return '|'.join([
+        _cache_tag(forecast_type), str(forecast_subtype).lower(),
+        str(championship_id or ''), str(sport_id or '')
+    ])
+
 
-# LRU кеш для статистики (maxsize=1024 - для ~100 типов прогнозов)
-@lru_cache(maxsize=1024)
 def get_complete_statistics_cached(
     forecast_type: str,
     forecast_subtype: str,
@@ -27,90 +90,104 @@ def get_complete_statistics_cached(
 ) -> Dict[str, Any]:
     """
     Кешированная версия get_complete_statistics.
-    
-    Кеш сбрасывается при перезапуске приложения.
-    Для долгоживущих процессов используйте clear_statistics_cache().
-    
+
+    Свежая запись берется из кеша процесса или общего кеша, иначе метрики
+    пересчитываются. Если пересчет не удался, отдается устаревшая запись,
+    а при ее отсутствии - значения по умолчанию.
+
     Args:
         forecast_type: Тип прогноза
         forecast_subtype: Подтип прогноза
         championship_id: Фильтр по чемпионату (опционально)
         sport_id: Фильтр по виду спорта (опционально)
-        
+
     Returns:
         Dict со всеми метриками
     """
+    key = _cache_key(forecast_type, forecast_subtype, championship_id, sport_id)
+    backend = get_cache_backend()
+
     try:
-        # Получаем историческую точность
-        hist = get_historical_accuracy_regular(
-            forecast_type, forecast_subtype, championship_id, sport_id
-        )
-        
-        # Получаем точность последних 10
-        recent = get_recent_accuracy(
-            forecast_type, forecast_subtype, 10, championship_id, sport_id
-        )
-        
-        # Получаем калибровку
-        calibration = get_calibration(
-            forecast_type, forecast_subtype, championship_id, sport_id
-        )
-        
-        # Получаем стабильность
-        stability = get_stability(
-            forecast_type, forecast_subtype, 90, championship_id, sport_id
-        )
-        
-        # Получаем границы уверенности
-        bounds = get_confidence_bounds(
+        entry = backend.get(key)
+    except Exception as e:
+        logger.warning(f'Ошибка чтения кеша статистики: {e}')
+        entry = None
+
+    if entry is not None and entry.is_fresh:
+        _counters['hits'] += 1
+        return dict(entry.value)
+
+    _counters['misses'] += 1
+    computed_at = time.time()
+    try:
+        # Метрики берутся из сводки statistics_rollups (с fallback на statistics)
+        stats = get_complete_statistics_from_rollup(
             forecast_type, forecast_subtype, championship_id, sport_id
         )
-        
-        # Объединяем все метрики
-        return {
-            'calibration': calibration,
-            'stability': stability,
-            'confidence': bounds.get('confidence', 0.5),
-            'uncertainty': bounds.get('uncertainty', 0.5),
-            'lower_bound': bounds.get('lower_bound', 0.0),
-            'upper_bound': bounds.get('upper_bound', 1.0),
-            'historical_correct': hist.get('correct', 0),
-            'historical_total': hist.get('total', 0),
-            'historical_accuracy': hist.get('accuracy', 0.0),
-            'recent_correct': recent.get('correct', 0),
-            'recent_accuracy': recent.get('accuracy', 0.0)
-        }
     except Exception as e:
+        _counters['errors'] += 1
+        if entry is not None:
+            _counters['stale_serves'] += 1
+            logger.warning(f'Ошибка при получении статистики для {forecast_type}/{forecast_subtype}, '
+                           f'используется устаревшая запись кеша: {e}')
+            return dict(entry.value)
         logger.error(f'Ошибка при получении статистики для {forecast_type}/{forecast_subtype}: {e}')
-        return {
-            'calibration': 0.75,
-            'stability': 0.80,
-            'confidence': 0.75,
-            'uncertainty': 0.25,
-            'lower_bound': 0.5,
-            'upper_bound': 0.9,
-            'historical_correct': 0,
-            'historical_total': 0,
-            'historical_accuracy': 0.0,
-            'recent_correct': 0,
-            'recent_accuracy': 0.0
-        }
+        return dict(DEFAULT_STATISTICS)
+
+    try:
+        backend.set(key, stats, _cache_tag(forecast_type), computed_at)
+    except Exception as e:
+        logger.warning(f'Ошибка записи кеша статистики: {e}')
+    return dict(stats)
+
+
+def invalidate_forecast_types(forecast_types: Iterable[str]) -> int:
+    """
+    Удаляет из кеша (процесса и общего) статистику указанных типов прогнозов.
+
+    Args:
+        forecast_types: Типы прогнозов, затронутые новыми результатами
+
+    Returns:
+        int: Количество удаленных записей общего кеша
+    """
+    tags = {_cache_tag(forecast_type) for forecast_type in forecast_types if forecast_type}
+    if not tags:
+        return 0
+    try:
+        removed = get_cache_backend().invalidate_tags(tags)
+    except Exception as e:
+        logger.error(f'Ошибка инвалидации кеша статистики: {e}')
+        return 0
+    _counters['invalidations'] += 1
+    logger.info(f'Кеш статистики инвалидирован для типов {sorted(tags)}: {removed} записей')
+    return removed
 
 
 def clear_statistics_cache() -> None:
     """Очищает кеш статистики."""
-    get_complete_statistics_cached.cache_clear()
+    try:
+        get_cache_backend().clear()
+    except Exception as e:
+        logger.error(f'Ошибка очистки кеша статистики: {e}')
+        return
+    _counters['invalidations'] += 1
     logger.info('Кеш статистики очищен')
 
 
 def get_cache_info() -> Dict[str, Any]:
-    """Возвращает информацию о кеше."""
-    info = get_complete_statistics_cached.cache_info()
+    """Возвращает информацию о кеше и счетчики текущего процесса."""
+    try:
+        info = get_cache_backend().info()
+    except Exception as e:
+        logger.warning(f'Ошибка получения информации о кеше статистики: {e}')
+        info = {}
+
+    lookups = _counters['hits'] + _counters['misses']
     return {
-        'hits': info.hits,
-        'misses': info.misses,
-        'maxsize': info.maxsize,
-        'currsize': info.currsize,
-        'hit_rate': info.hits / (info.hits + info.misses) if (info.hits + info.misses) > 0 else 0.0
+        **info,
+        **_counters,
+        'maxsize': info.get('maxsize'),
+        'currsize': info.get('currsize', 0),
+        'hit_rate': _counters['hits'] / lookups if lookups > 0 else 0.0
     }
-
@@ -0,0 +1,618 @@
+"""
+Запросы к материализованной сводке statistics_rollups.
+
+Сводка хранит агрегаты таблицы statistics по ключу
+(forecast_type, forecast_subtype, championship_id, sport_id, match_date,
+model_name, model_version, model_type), поэтому метрики качества
+(историческая точность, последние N, калибровка, стабильность, границы
+уверенности) и агрегаты StatisticsAPI (сводка, типы, модели, дни,
+чемпионаты) считаются по дневным строкам сводки, а не по всей истории
+statistics.
+"""
+
+import logging
+import statistics as stats_module
+from datetime import datetime, date, timedelta
+from typing import Dict, Any, Optional, List
+
+from sqlalchemy import (
+    Table, MetaData, Column, Index, UniqueConstraint, BigInteger, Integer, Numeric, VARCHAR, DATE, TIMESTAMP,
+    func, case, select, distinct
+)
+from config import Session_pool
+from db.models.statistics import Statistic
+from db.models.championship import ChampionShip
+from db.models.sport import Sport
+from db.queries.statistics_metrics import (
+    _normalize_forecast_subtype,
+    get_complete_statistics as get_complete_statistics_live
+)
+
+logger = logging.getLogger(__name__)
+
+
+metadata = MetaData()
+
+statistics_rollups = Table(
+    'statistics_rollups', metadata,
+    Column('id', BigInteger, primary_key=True, autoincrement=True),
+    Column('forecast_type', VARCHAR(50), nullable=False),
+    Column('forecast_subtype', VARCHAR(50), nullable=False),
+    Column('championship_id', BigInteger, nullable=False),
+    Column('sport_id', BigInteger, nullable=False),
+    Column('match_date', DATE, nullable=False),
+    Column('model_name', VARCHAR(100), nullable=False),
+    Column('model_version', VARCHAR(20)),
+    Column('model_type', VARCHAR(20)),
+    Column('row_count', Integer, nullable=False),
+    Column('match_count', Integer, nullable=False),
+    Column('total_count', Integer, nullable=False),
+    Column('correct_count', Integer, nullable=False),
+    Column('accuracy_count', Integer, nullable=False),
+    Column('accuracy_sum', Numeric(14, 4)),
+    Column('accuracy_min', Numeric(5, 4)),
+    Column('accuracy_max', Numeric(5, 4)),
+    Column('error_count', Integer, nullable=False),
+    Column('error_sum', Numeric(16, 3)),
+    Column('residual_count', Integer, nullable=False),
+    Column('residual_sum', Numeric(16, 3)),
+    Column('updated_at', TIMESTAMP, nullable=False),
+    UniqueConstraint(
+        'forecast_type', 'forecast_subtype', 'championship_id', 'sport_id', 'match_date',
+        'model_name', 'model_version', 'model_type',
+        name='uq_statistics_rollups_key'
+    ),
+    # Индексы совпадают с миграциями b7c41d2e9a05, c5e2a9d41f7b и d1f4b7a2c9e3
+    Index('ix_statistics_rollups_type_subtype_date', 'forecast_type', 'forecast_subtype', 'match_date'),
+    Index('ix_statistics_rollups_championship_date', 'championship_id', 'match_date'),
+    Index('ix_statistics_rollups_date_championship', 'match_date', 'championship_id', 'sport_id'),
+    Index('ix_statistics_rollups_sport_date', 'sport_id', 'match_date'),
+    Index('ix_statistics_rollups_type_date', 'forecast_type', 'match_date'),
+    Index('ix_statistics_rollups_model_date', 'model_name', 'match_date'),
+    Index('ix_statistics_rollups_updated_at', 'updated_at'),
+)
+
+# Колонки ключа сводки
+ROLLUP_KEY_COLUMNS = [
+    'forecast_type', 'forecast_subtype', 'championship_id', 'sport_id', 'match_date',
+    'model_name', 'model_version', 'model_type'
+]
+
+# Параметры метрик (совпадают с get_complete_statistics)
+RECENT_LIMIT = 10
+STABILITY_PERIOD_DAYS = 90
+
+# Наличие данных в сводке проверяется один раз на процесс
+_rollup_available: Optional[bool] = None
+
+
+def build_rollup_select(*filters):
+    """
+    Возвращает SELECT агрегатов statistics по ключу сводки.
+
+    Используется при пересчете сводки (INSERT ... SELECT).
+
+    Args:
+        *filters: Условия на Statistic (например, диапазон match_date)
+    """
+    query = select(
+        Statistic.forecast_type,
+        Statistic.forecast_subtype,
+        Statistic.championship_id,
+        Statistic.sport_id,
+        Statistic.match_date,
+        Statistic.model_name,
+        Statistic.model_version,
+        Statistic.model_type,
+        func.count(Statistic.id).label('row_count'),
+        func.count(distinct(Statistic.match_id)).label('match_count'),
+        func.count(Statistic.prediction_correct).label('total_count'),
+        func.coalesce(func.sum(case((Statistic.prediction_correct == True, 1), else_=0)), 0).label('correct_count'),
+        func.count(Statistic.prediction_accuracy).label('accuracy_count'),
+        func.sum(Statistic.prediction_accuracy).label('accuracy_sum'),
+        func.min(Statistic.prediction_accuracy).label('accuracy_min'),
+        func.max(Statistic.prediction_accuracy).label('accuracy_max'),
+        func.count(Statistic.prediction_error).label('error_count'),
+        func.sum(Statistic.prediction_error).label('error_sum'),
+        func.count(Statistic.prediction_residual).label('residual_count'),
+        func.sum(Statistic.prediction_residual).label('residual_sum'),
+        func.now().label('updated_at')
+    )
+    if filters:
+        query = query.where(*filters)
+    return query.group_by(
+        Statistic.forecast_type,
+        Statistic.forecast_subtype,
+        Statistic.championship_id,
+        Statistic.sport_id,
+        Statistic.match_date,
+        Statistic.model_name,
+        Statistic.model_version,
+        Statistic.model_type
+    )
+
+
+def is_rollup_available(force: bool = False) -> bool:
+    """
+    Проверяет, что сводка создана и заполнена (результат кэшируется на процесс).
+
+    Args:
+        force: Повторить проверку
+    """
+    global _rollup_available
+    if _rollup_available is None or force:
+        try:
+            with Session_pool() as session:
+                row = session.execute(
+                    select(statistics_rollups.c.id).limit(1)
+                ).first()
+                _rollup_available = row is not None
+        except Exception as e:
+            logger.warning(f'Сводка statistics_rollups недоступна: {e}')
+            _rollup_available = False
+        if not _rollup_available:
+            logger.warning(
+                'Сводка statistics_rollups пуста - метрики считаются по statistics. '
+                'Заполните ее: python run_pipeline.py rollup --full'
+            )
+    return _rollup_available
+
+
+def get_rollup_version() -> Optional[str]:
+    """
+    Возвращает время последнего обновления сводки.
+
+    Сводка пересчитывается при расчете результатов матчей, поэтому значение
+    меняется после каждого расчета (используется для ETag ответов API).
+    """
+    with Session_pool() as session:
+        updated_at = session.execute(
+            select(func.max(statistics_rollups.c.updated_at))
+        ).scalar()
+    return updated_at.isoformat() if hasattr(updated_at, 'isoformat') else updated_at
+
+
+def get_rollup_daily(
+    forecast_type: str,
+    forecast_subtype: str,
+    championship_id: Optional[int] = None,
+    sport_id: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Возвращает дневные агрегаты сводки для типа/подтипа прогноза (по убыванию даты).
+
+    Args:
+        forecast_type: Тип прогноза (в любом регистре)
+        forecast_subtype: Подтип прогноза (нормализуется как в statistics_metrics)
+        championship_id: Фильтр по чемпионату (опционально)
+        sport_id: Фильтр по виду спорта (опционально)
+
+    Returns:
+        List[Dict[str, Any]]: Строки с match_date и суммами счетчиков за день
+    """
+    rollup = statistics_rollups.c
+    query = select(
+        rollup.match_date,
+        func.sum(rollup.total_count).label('total_count'),
+        func.sum(rollup.correct_count).label('correct_count'),
+        func.sum(rollup.accuracy_count).label('accuracy_count'),
+        func.sum(rollup.accuracy_sum).label('accuracy_sum'),
+        func.min(rollup.accuracy_min).label('accuracy_min'),
+        func.max(rollup.accuracy_max).label('accuracy_max')
+    ).where(
+        rollup.forecast_type == forecast_type.lower(),
+        rollup.forecast_subtype == _normalize_forecast_subtype(forecast_type, forecast_subtype)
+    )
+
+    if championship_id:
+        query = query.where(rollup.championship_id == championship_id)
+
+    if sport_id:
+        query = query.where(rollup.sport_id == sport_id)
+
+    query = query.group_by(rollup.match_date).order_by(rollup.match_date.desc())
+
+    with Session_pool() as session:
+        return [row._asdict() for row in session.execute(query).all()]
+
+
+def compute_complete_statistics(
+    daily_rows: List[Dict[str, Any]],
+    recent_limit: int = RECENT_LIMIT,
+    period_days: int = STABILITY_PERIOD_DAYS,
+    now: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """
+    Рассчитывает метрики get_complete_statistics по дневным агрегатам сводки.
+
+    Последние N прогнозов берутся с самых поздних дат; если граничный день
+    входит частично, число правильных в нем берется пропорционально.
+
+    Args:
+        daily_rows: Результат get_rollup_daily (по убыванию даты)
+        recent_limit: Количество последних прогнозов
+        period_days: Период стабильности в днях
+        now: Текущее время (для тестов)
+
+    Returns:
+        Dict со всеми метриками (как get_complete_statistics) и recent_total
+    """
+    now = now or datetime.now()
+
+    total = correct = 0
+    accuracy_count = 0
+    accuracy_sum = 0.0
+    accuracy_min = accuracy_max = None
+    recent_total = recent_correct = 0
+    weekly: Dict[int, List[int]] = {}
+    period_total = 0
+    cutoff = (now - timedelta(days=period_days)).date()
+
+    for row in daily_rows:
+        day_total = int(row.get('total_count') or 0)
+        day_correct = int(row.get('correct_count') or 0)
+        total += day_total
+        correct += day_correct
+
+        # Последние N прогнозов
+        if recent_total < recent_limit and day_total:
+            taken = min(day_total, recent_limit - recent_total)
+            recent_total += taken
+            recent_correct += day_correct if taken == day_total else round(day_correct * taken / day_total)
+
+        # Понедельная точность за период (номер недели, как в get_stability)
+        match_date = row.get('match_date')
+        if isinstance(match_date, datetime):
+            match_date = match_date.date()
+        if match_date is not None and match_date >= cutoff and day_total:
+            week = weekly.setdefault(match_date.isocalendar()[1], [0, 0])
+            week[0] += day_correct
+            week[1] += day_total
+            period_total += day_total
+
+        # Агрегаты prediction_accuracy
+        day_accuracy_count = int(row.get('accuracy_count') or 0)
+        if day_accuracy_count:
+            accuracy_count += day_accuracy_count
+            accuracy_sum += float(row.get('accuracy_sum') or 0.0)
+            day_min = row.get('accuracy_min')
+            day_max = row.get('accuracy_max')
+            if day_min is not None:
+                accuracy_min = float(day_min) if accuracy_min is None else min(accuracy_min, float(day_min))
+            if day_max is not None:
+                accuracy_max = float(day_max) if accuracy_max is None else max(accuracy_max, float(day_max))
+
+    avg_accuracy = accuracy_sum / accuracy_count if accuracy_count else None
+
+    # Калибровка и границы уверенности (нейтральные значения при отсутствии данных)
+    if avg_accuracy:
+        calibration = min(max(avg_accuracy, 0.0), 1.0)
+        bounds = {
+            'confidence': avg_accuracy,
+            'uncertainty': 1.0 - avg_accuracy,
+            'lower_bound': accuracy_min or 0.0,
+            'upper_bound': accuracy_max or 1.0
+        }
+    else:
+        calibration = 0.75
+        bounds = {'confidence': 0.75, 'uncertainty': 0.25, 'lower_bound': 0.60, 'upper_bound': 0.90}
+
+    # Стабильность = 1 - нормализованное отклонение недельной точности
+    stability = 0.75
+    weekly_rates = [c / t for c, t in weekly.values() if t > 0]
+    if period_total >= 10 and len(weekly_rates) >= 2:
+        mean = stats_module.mean(weekly_rates)
+        std_dev = stats_module.stdev(weekly_rates)
+        stability = 1.0 - min(std_dev / (mean if mean > 0 else 1.0), 1.0)
+        stability = max(min(stability, 1.0), 0.0)
+
+    return {
+        'calibration': calibration,
+        'stability': stability,
+        'confidence': bounds['confidence'],
+        'uncertainty': bounds['uncertainty'],
+        'lower_bound': bounds['lower_bound'],
+        'upper_bound': bounds['upper_bound'],
+        'historical_correct': correct,
+        'historical_total': total,
+        'historical_accuracy': correct / total if total else 0.0,
+        'recent_correct': recent_correct,
+        'recent_total': recent_total,
+        'recent_accuracy': recent_correct / recent_total if recent_total else 0.0
+    }
+
+
+def get_complete_statistics_from_rollup(
+    forecast_type: str,
+    forecast_subtype: str,
+    championship_id: Optional[int] = None,
+    sport_id: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Получает полную статистику типа прогноза из сводки statistics_rollups.
+
+    Если сводка не создана или пуста, метрики считаются по statistics
+    (get_complete_statistics).
+
+    Args:
+        forecast_type: Тип прогноза
+        forecast_subtype: Подтип прогноза
+        championship_id: Фильтр по чемпионату (опционально)
+        sport_id: Фильтр по виду спорта (опционально)
+
+    Returns:
+        Dict со всеми метриками
+    """
+    if not is_rollup_available():
+        return get_complete_statistics_live(
+            forecast_type, forecast_subtype, championship_id, sport_id
+        )
+
+    daily_rows = get_rollup_daily(forecast_type, forecast_subtype, championship_id, sport_id)
+    return compute_complete_statistics(daily_rows)
+
+
+def _filter_rollup(
+    query,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    championship_id: Optional[int] = None,
+    sport_id: Optional[int] = None,
+    forecast_type: Optional[str] = None,
+    model_name: Optional[str] = None
+):
+    """Добавляет к запросу по сводке фильтры API (каждому набору соответствует индекс)."""
+    rollup = statistics_rollups.c
+    if start_date is not None and end_date is not None:
+        query = query.where(rollup.match_date.between(start_date, end_date))
+
+    if championship_id:
+        query = query.where(rollup.championship_id == championship_id)
+
+    if sport_id:
+        query = query.where(rollup.sport_id == sport_id)
+
+    if forecast_type:
+        query = query.where(rollup.forecast_type == forecast_type.lower())
+
+    if model_name:
+        query = query.where(rollup.model_name == model_name)
+    return query
+
+
+def _counter_columns():
+    """Суммы счетчиков сводки (общие для агрегатов API)."""
+    rollup = statistics_rollups.c
+    return [
+        func.sum(rollup.row_count).label('row_count'),
+        func.sum(rollup.total_count).label('total_count'),
+        func.sum(rollup.correct_count).label('correct_count'),
+        func.sum(rollup.accuracy_count).label('accuracy_count'),
+        func.sum(rollup.accuracy_sum).label('accuracy_sum'),
+        func.sum(rollup.error_count).label('error_count'),
+        func.sum(rollup.error_sum).label('error_sum'),
+        func.sum(rollup.residual_count).label('residual_count'),
+        func.sum(rollup.residual_sum).label('residual_sum')
+    ]
+
+
+def _championship_days(**filters):
+    """
+    Подзапрос агрегатов сводки по (match_date, championship_id, sport_id).
+
+    Матч относится к одному дню и одному чемпионату, поэтому число
+    уникальных матчей дня чемпионата - максимум match_count по типам
+    прогнозов и моделям (каждый тип прогноза строится для всех матчей),
+    а по дням и чемпионатам оно суммируется.
+    """
+    rollup = statistics_rollups.c
+    query = select(
+        rollup.match_date,
+        rollup.championship_id,
+        rollup.sport_id,
+        func.sum(rollup.row_count).label('row_count'),
+        func.sum(rollup.correct_count).label('correct_count'),
+        func.sum(rollup.accuracy_count).label('accuracy_count'),
+        func.sum(rollup.accuracy_sum).label('accuracy_sum'),
+        func.max(rollup.match_count).label('match_count')
+    )
+    query = _filter_rollup(query, **filters)
+    return query.group_by(rollup.match_date, rollup.championship_id, rollup.sport_id).subquery()
+
+
+def get_rollup_by_type(
+    start_date: date,
+    end_date: date,
+    championship_id: Optional[int] = None,
+    sport_id: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Возвращает агрегаты по типам прогнозов за период из сводки.
+
+    Args:
+        start_date: Начальная дата
+        end_date: Конечная дата
+        championship_id: ID чемпионата (опционально)
+        sport_id: ID вида спорта (опционально)
+
+    Returns:
+        List[Dict[str, Any]]: forecast_type и суммы счетчиков, по убыванию row_count
+    """
+    rollup = statistics_rollups.c
+    counters = _counter_columns()
+    query = _filter_rollup(
+        select(rollup.forecast_type, *counters),
+        start_date, end_date, championship_id, sport_id
+    )
+    query = query.group_by(rollup.forecast_type).order_by(counters[0].desc())
+
+    with Session_pool() as session:
+        return [row._asdict() for row in session.execute(query).all()]
+
+
+def get_rollup_summary(
+    start_date: date,
+    end_date: date,
+    championship_id: Optional[int] = None,
+    sport_id: Optional[int] = None,
+    forecast_type: Optional[str] = None,
+    model_name: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Возвращает сводные агрегаты за период из сводки.
+
+    Args:
+        start_date: Начальная дата
+        end_date: Конечная дата
+        championship_id: ID чемпионата (опционально)
+        sport_id: ID вида спорта (опционально)
+        forecast_type: Тип прогноза (опционально)
+        model_name: Название модели (опционально)
+
+    Returns:
+        Dict[str, Any]: Суммы счетчиков, unique_matches, unique_championships, unique_sports
+    """
+    days = _championship_days(
+        start_date=start_date, end_date=end_date, championship_id=championship_id,
+        sport_id=sport_id, forecast_type=forecast_type, model_name=model_name
+    )
+    query = select(
+        func.sum(days.c.row_count).label('row_count'),
+        func.sum(days.c.correct_count).label('correct_count'),
+        func.sum(days.c.accuracy_count).label('accuracy_count'),
+        func.sum(days.c.accuracy_sum).label('accuracy_sum'),
+        func.sum(days.c.match_count).label('unique_matches'),
+        func.count(distinct(days.c.championship_id)).label('unique_championships'),
+        func.count(distinct(days.c.sport_id)).label('unique_sports')
+    )
+
+    with Session_pool() as session:
+        return session.execute(query).one()._asdict()
+
+
+def get_rollup_by_model(
+    start_date: date,
+    end_date: date,
+    championship_id: Optional[int] = None,
+    sport_id: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Возвращает агрегаты по моделям за период из сводки.
+
+    Args:
+        start_date: Начальная дата
+        end_date: Конечная дата
+        championship_id: ID чемпионата (опционально)
+        sport_id: ID вида спорта (опционально)
+
+    Returns:
+        List[Dict[str, Any]]: model_name, model_version, model_type и суммы
+        счетчиков, по убыванию row_count
+    """
+    rollup = statistics_rollups.c
+    counters = _counter_columns()
+    query = _filter_rollup(
+        select(rollup.model_name, rollup.model_version, rollup.model_type, *counters),
+        start_date, end_date, championship_id, sport_id
+    )
+    query = query.group_by(
+        rollup.model_name, rollup.model_version, rollup.model_type
+    ).order_by(counters[0].desc())
+
+    with Session_pool() as session:
+        return [row._asdict() for row in session.execute(query).all()]
+
+
+def get_rollup_by_date(
+    start_date: date,
+    end_date: date,
+    championship_id: Optional[int] = None,
+    sport_id: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Возвращает дневные агрегаты за период из сводки (по убыванию даты).
+
+    Args:
+        start_date: Начальная дата
+        end_date: Конечная дата
+        championship_id: ID чемпионата (опционально)
+        sport_id: ID вида спорта (опционально)
+
+    Returns:
+        List[Dict[str, Any]]: match_date, суммы счетчиков и unique_matches
+    """
+    days = _championship_days(
+        start_date=start_date, end_date=end_date,
+        championship_id=championship_id, sport_id=sport_id
+    )
+    query = select(
+        days.c.match_date,
+        func.sum(days.c.row_count).label('row_count'),
+        func.sum(days.c.correct_count).label('correct_count'),
+        func.sum(days.c.accuracy_count).label('accuracy_count'),
+        func.sum(days.c.accuracy_sum).label('accuracy_sum'),
+        func.sum(days.c.match_count).label('unique_matches')
+    ).group_by(days.c.match_date).order_by(days.c.match_date.desc())
+
+    with Session_pool() as session:
+        return [row._asdict() for row in session.execute(query).all()]
+
+
+def get_rollup_by_championship() -> List[Dict[str, Any]]:
+    """
+    Возвращает количество прогнозов по чемпионатам из сводки.
+
+    Returns:
+        List[Dict[str, Any]]: championship_id, championshipName, sportName,
+        row_count и correct_count, по убыванию row_count
+    """
+    rollup = statistics_rollups.c
+    totals = select(
+        rollup.championship_id,
+        rollup.sport_id,
+        func.sum(rollup.row_count).label('row_count'),
+        func.sum(rollup.correct_count).label('correct_count')
+    ).group_by(rollup.championship_id, rollup.sport_id).subquery()
+
+    query = select(
+        totals.c.championship_id,
+        ChampionShip.championshipName,
+        Sport.sportName,
+        totals.c.row_count,
+        totals.c.correct_count
+    ).outerjoin(
+        ChampionShip, totals.c.championship_id == ChampionShip.id
+    ).outerjoin(
+        Sport, totals.c.sport_id == Sport.id
+    ).order_by(totals.c.row_count.desc())
+
+    with Session_pool() as session:
+        return [row._asdict() for row in session.execute(query).all()]
+
+
+def get_rollup_by_sport() -> List[Dict[str, Any]]:
+    """
+    Возвращает количество прогнозов по видам спорта из сводки.
+
+    Returns:
+        List[Dict[str, Any]]: sport_id, sportName, row_count и correct_count,
+        по убыванию row_count
+    """
+    rollup = statistics_rollups.c
+    totals = select(
+        rollup.sport_id,
+        func.sum(rollup.row_count).label('row_count'),
+        func.sum(rollup.correct_count).label('correct_count')
+    ).group_by(rollup.sport_id).subquery()
+
+    query = select(
+        totals.c.sport_id,
+        Sport.sportName,
+        totals.c.row_count,
+        totals.c.correct_count
+    ).outerjoin(
+        Sport, totals.c.sport_id == Sport.id
+    ).order_by(totals.c.row_count.desc())
+
+    with Session_pool() as session:
+        return [row._asdict() for row in session.execute(query).all()]
@@ -9,6 +9,7 @@ from sqlalchemy import text
 
 from config import Session_pool, DBSession
 from db.models import Target
+from core.constants import TARGET_FIELDS
 
 
 logger = logging.getLogger(__name__)
@@ -81,3 +82,28 @@ def get_target_by_match_id(match_id: int) -> Optional[Target]:
     """
     with Session_pool() as session:
         return session.query(Target).filter_by(match_id=match_id).first()
+
+
+def get_targets_frame(
+        db_session: DBSession,
+        match_ids: list[int]
+) -> pd.DataFrame:
+    """
+    Получает targets для списка матчей одним запросом в виде DataFrame.
+
+    Args:
+        db_session: Сессия базы данных
+        match_ids: Список ID матчей
+
+    Returns:
+        pd.DataFrame: Колонки match_id и TARGET_FIELDS
+    """
+    columns = ['match_id', *TARGET_FIELDS]
+    if not match_ids:
+        return pd.DataFrame(columns=columns)
+    result = (
+        db_session.query(*[getattr(Target, column) for column in columns])
+        .filter(Target.match_id.in_(match_ids))
+        .all()
+    )
+    return pd.DataFrame([row._asdict() for row in result], columns=columns)
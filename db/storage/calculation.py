@@ -1,5 +1,6 @@
 import logging
 import time
+from sqlalchemy import insert, select, update
 from sqlalchemy.exc import OperationalError
 
 from db.queries.standing import (
@@ -8,13 +9,16 @@ from db.queries.standing import (
     get_model_columns,
     object_to_dict
 )
-from db.queries.feature import get_feature_match_id_prefix
 from db.models import Standing, Feature
+from db.storage.target_storage import TargetStorage
 from core.constants import DROP_FIELD_BLOWOUTS
 
 
 logger = logging.getLogger(__name__)
 
+# Размер блока матчей при пакетной записи features (4 записи на матч)
+FEATURE_BATCH_SIZE = 200
+
 
 def save_standing(self, tournament_id, standings):
     batch_size = 50
@@ -97,82 +101,101 @@ def save_standing(self, tournament_id, standings):
 
 
 def save_feature(self, tournament_id, features):
-    batch_size = 50
+    """
+    Сохраняет признаки турнира (FeatureMatrix) пакетным upsert без
+    ORM-объектов: на блок матчей один SELECT существующих записей,
+    один bulk UPDATE и один bulk INSERT.
+    """
     processed = 0
-    
+
     try:
         logger.info(
             f'Сохранение данных FEATURE по турниру: {tournament_id}'
         )
-        
-        # Отключаем autoflush для избежания блокировок
-        with self.db_session._session.no_autoflush:
-            for match_id in features:
-                for prefix in features[match_id]:
-
-                    feature_db = (
-                        self.db_session.query(Feature)
-                        .filter(
-                            Feature.match_id == int(match_id),
-                            Feature.prefix == prefix
-                        )
-                        .first()
-                    )
-                    
-                    if feature_db is None:
-                        feature_db = Feature()
-
-                    # ВАЖНО: Принудительно устанавливаем match_id и prefix из внешней области,
-                    # не даем им затираться при копировании полей ниже
-                    feature_db.match_id = int(match_id)
-                    feature_db.prefix = prefix
-
-                    # Копируем только бизнес-поля, исключая системные/идентификационные
-                    for k, v in features[match_id][prefix].__dict__.items():
-                        if k.startswith('_'):
-                            continue
-                        if k in ('id', 'match_id', 'prefix', 'created_at', 'updated_at'):
-                            continue
-                        setattr(feature_db, k, v)
-
-                    self.db_session.add_model(feature_db)
-                    processed += 1
-                    
-                    # Коммитим пакетами с retry
-                    if processed % batch_size == 0:
-                        for retry in range(3):
-                            try:
-                                self.db_session.commit()
-                                logger.debug(f'Сохранено {processed} features')
-                                time.sleep(0.01)
-                                break
-                            except OperationalError as e:
-                                if '1205' in str(e) and retry < 2:
-                                    wait = (retry + 1) * 0.3
-                                    logger.warning(f'Блокировка features, retry {retry + 1}/3')
-                                    self.db_session.rollback()
-                                    time.sleep(wait)
-                                else:
-                                    raise
-            
-            # Финальный коммит
-            if processed % batch_size != 0:
-                for retry in range(3):
-                    try:
-                        self.db_session.commit()
-                        logger.debug(f'Финальное сохранение: {processed} features')
-                        break
-                    except OperationalError as e:
-                        if '1205' in str(e) and retry < 2:
-                            wait = (retry + 1) * 0.3
-                            logger.warning(f'Блокировка при финальном коммите features, retry {retry + 1}/3')
-                            self.db_session.rollback()
-                            time.sleep(wait)
-                        else:
-                            raise
+
+        match_ids = features.match_ids
+        for start in range(0, len(match_ids), FEATURE_BATCH_SIZE):
+            chunk = match_ids[start:start + FEATURE_BATCH_SIZE]
+            records = features.records(chunk)
+
+            # После отката при блокировке блок записывается повторно
+            for retry in range(3):
+                try:
+                    _upsert_features(self.db_session, chunk, records)
+                    self.db_session.commit()
+                    break
+                except OperationalError as e:
+                    if '1205' in str(e) and retry < 2:
+                        wait = (retry + 1) * 0.3
+                        logger.warning(f'Блокировка features, retry {retry + 1}/3')
+                        self.db_session.rollback()
+                        time.sleep(wait)
+                    else:
+                        raise
+
+            processed += len(records)
+            logger.debug(f'Сохранено {processed} features')
 
     except Exception as e:
         logger.critical(
             f'Ошибка при сохранении данных в FEATURES: {e}'
         )
         self.db_session.rollback()
+
+
+def _upsert_features(db_session, match_ids, records):
+    existing = {
+        (match_id, prefix): feature_id
+        for match_id, prefix, feature_id in db_session.execute(
+            select(Feature.match_id, Feature.prefix, Feature.id)
+            .where(Feature.match_id.in_(match_ids))
+        ).all()
+    }
+
+    updates = []
+    inserts = []
+    for record in records:
+        feature_id = existing.get((record['match_id'], record['prefix']))
+        if feature_id is None:
+            inserts.append(record)
+        else:
+            updates.append({**record, 'id': feature_id})
+
+    if updates:
+        db_session.execute(update(Feature), updates)
+    if inserts:
+        db_session.execute(insert(Feature), inserts)
+
+
+def save_target(self, tournament_id, targets):
+    """
+    Сохраняет targets турнира одним bulk upsert в сессии турнира
+    (вместо отдельной транзакции на каждый матч).
+    """
+    try:
+        logger.info(
+            f'Сохранение данных TARGETS по турниру: {tournament_id}'
+        )
+        target_storage = TargetStorage()
+
+        # После отката при блокировке запись повторяется целиком
+        for retry in range(3):
+            try:
+                saved = target_storage.save_targets_batch(targets, db_session=self.db_session)
+                self.db_session.commit()
+                logger.debug(f'Сохранено {saved} targets')
+                break
+            except OperationalError as e:
+                if '1205' in str(e) and retry < 2:
+                    wait = (retry + 1) * 0.3
+                    logger.warning(f'Блокировка targets, retry {retry + 1}/3')
+                    self.db_session.rollback()
+                    time.sleep(wait)
+                else:
+                    raise
+
+    except Exception as e:
+        logger.critical(
+            f'Ошибка при сохранении данных в TARGETS: {e}'
+        )
+        self.db_session.rollback()
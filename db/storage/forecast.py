@@ -1,11 +1,10 @@
 import logging
 import os
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
 from db.queries.prediction import get_prediction_match_id
 from db.models import Prediction, Outcome
-from db.models.match import Match
-from core.constants import SIZE_TOTAL, SIZE_ITOTAL, SPR_SPORTS
+from core.thresholds import ThresholdResolver
 from core.logger_message import MEASSGE_LOG
 from config import Session_pool
 
@@ -139,19 +138,27 @@ def save_forecast(db_session, forecasts, match_id):
         )
 
 
-def save_conformal_outcome(db_session, result: Dict[str, Any]) -> bool:
+def save_conformal_outcome(
+    db_session,
+    result: Dict[str, Any],
+    thresholds: Optional[ThresholdResolver] = None
+) -> bool:
     """
     Сохраняет конформный прогноз в таблицу outcomes.
     
     Args:
         db_session: Сессия базы данных
         result: Результат конформного анализа
+        thresholds: Резолвер порогов тоталов (загруженный на чемпионат);
+            если не передан, пороги определяются по одному матчу
         
     Returns:
         bool: True если успешно, False если ошибка
     """
     try:
         match_id = result['match_id']
+        if thresholds is None:
+            thresholds = ThresholdResolver(db_session=db_session)
         
         # Маппинг типов прогнозов на числовые коды
         feature_mapping = {
@@ -188,7 +195,7 @@ def save_conformal_outcome(db_session, result: Dict[str, Any]) -> bool:
                     forecast_numeric = float(forecast_data.get('forecast')) if forecast_data.get('forecast') is not None else None
                     if forecast_numeric is not None:
                         # Вычисляем динамические пороги по виду спорта/лиге
-                        threshold_total, threshold_itotal = _get_dynamic_thresholds(db_session, match_id)
+                        threshold_total, threshold_itotal = thresholds.get(match_id)
                         if forecast_type == 'total_amount':
                             threshold = threshold_total
                             outcome_text = 'ТБ' if forecast_numeric >= threshold else 'ТМ'
@@ -244,20 +251,30 @@ def save_conformal_outcome(db_session, result: Dict[str, Any]) -> bool:
         return False
 
 
-def save_conformal_outcomes_batch(db_session, results: List[Dict[str, Any]]) -> int:
+def save_conformal_outcomes_batch(
+    db_session,
+    results: List[Dict[str, Any]],
+    thresholds: Optional[ThresholdResolver] = None
+) -> int:
     """
     Сохраняет несколько конформных прогнозов в таблицу outcomes.
     
     Args:
         db_session: Сессия базы данных
         results: Список результатов конформного анализа
+        thresholds: Резолвер порогов тоталов (по умолчанию строится
+            одним запросом по всем матчам пакета)
         
     Returns:
         int: Количество успешно сохраненных прогнозов
     """
+    if thresholds is None:
+        thresholds = ThresholdResolver.for_matches(
+            db_session, [result['match_id'] for result in results]
+        )
     successful = 0
     for result in results:
-        if save_conformal_outcome(db_session, result):
+        if save_conformal_outcome(db_session, result, thresholds):
             successful += 1
     
     logger.info(f'Сохранено конформных прогнозов: {successful} из {len(results)}')
@@ -296,25 +313,3 @@ def _calculate_prediction_bounds(forecast_data: Dict[str, Any]) -> tuple:
         logger.error(f'Ошибка при расчете границ интервала: {e}')
         return 0.0, 1.0
 
-
-def _get_dynamic_thresholds(db_session, match_id: int) -> tuple:
-    """
-    Возвращает пороги (total, itotal) для матча, используя настройки по виду спорта.
-    Если матч не найден или данные отсутствуют — возвращает дефолтные 2.5 и 1.5.
-    """
-    try:
-        match: Match = (
-            db_session.query(Match)
-            .filter(Match.id == match_id)
-            .one_or_none()
-        )
-        if not match or match.sport_id is None:
-            return 2.5, 1.5
-        sport_key = SPR_SPORTS.get(match.sport_id)
-        if not sport_key:
-            return 2.5, 1.5
-        total = SIZE_TOTAL.get(sport_key, 2.5)
-        itotal = SIZE_ITOTAL.get(sport_key, 1.5)
-        return total, itotal
-    except Exception:
-        return 2.5, 1.5
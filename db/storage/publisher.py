@@ -5,19 +5,28 @@
 
 import logging
 import os
+import threading
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, Optional, Union
 
 logger = logging.getLogger(__name__)
 
 
-def save_conformal_report(content: str, report_type: str, date: datetime, output_dir: str = "results") -> str:
+def save_conformal_report(
+    content: Union[str, Iterable[str]],
+    report_type: str,
+    date: datetime,
+    output_dir: str = "results"
+) -> str:
     """
     Сохраняет отчет конформных прогнозов в файл.
     
+    Отчет, переданный частями (например, RenderedReport), записывается
+    потоково во временный файл, который затем заменяет целевой.
+    
     Args:
-        content: Содержимое отчета
+        content: Содержимое отчета (строка или итерируемые части)
         report_type: Тип отчета ('forecasts', 'outcomes', 'quality', 'regular')
         date: Дата отчета
         output_dir: Базовая директория для сохранения
@@ -61,9 +70,21 @@ def save_conformal_report(content: str, report_type: str, date: datetime, output
         
         file_path = year_month_dir / filename
         
-        # Сохраняем файл
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        # Сохраняем файл (частично записанный отчет не заменяет прежний)
+        # Уникальное имя: один отчет могут одновременно писать несколько потоков
+        tmp_path = file_path.with_name(f'{file_path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                if isinstance(content, str):
+                    f.write(content)
+                else:
+                    for chunk in content:
+                        f.write(chunk)
+            os.replace(tmp_path, file_path)
+        except Exception:
+            if tmp_path.exists():
+                tmp_path.unlink()
+            raise
         
         logger.info(f"Отчет {report_type} сохранен: {file_path}")
         return str(file_path)
@@ -4,7 +4,9 @@
 
 import logging
 from datetime import datetime, date
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, List, Set
+import pandas as pd
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
@@ -14,12 +16,20 @@ from db.models.prediction import Prediction
 from db.models.match import Match
 from db.models.championship import ChampionShip
 from db.models.sport import Sport
+from db.queries.statistics import get_statistics_for_settlement
 from db.storage.forecast import save_conformal_outcome
+from db.storage.statistics_rollup import refresh_statistics_rollup_for_matches
+from core.constants import FORECAST_TYPE_TO_FEATURE, TARGET_FIELDS
+from core.prediction_validator import are_predictions_correct
+from core.thresholds import ThresholdResolver, get_sport_thresholds
 # from forecast.quality_selector import is_quality_outcome  # Циклический импорт
 from config import Session_pool, DBSession
 
 logger = logging.getLogger(__name__)
 
+# Размер блока bulk UPDATE при пакетном расчете результатов
+SETTLEMENT_CHUNK_SIZE = 5000
+
 
 def _is_quality_outcome(forecast_type: str, probability: Optional[float], confidence: Optional[float]) -> bool:
     """
@@ -79,20 +89,35 @@ def _map_feature_to_type_and_model(feature_code: int) -> tuple[str, str]:
         return forecast_type, 'unknown'
     return forecast_type, 'classification'
 
-def save_conformal_outcome_with_statistics(db_session: Session, result: Dict[str, Any]) -> bool:
+def save_conformal_outcome_with_statistics(
+    db_session: Session,
+    result: Dict[str, Any],
+    thresholds: Optional[ThresholdResolver] = None,
+    finished_match_ids: Optional[Set[int]] = None,
+    inserted_match_ids: Optional[Set[int]] = None
+) -> bool:
     """
     Расширенная версия save_conformal_outcome с автоматической интеграцией в statistics.
     
     Args:
         db_session: Сессия базы данных
         result: Результат конформного анализа
+        thresholds: Резолвер порогов тоталов, общий для чемпионата
+        finished_match_ids: Если передано, завершенный матч добавляется сюда,
+            а результаты рассчитываются вызывающим кодом одним
+            settle_match_results на чемпионат; иначе - сразу по матчу
+        inserted_match_ids: Если передано, матч с новыми записями statistics
+            добавляется сюда, а сводка пересчитывается вызывающим кодом;
+            иначе - сразу по матчу
         
     Returns:
         bool: True если успешно, False если ошибка
     """
     try:
         # 1. Сохраняем в outcomes (существующая логика)
-        success = save_conformal_outcome(db_session, result)
+        if thresholds is None:
+            thresholds = ThresholdResolver(db_session=db_session)
+        success = save_conformal_outcome(db_session, result, thresholds)
         
         if not success:
             logger.error("Ошибка сохранения в outcomes")
@@ -114,6 +139,8 @@ def save_conformal_outcome_with_statistics(db_session: Session, result: Dict[str
             return True  # outcomes сохранены, но statistics не созданы
         
         # Интегрируем каждый outcome по правилу качества
+        inserted: Set[int] = inserted_match_ids if inserted_match_ids is not None else set()
+        inserted_types: Set[str] = set()
         for outcome in latest_outcomes:
             try:
                 # Пропускаем низкокачественные исходы
@@ -121,7 +148,8 @@ def save_conformal_outcome_with_statistics(db_session: Session, result: Dict[str
                 if not _is_quality_outcome(forecast_type, outcome.probability, outcome.confidence):
                     continue
 
-                integrate_outcome_to_statistics(db_session, outcome)
+                integrate_outcome_to_statistics(db_session, outcome, thresholds, inserted)
+                inserted_types.add(forecast_type)
             except Exception as e:
                 logger.error(f"Ошибка интеграции outcome {outcome.id}: {e}")
                 continue
@@ -129,14 +157,23 @@ def save_conformal_outcome_with_statistics(db_session: Session, result: Dict[str
         # logger.info(f"Успешно интегрированы {len([o for o in latest_outcomes if _is_quality_outcome(_map_feature_to_type(o.feature), o.probability, o.confidence)])} outcomes в statistics")
         
         # 3. Обновляем результаты матча в statistics (если матч завершен)
+        settled = False
         try:
             match = db_session.query(Match).filter(Match.id == match_id).first()
             if match and match.numOfHeadsHome is not None and match.numOfHeadsAway is not None:
                 # logger.info(f"Обновляем результаты матча {match_id}: {match.numOfHeadsHome}:{match.numOfHeadsAway}")
-                update_match_results(match_id, match.numOfHeadsHome, match.numOfHeadsAway)
+                if finished_match_ids is not None:
+                    finished_match_ids.add(match_id)
+                else:
+                    settled = update_match_results(match_id, match.numOfHeadsHome, match.numOfHeadsAway)
         except Exception as e:
             logger.warning(f"Не удалось обновить результаты матча {match_id}: {e}")
         
+        # 4. Новые (еще не рассчитанные) записи сразу попадают в сводку;
+        # при расчете результатов сводка уже пересчитана settle_match_results
+        if inserted_match_ids is None and match_id in inserted and not settled:
+            refresh_statistics_rollup_for_matches([match_id], inserted_types)
+        
         return True
         
     except Exception as e:
@@ -144,13 +181,22 @@ def save_conformal_outcome_with_statistics(db_session: Session, result: Dict[str
         return False
 
 
-def integrate_outcome_to_statistics(db_session: Session, outcome: Outcome) -> bool:
+def integrate_outcome_to_statistics(
+    db_session: Session,
+    outcome: Outcome,
+    thresholds: Optional[ThresholdResolver] = None,
+    inserted_match_ids: Optional[Set[int]] = None
+) -> bool:
     """
     Интегрирует один outcome в statistics.
     
     Args:
         db_session: Сессия базы данных
         outcome: Запись из таблицы outcomes
+        thresholds: Резолвер порогов тоталов (если не передан, пороги
+            определяются по виду спорта чемпионата)
+        inserted_match_ids: Если передано, матч добавляется сюда, а сводка
+            statistics_rollups пересчитывается вызывающим кодом; иначе - сразу
         
     Returns:
         bool: True если успешно, False если ошибка
@@ -174,11 +220,6 @@ def integrate_outcome_to_statistics(db_session: Session, outcome: Outcome) -> bo
             logger.error(f"Championship {match.tournament_id} не найден")
             return False
         
-        sport = db_session.query(Sport).filter(Sport.id == championship.sport_id).first()
-        if not sport:
-            logger.error(f"Sport {championship.sport_id} не найден")
-            return False
-        
         # Определяем тип прогноза
         forecast_type, model_type = _map_feature_to_type_and_model(outcome.feature)
         
@@ -186,15 +227,21 @@ def integrate_outcome_to_statistics(db_session: Session, outcome: Outcome) -> bo
         if model_type == 'regression' and outcome.outcome:
             try:
                 forecast_value = float(outcome.outcome)
-                # Определяем пороговое значение в зависимости от типа спорта
+                # Пороговое значение по виду спорта/чемпионату
+                if thresholds is not None and match.id in thresholds:
+                    threshold_total, threshold_itotal = thresholds.get(match.id)
+                else:
+                    threshold_total, threshold_itotal = get_sport_thresholds(
+                        championship.sport_id, match.tournament_id
+                    )
                 if forecast_type == 'total_amount':
-                    threshold = 2.5 if sport.name == 'Soccer' else 4.5
+                    threshold = threshold_total
                     forecast_subtype = 'тб' if forecast_value > threshold else 'тм'
                 elif forecast_type == 'total_home_amount':
-                    threshold = 1.5 if sport.name == 'Soccer' else 2.5
+                    threshold = threshold_itotal
                     forecast_subtype = 'ит1б' if forecast_value > threshold else 'ит1м'
                 elif forecast_type == 'total_away_amount':
-                    threshold = 1.5 if sport.name == 'Soccer' else 2.5
+                    threshold = threshold_itotal
                     forecast_subtype = 'ит2б' if forecast_value > threshold else 'ит2м'
                 else:
                     forecast_subtype = outcome.outcome or 'unknown'
@@ -252,6 +299,11 @@ def integrate_outcome_to_statistics(db_session: Session, outcome: Outcome) -> bo
         db_session.add(statistic)
         db_session.commit()
         
+        if inserted_match_ids is not None:
+            inserted_match_ids.add(outcome.match_id)
+        else:
+            refresh_statistics_rollup_for_matches([outcome.match_id], [forecast_type])
+        
         return True
         
     except Exception as e:
@@ -339,6 +391,9 @@ def integrate_prediction_to_statistics(db_session: Session, prediction_id: int)
         db_session.add(statistic)
         db_session.commit()
         
+        # Новая запись сразу попадает в сводку statistics_rollups
+        refresh_statistics_rollup_for_matches([prediction.match_id], [forecast_type])
+        
         return True
         
     except Exception as e:
@@ -380,74 +435,108 @@ def update_match_results(match_id: int, goal_home: int, goal_away: int) -> bool:
     Returns:
         bool: True если успешно, False если ошибка
     """
+    # Счет берется из matchs в settle_match_results; аргументы сохранены
+    # для совместимости вызовов
+    return settle_match_results(match_ids=[match_id]) is not None
+
+
+def settle_match_results(
+    match_ids: Optional[Iterable[int]] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    chunk_size: int = SETTLEMENT_CHUNK_SIZE
+) -> Optional[int]:
+    """
+    Пакетно рассчитывает результаты прогнозов завершенных матчей.
+
+    Записи statistics соединяются с matchs и targets одним запросом,
+    правильность вычисляется векторно по (forecast_type, forecast_subtype),
+    результаты записываются одним bulk UPDATE на каждый блок chunk_size.
+
+    Args:
+        match_ids: ID завершенных матчей (опционально)
+        start_date: Начальная дата матчей (опционально)
+        end_date: Конечная дата матчей (опционально)
+        chunk_size: Размер блока записи
+
+    Returns:
+        Optional[int]: Количество обновленных записей или None при ошибке
+    """
+    if match_ids is not None:
+        match_ids = list(set(match_ids))
+        if not match_ids:
+            return 0
+    elif start_date is None and end_date is None:
+        logger.error('Для расчета результатов нужны match_ids или диапазон дат')
+        return None
+
     try:
         with Session_pool() as db_session:
-            # Определяем результат матча
-            if goal_home > goal_away:
-                actual_result = 'home_win'
-            elif goal_home < goal_away:
-                actual_result = 'away_win'
-            else:
-                actual_result = 'draw'
-            
-            actual_value = float(goal_home + goal_away)
-            
-            # Обновляем все записи статистики для этого матча через ORM
-            statistics = db_session.query(Statistic).filter(Statistic.match_id == match_id).all()
-            
-            for statistic in statistics:
-                statistic.actual_value = actual_value
-
-                # Пересчитываем качество прогнозов используя prediction_validator
-                if statistic.outcome_id:
-                    outcome = db_session.query(Outcome).filter(Outcome.id == statistic.outcome_id).first()
-                    if outcome:
-                        from core.prediction_validator import is_prediction_correct_from_target
-                        from db.queries.target import get_target_by_match_id
-                        
-                        # Маппинг forecast_type -> feature
-                        forecast_type_to_feature = {
-                            'win_draw_loss': 1,
-                            'oz': 2,
-                            'goal_home': 3,
-                            'goal_away': 4,
-                            'total': 5,
-                            'total_home': 6,
-                            'total_away': 7,
-                            'total_amount': 8,
-                            'total_home_amount': 9,
-                            'total_away_amount': 10
-                        }
-                        
-                        feature = forecast_type_to_feature.get(statistic.forecast_type)
-                        if feature:
-                            # Получаем target из текущей сессии
-                            from db.models.target import Target
-                            target = db_session.query(Target).filter_by(match_id=match_id).first()
-                            if target:
-                                # Используем forecast_subtype вместо outcome.outcome
-                                # т.к. для регрессионных моделей он уже преобразован в категорию
-                                is_success = is_prediction_correct_from_target(feature, statistic.forecast_subtype, target)
-                            else:
-                                logger.warning(f"Target не найден для матча {match_id}")
-                                is_success = False
-                        else:
-                            logger.warning(f"Неизвестный forecast_type: {statistic.forecast_type}")
-                            is_success = False
-                        
-                        statistic.prediction_correct = is_success
-                        statistic.actual_result = is_success  # boolean: True/False
-                        statistic.prediction_accuracy = 1.0 if is_success else 0.0
-                    else:
-                        logger.warning(f"Outcome не найден для outcome_id={statistic.outcome_id}")
-                else:
-                    logger.warning(f"У statistic id={statistic.id} нет outcome_id")
-            
+            frame = get_statistics_for_settlement(
+                db_session,
+                match_ids=match_ids,
+                start_date=start_date,
+                end_date=end_date
+            )
+            if frame.empty:
+                return 0
+
+            updates = _build_settlement_updates(frame)
+            for start in range(0, len(updates), chunk_size):
+                db_session.execute(
+                    update(Statistic),
+                    updates[start:start + chunk_size]
+                )
             db_session.commit()
-            
-            # logger.info(f"Обновлена статистика для матча {match_id}: {actual_result} ({goal_home}:{goal_away})")
-            return True
-            
+            settled_match_ids = frame['match_id'].unique().tolist()
+            settled_forecast_types = frame['forecast_type'].dropna().unique().tolist()
+
     except Exception as e:
-        logger.error(f"Ошибка обновления результатов матча {match_id}: {e}")
-        return False
\ No newline at end of file
+        logger.error(f'Ошибка пакетного расчета результатов матчей: {e}')
+        return None
+
+    logger.debug(f'Обновлено {len(updates)} записей statistics')
+
+    # Инкрементальный пересчет сводки только по затронутым матчам и
+    # инвалидация кеша затронутых типов; ошибка не отменяет расчет результатов
+    refresh_statistics_rollup_for_matches(settled_match_ids, settled_forecast_types)
+    return len(updates)
+
+
+def _build_settlement_updates(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Формирует параметры bulk UPDATE по кадру get_statistics_for_settlement."""
+    actual_value = (
+        frame['numOfHeadsHome'].astype(float)
+        + frame['numOfHeadsAway'].astype(float)
+    )
+
+    features = frame['forecast_type'].map(FORECAST_TYPE_TO_FEATURE)
+    unknown_types = frame.loc[
+        features.isna() & frame['outcome_id'].notna(), 'forecast_type'
+    ].unique()
+    for forecast_type in unknown_types:
+        logger.warning(f"Неизвестный forecast_type: {forecast_type}")
+
+    missing_targets = frame.loc[frame['target_match_id'].isna(), 'match_id'].unique()
+    for match_id in missing_targets:
+        logger.warning(f"Target не найден для матча {match_id}")
+
+    is_success = are_predictions_correct(
+        features.fillna(-1).astype(int),
+        frame['forecast_subtype'],
+        frame[TARGET_FIELDS]
+    )
+    has_outcome = frame['outcome_id'].notna().to_numpy()
+
+    updates = []
+    for statistic_id, value, success, settled in zip(
+        frame['id'].to_numpy(), actual_value.to_numpy(),
+        is_success, has_outcome
+    ):
+        row = {'id': int(statistic_id), 'actual_value': float(value)}
+        if settled:
+            row['prediction_correct'] = bool(success)
+            row['actual_result'] = bool(success)
+            row['prediction_accuracy'] = 1.0 if success else 0.0
+        updates.append(row)
+    return updates
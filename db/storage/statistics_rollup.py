@@ -0,0 +1,125 @@
+# izhbet/db/storage/statistics_rollup.py
+"""
+Пересчет материализованной сводки statistics_rollups.
+
+Сводка пересчитывается целиком (rebuild) или инкрементально - только для
+пар (championship_id, match_date), затронутых новыми записями statistics
+или новыми результатами матчей.
+"""
+
+import logging
+from collections import defaultdict
+from typing import Iterable, Optional
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from config import Session_pool
+from db.models.statistics import Statistic
+from db.queries.statistics_rollup import statistics_rollups, build_rollup_select
+
+logger = logging.getLogger(__name__)
+
+# Колонки INSERT ... SELECT (в порядке build_rollup_select)
+_ROLLUP_INSERT_COLUMNS = [
+    'forecast_type', 'forecast_subtype', 'championship_id', 'sport_id', 'match_date',
+    'model_name', 'model_version', 'model_type',
+    'row_count', 'match_count', 'total_count', 'correct_count',
+    'accuracy_count', 'accuracy_sum', 'accuracy_min', 'accuracy_max',
+    'error_count', 'error_sum', 'residual_count', 'residual_sum', 'updated_at'
+]
+
+
+def _insert_rollup(db_session: Session, *filters) -> int:
+    """Вставляет агрегаты statistics по условиям filters одним INSERT ... SELECT."""
+    result = db_session.execute(
+        insert(statistics_rollups).from_select(
+            _ROLLUP_INSERT_COLUMNS, build_rollup_select(*filters)
+        )
+    )
+    return result.rowcount or 0
+
+
+def refresh_statistics_rollup(
+    db_session: Session,
+    match_ids: Optional[Iterable[int]] = None
+) -> int:
+    """
+    Пересчитывает сводку в рамках переданной сессии (без commit).
+
+    Args:
+        db_session: Сессия базы данных
+        match_ids: Матчи с новыми записями или результатами; None - полный пересчет
+
+    Returns:
+        int: Количество записанных строк сводки
+    """
+    if match_ids is None:
+        db_session.execute(delete(statistics_rollups))
+        return _insert_rollup(db_session)
+
+    match_ids = list(set(match_ids))
+    if not match_ids:
+        return 0
+
+    # Пары (чемпионат, дата), затронутые матчами
+    pairs = db_session.execute(
+        select(Statistic.championship_id, Statistic.match_date).where(
+            Statistic.match_id.in_(match_ids)
+        ).distinct()
+    ).all()
+
+    championships_by_date = defaultdict(set)
+    for championship_id, match_date in pairs:
+        championships_by_date[match_date].add(championship_id)
+
+    written = 0
+    for match_date, championship_ids in championships_by_date.items():
+        db_session.execute(
+            delete(statistics_rollups).where(
+                statistics_rollups.c.match_date == match_date,
+                statistics_rollups.c.championship_id.in_(championship_ids)
+            )
+        )
+        written += _insert_rollup(
+            db_session,
+            Statistic.match_date == match_date,
+            Statistic.championship_id.in_(championship_ids)
+        )
+    return written
+
+
+def refresh_statistics_rollup_for_matches(
+    match_ids: Optional[Iterable[int]] = None,
+    forecast_types: Optional[Iterable[str]] = None
+) -> Optional[int]:
+    """
+    Пересчитывает сводку в отдельной транзакции и сбрасывает кэш метрик.
+
+    Args:
+        match_ids: Матчи с новыми записями или результатами; None - полный пересчет
+        forecast_types: Затронутые типы прогнозов; None - сбрасывается весь кэш
+
+    Returns:
+        Optional[int]: Количество записанных строк сводки или None при ошибке
+    """
+    try:
+        with Session_pool() as db_session:
+            written = refresh_statistics_rollup(db_session, match_ids)
+            db_session.commit()
+    except Exception as e:
+        logger.error(f'Ошибка пересчета сводки statistics_rollups: {e}')
+        return None
+
+    from db.queries.statistics_cache import clear_statistics_cache, invalidate_forecast_types
+    from db.queries.statistics_rollup import is_rollup_available
+
+    if forecast_types is None:
+        clear_statistics_cache()
+    else:
+        invalidate_forecast_types(forecast_types)
+    is_rollup_available(force=True)
+
+    scope = 'полный' if match_ids is None else 'инкрементальный'
+    logger.info(f'Сводка statistics_rollups обновлена ({scope}): {written} строк')
+    return written
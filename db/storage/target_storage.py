@@ -4,6 +4,7 @@
 
 import logging
 from typing import Dict, Any, Optional, List
+from sqlalchemy import insert, select, update
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
@@ -12,6 +13,9 @@ from config import Session_pool
 
 logger = logging.getLogger(__name__)
 
+# Размер блока match_id в пакетной записи targets
+TARGET_BATCH_SIZE = 500
+
 
 class TargetStorage:
     """Класс для работы с целевыми переменными в БД."""
@@ -76,52 +80,70 @@ class TargetStorage:
                 pass
             return None
 
-    def save_targets_batch(self, targets_data: List[Dict[str, Any]]) -> int:
+    def save_targets_batch(
+        self,
+        targets_data: List[Dict[str, Any]],
+        db_session: Optional[Any] = None
+    ) -> int:
         """
-        Сохраняет множество целевых переменных пакетом.
+        Сохраняет множество целевых переменных пакетом (bulk upsert).
+        
+        Существующие записи находятся одним SELECT по блоку match_id,
+        затем выполняются один bulk UPDATE и один bulk INSERT на блок.
+        Повторы match_id в пакете схлопываются (остается последний).
         
         Args:
             targets_data: Список словарей с данными целевых переменных
+            db_session: Сессия вызывающего кода (Session или DBSession);
+                запись идет в ее транзакции, коммит выполняет вызывающий код.
+                Без сессии используется Session_pool с коммитом.
             
         Returns:
-            int: Количество успешно сохраненных записей
+            int: Количество сохраненных записей
         """
-        saved_count = 0
-        
+        targets = list({
+            target_data['match_id']: target_data for target_data in targets_data
+        }.values())
+        if not targets:
+            return 0
+
+        if db_session is not None:
+            return self._upsert_targets(db_session, targets)
+
         try:
-            with Session_pool() as db_session:
-                for target_data in targets_data:
-                    try:
-                        # Проверяем существование записи
-                        existing_target = db_session.query(Target).filter(
-                            Target.match_id == target_data['match_id']
-                        ).first()
-                        
-                        if existing_target:
-                            # Обновляем
-                            for key, value in target_data.items():
-                                if hasattr(existing_target, key):
-                                    setattr(existing_target, key, value)
-                        else:
-                            # Создаем новую
-                            target = Target(**target_data)
-                            db_session.add(target)
-                        
-                        saved_count += 1
-                        
-                    except Exception as e:
-                        logger.warning(f"Ошибка при сохранении целевой переменной для матча {target_data.get('match_id', 'unknown')}: {e}")
-                        continue
-                
-                db_session.commit()
-                logger.info(f"Сохранено {saved_count} целевых переменных из {len(targets_data)}")
-                
+            with Session_pool() as session:
+                saved_count = self._upsert_targets(session, targets)
+                session.commit()
         except Exception as e:
             logger.error(f"Ошибка при пакетном сохранении целевых переменных: {e}")
-            db_session.rollback()
-            
+            return 0
+
+        logger.info(f"Сохранено {saved_count} целевых переменных")
         return saved_count
 
+    @staticmethod
+    def _upsert_targets(db_session: Any, targets: List[Dict[str, Any]]) -> int:
+        for start in range(0, len(targets), TARGET_BATCH_SIZE):
+            chunk = targets[start:start + TARGET_BATCH_SIZE]
+            existing = dict(db_session.execute(
+                select(Target.match_id, Target.id).where(
+                    Target.match_id.in_([target['match_id'] for target in chunk])
+                )
+            ).all())
+
+            updates = [
+                {**target, 'id': existing[target['match_id']]}
+                for target in chunk if target['match_id'] in existing
+            ]
+            inserts = [target for target in chunk if target['match_id'] not in existing]
+            if updates:
+                db_session.execute(update(Target), updates)
+            if inserts:
+                db_session.execute(insert(Target), inserts)
+
+        logger.debug(f"Пакетная запись {len(targets)} целевых переменных")
+        return len(targets)
+
     def get_target_by_match_id(self, match_id: int) -> Optional[Target]:
         """
         Получает целевую переменную по ID матча.
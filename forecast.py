@@ -4,6 +4,7 @@ from datetime import datetime, timedelta
 
 from forecast.conformal_processor import ConformalProcessor
 from core.constants import FORECAST
+from core import telemetry
 
 
 logger = logging.getLogger(__name__)
@@ -62,7 +63,11 @@ def main() -> int:
 
     try:
         if args.command == 'all_time':
-            return run_all_time()
+            with telemetry.run('forecast', mode='ALL_TIME') as span:
+                code = run_all_time()
+                if code:
+                    span.status = 'error'
+            return code
     except Exception as exc:
         logger.exception("Ошибка выполнения команды: %s", exc)
         return 1
@@ -2,7 +2,7 @@
 Интегрированный конформный предиктор для обработки прогнозов.
 """
 import logging
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Set
 import pandas as pd
 from multiprocessing import cpu_count
 from concurrent.futures import ThreadPoolExecutor
@@ -15,7 +15,9 @@ from db.queries.forecast import (
     get_training_targets
 )
 from db.storage.forecast import save_conformal_outcome
-from db.storage.statistic import save_conformal_outcome_with_statistics
+from db.storage.statistic import save_conformal_outcome_with_statistics, settle_match_results
+from db.storage.statistics_rollup import refresh_statistics_rollup_for_matches
+from core.thresholds import ThresholdResolver
 from config import Session_pool
 
 logger = logging.getLogger(__name__)
@@ -45,10 +47,17 @@ def process_tournament_conformal(tournament_id: int, conformal_predictor: Neural
             
             # Создаем анализатор
             analyzer = NeuralConformalAnalyzer(db_session, conformal_predictor)
+
+            # Пороги тоталов для всех матчей чемпионата одним запросом
+            thresholds = ThresholdResolver.for_tournament(db_session, tournament_id)
             
             # Обрабатываем каждый прогноз
             successful_predictions = 0
             failed_predictions = 0
+            # Завершенные матчи: результаты и сводка пересчитываются один раз на чемпионат
+            finished_match_ids: Set[int] = set()
+            # Матчи с новыми записями statistics: сводка пересчитывается один раз на чемпионат
+            inserted_match_ids: Set[int] = set()
             
             for idx, prediction_dict in enumerate(predictions):
                 try:
@@ -57,7 +66,9 @@ def process_tournament_conformal(tournament_id: int, conformal_predictor: Neural
                     
                     if 'error' not in result:
                         # Сохраняем результат в таблицу outcomes и интегрируем в statistics
-                        if save_conformal_outcome_with_statistics(db_session, result):
+                        if save_conformal_outcome_with_statistics(
+                            db_session, result, thresholds, finished_match_ids, inserted_match_ids
+                        ):
                             successful_predictions += 1
                         else:
                             failed_predictions += 1
@@ -68,6 +79,18 @@ def process_tournament_conformal(tournament_id: int, conformal_predictor: Neural
                     failed_predictions += 1
                     logger.error(f'Ошибка при обработке прогноза {idx + 1}: {e}')
                     continue
+
+            settled = None
+            if finished_match_ids:
+                settled = settle_match_results(match_ids=finished_match_ids)
+                if settled is None:
+                    logger.warning(f'Не удалось обновить результаты матчей чемпионата {tournament_id}')
+
+            # Сводка по завершенным матчам пересчитана при расчете результатов,
+            # остальные новые записи (ожидающие результата) добавляются в нее здесь
+            pending_match_ids = inserted_match_ids - finished_match_ids if settled is not None else inserted_match_ids
+            if pending_match_ids:
+                refresh_statistics_rollup_for_matches(pending_match_ids)
             
             result_msg = f'Чемпионат {tournament_id}: успешно {successful_predictions}, ошибок {failed_predictions}'
             logger.info(result_msg)
@@ -7,12 +7,14 @@
 import warnings
 import logging
 import pandas as pd
-from typing import List, Dict, Optional
+import hashlib
+import numpy as np
+from typing import List, Dict, Optional, Iterable
 from datetime import datetime, timedelta
 from pathlib import Path
 
-from .forecast import ForecastFormatter
-from core.constants import today, yesterday
+from .forecast import ForecastFormatter, are_forecasts_correct
+from core.constants import today, yesterday, TARGET_FIELDS
 from config import Session_pool
 from sqlalchemy import text
 
@@ -23,6 +25,62 @@ warnings.filterwarnings(
 
 logger = logging.getLogger(__name__)
 
+# Категории типов прогнозов для бонуса за разнообразие (порядок = коды категорий)
+FORECAST_CATEGORIES = ['outcome', 'both_score', 'goals', 'totals', 'other']
+
+# Весовые коэффициенты рейтинга прогноза
+RATING_WEIGHTS = {
+    'probability': 0.4,    # 40% - вероятность прогноза
+    'confidence': 0.3,     # 30% - уверенность в прогнозе
+    'uncertainty': 0.2,    # 20% - низкая неопределенность
+    'diversity': 0.1       # 10% - разнообразие типов прогнозов
+}
+
+# Поля прогноза, попадающие в словарь forecasts сгруппированного матча
+GROUPED_FORECAST_FIELDS = [
+    'forecast', 'outcome', 'probability', 'confidence',
+    'uncertainty', 'lower_bound', 'upper_bound', 'is_correct'
+]
+
+# Поля матча, которые берутся из первой строки группы
+GROUPED_MATCH_FIELDS = [
+    'gameData', 'tournament_id', 'teamHome_id', 'teamAway_id',
+    'teamHome_name', 'teamAway_name', 'championshipName', 'sportName',
+    'numOfHeadsHome', 'numOfHeadsAway', 'typeOutcome', 'gameComment'
+]
+
+
+def get_forecast_category(forecast_type: str) -> str:
+    """Определяет категорию прогноза (исходы, обе забьют, голы, тоталы)."""
+    if not isinstance(forecast_type, str):
+        return 'other'
+    if 'win_draw_loss' in forecast_type:
+        return 'outcome'
+    elif 'oz' in forecast_type:
+        return 'both_score'
+    elif 'goal' in forecast_type:
+        return 'goals'
+    elif 'total' in forecast_type:
+        return 'totals'
+    return 'other'
+
+
+def forecast_category_codes(forecast_types: pd.Series) -> pd.Categorical:
+    """
+    Векторно кодирует типы прогнозов в категории FORECAST_CATEGORIES.
+
+    Категория вычисляется только для уникальных типов (их не больше десятка),
+    после чего разносится по строкам через коды factorize.
+    """
+    type_codes, unique_types = pd.factorize(forecast_types)
+    unique_codes = np.array(
+        [FORECAST_CATEGORIES.index(get_forecast_category(t)) for t in unique_types] +
+        [FORECAST_CATEGORIES.index('other')],
+        dtype=np.int8
+    )
+    # Код -1 (NaN) попадает на последний элемент - категорию 'other'
+    return pd.Categorical.from_codes(unique_codes[type_codes], FORECAST_CATEGORIES)
+
 
 class ConformalForecastGenerator:
     """
@@ -34,8 +92,12 @@ class ConformalForecastGenerator:
     - Уверенность в прогнозах
     """
     
-    def __init__(self):
+    def __init__(self, publishers: Optional[List] = None,
+                 cache_dir: Optional[str] = 'results/cache/outcomes'):
         self.formatter = ForecastFormatter()
+        self.publishers = publishers or []
+        # Каталог Parquet-кэша сезонного режима (None - без кэша)
+        self.cache_dir = cache_dir
         
         # Маппинг типов прогнозов
         self.feature_mapping = {
@@ -123,43 +185,33 @@ class ConformalForecastGenerator:
         if df.empty:
             return df
         
-        # Группируем по match_id и создаем сводку прогнозов
-        grouped = []
-        
-        for match_id, group in df.groupby('match_id'):
-            match_info = {
-                'match_id': match_id,
-                'gameData': group['gameData'].iloc[0],
-                'tournament_id': group['tournament_id'].iloc[0],
-                'teamHome_id': group['teamHome_id'].iloc[0],
-                'teamAway_id': group['teamAway_id'].iloc[0],
-                'teamHome_name': group['teamHome_name'].iloc[0],
-                'teamAway_name': group['teamAway_name'].iloc[0],
-                'championshipName': group['championshipName'].iloc[0],
-                'sportName': group['sportName'].iloc[0],
-                'numOfHeadsHome': group['numOfHeadsHome'].iloc[0],
-                'numOfHeadsAway': group['numOfHeadsAway'].iloc[0],
-                'typeOutcome': group['typeOutcome'].iloc[0],
-                'gameComment': group['gameComment'].iloc[0],
-                'forecasts': {}
+        # Правильность прогнозов считается векторно по колонкам target_* кадра
+        if 'is_correct' not in df.columns and all(c in df.columns for c in TARGET_FIELDS):
+            df = df.assign(is_correct=are_forecasts_correct(df, df[TARGET_FIELDS]))
+        
+        # Сортировка стабильна: порядок прогнозов внутри матча сохраняется
+        df = df.sort_values('match_id', kind='stable')
+        
+        # Информация о матче - первая строка каждой группы
+        match_columns = [c for c in GROUPED_MATCH_FIELDS if c in df.columns]
+        grouped = df.drop_duplicates('match_id')[['match_id'] + match_columns].reset_index(drop=True)
+        
+        # Словари прогнозов собираются одним проходом по массивам колонок
+        forecast_values = {
+            field: (df[field].to_numpy(dtype=object) if field in df.columns
+                    else np.full(len(df), None, dtype=object))
+            for field in GROUPED_FORECAST_FIELDS
+        }
+        forecasts_by_match: Dict[int, Dict[str, dict]] = {}
+        for i, (match_id, forecast_type) in enumerate(
+            zip(df['match_id'].to_numpy(), df['forecast_type'].to_numpy())
+        ):
+            forecasts_by_match.setdefault(match_id, {})[forecast_type] = {
+                field: values[i] for field, values in forecast_values.items()
             }
-            
-            # Добавляем прогнозы по типам
-            for _, row in group.iterrows():
-                forecast_type = row['forecast_type']
-                match_info['forecasts'][forecast_type] = {
-                    'forecast': row['forecast'],
-                    'outcome': row['outcome'],
-                    'probability': row['probability'],
-                    'confidence': row['confidence'],
-                    'uncertainty': row.get('uncertainty'),
-                    'lower_bound': row.get('lower_bound'),
-                    'upper_bound': row.get('upper_bound')
-                }
-            
-            grouped.append(match_info)
-        
-        return pd.DataFrame(grouped)
+        
+        grouped['forecasts'] = [forecasts_by_match[match_id] for match_id in grouped['match_id']]
+        return grouped
     
     def generate_quality_outcomes_report(self, date: datetime) -> str:
         """
@@ -229,7 +281,7 @@ class ConformalForecastGenerator:
             f'{"="*60}\n'
         ]
         
-        for _, match in df.iterrows():
+        for match in df.to_dict('records'):
             # Основная информация о матче
             match_info = (
                 f"\n🏆 {match['sportName']} - {match['championshipName']}\n"
@@ -319,7 +371,7 @@ class ConformalForecastGenerator:
             f'{"="*60}\n'
         ]
         
-        for _, match in df.iterrows():
+        for match in df.to_dict('records'):
             # Основная информация о матче
             match_info = [
                 f"\n🏆 {match['sportName']} - {match['championshipName']}",
@@ -345,25 +397,21 @@ class ConformalForecastGenerator:
             for forecast_type, forecast_data in match['forecasts'].items():
                 total_forecasts += 1
                 
-                # Добавляем forecast_type в forecast_data для правильной проверки
-                forecast_data_with_type = forecast_data.copy()
-                forecast_data_with_type['forecast_type'] = forecast_type
+                # Определяем, был ли прогноз правильным
+                is_correct = self._forecast_is_correct(forecast_type, forecast_data, match)
+                if is_correct:
+                    correct_forecasts += 1
                 
-            # Определяем, был ли прогноз правильным
-            is_correct = self.formatter.is_forecast_correct(forecast_data_with_type, match)
-            if is_correct:
-                correct_forecasts += 1
-            
-            outcome = self.formatter.format_outcome(forecast_data['outcome'], forecast_type)
-            confidence = f"{forecast_data['confidence']:.1%}"
-            probability = f"{forecast_data['probability']:.1%}"
-            
-            status_emoji = "✅" if is_correct else "❌"
-            
-            forecasts_info.append(
-                f"  {status_emoji} {forecast_type.upper()}: {outcome} | "
-                f"Уверенность: {confidence} | Вероятность: {probability}"
-            )
+                outcome = self.formatter.format_outcome(forecast_data['outcome'], forecast_type)
+                confidence = f"{forecast_data['confidence']:.1%}"
+                probability = f"{forecast_data['probability']:.1%}"
+                
+                status_emoji = "✅" if is_correct else "❌"
+                
+                forecasts_info.append(
+                    f"  {status_emoji} {forecast_type.upper()}: {outcome} | "
+                    f"Уверенность: {confidence} | Вероятность: {probability}"
+                )
             
             if forecasts_info:
                 match_info.extend(forecasts_info)
@@ -397,16 +445,37 @@ class ConformalForecastGenerator:
         # Вычисляем рейтинг для каждого прогноза
         forecasts_df = self._calculate_forecast_rating(forecasts_df)
         
-        # Сортируем по рейтингу (убывание)
-        forecasts_df = forecasts_df.sort_values('rating', ascending=False)
-        
-        # Берем топ N прогнозов
-        best_forecasts = forecasts_df.head(max_forecasts)
+        # Берем топ N прогнозов по рейтингу без полной сортировки
+        best_forecasts = forecasts_df.nlargest(max_forecasts, 'rating', keep='first')
         
         logger.info(f"Выбрано {len(best_forecasts)} лучших прогнозов")
         
         return best_forecasts
 
+    def select_best_forecasts_per_match(self, forecasts_df: pd.DataFrame,
+                                        max_per_match: int = 3) -> pd.DataFrame:
+        """
+        Выбирает лучшие прогнозы внутри каждого матча.
+        
+        Args:
+            forecasts_df: DataFrame с прогнозами
+            max_per_match: Максимальное количество прогнозов на матч
+            
+        Returns:
+            DataFrame с отобранными прогнозами (колонка match_rank - место внутри матча)
+        """
+        if forecasts_df.empty:
+            return forecasts_df
+        
+        df = self._calculate_forecast_rating(forecasts_df)
+        # Прогнозы без рейтинга (NaN в вероятности/уверенности) - в конце матча
+        df['match_rank'] = df.groupby('match_id', sort=False)['rating'].rank(
+            method='first', ascending=False, na_option='bottom'
+        ).astype(np.int32)
+        
+        best_forecasts = df[df['match_rank'] <= max_per_match]
+        return best_forecasts.sort_values(['match_id', 'match_rank'], kind='stable')
+
     def _calculate_forecast_rating(self, forecasts_df: pd.DataFrame) -> pd.DataFrame:
         """
         Вычисляет рейтинг для каждого прогноза на основе множественных факторов.
@@ -415,7 +484,7 @@ class ConformalForecastGenerator:
         - Вероятность прогноза (probability)
         - Уверенность в прогнозе (confidence)
         - Неопределенность интервала (uncertainty)
-        - Историческую точность (если доступна)
+        - Разнообразие типов прогнозов
         """
         # Создаем копию для безопасной работы
         df = forecasts_df.copy()
@@ -424,76 +493,46 @@ class ConformalForecastGenerator:
         df['prob_norm'] = df['probability'].clip(0, 1)
         df['conf_norm'] = df['confidence'].clip(0, 1)
         
-        # Вычисляем неопределенность (если доступна)
+        # Нормализуем неопределенность (меньше = лучше)
+        df['uncertainty_norm'] = 1.0
         if 'uncertainty' in df.columns:
-            # Нормализуем неопределенность (меньше = лучше)
             uncertainty_max = df['uncertainty'].max()
             if uncertainty_max > 0:
                 df['uncertainty_norm'] = 1 - (df['uncertainty'] / uncertainty_max)
-            else:
-                df['uncertainty_norm'] = 1.0
-        else:
-            df['uncertainty_norm'] = 1.0
-        
-        # Весовые коэффициенты для разных факторов
-        weights = {
-            'probability': 0.4,    # 40% - вероятность прогноза
-            'confidence': 0.3,     # 30% - уверенность в прогнозе
-            'uncertainty': 0.2,    # 20% - низкая неопределенность
-            'diversity': 0.1       # 10% - разнообразие типов прогнозов
-        }
         
         # Базовый рейтинг на основе вероятности и уверенности
         df['base_rating'] = (
-            weights['probability'] * df['prob_norm'] +
-            weights['confidence'] * df['conf_norm'] +
-            weights['uncertainty'] * df['uncertainty_norm']
+            RATING_WEIGHTS['probability'] * df['prob_norm'] +
+            RATING_WEIGHTS['confidence'] * df['conf_norm'] +
+            RATING_WEIGHTS['uncertainty'] * df['uncertainty_norm']
         )
         
         # Добавляем бонус за разнообразие типов прогнозов
         df = self._add_diversity_bonus(df)
         
-        # Финальный рейтинг
-        df['rating'] = df['base_rating'] + df.get('diversity_bonus', 0)
-        
-        # Ограничиваем рейтинг диапазоном 0-1
-        df['rating'] = df['rating'].clip(0, 1)
+        # Финальный рейтинг, ограниченный диапазоном 0-1
+        df['rating'] = (df['base_rating'] + df['diversity_bonus']).clip(0, 1)
         
         return df
 
     def _add_diversity_bonus(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Добавляет бонус за разнообразие типов прогнозов.
-        Поощряет выбор разных типов прогнозов (исходы, тоталы, голы и т.д.)
+        Поощряет выбор разных типов прогнозов (исходы, тоталы, голы и т.д.):
+        чем меньше прогнозов в категории, тем больше бонус.
         """
-        if 'forecast_type' not in df.columns:
-            df['diversity_bonus'] = 0
+        if 'forecast_type' not in df.columns or df.empty:
+            df['diversity_bonus'] = 0.0
             return df
         
-        # Определяем категории прогнозов
-        def get_forecast_category(forecast_type: str) -> str:
-            if 'win_draw_loss' in forecast_type:
-                return 'outcome'
-            elif 'oz' in forecast_type:
-                return 'both_score'
-            elif 'goal' in forecast_type:
-                return 'goals'
-            elif 'total' in forecast_type:
-                return 'totals'
-            else:
-                return 'other'
-        
-        df['category'] = df['forecast_type'].apply(get_forecast_category)
-        
-        # Подсчитываем количество прогнозов в каждой категории
-        category_counts = df['category'].value_counts()
+        df['category'] = forecast_category_codes(df['forecast_type'])
         
-        # Вычисляем бонус за разнообразие
-        # Чем меньше прогнозов в категории, тем больше бонус
+        # Количество прогнозов в каждой категории по кодам
+        codes = df['category'].cat.codes.to_numpy()
+        category_counts = np.bincount(codes, minlength=len(FORECAST_CATEGORIES))
         max_count = category_counts.max()
-        df['diversity_bonus'] = df['category'].apply(
-            lambda cat: 0.1 * (1 - category_counts[cat] / max_count) if max_count > 0 else 0
-        )
+        
+        df['diversity_bonus'] = RATING_WEIGHTS['diversity'] * (1 - category_counts[codes] / max_count)
         
         return df
 
@@ -557,7 +596,7 @@ class ConformalForecastGenerator:
         # Сортируем по рейтингу
         sorted_forecasts = forecasts_df.sort_values('rating', ascending=False)
         
-        for idx, (_, forecast) in enumerate(sorted_forecasts.iterrows(), 1):
+        for idx, forecast in enumerate(sorted_forecasts.to_dict('records'), 1):
             # Получаем информацию о матче
             match_info = f"{forecast.get('teamHome_name', 'Unknown')} vs {forecast.get('teamAway_name', 'Unknown')}"
             championship = forecast.get('championshipName', 'Unknown')
@@ -619,7 +658,7 @@ class ConformalForecastGenerator:
         
         # Статистика
         total_matches = len(grouped_outcomes)
-        total_forecasts = sum(len(match['forecasts']) for _, match in grouped_outcomes.iterrows())
+        total_forecasts = sum(len(forecasts) for forecasts in grouped_outcomes['forecasts'])
         
         report_lines.append(f"\n📊 СТАТИСТИКА КАЧЕСТВЕННЫХ ИТОГОВ:")
         report_lines.append(f"   • Всего матчей: {total_matches}")
@@ -642,7 +681,7 @@ class ConformalForecastGenerator:
         total_correct = 0
         total_analyzed = 0
         
-        for _, match in grouped_outcomes.iterrows():
+        for match in grouped_outcomes.to_dict('records'):
             match_analysis = self._analyze_quality_match(match)
             report_lines.extend(match_analysis['lines'])
             total_correct += match_analysis['correct']
@@ -691,10 +730,7 @@ class ConformalForecastGenerator:
             total += 1
             
             # Определяем, был ли прогноз правильным
-            is_correct = self.formatter.is_forecast_correct({
-                'forecast_type': forecast_type,
-                'outcome': forecast_data['outcome']
-            }, match)
+            is_correct = self._forecast_is_correct(forecast_type, forecast_data, match)
             
             if is_correct:
                 correct += 1
@@ -732,6 +768,19 @@ class ConformalForecastGenerator:
         }
     
     
+    def _forecast_is_correct(self, forecast_type: str, forecast_data: dict, match: dict) -> bool:
+        """
+        Возвращает правильность прогноза, рассчитанную при группировке по target_*.
+        Запрос targets из БД выполняется только если кадр пришел без этих колонок.
+        """
+        is_correct = forecast_data.get('is_correct')
+        if is_correct is not None:
+            return bool(is_correct)
+        return self.formatter.is_forecast_correct({
+            'forecast_type': forecast_type,
+            'outcome': forecast_data['outcome']
+        }, match)
+    
     def _save_quality_outcomes_report(self, content: str, date: datetime) -> str:
         """Сохраняет отчет по качественным итогам в файл."""
         # Создаем поддиректорию по году и месяцу в папке outcome
@@ -854,15 +903,17 @@ class ConformalForecastGenerator:
             raise
 
 
-    def process_season_conformal_forecasts(self, year: str = None):
+    def process_season_conformal_forecasts(self, year: str = None, use_cache: bool = True):
         """
         Обрабатывает конформные прогнозы за весь период чемпионата:
         - Получает список всех турниров за указанный год
-        - Для каждого турнира получает список матчей за сезон
-        - Обрабатывает прогнозы день за днем
+        - Загружает исходы всех турниров одним потоковым запросом
+          (неизменившиеся дни читаются из Parquet-кэша)
+        - Разбивает их в памяти по (турнир, дата) и формирует отчеты
         
         Args:
             year: Год турнира (например, "2025"). Если None, используется текущий сезон.
+            use_cache: Использовать дисковый кэш дней
         """
         logger.info(f'Обработка конформных прогнозов за период чемпионата (год: {year or "текущий сезон"})')
         
@@ -871,10 +922,18 @@ class ConformalForecastGenerator:
             tournaments = self.get_all_tournaments(year)
             logger.info(f'Найдено {len(tournaments)} турниров для обработки')
             
-            # 2. Обрабатываем каждый турнир
-            for tournament_id in tournaments:
-                logger.info(f'Обработка турнира {tournament_id}')
-                self.process_tournament_season_forecasts(tournament_id)
+            if not tournaments:
+                return
+            
+            # 2. Загружаем исходы за сезон и разбиваем по (турнир, дата)
+            df_season = self.load_season_outcomes(tournaments, use_cache=use_cache)
+            partitions = self.partition_season_outcomes(df_season)
+            logger.info(f'Сформировано {len(partitions)} срезов (турнир, дата)')
+            
+            # 3. Качественный прогноз строится по дате, а не по турниру - кэшируем путь
+            quality_paths: Dict[str, Optional[str]] = {}
+            for (tournament_id, match_date), df_forecasts in partitions:
+                self._process_date_frame(tournament_id, match_date, df_forecasts, quality_paths)
             
             logger.info('Обработка конформных прогнозов за весь период завершена')
             
@@ -882,6 +941,112 @@ class ConformalForecastGenerator:
             logger.error(f'Ошибка при обработке конформных прогнозов за весь период: {e}')
             raise
 
+    def load_season_outcomes(self, tournament_ids: List[int], use_cache: bool = True) -> pd.DataFrame:
+        """
+        Загружает исходы за сезон для списка чемпионатов.
+        
+        Из БД потоково читаются только дни, отсутствующие в кэше или
+        изменившиеся с момента последней выгрузки.
+        
+        Args:
+            tournament_ids: ID чемпионатов
+            use_cache: Использовать дисковый кэш дней
+            
+        Returns:
+            pd.DataFrame: Исходы с колонками load_date_forecasts и match_date (YYYY-MM-DD)
+        """
+        from db.queries.forecast import (
+            get_season_outcome_fingerprints, iter_season_outcomes
+        )
+        
+        cache = None
+        fingerprints: Dict[str, str] = {}
+        stale_dates: Optional[List[str]] = None
+        frames = []
+        
+        if use_cache and self.cache_dir:
+            from .season_cache import SeasonOutcomeCache
+            
+            cache = SeasonOutcomeCache(self._season_cache_dir(tournament_ids))
+            fingerprints = get_season_outcome_fingerprints(tournament_ids)
+            fresh_dates, stale_dates = cache.split_dates(fingerprints)
+            logger.info(f'Кэш исходов: {len(fresh_dates)} дней актуальны, {len(stale_dates)} к загрузке')
+            
+            df_cached, failed_dates = cache.load(fresh_dates)
+            if not df_cached.empty:
+                frames.append(df_cached)
+            if failed_dates:
+                # Нечитаемые файлы кэша: дни перезагружаются из БД и пересохраняются
+                logger.info(f'Кэш исходов: {len(failed_dates)} дней не прочитаны, загружаются из БД')
+                stale_dates = sorted(stale_dates + failed_dates)
+        
+        if stale_dates is None or stale_dates:
+            match_dates = None
+            if stale_dates is not None:
+                match_dates = [datetime.strptime(d, '%Y-%m-%d').date() for d in stale_dates]
+            
+            loaded = [
+                self._prepare_season_chunk(chunk)
+                for chunk in iter_season_outcomes(tournament_ids, match_dates=match_dates)
+            ]
+            if loaded:
+                df_loaded = pd.concat(loaded, ignore_index=True)
+                if cache is not None:
+                    saved = cache.save(df_loaded, fingerprints)
+                    logger.info(f'В кэш исходов сохранено {saved} дней')
+                frames.append(df_loaded)
+        
+        if not frames:
+            return pd.DataFrame()
+        
+        df = pd.concat(frames, ignore_index=True)
+        return self._filter_season_years(df, tournament_ids)
+
+    def _season_cache_dir(self, tournament_ids: Iterable[int]) -> Path:
+        """Каталог кэша для конкретного набора чемпионатов."""
+        key = ','.join(str(t) for t in sorted(tournament_ids))
+        digest = hashlib.md5(key.encode('utf-8')).hexdigest()[:12]
+        return Path(self.cache_dir) / f'season_{digest}'
+
+    def _prepare_season_chunk(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """Приводит пачку из БД к виду load_date_forecasts."""
+        chunk['match_date'] = pd.to_datetime(chunk['match_date']).dt.strftime('%Y-%m-%d')
+        chunk['gameData'] = pd.to_datetime(chunk['gameData'])
+        chunk['forecast_type'] = chunk['feature'].map(self.feature_mapping)
+        return chunk
+
+    def _filter_season_years(self, df: pd.DataFrame, tournament_ids: List[int]) -> pd.DataFrame:
+        """Оставляет только матчи последнего сезона каждого чемпионата (как load_date_forecasts)."""
+        if df.empty:
+            return df
+        
+        from db.queries.forecast import get_championship_season_years
+        
+        season_years = get_championship_season_years(tournament_ids)
+        allowed = pd.DataFrame(
+            [(championship_id, year) for championship_id, years in season_years.items() for year in years],
+            columns=['tournament_id', 'season_year']
+        )
+        df = df.assign(season_year=df['gameData'].dt.year)
+        df = df.merge(allowed, on=['tournament_id', 'season_year'], how='inner')
+        return df.drop(columns='season_year')
+
+    def partition_season_outcomes(self, df: pd.DataFrame) -> List[tuple]:
+        """
+        Разбивает исходы сезона на срезы по (турнир, дата).
+        
+        Returns:
+            List[tuple]: [((tournament_id, match_date), DataFrame), ...] в порядке дат
+        """
+        if df.empty:
+            return []
+        
+        df = df.sort_values(['match_date', 'tournament_id', 'gameData', 'feature'], kind='stable')
+        return [
+            (key, group.reset_index(drop=True))
+            for key, group in df.groupby(['tournament_id', 'match_date'], sort=False)
+        ]
+
     def get_all_tournaments(self, year: str = None) -> List[int]:
         """
         Получает список турниров по году.
@@ -951,7 +1116,25 @@ class ConformalForecastGenerator:
         try:
             # 1. Загружаем прогнозы на указанную дату
             df_forecasts = self.load_date_forecasts(tournament_id, match_date)
-            
+        except Exception as e:
+            logger.error(f'Ошибка при загрузке прогнозов на {match_date}: {e}')
+            return
+        
+        self._process_date_frame(tournament_id, match_date, df_forecasts)
+
+    def _process_date_frame(self, tournament_id: int, match_date: str,
+                            df_forecasts: pd.DataFrame,
+                            quality_paths: Optional[Dict[str, Optional[str]]] = None):
+        """
+        Формирует и публикует отчеты по уже загруженным прогнозам (турнир, дата).
+        
+        Args:
+            tournament_id: ID чемпионата
+            match_date: Дата в формате YYYY-MM-DD
+            df_forecasts: Прогнозы на дату
+            quality_paths: Кэш путей качественных прогнозов по датам
+        """
+        try:
             if df_forecasts.empty:
                 logger.warning(f'Нет прогнозов на {match_date} для чемпионата {tournament_id}')
                 return
@@ -966,17 +1149,15 @@ class ConformalForecastGenerator:
             outcomes_report = self.generate_yesterday_outcomes_report(df_grouped)
 
             # Дополнительно: ОБЯЗАТЕЛЬНО сформируем качественный прогноз для указанной даты
-            quality_path = None
-            try:
-                date_obj = datetime.strptime(match_date, '%Y-%m-%d')
-                from .quality_forecast_report import QualityForecastReporter
-                quality_reporter = QualityForecastReporter(output_dir='results')
-                quality_path = quality_reporter.generate_quality_forecast_report(date_obj)
-                logger.info(f"Качественный прогноз за {match_date} сохранен: {quality_path}")
-            except Exception as e:
-                logger.warning(f"Не удалось сформировать качественный прогноз за {match_date}: {e}")
+            if quality_paths is None:
+                quality_paths = {}
+            if match_date not in quality_paths:
+                quality_paths[match_date] = self._generate_quality_forecast_for_date(match_date)
+            quality_path = quality_paths[match_date]
             
             # 4. Публикуем отчет
+            from publisher.conformal_sending import ConformalDailyPublisher
+            
             for publisher in self.publishers:
                 try:
                     if isinstance(publisher, ConformalDailyPublisher):
@@ -999,6 +1180,19 @@ class ConformalForecastGenerator:
         except Exception as e:
             logger.error(f'Ошибка при обработке прогнозов на {match_date}: {e}')
 
+    def _generate_quality_forecast_for_date(self, match_date: str) -> Optional[str]:
+        """Формирует качественный прогноз за дату и возвращает путь к файлу."""
+        try:
+            date_obj = datetime.strptime(match_date, '%Y-%m-%d')
+            from publisher.quality_forecast_report import QualityForecastReporter
+            quality_reporter = QualityForecastReporter(output_dir='results')
+            quality_path = quality_reporter.generate_quality_forecast_report(date_obj)
+            logger.info(f"Качественный прогноз за {match_date} сохранен: {quality_path}")
+            return quality_path
+        except Exception as e:
+            logger.warning(f"Не удалось сформировать качественный прогноз за {match_date}: {e}")
+            return None
+
     def load_date_forecasts(self, tournament_id: int, match_date: str) -> pd.DataFrame:
         """
         Загружает прогнозы на конкретную дату для конкретного чемпионата.
@@ -1092,6 +1286,15 @@ class ConformalForecastGenerator:
             df = pd.DataFrame(result.fetchall(), columns=result.keys())
             
             if not df.empty:
+                # targets всех матчей даты одним запросом - для векторной проверки прогнозов
+                from core.prediction_validator import align_targets
+                from db.queries.target import get_targets_frame
+                
+                match_ids = [int(match_id) for match_id in df['match_id'].unique()]
+                targets = align_targets(df['match_id'].tolist(), get_targets_frame(db_session, match_ids))
+                targets.index = df.index
+                df = df.join(targets)
+                
                 # Добавляем название типа прогноза
                 df['forecast_type'] = df['feature'].map(self.feature_mapping)
                 
@@ -8,8 +8,12 @@
 
 from datetime import datetime
 from typing import Dict
+import numpy as np
 import pandas as pd
 
+from core.constants import FORECAST_TYPE_TO_FEATURE
+from core.target_utils import TARGET_RULES, targets_from_goals
+
 
 class ForecastFormatter:
     """Класс для форматирования и валидации прогнозов."""
@@ -72,58 +76,69 @@ def get_match_result(home_goals: int, away_goals: int) -> str:
     return 'Н'
 
 
-def check_match_outcome_correct_from_targets(predicted_outcome: str, match: pd.Series) -> bool:
+REGRESSION_FORECAST_TYPES = ('total_amount', 'total_home_amount', 'total_away_amount')
+
+
+def are_forecasts_correct_from_goals(
+    forecast_types,
+    outcomes,
+    home_goals,
+    away_goals
+) -> np.ndarray:
+    """
+    Векторно проверяет прогнозы по счету матчей (без обращения к targets).
+
+    Args:
+        forecast_types: Типы прогнозов (win_draw_loss, oz, goal_home, ...)
+        outcomes: Прогнозы (п1, да/нет, тб, ...)
+        home_goals: Голы хозяев
+        away_goals: Голы гостей
+
+    Returns:
+        np.ndarray: Булев массив правильности прогнозов
+    """
+    from core.prediction_validator import are_predictions_correct
+
+    features = pd.Series(forecast_types).map(FORECAST_TYPE_TO_FEATURE).fillna(-1).astype(int)
+    return are_predictions_correct(
+        features.to_numpy(),
+        outcomes,
+        targets_from_goals(home_goals, away_goals)
+    )
+
+
+def is_forecast_correct_from_goals(forecast_type: str, predicted_outcome: str, match: pd.Series) -> bool:
+    """
+    Проверяет один прогноз по счету матча: скалярный аналог
+    are_forecasts_correct_from_goals с теми же правилами.
+    """
+    from core.prediction_validator import resolve_target_column
+
     home_goals = match.get('numOfHeadsHome', None)
     away_goals = match.get('numOfHeadsAway', None)
     if pd.isna(home_goals) or pd.isna(away_goals):
         return False
-    if home_goals > away_goals:
-        actual_outcome = '1'
-    elif home_goals < away_goals:
-        actual_outcome = '2'
-    else:
-        actual_outcome = 'X'
-    po = str(predicted_outcome).lower()
-    if po == 'п1':
-        return actual_outcome == '1'
-    if po == 'п2':
-        return actual_outcome == '2'
-    if po == 'х':
-        return actual_outcome == 'X'
-    return False
+    feature = FORECAST_TYPE_TO_FEATURE.get(forecast_type)
+    if feature is None:
+        return False
+    column = resolve_target_column(feature, str(predicted_outcome))
+    if column not in TARGET_RULES:
+        return False
+    return bool(TARGET_RULES[column](float(home_goals), float(away_goals)))
+
+
+def check_match_outcome_correct_from_targets(predicted_outcome: str, match: pd.Series) -> bool:
+    return is_forecast_correct_from_goals('win_draw_loss', predicted_outcome, match)
 
 
 def check_both_teams_score_correct_from_targets(predicted_outcome: str, match: pd.Series) -> bool:
-    home_goals = match.get('numOfHeadsHome', None)
-    away_goals = match.get('numOfHeadsAway', None)
-    if pd.isna(home_goals) or pd.isna(away_goals):
-        return False
-    both_scored = home_goals > 0 and away_goals > 0
-    po = str(predicted_outcome).lower()
-    if 'да' in po or 'обезабьют' in po or 'обе забьют' in po:
-        return both_scored
-    if 'нет' in po or 'незабьют' in po or 'не забьют' in po:
-        return not both_scored
-    return False
+    return is_forecast_correct_from_goals('oz', predicted_outcome, match)
 
 
 def check_team_goals_correct_from_targets(predicted_outcome: str, forecast_type: str, match: pd.Series) -> bool:
-    home_goals = match.get('numOfHeadsHome', None)
-    away_goals = match.get('numOfHeadsAway', None)
-    if pd.isna(home_goals) or pd.isna(away_goals):
-        return False
-    if forecast_type == 'goal_home':
-        actual_scored = home_goals > 0
-    elif forecast_type == 'goal_away':
-        actual_scored = away_goals > 0
-    else:
+    if forecast_type not in ('goal_home', 'goal_away'):
         return False
-    po = str(predicted_outcome).lower()
-    if 'да' in po or 'забьет' in po:
-        return actual_scored
-    if 'нет' in po or 'не забьет' in po:
-        return not actual_scored
-    return False
+    return is_forecast_correct_from_goals(forecast_type, predicted_outcome, match)
 
 
 # Старые функции check_total_correct_from_targets и check_amount_correct_from_targets удалены.
@@ -140,6 +155,137 @@ def build_nn_value_suffix(forecast_type: str, forecast_data: Dict) -> str:
     return ""
 
 
+def categorize_regression_forecasts(forecasts: pd.DataFrame) -> pd.Series:
+    """
+    Переводит числовые прогнозы регрессии в категории (тб/тм, ит1б/ит1м, ит2б/ит2м)
+    по порогам вида спорта; остальные прогнозы возвращаются без изменений.
+
+    Args:
+        forecasts: DataFrame с колонками forecast_type, outcome и, опционально,
+            sport_id / sportName / tournament_id
+
+    Returns:
+        pd.Series: Прогнозы для проверки (None — значение не удалось разобрать)
+    """
+    from core.thresholds import get_sport_thresholds, get_sport_name_thresholds
+
+    outcomes = forecasts['outcome'].astype(object).copy()
+    is_regression = forecasts['forecast_type'].isin(REGRESSION_FORECAST_TYPES).to_numpy()
+    if not is_regression.any():
+        return outcomes
+
+    regression = forecasts.loc[is_regression]
+    values = pd.to_numeric(regression['outcome'], errors='coerce').to_numpy(dtype=float)
+
+    def _column(name: str, default) -> pd.Series:
+        if name in regression:
+            return regression[name]
+        return pd.Series(default, index=regression.index)
+
+    # Пороги считаются один раз на уникальную тройку (вид спорта, название, чемпионат)
+    keys = pd.DataFrame({
+        'sport_id': _column('sport_id', np.nan),
+        'sport_name': _column('sportName', 'Soccer'),
+        'championship_id': _column('tournament_id', np.nan),
+    })
+    codes = keys.groupby(list(keys.columns), sort=False, dropna=False).ngroup().to_numpy()
+    unique_thresholds = []
+    for sport_id, sport_name, championship_id in keys.drop_duplicates().itertuples(index=False):
+        championship = None if pd.isna(championship_id) else int(championship_id)
+        if pd.isna(sport_id):
+            unique_thresholds.append(get_sport_name_thresholds(sport_name, championship))
+        else:
+            unique_thresholds.append(get_sport_thresholds(int(sport_id), championship))
+    unique_thresholds = np.array(unique_thresholds, dtype=float).reshape(-1, 2)
+    total = unique_thresholds[codes, 0]
+    itotal = unique_thresholds[codes, 1]
+
+    forecast_types = regression['forecast_type'].to_numpy()
+    categorized = np.select(
+        [
+            forecast_types == 'total_amount',
+            forecast_types == 'total_home_amount',
+            forecast_types == 'total_away_amount',
+        ],
+        [
+            np.where(values > total, 'тб', 'тм'),
+            np.where(values > itotal, 'ит1б', 'ит1м'),
+            np.where(values > itotal, 'ит2б', 'ит2м'),
+        ],
+        default=''
+    ).astype(object)
+    # Нечисловые значения регрессии не проверяются (как и раньше)
+    categorized[np.isnan(values)] = None
+    outcomes.loc[is_regression] = categorized
+    return outcomes
+
+
+def categorize_regression_value(forecast_type: str, value, match: pd.Series):
+    """
+    Скалярный аналог categorize_regression_forecasts для одного прогноза.
+
+    Returns:
+        Категория (тб/тм, ит1б/ит1м, ит2б/ит2м) или None, если значение
+        не удалось разобрать
+    """
+    from core.thresholds import get_sport_thresholds, get_sport_name_thresholds
+
+    try:
+        forecast_value = float(value)
+    except (ValueError, TypeError):
+        return None
+    if np.isnan(forecast_value):
+        return None
+
+    sport_id = match.get('sport_id', None)
+    championship_id = match.get('tournament_id', None)
+    championship = None if pd.isna(championship_id) else int(championship_id)
+    if sport_id is not None and not pd.isna(sport_id):
+        threshold_total, threshold_itotal = get_sport_thresholds(int(sport_id), championship)
+    else:
+        threshold_total, threshold_itotal = get_sport_name_thresholds(
+            match.get('sportName', 'Soccer'), championship
+        )
+
+    if forecast_type == 'total_amount':
+        return 'тб' if forecast_value > threshold_total else 'тм'
+    if forecast_type == 'total_home_amount':
+        return 'ит1б' if forecast_value > threshold_itotal else 'ит1м'
+    return 'ит2б' if forecast_value > threshold_itotal else 'ит2м'
+
+
+def are_forecasts_correct(forecasts: pd.DataFrame, targets: pd.DataFrame) -> np.ndarray:
+    """
+    Векторно определяет правильность прогнозов по таблице targets.
+
+    Args:
+        forecasts: DataFrame с колонками forecast_type, outcome
+            (и sport_id / sportName / tournament_id для регрессии)
+        targets: DataFrame с колонками target_*, выровненный по строкам forecasts
+
+    Returns:
+        np.ndarray: Булев массив правильности прогнозов
+    """
+    from core.prediction_validator import are_predictions_correct
+
+    if forecasts.empty:
+        return np.zeros(0, dtype=bool)
+
+    outcomes = categorize_regression_forecasts(forecasts)
+    features = forecasts['forecast_type'].map(FORECAST_TYPE_TO_FEATURE)
+    valid = (
+        features.notna() & outcomes.notna()
+        & forecasts['outcome'].notna() & (forecasts['outcome'].astype(str) != '')
+    ).to_numpy()
+
+    correct = are_predictions_correct(
+        features.fillna(-1).astype(int).to_numpy(),
+        outcomes.fillna('').to_numpy(),
+        targets.reset_index(drop=True)
+    )
+    return correct & valid
+
+
 def is_forecast_correct(forecast_data: dict, match: pd.Series) -> bool:
     """
     Определяет, был ли прогноз правильным используя target из БД.
@@ -153,61 +299,23 @@ def is_forecast_correct(forecast_data: dict, match: pd.Series) -> bool:
     """
     from core.prediction_validator import is_prediction_correct_from_target
     from db.queries.target import get_target_by_match_id
-    import logging
-    
-    logger = logging.getLogger(__name__)
-    
+
     forecast_type = forecast_data.get('forecast_type', '')
     outcome = forecast_data.get('outcome', '')
     match_id = match.get('id', match.get('match_id', 0))
-    
+
     if not forecast_type or not outcome or not match_id:
         return False
-    
-    # Маппинг forecast_type -> feature и model_type
-    forecast_type_to_feature = {
-        'win_draw_loss': (1, 'classification'),
-        'oz': (2, 'classification'),
-        'goal_home': (3, 'classification'),
-        'goal_away': (4, 'classification'),
-        'total': (5, 'classification'),
-        'total_home': (6, 'classification'),
-        'total_away': (7, 'classification'),
-        'total_amount': (8, 'regression'),
-        'total_home_amount': (9, 'regression'),
-        'total_away_amount': (10, 'regression')
-    }
-    
-    feature_data = forecast_type_to_feature.get(forecast_type)
-    if not feature_data:
+    if forecast_type not in FORECAST_TYPE_TO_FEATURE:
         return False
-    
-    feature, model_type = feature_data
-    
-    # Для регрессионных моделей преобразуем числовое значение в категорию
-    if model_type == 'regression' and outcome:
-        try:
-            forecast_value = float(outcome)
-            sport_name = match.get('sportName', 'Soccer')
-            
-            if forecast_type == 'total_amount':
-                threshold = 2.5 if sport_name == 'Soccer' else 4.5
-                outcome = 'тб' if forecast_value > threshold else 'тм'
-            elif forecast_type == 'total_home_amount':
-                threshold = 1.5 if sport_name == 'Soccer' else 2.5
-                outcome = 'ит1б' if forecast_value > threshold else 'ит1м'
-            elif forecast_type == 'total_away_amount':
-                threshold = 1.5 if sport_name == 'Soccer' else 2.5
-                outcome = 'ит2б' if forecast_value > threshold else 'ит2м'
-        except (ValueError, TypeError) as e:
-            logger.warning(f"Не удалось преобразовать регрессионное значение {outcome}: {e}")
-            return False
-    
-    # Получаем target и проверяем правильность
+
     target = get_target_by_match_id(match_id)
     if not target:
         return False
-    
-    return is_prediction_correct_from_target(feature, outcome, target)
 
+    if forecast_type in REGRESSION_FORECAST_TYPES:
+        outcome = categorize_regression_value(forecast_type, outcome, match)
+        if outcome is None:
+            return False
 
+    return is_prediction_correct_from_target(FORECAST_TYPE_TO_FEATURE[forecast_type], outcome, target)
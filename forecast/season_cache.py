@@ -0,0 +1,124 @@
+# izhbet/forecast/season_cache.py
+"""
+Дисковый кэш исходов конформных прогнозов по датам (Parquet).
+
+Каждая дата хранится отдельным файлом {YYYY-MM-DD}.parquet, рядом лежит
+manifest.json с отпечатками дат (см. get_season_outcome_fingerprints).
+Дата считается актуальной, если ее отпечаток в БД совпадает с сохраненным,
+поэтому при повторном запуске сезонного режима из БД загружаются только
+новые или изменившиеся дни.
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class SeasonOutcomeCache:
+    """Кэш дневных срезов исходов в формате Parquet."""
+
+    MANIFEST_FILE = 'manifest.json'
+
+    def __init__(self, cache_dir: str = 'results/cache/outcomes'):
+        self.cache_dir = Path(cache_dir)
+        self._manifest = self._load_manifest()
+
+    def _manifest_path(self) -> Path:
+        return self.cache_dir / self.MANIFEST_FILE
+
+    def _day_path(self, match_date: str) -> Path:
+        return self.cache_dir / f'{match_date}.parquet'
+
+    def _load_manifest(self) -> Dict[str, str]:
+        path = self._manifest_path()
+        if not path.exists():
+            return {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f'Не удалось прочитать манифест кэша {path}: {e}')
+            return {}
+
+    def _save_manifest(self) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with open(self._manifest_path(), 'w', encoding='utf-8') as f:
+            json.dump(self._manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+    def split_dates(self, fingerprints: Dict[str, str]) -> Tuple[List[str], List[str]]:
+        """
+        Делит даты на актуальные в кэше и требующие загрузки из БД.
+
+        Args:
+            fingerprints: {YYYY-MM-DD: отпечаток} из БД
+
+        Returns:
+            Tuple[List[str], List[str]]: (актуальные даты, устаревшие даты)
+        """
+        fresh, stale = [], []
+        for match_date, fingerprint in sorted(fingerprints.items()):
+            if (self._manifest.get(match_date) == fingerprint
+                    and self._day_path(match_date).exists()):
+                fresh.append(match_date)
+            else:
+                stale.append(match_date)
+        return fresh, stale
+
+    def load(self, match_dates: Iterable[str]) -> Tuple[pd.DataFrame, List[str]]:
+        """
+        Читает сохраненные дни; поврежденные файлы удаляются из манифеста.
+
+        Returns:
+            Tuple[pd.DataFrame, List[str]]: (исходы прочитанных дней, даты,
+            которые прочитать не удалось - их нужно загрузить из БД)
+        """
+        frames, failed = [], []
+        for match_date in match_dates:
+            try:
+                frames.append(pd.read_parquet(self._day_path(match_date)))
+            except Exception as e:
+                logger.warning(f'Не удалось прочитать кэш за {match_date}: {e}')
+                self._manifest.pop(match_date, None)
+                failed.append(match_date)
+
+        if not frames:
+            return pd.DataFrame(), failed
+        return pd.concat(frames, ignore_index=True), failed
+
+    def save(self, df: pd.DataFrame, fingerprints: Dict[str, str]) -> int:
+        """
+        Сохраняет загруженные из БД дни и обновляет манифест.
+
+        Args:
+            df: Исходы с колонкой match_date (YYYY-MM-DD)
+            fingerprints: Отпечатки дат из БД
+
+        Returns:
+            int: Количество сохраненных дней
+        """
+        if df.empty:
+            return 0
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        saved = 0
+        for match_date, day_df in df.groupby('match_date', sort=False):
+            if match_date not in fingerprints:
+                continue
+            try:
+                day_df.to_parquet(self._day_path(match_date), index=False)
+                self._manifest[match_date] = fingerprints[match_date]
+                saved += 1
+            except Exception as e:
+                logger.warning(f'Не удалось сохранить кэш за {match_date}: {e}')
+                self._manifest.pop(match_date, None)
+
+        try:
+            self._save_manifest()
+        except Exception as e:
+            logger.warning(f'Не удалось сохранить манифест кэша: {e}')
+        return saved
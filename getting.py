@@ -9,6 +9,7 @@ from sys import argv
 
 from core.constants import OPERATIONS
 from getting.download import Download
+from core import telemetry
 
 
 logger = logging.getLogger(__name__)
@@ -33,7 +34,8 @@ def main() -> None:
         f'Запущен скрипт, getting.py c параметром: {operation}'
     )
     download_data = Download(operation)
-    download_data.download_sportradar()
+    with telemetry.run('getting', mode=operation):
+        download_data.download_sportradar()
 
 
 if __name__ == '__main__':
@@ -8,7 +8,7 @@ import logging
 import abc
 from abc import ABC, abstractmethod
 from typing import Any, List, Dict, Optional, TypeVar, Generic
-from multiprocessing import JoinableQueue, cpu_count
+from multiprocessing import JoinableQueue, Queue, cpu_count
 
 from core.constants import OPERATIONS
 from db.queries.tournament import (
@@ -22,6 +22,7 @@ from core.constants import (
 )
 from .datahandler import DataHandlerFactory
 from core.consumer import Consumer
+from core.telemetry import get_tracer
 from db.base import DBSession
 from config import get_db_session
 
@@ -323,10 +324,11 @@ class GetSportRadar:
 
         # Новая версия
         tasks = JoinableQueue()
+        results = Queue()
 
         number_consumers = 10 #cpu_count()
         consumers = [
-            Consumer(tasks, None)
+            Consumer(tasks, results)
                 for _ in range(number_consumers)
         ]
         for consumer in consumers:
@@ -339,7 +341,10 @@ class GetSportRadar:
             tasks.put(None)
 
         tasks.join()
-        
+
+        # Телеметрия турниров (до join, чтобы очередь результатов не блокировала выход)
+        get_tracer().collect(results, len(tournament_ids))
+
         # Ждем завершения всех потребителей
         for consumer in consumers:
             consumer.join()
@@ -0,0 +1,60 @@
+"""create statistics rollups table
+
+Revision ID: b7c41d2e9a05
+Revises: f123456789ab
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7c41d2e9a05'
+down_revision: Union[str, None] = 'f123456789ab'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('statistics_rollups',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('forecast_type', sa.VARCHAR(length=50), nullable=False),
+    sa.Column('forecast_subtype', sa.VARCHAR(length=50), nullable=False),
+    sa.Column('championship_id', sa.BigInteger(), nullable=False),
+    sa.Column('sport_id', sa.BigInteger(), nullable=False),
+    sa.Column('match_date', sa.DATE(), nullable=False),
+    sa.Column('row_count', sa.Integer(), nullable=False),
+    sa.Column('total_count', sa.Integer(), nullable=False),
+    sa.Column('correct_count', sa.Integer(), nullable=False),
+    sa.Column('accuracy_count', sa.Integer(), nullable=False),
+    sa.Column('accuracy_sum', sa.Numeric(precision=14, scale=4), nullable=True),
+    sa.Column('accuracy_min', sa.Numeric(precision=5, scale=4), nullable=True),
+    sa.Column('accuracy_max', sa.Numeric(precision=5, scale=4), nullable=True),
+    sa.Column('error_count', sa.Integer(), nullable=False),
+    sa.Column('error_sum', sa.Numeric(precision=16, scale=3), nullable=True),
+    sa.Column('residual_count', sa.Integer(), nullable=False),
+    sa.Column('residual_sum', sa.Numeric(precision=16, scale=3), nullable=True),
+    sa.Column('updated_at', sa.TIMESTAMP(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint(
+        'forecast_type', 'forecast_subtype', 'championship_id', 'sport_id', 'match_date',
+        name='uq_statistics_rollups_key'
+    )
+    )
+    op.create_index(
+        'ix_statistics_rollups_type_subtype_date', 'statistics_rollups',
+        ['forecast_type', 'forecast_subtype', 'match_date'], unique=False
+    )
+    op.create_index(
+        'ix_statistics_rollups_championship_date', 'statistics_rollups',
+        ['championship_id', 'match_date'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_statistics_rollups_championship_date', table_name='statistics_rollups')
+    op.drop_index('ix_statistics_rollups_type_subtype_date', table_name='statistics_rollups')
+    op.drop_table('statistics_rollups')
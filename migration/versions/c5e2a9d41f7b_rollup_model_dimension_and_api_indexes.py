@@ -0,0 +1,82 @@
+"""add model dimension to statistics rollups and api indexes
+
+Revision ID: c5e2a9d41f7b
+Revises: b7c41d2e9a05
+Create Date: 2026-10-18 18:00:00.000000
+
+Сводка statistics_rollups получает измерение модели и число уникальных
+матчей; старые строки удаляются, после миграции сводку нужно заполнить:
+python run_pipeline.py rollup --full
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e2a9d41f7b'
+down_revision: Union[str, None] = 'b7c41d2e9a05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Строки без модели несовместимы с новым ключом
+    op.execute('DELETE FROM statistics_rollups')
+
+    op.drop_constraint('uq_statistics_rollups_key', 'statistics_rollups', type_='unique')
+    op.add_column('statistics_rollups', sa.Column('model_name', sa.VARCHAR(length=100), nullable=False))
+    op.add_column('statistics_rollups', sa.Column('model_version', sa.VARCHAR(length=20), nullable=True))
+    op.add_column('statistics_rollups', sa.Column('model_type', sa.VARCHAR(length=20), nullable=True))
+    op.add_column('statistics_rollups', sa.Column('match_count', sa.Integer(), nullable=False))
+    op.create_unique_constraint(
+        'uq_statistics_rollups_key', 'statistics_rollups',
+        ['forecast_type', 'forecast_subtype', 'championship_id', 'sport_id', 'match_date',
+         'model_name', 'model_version', 'model_type']
+    )
+
+    # Индексы под комбинации фильтров StatisticsAPI (период + фильтр)
+    op.create_index(
+        'ix_statistics_rollups_date_championship', 'statistics_rollups',
+        ['match_date', 'championship_id', 'sport_id'], unique=False
+    )
+    op.create_index(
+        'ix_statistics_rollups_sport_date', 'statistics_rollups',
+        ['sport_id', 'match_date'], unique=False
+    )
+    op.create_index(
+        'ix_statistics_rollups_type_date', 'statistics_rollups',
+        ['forecast_type', 'match_date'], unique=False
+    )
+    op.create_index(
+        'ix_statistics_rollups_model_date', 'statistics_rollups',
+        ['model_name', 'match_date'], unique=False
+    )
+
+    # Постраничная выдача прогнозов матча (ORDER BY forecast_type, id)
+    op.create_index(
+        'ix_statistics_match_forecast_type_id', 'statistics',
+        ['match_id', 'forecast_type', 'id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_statistics_match_forecast_type_id', table_name='statistics')
+    op.drop_index('ix_statistics_rollups_model_date', table_name='statistics_rollups')
+    op.drop_index('ix_statistics_rollups_type_date', table_name='statistics_rollups')
+    op.drop_index('ix_statistics_rollups_sport_date', table_name='statistics_rollups')
+    op.drop_index('ix_statistics_rollups_date_championship', table_name='statistics_rollups')
+
+    op.execute('DELETE FROM statistics_rollups')
+
+    op.drop_constraint('uq_statistics_rollups_key', 'statistics_rollups', type_='unique')
+    op.drop_column('statistics_rollups', 'match_count')
+    op.drop_column('statistics_rollups', 'model_type')
+    op.drop_column('statistics_rollups', 'model_version')
+    op.drop_column('statistics_rollups', 'model_name')
+    op.create_unique_constraint(
+        'uq_statistics_rollups_key', 'statistics_rollups',
+        ['forecast_type', 'forecast_subtype', 'championship_id', 'sport_id', 'match_date']
+    )
@@ -0,0 +1,30 @@
+"""add statistics rollups updated_at index
+
+Revision ID: d1f4b7a2c9e3
+Revises: c5e2a9d41f7b
+Create Date: 2026-10-18 20:00:00.000000
+
+Версия данных HTTP API (ETag) - MAX(updated_at) сводки.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd1f4b7a2c9e3'
+down_revision: Union[str, None] = 'c5e2a9d41f7b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_statistics_rollups_updated_at', 'statistics_rollups',
+        ['updated_at'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_statistics_rollups_updated_at', table_name='statistics_rollups')
@@ -1,6 +1,10 @@
 # izhbet/monitoring/dashboard.py
 """
 Дашборд для визуализации мониторинга моделей с поддержкой чемпионатов.
+
+Метрики загружаются в MetricsStore (monitoring/data.py) один раз на процесс
+и догружаются по training_date не чаще METRICS_REFRESH_SECONDS, поэтому
+перерисовка при изменении настроек не обращается к базе.
 """
 
 import streamlit as st
@@ -11,13 +15,42 @@ import plotly.graph_objects as go
 from datetime import datetime, timedelta
 from typing import List, Dict, Any
 
-from db.queries.metrics import (
-    get_available_championships,
-    get_metrics_by_championship,
-    get_models_by_championship,
-    get_metrics_history,
-    get_championship_stats
-)
+from monitoring.data import MetricsStore
+
+# Как часто догружать новые метрики, сек
+METRICS_REFRESH_SECONDS = 60
+
+# Колонки вкладки истории (как в get_metrics_history)
+HISTORY_COLUMNS = [
+    'model_name', 'accuracy', 'precision', 'recall', 'f1_score',
+    'mae', 'mse', 'rmse', 'r2', 'min_error', 'max_error', 'training_date'
+]
+
+
+@st.cache_resource
+def get_metrics_store() -> MetricsStore:
+    """Общее для сессий хранилище метрик."""
+    return MetricsStore(refresh_interval=METRICS_REFRESH_SECONDS)
+
+
+@st.cache_data(max_entries=4)
+def _summary_table(version: int) -> pd.DataFrame:
+    """Сводная таблица чемпионатов для версии данных хранилища."""
+    summary = get_metrics_store().championship_summary()
+    return pd.DataFrame({
+        'Чемпионат': summary['championship_name'],
+        'ID': summary['championship_id'],
+        'Моделей': summary['total_models'],
+        'Средняя точность': summary['avg_accuracy'],
+        'Всего предсказаний': summary['total_predictions'],
+        'Лучшая модель': summary['best_model'],
+        'Худшая модель': summary['worst_model']
+    })
+
+
+def _record(row: pd.Series) -> Dict[str, Any]:
+    """Строка DataFrame как словарь (NaN -> None)."""
+    return row.astype(object).where(row.notna(), None).to_dict()
 
 
 class ChampionshipMonitoringDashboard:
@@ -31,6 +64,9 @@ class ChampionshipMonitoringDashboard:
         )
         st.title("🏆 Мониторинг качества моделей по чемпионатам")
 
+        self.store = get_metrics_store()
+        self.store.refresh()
+
         # Загрузка данных о чемпионатах
         championships = self._get_available_championships()
 
@@ -60,8 +96,7 @@ class ChampionshipMonitoringDashboard:
     def _get_available_championships(self) -> List[Dict]:
         """Получение списка доступных чемпионатов."""
         try:
-            championships = get_available_championships()
-            return sorted(championships, key=lambda x: x['name'])
+            return self.store.championships()
         except Exception as e:
             st.error(f"Ошибка загрузки чемпионатов: {e}")
             return []
@@ -70,32 +105,13 @@ class ChampionshipMonitoringDashboard:
         """Обзорная панель всех чемпионатов."""
         st.header("📊 Обзор качества моделей по чемпионатам")
 
-        # Сбор сводной статистики
-        summary_data = []
-
-        for championship in championships:
-            try:
-                champ_stats = get_championship_stats(championship['id'])
-                models = get_models_by_championship(championship['id'])
-                summary_data.append({
-                    'Чемпионат': championship['name'],
-                    'ID': championship['id'],
-                    'Моделей': len(models),
-                    'Средняя точность': champ_stats['avg_accuracy'],
-                    'Всего предсказаний': champ_stats['total_predictions'],
-                    'Лучшая модель': champ_stats['best_model'],
-                    'Худшая модель': champ_stats['worst_model']
-                })
-            except Exception as e:
-                st.warning(f"Ошибка загрузки данных для чемпионата {championship['name']}: {e}")
-                continue
+        # Сводная статистика всех чемпионатов (пересчитывается при новых метриках)
+        df_summary = _summary_table(self.store.version)
 
-        if not summary_data:
+        if df_summary.empty:
             st.info("Нет данных для отображения")
             return
 
-        df_summary = pd.DataFrame(summary_data)
-
         # Вкладки с разной информацией
         tab1, tab2, tab3 = st.tabs(["Сводная таблица", "Визуализация", "Топ чемпионаты"])
 
@@ -155,14 +171,10 @@ class ChampionshipMonitoringDashboard:
 
         selected_champ = championship_options[selected_champ_name]
 
-        # Загрузка метрик чемпионата
-        try:
-            models = get_models_by_championship(selected_champ['id'])
-            if not models:
-                st.warning(f"Нет данных мониторинга для чемпионата {selected_champ_name}")
-                return
-        except Exception as e:
-            st.error(f"Ошибка загрузки данных чемпионата: {e}")
+        # Последние метрики моделей чемпионата
+        models = self.store.models(selected_champ['id'])
+        if models.empty:
+            st.warning(f"Нет данных мониторинга для чемпионата {selected_champ_name}")
             return
 
         # Вкладки с детальной информацией
@@ -180,11 +192,11 @@ class ChampionshipMonitoringDashboard:
         with tab4:
             self._show_history_tab(selected_champ['id'])
 
-    def _show_championship_overview(self, championship: Dict, models: List[Dict]):
+    def _show_championship_overview(self, championship: Dict, models: pd.DataFrame):
         """Обзорная информация по чемпионату."""
         col1, col2, col3 = st.columns(3)
 
-        stats = get_championship_stats(championship['id'])
+        stats = self.store.championship_stats(championship['id'])
 
         with col1:
             st.metric("Всего моделей", stats['total_models'])
@@ -198,56 +210,31 @@ class ChampionshipMonitoringDashboard:
             st.metric("Худшая модель", stats['worst_model'])
             st.metric("Стабильность", stats['stability'])
 
-        # График распределения точности по моделям
-        model_accuracies = []
-        for model in models:
-            # Для классификации используем accuracy
-            if model.get('accuracy') and model['accuracy'] > 0:
-                model_accuracies.append({
-                    'Модель': model['model_name'], 
-                    'Точность': model['accuracy']
-                })
-            # Для регрессии используем обратное значение MAE (чем меньше MAE, тем лучше)
-            elif model.get('mae') and model['mae'] > 0:
-                # Адаптивная нормализация MAE в зависимости от типа модели
-                mae_value = model['mae']
-                model_name = model['model_name']
-                
-                # Разные пороги нормализации для разных типов моделей
-                if 'total_amount' in model_name:
-                    # Для моделей общего тотала используем более высокий порог
-                    max_mae = 5.0
-                elif 'total_home' in model_name or 'total_away' in model_name:
-                    # Для индивидуальных тоталов используем средний порог
-                    max_mae = 3.0
-                else:
-                    # Для остальных моделей используем стандартный порог
-                    max_mae = 2.0
-                
-                # Нормализуем MAE к [0,1] с адаптивным порогом
-                normalized_mae = min(mae_value / max_mae, 1.0)
-                accuracy_score = 1 - normalized_mae
-                
-                model_accuracies.append({
-                    'Модель': f"{model['model_name']} (MAE: {mae_value:.2f})",
-                    'Точность': accuracy_score
-                })
-
-        if model_accuracies:
-            df_acc = pd.DataFrame(model_accuracies)
+        # График распределения точности по моделям: accuracy для классификации,
+        # нормализованный MAE для регрессии (score в MetricsStore)
+        scored = models[models['score'].notna()]
+        if not scored.empty:
+            is_classification = scored['accuracy'].fillna(0) > 0
+            labels = np.where(
+                is_classification,
+                scored['model_name'],
+                scored['model_name'] + ' (MAE: ' + scored['mae'].map('{:.2f}'.format) + ')'
+            )
+            df_acc = pd.DataFrame({'Модель': labels, 'Точность': scored['score'].to_numpy()})
             fig = px.bar(df_acc, x='Модель', y='Точность',
                          title='Точность моделей в чемпионате')
             st.plotly_chart(fig, use_container_width=True)
 
-    def _show_models_details(self, models: List[Dict], championship: Dict):
+    def _show_models_details(self, models: pd.DataFrame, championship: Dict):
         """Детализация по моделям чемпионата."""
         st.subheader("Детализация по моделям")
 
-        model_names = [model['model_name'] for model in models]
+        model_names = models['model_name'].tolist()
         selected_model_name = st.selectbox("Выберите модель", model_names)
 
         if selected_model_name:
-            selected_model = next((m for m in models if m['model_name'] == selected_model_name), None)
+            selected_rows = models[models['model_name'] == selected_model_name]
+            selected_model = _record(selected_rows.iloc[0]) if not selected_rows.empty else None
             
             if selected_model:
                 col1, col2 = st.columns(2)
@@ -282,12 +269,12 @@ class ChampionshipMonitoringDashboard:
                     st.write(f"**Дата обучения:** {selected_model.get('training_date', 'N/A')}")
                     st.write(f"**Название:** {selected_model.get('model_name', 'N/A')}")
 
-    def _show_trends_tab(self, models: List[Dict], championship: Dict, days: int):
+    def _show_trends_tab(self, models: pd.DataFrame, championship: Dict, days: int):
         """Вкладка с трендами моделей чемпионата."""
         st.subheader("Тренды метрик")
 
         # Мультиселект моделей для сравнения
-        model_names = [model['model_name'] for model in models]
+        model_names = models['model_name'].tolist()
         selected_models = st.multiselect(
             "Выберите модели для сравнения",
             model_names,
@@ -299,62 +286,42 @@ class ChampionshipMonitoringDashboard:
 
         fig = go.Figure()
 
-        for model_name in selected_models:
-            try:
-                # Получаем историю метрик для модели
-                history = get_metrics_history(championship['id'], model_name, days)
-                
-                if not history:
-                    continue
+        # История всех выбранных моделей одним срезом
+        history = self.store.history(championship['id'], selected_models, days)
+        # Нулевые и пустые значения не отображаются
+        accuracy = history['accuracy'].where(history['accuracy'] > 0)
+        mae = history['mae'].where(history['mae'] > 0)
 
-                # Извлекаем метрики точности для классификации
-                timestamps = []
-                accuracies = []
-                mae_values = []
-
-                for record in history:
-                    timestamp = record['training_date']
-                    timestamps.append(timestamp)
-                    
-                    # Для классификации используем accuracy
-                    accuracy = record.get('accuracy', 0)
-                    if accuracy and accuracy > 0:
-                        accuracies.append(accuracy)
-                    else:
-                        accuracies.append(None)
-                    
-                    # Для регрессии используем MAE
-                    mae = record.get('mae', 0)
-                    if mae and mae > 0:
-                        mae_values.append(mae)
-                    else:
-                        mae_values.append(None)
-
-                if timestamps:
-                    # Добавляем линию точности (для классификации)
-                    if any(acc is not None for acc in accuracies):
-                        fig.add_trace(go.Scatter(
-                            x=timestamps,
-                            y=accuracies,
-                            name=f"{model_name} (Accuracy)",
-                            mode='lines+markers',
-                            line=dict(dash='solid'),
-                            yaxis='y'
-                        ))
-                    
-                    # Добавляем линию MAE (для регрессии)
-                    if any(mae is not None for mae in mae_values):
-                        fig.add_trace(go.Scatter(
-                            x=timestamps,
-                            y=mae_values,
-                            name=f"{model_name} (MAE)",
-                            mode='lines+markers',
-                            line=dict(dash='dash'),
-                            yaxis='y2'
-                        ))
-            except Exception as e:
-                st.warning(f"Ошибка загрузки истории для модели {model_name}: {e}")
+        groups = history.groupby('model_name', sort=False).groups
+        for model_name in selected_models:
+            index = groups.get(model_name)
+            if index is None:
                 continue
+            timestamps = history.loc[index, 'training_date']
+            model_accuracy = accuracy.loc[index]
+            model_mae = mae.loc[index]
+
+            # Добавляем линию точности (для классификации)
+            if model_accuracy.notna().any():
+                fig.add_trace(go.Scatter(
+                    x=timestamps,
+                    y=model_accuracy,
+                    name=f"{model_name} (Accuracy)",
+                    mode='lines+markers',
+                    line=dict(dash='solid'),
+                    yaxis='y'
+                ))
+
+            # Добавляем линию MAE (для регрессии)
+            if model_mae.notna().any():
+                fig.add_trace(go.Scatter(
+                    x=timestamps,
+                    y=model_mae,
+                    name=f"{model_name} (MAE)",
+                    mode='lines+markers',
+                    line=dict(dash='dash'),
+                    yaxis='y2'
+                ))
 
         # Настройка осей для двойного графика
         fig.update_layout(
@@ -391,31 +358,18 @@ class ChampionshipMonitoringDashboard:
         if not selected_championships:
             return
 
-        # Сбор данных для сравнения
-        comparison_data = []
-
-        for champ_name in selected_championships:
-            champ = next((c for c in championships if c['name'] == champ_name), None)
-            if not champ:
-                continue
-
-            try:
-                stats = get_championship_stats(champ['id'])
-                models = get_models_by_championship(champ['id'])
-                comparison_data.append({
-                    'Чемпионат': champ_name,
-                    'Точность': stats['avg_accuracy'],
-                    'Предсказания': stats['total_predictions'],
-                    'Модели': len(models)
-                })
-            except Exception as e:
-                st.warning(f"Ошибка загрузки данных для чемпионата {champ_name}: {e}")
-                continue
-
-        if not comparison_data:
+        # Данные для сравнения из сводной таблицы
+        df_summary = _summary_table(self.store.version)
+        df_summary = df_summary[df_summary['Чемпионат'].isin(selected_championships)]
+        if df_summary.empty:
             return
 
-        df_comparison = pd.DataFrame(comparison_data)
+        df_comparison = pd.DataFrame({
+            'Чемпионат': df_summary['Чемпионат'],
+            'Точность': df_summary['Средняя точность'],
+            'Предсказания': df_summary['Всего предсказаний'],
+            'Модели': df_summary['Моделей']
+        })
 
         # Визуализация сравнения
         col1, col2 = st.columns(2)
@@ -448,15 +402,14 @@ class ChampionshipMonitoringDashboard:
         st.subheader("История изменений метрик")
 
         try:
-            # Получаем историю метрик для чемпионата
-            history = get_metrics_history(championship_id, days=90)
+            # История метрик чемпионата за 90 дней
+            history = self.store.history(championship_id, days=90)
             
-            if not history:
+            if history.empty:
                 st.info("Нет исторических данных для отображения")
                 return
 
-            # Создаем DataFrame для отображения
-            df_history = pd.DataFrame(history)
+            df_history = history[HISTORY_COLUMNS].reset_index(drop=True)
             
             # Показываем таблицу с историей
             st.dataframe(
@@ -0,0 +1,240 @@
+# izhbet/monitoring/data.py
+"""
+Слой данных дашборда мониторинга моделей.
+
+Таблица metrics загружается один раз в DataFrame и дальше обновляется
+инкрементально по водяному знаку training_date (save_metrics обновляет
+training_date при перезаписи метрик). Полная перезагрузка выполняется
+раз в full_reload_interval секунд, чтобы учесть удаленные записи.
+Последние метрики моделей, сводка по чемпионатам и история считаются
+векторно по этому DataFrame и пересчитываются только при изменении
+версии данных.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from db.queries.metrics import get_metrics_frame, METRIC_FRAME_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+# Пороги нормализации MAE по типу модели (подстрока имени модели)
+MAE_NORMALIZATION = [('total_amount', 5.0), ('total_home', 3.0), ('total_away', 3.0)]
+DEFAULT_MAX_MAE = 2.0
+
+
+def _max_mae(model_name: str) -> float:
+    for pattern, threshold in MAE_NORMALIZATION:
+        if pattern in model_name:
+            return threshold
+    return DEFAULT_MAX_MAE
+
+
+def model_scores(frame: pd.DataFrame) -> pd.Series:
+    """
+    Сопоставимая оценка моделей: accuracy для классификации,
+    1 - MAE / порог для регрессии (NaN, если метрик нет).
+    """
+    accuracy = frame['accuracy']
+    mae = frame['mae']
+
+    # Порог считается один раз на уникальное имя модели
+    codes, names = pd.factorize(frame['model_name'].fillna('').astype(str))
+    thresholds = np.array([_max_mae(name) for name in names] + [DEFAULT_MAX_MAE])
+    max_mae = pd.Series(thresholds[codes], index=frame.index)
+
+    regression_score = 1 - np.minimum(mae / max_mae, 1.0)
+    scores = accuracy.where(accuracy > 0)
+    return scores.fillna(regression_score.where(mae > 0))
+
+
+class MetricsStore:
+    """DataFrame метрик с инкрементальным обновлением и производными таблицами."""
+
+    def __init__(self, refresh_interval: float = 60.0, full_reload_interval: float = 3600.0):
+        self.refresh_interval = refresh_interval
+        self.full_reload_interval = full_reload_interval
+        self.frame = pd.DataFrame(columns=METRIC_FRAME_COLUMNS)
+        self.latest = self.frame
+        self.watermark: Optional[datetime] = None
+        self.version = 0
+        self._history: Dict[Any, pd.DataFrame] = {}
+        self._summary: Optional[pd.DataFrame] = None
+        self._refreshed_at = 0.0
+        self._reloaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Догружает новые и измененные записи (не чаще refresh_interval).
+
+        Returns:
+            bool: Данные изменились
+        """
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._refreshed_at < self.refresh_interval:
+                return False
+            self._refreshed_at = now
+
+            full = self.watermark is None or now - self._reloaded_at >= self.full_reload_interval
+            try:
+                increment = get_metrics_frame(None if full else self.watermark)
+            except Exception as e:
+                logger.error(f'Ошибка загрузки метрик для дашборда: {e}')
+                return False
+
+            if full:
+                frame = increment.sort_values(['training_date', 'id'], kind='mergesort')
+                self._reloaded_at = now
+                if self._same_frame(frame):
+                    return False
+            elif not self._has_changes(increment):
+                return False
+            else:
+                # Инкремент не раньше водяного знака, поэтому порядок по training_date
+                # сохраняется; граничные и измененные записи заменяются по id
+                increment = increment.sort_values(['training_date', 'id'], kind='mergesort')
+                increment['score'] = model_scores(increment)
+                unchanged = self.frame[~self.frame['id'].isin(increment['id'])]
+                frame = pd.concat([unchanged, increment], ignore_index=True)
+
+            self._set_frame(frame)
+            logger.info(
+                f'Метрики дашборда обновлены ({"полная загрузка" if full else "инкремент"}): '
+                f'{len(increment)} записей, всего {len(self.frame)}'
+            )
+            return True
+
+    def _has_changes(self, increment: pd.DataFrame) -> bool:
+        return bool(
+            (increment['training_date'] > self.watermark).any()
+            or (~increment['id'].isin(self.frame['id'])).any()
+        )
+
+    def _same_frame(self, frame: pd.DataFrame) -> bool:
+        return (
+            len(frame) == len(self.frame)
+            and self.watermark is not None
+            and not frame.empty
+            and frame['training_date'].max() == self.watermark
+        )
+
+    def _set_frame(self, frame: pd.DataFrame) -> None:
+        frame = frame.reset_index(drop=True)
+        if 'score' not in frame.columns:
+            frame['score'] = model_scores(frame)
+        self.frame = frame
+        self.watermark = frame['training_date'].max() if not frame.empty else None
+
+        # Последние метрики каждой модели чемпионата
+        self.latest = frame.drop_duplicates(['championship_id', 'model_name'], keep='last')
+        self._history = {key: group for key, group in frame.groupby('championship_id', sort=False)}
+        self._summary = None
+        self.version += 1
+
+    def championships(self) -> List[Dict[str, Any]]:
+        """Чемпионаты с метриками (как get_available_championships), по имени."""
+        if self.frame.empty:
+            return []
+        grouped = self.frame.groupby(['championship_id', 'championship_name'], sort=False).agg(
+            last_training=('training_date', 'max'),
+            total_metrics=('id', 'size')
+        ).reset_index()
+        grouped = grouped.rename(columns={'championship_id': 'id', 'championship_name': 'name'})
+        return grouped.sort_values('name', kind='mergesort').to_dict('records')
+
+    def models(self, championship_id: int) -> pd.DataFrame:
+        """
+        Последние метрики моделей чемпионата: классификация по убыванию
+        accuracy, регрессия по возрастанию MAE.
+        """
+        models = self.latest[self.latest['championship_id'] == championship_id]
+        if models.empty:
+            return models
+        order = np.where(models['model_type'] == 'regression', models['mae'], -models['accuracy'])
+        return models.iloc[np.argsort(order, kind='mergesort')]
+
+    def history(
+        self,
+        championship_id: int,
+        model_names: Optional[List[str]] = None,
+        days: Optional[int] = None
+    ) -> pd.DataFrame:
+        """История метрик чемпионата (по возрастанию training_date)."""
+        history = self._history.get(championship_id)
+        if history is None:
+            return self.frame.iloc[0:0]
+        if model_names:
+            history = history[history['model_name'].isin(model_names)]
+        if days is not None:
+            history = history[history['training_date'] >= datetime.now() - timedelta(days=days)]
+        return history
+
+    def championship_summary(self) -> pd.DataFrame:
+        """
+        Сводка по чемпионатам (как get_championship_stats для всех сразу).
+
+        Returns:
+            pd.DataFrame: championship_id, championship_name, total_models,
+            avg_accuracy, best_model, worst_model, stability
+        """
+        if self._summary is not None:
+            return self._summary
+
+        latest = self.latest
+        columns = ['championship_id', 'championship_name', 'total_models', 'total_predictions',
+                   'avg_accuracy', 'best_model', 'worst_model', 'stability']
+        if latest.empty:
+            self._summary = pd.DataFrame(columns=columns)
+            return self._summary
+
+        scored = latest[latest['score'].notna() & latest['model_name'].notna()]
+        grouped = latest.groupby('championship_id', sort=False)
+        summary = pd.DataFrame({
+            'championship_name': grouped['championship_name'].last(),
+            'total_models': grouped.size()
+        })
+
+        scores = scored.groupby('championship_id', sort=False)['score']
+        summary['avg_accuracy'] = scores.mean()
+        summary['avg_accuracy'] = summary['avg_accuracy'].fillna(0.0)
+        summary['best_model'] = scored.loc[scores.idxmax(), ['championship_id', 'model_name']].set_index('championship_id')['model_name']
+        summary['worst_model'] = scored.loc[scores.idxmin(), ['championship_id', 'model_name']].set_index('championship_id')['model_name']
+        summary[['best_model', 'worst_model']] = summary[['best_model', 'worst_model']].fillna('N/A')
+
+        # Стабильность по разбросу оценок моделей
+        std_dev = scores.std(ddof=0).where(scores.count() > 1)
+        summary['stability'] = np.select(
+            [std_dev.reindex(summary.index) < 0.1, std_dev.reindex(summary.index) < 0.2],
+            ['Высокая', 'Средняя'],
+            default='Низкая'
+        )
+        # В таблице metrics нет количества предсказаний
+        summary['total_predictions'] = 0
+
+        self._summary = summary.reset_index()[columns]
+        return self._summary
+
+    def championship_stats(self, championship_id: int) -> Dict[str, Any]:
+        """Сводка одного чемпионата (формат get_championship_stats)."""
+        summary = self.championship_summary()
+        row = summary[summary['championship_id'] == championship_id]
+        if row.empty:
+            return {
+                'total_models': 0,
+                'total_predictions': 0,
+                'avg_accuracy': 0.0,
+                'best_model': 'N/A',
+                'worst_model': 'N/A',
+                'stability': 'Низкая'
+            }
+        stats = row.iloc[0].to_dict()
+        stats['total_models'] = int(stats['total_models'])
+        return stats
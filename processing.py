@@ -10,6 +10,7 @@ from sys import argv
 from typing import List, Optional
 
 from core.constants import ACTION_MODEL
+from core import telemetry
 from processing.pipeline import EmbeddingCalculationPipeline
 from processing.datasource import DatabaseSource
 from processing.balancing_config import ProcessFeatures
@@ -26,7 +27,8 @@ def main() -> None:
         logger.info('Запуск модуля обработки данных')
 
         action = _get_action_from_args()
-        _process_data(action)
+        with telemetry.run('processing', mode=action):
+            _process_data(action)
 
         logger.info('Модуль обработки данных завершил работу успешно.')
         
@@ -4,7 +4,7 @@
 """
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Set
 import pandas as pd
 import logging
 
@@ -38,8 +38,15 @@ class DataProcessor(ABC):
 class ProcessFeatures(DataProcessor):
     """Обработчик признаков для матчей с поддержкой мониторинга."""
 
-    def __init__(self, action_model: str) -> None:
+    def __init__(
+            self,
+            action_model: str,
+            model_filter: Optional[Dict[int, Set[str]]] = None
+    ) -> None:
         self.create_model = action_model == 'CREATE_MODEL'
+        # Турнир -> модели для обучения (переобучение только недостающих);
+        # None - все модели
+        self.model_filter = model_filter
         self.db_session: DBSession = None
         self.current_championship_id = None
         self.current_championship_name = None
@@ -142,6 +149,13 @@ class ProcessFeatures(DataProcessor):
         # logger.debug(f"Первые 10 колонок фичей: {feature_columns[:10]}")
         
         feature_config = create_feature_config(feature_columns)
+        if self.model_filter and self.model_filter.get(self.tournament_id):
+            selected = self.model_filter[self.tournament_id]
+            feature_config = {
+                name: config for name, config in feature_config.items()
+                if name in selected
+            }
+            logger.info(f"Отобрано {len(feature_config)} моделей: {sorted(feature_config)}")
 
         if self.create_model:
             logger.info('Создание модели')
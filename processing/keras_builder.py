@@ -1,5 +1,5 @@
 # izhbet/processing/keras_builder.py
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Sequence
 import logging
 
 from keras import models, layers, optimizers, regularizers
@@ -18,46 +18,23 @@ class KerasModelBuilder:
             l1_reg: float = 0.001,
             l2_reg: float = 0.001,
             dropout_rate: float = 0.5,
-            initial_learning_rate: float = 0.001
+            initial_learning_rate: float = 0.001,
+            units: Sequence[int] = (256, 128, 64, 32, 16)
     ) -> models.Sequential:
         """
         Создание улучшенной модели Keras с регуляризацией.
+
+        units - размеры блоков Dense/BatchNormalization/Dropout; dropout
+        уменьшается на 10% с каждым блоком.
         """
         regularizer = regularizers.l1_l2(l1=l1_reg, l2=l2_reg)
 
-        model = models.Sequential([
-            layers.Input(shape=(input_shape,)),
-
-            # Блок 1
-            layers.Dense(units=256, activation='relu',
-                         kernel_regularizer=regularizer),
-            layers.BatchNormalization(),
-            layers.Dropout(dropout_rate),
-
-            # Блок 2
-            layers.Dense(units=128, activation='relu',
-                         kernel_regularizer=regularizer),
-            layers.BatchNormalization(),
-            layers.Dropout(dropout_rate * 0.9),
-
-            # Блок 3
-            layers.Dense(units=64, activation='relu',
-                         kernel_regularizer=regularizer),
-            layers.BatchNormalization(),
-            layers.Dropout(dropout_rate * 0.8),
-
-            # Блок 4
-            layers.Dense(units=32, activation='relu',
-                         kernel_regularizer=regularizer),
-            layers.BatchNormalization(),
-            layers.Dropout(dropout_rate * 0.7),
-
-            # Блок 5
-            layers.Dense(units=16, activation='relu',
-                         kernel_regularizer=regularizer),
-            layers.BatchNormalization(),
-            layers.Dropout(dropout_rate * 0.6),
-        ])
+        model = models.Sequential([layers.Input(shape=(input_shape,))])
+        for block, block_units in enumerate(units):
+            model.add(layers.Dense(units=block_units, activation='relu',
+                                   kernel_regularizer=regularizer))
+            model.add(layers.BatchNormalization())
+            model.add(layers.Dropout(dropout_rate * (1 - 0.1 * block)))
 
         # Выходной слой
         if task_type == 'classification':
@@ -95,6 +72,63 @@ class KerasModelBuilder:
 
         return model
 
+    @staticmethod
+    def create_multitask_model(
+            input_shape: int,
+            heads: Dict[str, str],
+            l1_reg: float = 0.001,
+            l2_reg: float = 0.001,
+            dropout_rate: float = 0.5,
+            initial_learning_rate: float = 0.001,
+            regression_loss_weight: float = 1.0,
+            trunk_units: Sequence[int] = (256, 128, 64, 32, 16)
+    ) -> models.Model:
+        """
+        Создание многозадачной модели: общий ствол из блоков
+        Dense/BatchNormalization/Dropout и по голове на целевую переменную.
+
+        Args:
+            input_shape: Количество признаков
+            heads: Имя головы (модели) -> task_type; classification - бинарная
+                цель (sigmoid), regression - линейный выход
+            regression_loss_weight: Вес MSE регрессионных голов в общей потере
+            trunk_units: Размеры слоев ствола
+
+        Returns:
+            Модель с выходами в порядке heads (имена слоев = имена голов)
+        """
+        regularizer = regularizers.l1_l2(l1=l1_reg, l2=l2_reg)
+
+        inputs = layers.Input(shape=(input_shape,))
+        x = inputs
+        for block, units in enumerate(trunk_units):
+            x = layers.Dense(units=units, activation='relu',
+                             kernel_regularizer=regularizer)(x)
+            x = layers.BatchNormalization()(x)
+            x = layers.Dropout(dropout_rate * (1 - 0.1 * block))(x)
+
+        outputs, losses, loss_weights, metrics = [], [], [], []
+        for name, task_type in heads.items():
+            if task_type == 'classification':
+                outputs.append(layers.Dense(1, activation='sigmoid', name=name)(x))
+                losses.append('binary_crossentropy')
+                loss_weights.append(1.0)
+                metrics.append(['accuracy'])
+            else:
+                outputs.append(layers.Dense(1, activation='linear', name=name)(x))
+                losses.append('mse')
+                loss_weights.append(regression_loss_weight)
+                metrics.append(['mae'])
+
+        model = models.Model(inputs=inputs, outputs=outputs, name='multitask')
+        model.compile(
+            optimizer=optimizers.Adam(learning_rate=initial_learning_rate),
+            loss=losses,
+            loss_weights=loss_weights,
+            metrics=metrics
+        )
+        return model
+
     @staticmethod
     def create_callbacks(
             models_dir: str,
@@ -0,0 +1,213 @@
+# izhbet/processing/keras_bundle.py
+"""
+Артефакты предобработки чемпионата в одном файле.
+
+Скалеры и label encoder'ы всех моделей чемпионата сохраняются в один
+несжатый .npz: параметры обученных объектов - массивами, а манифест
+(классы объектов, их параметры, порядок признаков моделей и хеш версии) -
+JSON-строкой внутри того же архива. Модели с одинаковыми признаками и
+нормализацией используют один скалер. Загрузка чемпионата - одно
+открытие файла вместо пары joblib-файлов на модель.
+"""
+
+import os
+import json
+import hashlib
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sklearn.preprocessing import (
+    LabelEncoder, MinMaxScaler, PowerTransformer, QuantileTransformer,
+    RobustScaler, StandardScaler
+)
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_FILENAME = 'preprocessing.npz'
+BUNDLE_FORMAT = 1
+
+ESTIMATORS = {
+    cls.__name__: cls
+    for cls in (
+        StandardScaler, MinMaxScaler, RobustScaler, PowerTransformer,
+        QuantileTransformer, LabelEncoder
+    )
+}
+
+_SCALAR_TYPES = (bool, int, float, str, type(None))
+
+
+def bundle_path(models_dir: str) -> str:
+    return os.path.join(models_dir, BUNDLE_FILENAME)
+
+
+def feature_hash(columns: List[str]) -> str:
+    """Хеш набора и порядка признаков."""
+    return hashlib.sha1('\x1f'.join(columns).encode('utf-8')).hexdigest()[:16]
+
+
+def _encode_estimator(
+        estimator: Any
+) -> Optional[Tuple[Dict[str, Any], Dict[str, np.ndarray]]]:
+    """
+    Описание обученного объекта sklearn: класс, параметры и состояние
+    (массивы отдельно). None - объект нельзя сохранить без pickle.
+    """
+    name = type(estimator).__name__
+    if ESTIMATORS.get(name) is not type(estimator):
+        return None
+
+    params = estimator.get_params()
+    state, arrays = {}, {}
+    for key, value in vars(estimator).items():
+        if key in params:
+            continue
+        if isinstance(value, np.ndarray):
+            if value.dtype.hasobject:
+                return None
+            arrays[key] = value
+        elif isinstance(value, np.generic):
+            state[key] = value.item()
+        elif isinstance(value, _SCALAR_TYPES):
+            state[key] = value
+        else:
+            return None
+
+    if not all(isinstance(value, _SCALAR_TYPES + (tuple, list)) for value in params.values()):
+        return None
+    return {'class': name, 'params': params, 'state': state}, arrays
+
+
+def _decode_estimator(description: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> Any:
+    params = {
+        key: tuple(value) if isinstance(value, list) else value
+        for key, value in description['params'].items()
+    }
+    estimator = ESTIMATORS[description['class']](**params)
+    for key, value in description['state'].items():
+        setattr(estimator, key, value)
+    for key, value in arrays.items():
+        setattr(estimator, key, value)
+    return estimator
+
+
+def save_bundle(
+        save_dir: str,
+        scalers: Dict[str, Any],
+        label_encoders: Dict[str, Any],
+        features: Dict[str, List[str]]
+) -> Tuple[List[str], str]:
+    """
+    Запись артефактов предобработки чемпионата.
+
+    Args:
+        save_dir: Директория моделей чемпионата
+        scalers: Модель -> обученный скалер
+        label_encoders: Модель -> LabelEncoder (только классификация)
+        features: Модель -> порядок признаков
+
+    Returns:
+        (модели, артефакты которых не удалось сохранить без pickle -
+        для них остаются joblib-файлы; версия артефактов)
+    """
+    manifest = {
+        'format': BUNDLE_FORMAT,
+        'training_date': datetime.now().isoformat(),
+        'estimators': {},
+        'feature_sets': {},
+        'models': {},
+    }
+    arrays: Dict[str, np.ndarray] = {}
+    unsupported = []
+
+    def add_estimator(estimator: Any) -> Optional[str]:
+        encoded = _encode_estimator(estimator)
+        if encoded is None:
+            return None
+        description, state_arrays = encoded
+        digest = hashlib.sha1(json.dumps(description, sort_keys=True).encode('utf-8'))
+        for key in sorted(state_arrays):
+            digest.update(key.encode('utf-8'))
+            digest.update(np.ascontiguousarray(state_arrays[key]).tobytes())
+        key = digest.hexdigest()[:16]
+        if key not in manifest['estimators']:
+            description['arrays'] = sorted(state_arrays)
+            manifest['estimators'][key] = description
+            for name, value in state_arrays.items():
+                arrays[f'{key}/{name}'] = value
+        return key
+
+    for model_name, scaler in scalers.items():
+        scaler_key = add_estimator(scaler)
+        label_encoder = label_encoders.get(model_name)
+        encoder_key = add_estimator(label_encoder) if label_encoder is not None else None
+        if scaler_key is None or (label_encoder is not None and encoder_key is None):
+            unsupported.append(model_name)
+            continue
+
+        columns = list(features.get(model_name, []))
+        feature_key = feature_hash(columns)
+        manifest['feature_sets'][feature_key] = columns
+        manifest['models'][model_name] = {
+            'scaler': scaler_key,
+            'label_encoder': encoder_key,
+            'features': feature_key,
+        }
+
+    manifest['version'] = hashlib.sha1(json.dumps(
+        [manifest['estimators'], manifest['feature_sets'], manifest['models']],
+        sort_keys=True
+    ).encode('utf-8')).hexdigest()[:16]
+
+    os.makedirs(save_dir, exist_ok=True)
+    path = bundle_path(save_dir)
+    tmp_path = f'{path[:-4]}.{os.getpid()}.tmp.npz'
+    np.savez(tmp_path, manifest=np.array(json.dumps(manifest, ensure_ascii=False)), **arrays)
+    os.replace(tmp_path, path)
+
+    logger.info(
+        f"Артефакты предобработки сохранены в {path}: "
+        f"{len(manifest['models'])} моделей, {len(manifest['estimators'])} объектов, "
+        f"версия {manifest['version']}"
+    )
+    return unsupported, manifest['version']
+
+
+def load_bundle(models_dir: str) -> Tuple[Dict[str, Dict[str, Any]], Optional[str]]:
+    """
+    Загрузка артефактов предобработки чемпионата.
+
+    Returns:
+        (модель -> {'scaler', 'label_encoder', 'features'}, версия);
+        пустой словарь и None, если файла нет
+    """
+    try:
+        with np.load(bundle_path(models_dir), allow_pickle=False) as data:
+            manifest = json.loads(str(data['manifest']))
+            estimators = {
+                key: _decode_estimator(
+                    description,
+                    {name: data[f'{key}/{name}'] for name in description['arrays']}
+                )
+                for key, description in manifest['estimators'].items()
+            }
+    except FileNotFoundError:
+        return {}, None
+
+    bundle = {
+        model_name: {
+            'scaler': estimators[entry['scaler']],
+            'label_encoder': (
+                estimators[entry['label_encoder']] if entry['label_encoder'] else None
+            ),
+            'features': manifest['feature_sets'][entry['features']],
+        }
+        for model_name, entry in manifest['models'].items()
+    }
+    logger.debug(
+        f"Загружены артефакты предобработки версии {manifest['version']}: "
+        f"{len(bundle)} моделей"
+    )
+    return bundle, manifest['version']
@@ -3,7 +3,11 @@
 """
 
 import os
-from typing import Dict, Any
+import json
+import logging
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
 
 
 class Config:
@@ -30,6 +34,31 @@ class Config:
     DEFAULT_DROPOUT_RATE = 0.3
     DEFAULT_LEARNING_RATE = 0.001
 
+    # Многозадачная модель: общий ствол и головы по целевым переменным
+    # вместо отдельной сети на каждую модель чемпионата
+    MULTITASK_ENABLED = os.getenv('KERAS_MULTITASK', '0') == '1'
+    MULTITASK_MODEL_NAME = 'multitask'
+    # Вес MSE регрессионных голов относительно binary_crossentropy
+    MULTITASK_REGRESSION_LOSS_WEIGHT = 0.2
+
+    # Общая нормализованная матрица признаков чемпионата в .npy (memmap):
+    # модели с одинаковыми признаками используют ее срезы, обучение идет
+    # через tf.data с предвыборкой
+    FEATURE_MMAP_ENABLED = os.getenv('KERAS_FEATURE_MMAP', '0') == '1'
+    FEATURE_CACHE_DIRNAME = 'features'
+
+    # Архитектура по умолчанию (слои общего ствола)
+    DEFAULT_UNITS = (256, 128, 64, 32, 16)
+
+    # Подбор гиперпараметров (successive halving) по чемпионатам
+    TUNING_ENABLED = os.getenv('KERAS_TUNING', '0') == '1'
+    TUNING_FILENAME = 'tuning.json'
+    TUNING_TRIALS = 27
+    TUNING_MIN_EPOCHS = 4
+    TUNING_ETA = 3
+    TUNING_WORKERS = min(4, os.cpu_count() or 1)
+    # Параметры, которые задает подбор гиперпараметров
+    TUNED_KEYS = ('l1_reg', 'l2_reg', 'dropout_rate', 'learning_rate', 'units', 'batch_size')
 
     @classmethod
     def get_pickle_path(cls, category: str, filename: str) -> str:
@@ -37,14 +66,25 @@ class Config:
         return os.path.join('./pickle', category, filename)
 
     @classmethod
-    def get_model_config(cls, model_type: str) -> Dict[str, Any]:
-        """Получить конфигурацию модели по типу."""
+    def get_model_config(
+            cls,
+            model_type: str,
+            models_dir: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Получить конфигурацию модели по типу.
+
+        Если для чемпионата (models_dir) подобраны гиперпараметры, они
+        заменяют значения по умолчанию.
+        """
         configs = {
             'classification': {
                 'l1_reg': cls.DEFAULT_L1_REG,
                 'l2_reg': cls.DEFAULT_L2_REG,
                 'dropout_rate': cls.DEFAULT_DROPOUT_RATE,
                 'learning_rate': cls.DEFAULT_LEARNING_RATE,
+                'units': cls.DEFAULT_UNITS,
+                'batch_size': cls.BATCH_SIZE,
                 'patience': 20,
                 'min_delta': 0.0005
             },
@@ -53,11 +93,35 @@ class Config:
                 'l2_reg': cls.DEFAULT_L2_REG * 0.5,
                 'dropout_rate': cls.DEFAULT_DROPOUT_RATE * 0.7,
                 'learning_rate': cls.DEFAULT_LEARNING_RATE,
+                'units': cls.DEFAULT_UNITS,
+                'batch_size': cls.BATCH_SIZE,
                 'patience': 15,
                 'min_delta': 0.001
             }
         }
-        return configs.get(model_type, configs['classification'])
+        config = dict(configs.get(model_type, configs['classification']))
+
+        tuned = cls.get_tuned_configs(models_dir).get(model_type) if models_dir else None
+        if tuned:
+            config.update({key: tuned[key] for key in cls.TUNED_KEYS if key in tuned})
+            config['units'] = tuple(config['units'])
+        return config
+
+    @classmethod
+    def get_tuning_path(cls, models_dir: str) -> str:
+        return os.path.join(models_dir, cls.TUNING_FILENAME)
+
+    @classmethod
+    def get_tuned_configs(cls, models_dir: str) -> Dict[str, Dict[str, Any]]:
+        """Подобранные гиперпараметры чемпионата по типам моделей."""
+        try:
+            with open(cls.get_tuning_path(models_dir), encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.error(f'Ошибка чтения подобранных гиперпараметров {models_dir}: {e}')
+            return {}
 
 
 # Конфигурация по умолчанию
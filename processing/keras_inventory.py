@@ -0,0 +1,128 @@
+# izhbet/processing/keras_inventory.py
+"""
+Опись моделей чемпионата.
+
+inventory.json в директории моделей чемпионата ведет KerasModelManager при
+сохранении: по записи на модель (файл, mtime, хеш признаков, метрики,
+дата обучения). Проверка полноты моделей читает один этот файл вместо
+обхода директорий.
+"""
+
+import os
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INVENTORY_FILENAME = 'inventory.json'
+INVENTORY_FORMAT = 1
+
+
+def inventory_path(models_dir: str) -> str:
+    return os.path.join(models_dir, INVENTORY_FILENAME)
+
+
+def _to_json(value: Any) -> Any:
+    """Типы numpy в метриках -> JSON."""
+    if isinstance(value, (np.generic, np.ndarray)):
+        return value.tolist()
+    raise TypeError(f'{type(value).__name__} не сериализуется в JSON')
+
+
+def load_inventory(models_dir: str) -> Optional[Dict[str, Any]]:
+    """Опись моделей чемпионата; None, если описи нет или она повреждена."""
+    try:
+        with open(inventory_path(models_dir), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.error(f'Ошибка чтения описи моделей {models_dir}: {e}')
+        return None
+
+
+def update_inventory(
+        models_dir: str,
+        entries: Dict[str, Dict[str, Any]],
+        removed: Iterable[str] = (),
+        **fields: Any
+) -> Dict[str, Any]:
+    """
+    Обновление описи: записи обученных моделей заменяются, removed
+    удаляются, остальные сохраняются. fields - общие поля описи
+    (например, версия артефактов предобработки).
+    """
+    inventory = load_inventory(models_dir) or {'format': INVENTORY_FORMAT, 'models': {}}
+    models = inventory.setdefault('models', {})
+    for model_name in removed:
+        models.pop(model_name, None)
+    models.update(entries)
+    inventory.update(fields)
+    inventory['updated_at'] = datetime.now().isoformat()
+
+    os.makedirs(models_dir, exist_ok=True)
+    path = inventory_path(models_dir)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(inventory, f, ensure_ascii=False, indent=2, default=_to_json)
+    os.replace(tmp_path, path)
+    return inventory
+
+
+def make_entry(
+        models_dir: str,
+        model_file: str,
+        feature_hash: Optional[str],
+        model_info: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Запись описи для сохраненного файла модели."""
+    return {
+        'file': model_file,
+        'mtime': os.path.getmtime(os.path.join(models_dir, model_file)),
+        'feature_hash': feature_hash,
+        'metrics': model_info.get('metrics'),
+        'sample_size': model_info.get('sample_size'),
+        'training_date': model_info.get('training_date') or datetime.now().isoformat(),
+    }
+
+
+def diff_inventory(
+        inventory: Dict[str, Any],
+        expected_models: Iterable[str],
+        max_age_days: Optional[int] = None,
+        now: Optional[datetime] = None
+) -> Tuple[List[str], List[str]]:
+    """
+    Сравнение описи с ожидаемым набором моделей.
+
+    Устаревшей считается модель, обученная раньше max_age_days дней назад
+    или на наборе признаков, отличном от последнего обучения чемпионата.
+
+    Returns:
+        (отсутствующие модели, устаревшие модели)
+    """
+    expected_models = list(expected_models)
+    models = inventory.get('models', {})
+    missing = [name for name in expected_models if name not in models]
+
+    latest = max(models.values(), key=lambda entry: entry.get('training_date') or '', default=None)
+    current_hash = latest.get('feature_hash') if latest else None
+    cutoff = (
+        ((now or datetime.now()) - timedelta(days=max_age_days)).isoformat()
+        if max_age_days is not None else None
+    )
+
+    stale = []
+    for name in expected_models:
+        entry = models.get(name)
+        if entry is None:
+            continue
+        if current_hash and entry.get('feature_hash') != current_hash:
+            stale.append(name)
+        elif cutoff and (entry.get('training_date') or '') < cutoff:
+            stale.append(name)
+    return missing, stale
@@ -4,15 +4,20 @@
 """
 
 import os
+import json
 import logging
-from typing import Any, Dict, Optional
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 import pandas as pd
 import joblib
 import numpy as np
 from keras import models
 
-from core.types import FeatureConfig, ModelData
+from core.types import FeatureConfig, ModelData, MultiTaskData
 from core.utils import get_scalers
+from .keras_config import Config
+from .keras_bundle import BUNDLE_FILENAME, feature_hash, load_bundle, save_bundle
+from .keras_inventory import make_entry, update_inventory
 
 logger = logging.getLogger(__name__)
 
@@ -33,44 +38,214 @@ class KerasModelManager:
             feature_config: Конфигурация признаков
         """
         self.feature_config = feature_config
+        self.multitask: Optional[Dict[str, Any]] = None
+        self.bundle_version: Optional[str] = None
         self.loaded_models = self.load_models(models_dir)
 
     @staticmethod
     def save_models(
             save_dir: str,
-            models_data: Dict[str, Dict[str, Any]]
+            models_data: Dict[str, Dict[str, Any]],
+            feature_config: Optional[Dict[str, FeatureConfig]] = None
     ) -> None:
         """
         Сохранение моделей и связанных артефактов.
 
+        Скалеры и label encoder'ы всех моделей записываются одним файлом
+        (keras_bundle); joblib-файлы остаются только для объектов, которые
+        нельзя сохранить без pickle. Артефакты моделей, не вошедших в
+        models_data, сохраняются; опись моделей (keras_inventory)
+        обновляется для сохраненных моделей.
+
         Args:
             save_dir: Директория для сохранения
             models_data: Словарь с моделями и артефактами
+            feature_config: Конфигурация признаков (порядок признаков моделей)
         """
         os.makedirs(save_dir, exist_ok=True)
 
+        scalers, label_encoders, features = {}, {}, {}
+        saved: List[str] = []
         for model_name, model_data in models_data.items():
             try:
                 # Сохранение модели
                 model_path = os.path.join(save_dir, f'{model_name}_model.keras')
                 model_data['model'].save(model_path)
 
-                # Сохранение скалера (исправлено: доступ через processed_data)
-                scaler_path = os.path.join(save_dir, f'{model_name}_scaler.joblib')
-                joblib.dump(model_data['processed_data'].scaler, scaler_path)  # Исправлено
-
-                # Сохранение label encoder для классификации (исправлено)
-                if (hasattr(model_data['processed_data'], 'label_encoder') and
-                        model_data['processed_data'].label_encoder is not None):
-                    label_path = os.path.join(save_dir, f'{model_name}_label_encoder.joblib')
-                    joblib.dump(model_data['processed_data'].label_encoder, label_path)  # Исправлено
+                processed_data = model_data['processed_data']
+                scalers[model_name] = processed_data.scaler
+                if getattr(processed_data, 'label_encoder', None) is not None:
+                    label_encoders[model_name] = processed_data.label_encoder
+                if feature_config and model_name in feature_config:
+                    features[model_name] = feature_config[model_name].features
+                saved.append(model_name)
 
             except Exception as e:
                 logger.error(f'Ошибка сохранения модели {model_name}: {e}')
                 continue
 
+        # Частичное переобучение: артефакты остальных моделей переносятся
+        # в новый файл без изменений
+        try:
+            previous, _ = load_bundle(save_dir)
+        except Exception as e:
+            logger.error(f'Ошибка чтения артефактов предобработки {save_dir}: {e}')
+            previous = {}
+        for model_name, artifacts in previous.items():
+            if model_name in models_data:
+                continue
+            scalers[model_name] = artifacts['scaler']
+            if artifacts['label_encoder'] is not None:
+                label_encoders[model_name] = artifacts['label_encoder']
+            features[model_name] = artifacts['features']
+
+        unsupported, version = save_bundle(save_dir, scalers, label_encoders, features)
+        for model_name in saved:
+            scaler_path = os.path.join(save_dir, f'{model_name}_scaler.joblib')
+            label_path = os.path.join(save_dir, f'{model_name}_label_encoder.joblib')
+            if model_name in unsupported:
+                joblib.dump(scalers[model_name], scaler_path)
+                if model_name in label_encoders:
+                    joblib.dump(label_encoders[model_name], label_path)
+                continue
+            # Артефакты модели в общем файле - отдельные файлы устарели
+            for path in (scaler_path, label_path):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+        # Многозадачная модель имеет приоритет при загрузке, поэтому после
+        # обучения отдельных моделей ее артефакты удаляются
+        removed_heads = KerasModelManager._remove_multitask(save_dir)
+
+        update_inventory(
+            save_dir,
+            {
+                model_name: make_entry(
+                    save_dir, f'{model_name}_model.keras',
+                    feature_hash(features[model_name]) if model_name in features else None,
+                    models_data[model_name]
+                )
+                for model_name in saved
+            },
+            removed=[name for name in removed_heads if name not in saved],
+            bundle_version=version
+        )
+
         logger.info('Все модели и артефакты успешно сохранены.')
 
+    @staticmethod
+    def _multitask_paths(models_dir: str) -> Dict[str, str]:
+        name = Config.MULTITASK_MODEL_NAME
+        return {
+            'model': os.path.join(models_dir, f'{name}_model.keras'),
+            'scaler': os.path.join(models_dir, f'{name}_scaler.joblib'),
+            'heads': os.path.join(models_dir, f'{name}_heads.json'),
+        }
+
+    @staticmethod
+    def save_multitask_model(
+            save_dir: str,
+            model: Any,
+            data: MultiTaskData,
+            models_info: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> None:
+        """
+        Сохранение многозадачной модели: модель, общий скалер и описание
+        голов (порядок выходов, task_type, порядок признаков).
+
+        Args:
+            save_dir: Директория для сохранения
+            model: Обученная модель
+            data: Данные, на которых она обучена
+            models_info: Голова -> метрики и размер выборки (для описи)
+        """
+        os.makedirs(save_dir, exist_ok=True)
+        paths = KerasModelManager._multitask_paths(save_dir)
+        # Головы прежней модели, не вошедшие в новую, удаляются из описи
+        try:
+            with open(paths['heads'], encoding='utf-8') as f:
+                previous_heads = list(json.load(f)['heads'])
+        except (OSError, ValueError, KeyError):
+            previous_heads = []
+
+        model.save(paths['model'])
+        joblib.dump(data.scaler, paths['scaler'])
+        # Описание голов пишется последним: по нему загрузчик определяет,
+        # что многозадачная модель сохранена полностью
+        with open(paths['heads'], 'w', encoding='utf-8') as f:
+            json.dump({
+                'heads': data.task_types,
+                'features': data.features,
+                'training_date': datetime.now().isoformat()
+            }, f, ensure_ascii=False)
+
+        model_file = os.path.basename(paths['model'])
+        update_inventory(save_dir, {
+            head: make_entry(
+                save_dir, model_file, feature_hash(data.features),
+                (models_info or {}).get(head, {})
+            )
+            for head in data.task_types
+        }, removed=[head for head in previous_heads if head not in data.task_types])
+
+        logger.info(
+            f'Многозадачная модель сохранена: {len(data.task_types)} голов'
+        )
+
+    @staticmethod
+    def _remove_multitask(models_dir: str) -> List[str]:
+        """Удаление артефактов многозадачной модели; возвращает ее головы."""
+        paths = KerasModelManager._multitask_paths(models_dir)
+        try:
+            with open(paths['heads'], encoding='utf-8') as f:
+                heads = list(json.load(f)['heads'])
+        except FileNotFoundError:
+            return []
+        except (ValueError, KeyError):
+            heads = []
+        for path in paths.values():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        logger.info(f'Удалена устаревшая многозадачная модель в {models_dir}')
+        return heads
+
+    def _load_multitask(self, models_dir: str) -> Dict[str, Dict[str, Any]]:
+        """Загрузка многозадачной модели (головы как отдельные модели)."""
+        paths = self._multitask_paths(models_dir)
+        if not os.path.exists(paths['heads']):
+            return {}
+
+        try:
+            with open(paths['heads'], encoding='utf-8') as f:
+                manifest = json.load(f)
+            model = models.load_model(paths['model'])
+            scaler = joblib.load(paths['scaler'])
+        except Exception as e:
+            logger.error(f'Ошибка загрузки многозадачной модели: {e}')
+            return {}
+
+        heads = list(manifest['heads'])
+        self.multitask = {
+            'model': model,
+            'scaler': scaler,
+            'heads': heads,
+            'features': manifest['features']
+        }
+        logger.debug(f'Загружена многозадачная модель: {len(heads)} голов')
+        return {
+            model_name: {
+                'model': model,
+                'scaler': scaler,
+                'label_encoder': None,
+                'head': index
+            }
+            for index, model_name in enumerate(heads)
+        }
+
     def load_models(
             self,
             models_dir: str
@@ -84,24 +259,43 @@ class KerasModelManager:
         Returns:
             Словарь загруженных моделей
         """
-        loaded_models = {}
+        loaded_models = self._load_multitask(models_dir)
+
+        # Один листинг директории вместо проверки каждого файла
+        try:
+            files = set(os.listdir(models_dir))
+        except FileNotFoundError:
+            files = set()
+
+        bundle = {}
+        if BUNDLE_FILENAME in files:
+            try:
+                bundle, self.bundle_version = load_bundle(models_dir)
+            except Exception as e:
+                logger.error(f'Ошибка загрузки артефактов предобработки: {e}')
 
         for model_name in self.feature_config.keys():
+            if model_name in loaded_models:
+                continue
             try:
                 # Сначала ищем обычную модель, затем лучшую
-                model_path = os.path.join(models_dir, f'{model_name}_model.keras')
-                if not os.path.exists(model_path):
+                model_file = f'{model_name}_model.keras'
+                if model_file not in files:
                     # Если обычной модели нет, ищем лучшую
-                    best_model_path = os.path.join(models_dir, f'{model_name}_best_model.keras')
-                    if os.path.exists(best_model_path):
-                        model_path = best_model_path
-                        logger.debug(f'Используется лучшая модель: {model_path}')
+                    best_model_file = f'{model_name}_best_model.keras'
+                    if best_model_file in files:
+                        model_file = best_model_file
+                        logger.debug(f'Используется лучшая модель: {model_file}')
                     else:
-                        logger.debug(f'Файл модели не найден: {model_path} или {best_model_path}')
+                        logger.debug(f'Файл модели не найден: {model_file} или {best_model_file}')
                         continue
 
                 # Загрузка модели и артефактов
-                model = models.load_model(model_path)
+                model = models.load_model(os.path.join(models_dir, model_file))
+                if model_name in bundle:
+                    loaded_models[model_name] = {'model': model, **bundle[model_name]}
+                    continue
+
                 scaler = self._load_scaler(models_dir, model_name)
                 label_encoder = self._load_label_encoder(models_dir, model_name)
 
@@ -157,12 +351,23 @@ class KerasModelManager:
             scaled_features = model_data['scaler'].transform(prepared_features)
 
             prediction = model_data['model'].predict(scaled_features, verbose=0)
+            if 'head' in model_data:
+                prediction = self._head_outputs(prediction)[model_data['head']]
             return self._process_prediction(prediction, model_data)
 
         except Exception as e:
             logger.error(f'Ошибка предсказания моделью {model_name}: {e}')
             return {'error': str(e)}
 
+    @staticmethod
+    def _head_outputs(prediction: Any) -> list:
+        """Выходы многозадачной модели списком в порядке голов."""
+        if isinstance(prediction, dict):
+            return list(prediction.values())
+        if isinstance(prediction, np.ndarray):
+            return [prediction]
+        return list(prediction)
+
     @staticmethod
     def _prepare_input_features(input_features: np.ndarray) -> np.ndarray:
         """Подготовка входных признаков."""
@@ -210,12 +415,49 @@ class KerasModelManager:
         """
         batch_results = {}
 
+        if self.multitask is not None:
+            batch_results.update(self._multitask_predict(df_feature, feature_config))
+
         for model_name, config in feature_config.items():
+            if model_name in batch_results:
+                continue
             try:
-                features = df_feature[config.features].values
+                # Порядок признаков, на котором обучена модель (из общего файла)
+                columns = self.loaded_models.get(model_name, {}).get('features') or config.features
+                features = df_feature[columns].values
                 batch_results[model_name] = self.predict(model_name, features)
             except Exception as e:
                 logger.error(f'Ошибка пакетного предсказания {model_name}: {e}')
                 batch_results[model_name] = {'error': str(e)}
 
-        return batch_results
\ No newline at end of file
+        return batch_results
+
+    def _multitask_predict(
+            self,
+            df_feature: pd.DataFrame,
+            feature_config: Dict[str, FeatureConfig]
+    ) -> Dict[str, Dict[str, Any]]:
+        """Предсказание всех голов многозадачной модели за один проход."""
+        heads = [name for name in self.multitask['heads'] if name in feature_config]
+        if not heads:
+            return {}
+
+        try:
+            features = self._prepare_input_features(
+                df_feature[self.multitask['features']].values
+            )
+            scaled_features = self.multitask['scaler'].transform(features)
+            outputs = self._head_outputs(
+                self.multitask['model'].predict(scaled_features, verbose=0)
+            )
+        except Exception as e:
+            logger.error(f'Ошибка предсказания многозадачной моделью: {e}')
+            return {name: {'error': str(e)} for name in heads}
+
+        return {
+            name: self._process_prediction(
+                outputs[self.loaded_models[name]['head']],
+                self.loaded_models[name]
+            )
+            for name in heads
+        }
\ No newline at end of file
@@ -3,22 +3,72 @@
 Предобработка данных для моделей Keras.
 """
 
+import os
+import hashlib
 import logging
-from typing import Dict, Any, Tuple, Optional, List
+from typing import Dict, Any, Tuple, Optional, List, NamedTuple
 import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder, StandardScaler, RobustScaler
 from sklearn.impute import SimpleImputer
 
-from core.types import ModelData, FeatureConfig
+from core.types import ModelData, FeatureConfig, MultiTaskData
 from core.utils import (
     get_scalers, prepare_features_and_targets,
     validate_targets
 )
+from .keras_config import Config
 
 logger = logging.getLogger(__name__)
 
+# Строк на блок при записи матрицы признаков в memmap
+STORE_CHUNK_ROWS = 65536
+
+
+class SharedFeatures(NamedTuple):
+    """
+    Нормализованная матрица признаков, общая для моделей с одинаковыми
+    признаками и нормализацией. Строки переставлены так, что первые
+    n_train - обучающая выборка: train/test - срезы (views) матрицы.
+    """
+    matrix: np.ndarray
+    scaler: Any
+    order: np.ndarray
+    n_train: int
+
+
+def make_dataset(
+        X: np.ndarray,
+        y: np.ndarray,
+        batch_size: int,
+        shuffle: bool = False,
+        seed: int = Config.RANDOM_STATE
+):
+    """
+    tf.data-конвейер по батчам из (memmap) массивов: в память читаются
+    только строки текущего батча, следующий готовится заранее (prefetch).
+    """
+    import tensorflow as tf
+
+    size = len(X)
+    rng = np.random.default_rng(seed)
+
+    def batches():
+        index = rng.permutation(size) if shuffle else np.arange(size)
+        for start in range(0, size, batch_size):
+            rows = np.sort(index[start:start + batch_size])
+            yield np.asarray(X[rows], dtype=np.float32), np.asarray(y[rows])
+
+    dataset = tf.data.Dataset.from_generator(
+        batches,
+        output_signature=(
+            tf.TensorSpec(shape=(None, X.shape[1]), dtype=tf.float32),
+            tf.TensorSpec(shape=(None,) + y.shape[1:], dtype=tf.as_dtype(y.dtype)),
+        )
+    )
+    return dataset.prefetch(tf.data.AUTOTUNE)
+
 
 class OverfittingMonitor:
     """Монитор для обнаружения переобучения."""
@@ -61,11 +111,16 @@ class DataPreprocessor:
         self,
         features: pd.DataFrame,
         target: pd.DataFrame,
-        feature_config: Dict[str, FeatureConfig]
+        feature_config: Dict[str, FeatureConfig],
+        feature_cache_dir: Optional[str] = None
     ) -> None:
         self.original_features = features
         self.original_target = target
         self.feature_config = feature_config
+        # Директория общих матриц признаков (.npy); None - матрицы в памяти
+        # для каждой модели отдельно
+        self.feature_cache_dir = feature_cache_dir
+        self._shared_features: Dict[Tuple[Tuple[str, ...], str], SharedFeatures] = {}
 
         # Очищаем и валидируем данные
         self.features, self.target = prepare_features_and_targets(
@@ -79,6 +134,11 @@ class DataPreprocessor:
         processed_data = {}
 
         for model_name, config in self.feature_config.items():
+            if self.feature_cache_dir:
+                model_data = self._process_shared_model(config, model_name)
+                if model_data is not None:
+                    processed_data[model_name] = model_data
+                continue
             try:
                 # # Получаем данные для конкретной модели
                 X_raw = self.features[config.features].values
@@ -106,6 +166,159 @@ class DataPreprocessor:
 
         return processed_data
 
+    def preprocess_multitask(self) -> Optional[MultiTaskData]:
+        """
+        Предобработка для многозадачной модели: признаки нормализуются
+        одним скалером, выборка делится на train/test один раз для всех
+        целевых переменных. Головы строятся для бинарных (One-Hot) и
+        регрессионных таргетов; модели с LabelEncoder пропускаются.
+        """
+        configs = list(self.feature_config.items())
+        if not configs:
+            return None
+
+        first_name, first_config = configs[0]
+        for model_name, config in configs[1:]:
+            if (config.features != first_config.features or
+                    config.normalization_method != first_config.normalization_method):
+                logger.error(
+                    f'Модель {model_name}: признаки или нормализация отличаются '
+                    f'от {first_name}, многозадачная модель невозможна'
+                )
+                return None
+
+        X, scaler = self._normalize_features(first_config, Config.MULTITASK_MODEL_NAME)
+        if X is None:
+            return None
+
+        targets, task_types = {}, {}
+        for model_name, config in configs:
+            target_data = self._validate_model_target(config.target, model_name)
+            if target_data is None:
+                continue
+            y, label_encoder, _ = self._prepare_target(target_data, config, model_name)
+            if y is None:
+                continue
+            if label_encoder is not None:
+                logger.warning(
+                    f'Модель {model_name}: многоклассовый таргет не '
+                    f'поддерживается многозадачной моделью'
+                )
+                continue
+            targets[model_name] = y.astype(np.float32)
+            task_types[model_name] = config.task_type
+
+        if not targets:
+            return None
+
+        train_index, test_index = train_test_split(
+            np.arange(len(X)), test_size=0.2, random_state=42
+        )
+        X = X.astype(np.float32)
+        return MultiTaskData(
+            X_train=X[train_index],
+            X_test=X[test_index],
+            y_train={name: y[train_index] for name, y in targets.items()},
+            y_test={name: y[test_index] for name, y in targets.items()},
+            scaler=scaler,
+            features=list(first_config.features),
+            task_types=task_types
+        )
+
+    def _get_shared_features(
+            self,
+            config: FeatureConfig,
+            model_name: str
+    ) -> Optional[SharedFeatures]:
+        """
+        Общая матрица признаков для набора признаков и метода нормализации:
+        нормализуется и делится на train/test один раз, сохраняется в .npy
+        и открывается как memmap.
+        """
+        key = (tuple(config.features), config.normalization_method)
+        shared = self._shared_features.get(key)
+        if shared is not None:
+            return shared
+
+        X, scaler = self._normalize_features(config, model_name)
+        if X is None:
+            return None
+
+        train_index, test_index = train_test_split(
+            np.arange(len(X)), test_size=0.2, random_state=Config.RANDOM_STATE
+        )
+        order = np.concatenate([train_index, test_index])
+        matrix = self._store_matrix(key, X, order)
+        # Полная float64-матрица больше не нужна: обучение читает memmap
+        del X
+
+        shared = SharedFeatures(matrix, scaler, order, len(train_index))
+        self._shared_features[key] = shared
+        return shared
+
+    def _store_matrix(
+            self,
+            key: Tuple[Tuple[str, ...], str],
+            X: np.ndarray,
+            order: np.ndarray
+    ) -> np.ndarray:
+        """
+        Запись строк X в порядке order в .npy (float32, атомарно) и
+        открытие файла как memmap. Строки переставляются и приводятся к
+        float32 блоками прямо в memmap, без полных копий матрицы в памяти.
+        """
+        os.makedirs(self.feature_cache_dir, exist_ok=True)
+        digest = hashlib.md5(repr(key).encode('utf-8')).hexdigest()[:16]
+        path = os.path.join(self.feature_cache_dir, f'features_{digest}.npy')
+        tmp_path = f'{path[:-4]}.{os.getpid()}.tmp.npy'
+
+        shape = (len(order), X.shape[1])
+        target = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.float32, shape=shape)
+        for start in range(0, len(order), STORE_CHUNK_ROWS):
+            rows = order[start:start + STORE_CHUNK_ROWS]
+            target[start:start + len(rows)] = X[rows]
+        target.flush()
+        del target
+
+        os.replace(tmp_path, path)
+        logger.debug(f'Матрица признаков {shape} сохранена в {path}')
+        return np.load(path, mmap_mode='r')
+
+    def _process_shared_model(
+            self,
+            config: FeatureConfig,
+            model_name: str
+    ) -> Optional[ModelData]:
+        """Данные модели как срезы общей матрицы признаков."""
+        try:
+            shared = self._get_shared_features(config, model_name)
+            if shared is None:
+                return None
+
+            target_data = self._validate_model_target(config.target, model_name)
+            if target_data is None:
+                return None
+            y, label_encoder, num_classes = self._prepare_target(
+                target_data, config, model_name
+            )
+            if y is None:
+                return None
+
+            y = y[shared.order]
+            return ModelData(
+                X_train=shared.matrix[:shared.n_train],
+                X_test=shared.matrix[shared.n_train:],
+                y_train=y[:shared.n_train],
+                y_test=y[shared.n_train:],
+                scaler=shared.scaler,
+                label_encoder=label_encoder,
+                task_type=config.task_type,
+                num_classes=num_classes
+            )
+
+        except Exception as e:
+            logger.error(f'Ошибка предобработки для модели {model_name}: {e}')
+            return None
 
     def _process_single_model(
             self,
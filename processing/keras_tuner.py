@@ -0,0 +1,221 @@
+# izhbet/processing/keras_tuner.py
+"""
+Подбор гиперпараметров моделей Keras по чемпионатам.
+
+Successive halving: случайные конфигурации (ширина и глубина сети,
+dropout, L1/L2, learning rate, размер батча) обучаются с малым числом эпох,
+в следующий раунд проходит лучшая 1/eta по val_loss с бюджетом эпох,
+увеличенным в eta раз. Внутри испытания обучение обрывается по кривой
+валидации (EarlyStopping). Испытания раунда выполняются в пуле процессов
+на CPU. Лучшая конфигурация сохраняется в директорию моделей чемпионата
+(Config.TUNING_FILENAME) по типу модели и используется
+Config.get_model_config.
+"""
+
+import os
+import json
+import math
+import random
+import logging
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.types import FeatureConfig, ModelData
+from .keras_config import Config
+
+logger = logging.getLogger(__name__)
+
+SEARCH_SPACE = {
+    'width': (16, 32, 64, 128, 256),
+    'depth': (1, 2, 3, 4, 5),
+    'dropout_rate': (0.1, 0.2, 0.3, 0.4, 0.5),
+    'l1_reg': (0.0, 1e-5, 1e-4, 1e-3),
+    'l2_reg': (0.0, 1e-5, 1e-4, 1e-3),
+    'learning_rate': (3e-4, 1e-3, 3e-3),
+    'batch_size': (32, 64, 128, 256),
+}
+
+
+def sample_configs(n_trials: int, seed: int = Config.RANDOM_STATE) -> List[Dict[str, Any]]:
+    """Случайные различающиеся конфигурации из SEARCH_SPACE."""
+    rng = random.Random(seed)
+    configs, seen = [], set()
+    space_size = math.prod(len(values) for values in SEARCH_SPACE.values())
+    while len(configs) < min(n_trials, space_size):
+        params = {key: rng.choice(values) for key, values in SEARCH_SPACE.items()}
+        key = tuple(params.values())
+        if key in seen:
+            continue
+        seen.add(key)
+        # Сужающаяся к выходу "пирамида" слоев
+        params['units'] = tuple(max(8, params['width'] >> block) for block in range(params['depth']))
+        configs.append(params)
+    return configs
+
+
+def _run_trial(
+        data_path: str,
+        task_type: str,
+        num_classes: int,
+        params: Dict[str, Any],
+        epochs: int,
+        seed: int
+) -> float:
+    """Обучение одной конфигурации; лучший val_loss на кривой валидации."""
+    # Испытания выполняются на CPU, GPU (если есть) остается основному обучению
+    os.environ['CUDA_VISIBLE_DEVICES'] = '-1'
+    from keras import callbacks, utils
+    from .keras_builder import KerasModelBuilder
+
+    utils.set_random_seed(seed)
+    with np.load(data_path) as data:
+        X_train, y_train = data['X_train'], data['y_train']
+        X_val, y_val = data['X_val'], data['y_val']
+
+    model = KerasModelBuilder.create_advanced_model(
+        input_shape=X_train.shape[1],
+        task_type=task_type,
+        num_classes=num_classes,
+        l1_reg=params['l1_reg'],
+        l2_reg=params['l2_reg'],
+        dropout_rate=params['dropout_rate'],
+        initial_learning_rate=params['learning_rate'],
+        units=params['units']
+    )
+    history = model.fit(
+        X_train, y_train,
+        validation_data=(X_val, y_val),
+        epochs=epochs,
+        batch_size=params['batch_size'],
+        callbacks=[callbacks.EarlyStopping(
+            monitor='val_loss', patience=max(2, epochs // 5), verbose=0
+        )],
+        verbose=0
+    )
+    val_loss = np.asarray(history.history.get('val_loss', []), dtype=float)
+    val_loss = val_loss[np.isfinite(val_loss)]
+    return float(val_loss.min()) if val_loss.size else math.inf
+
+
+def successive_halving(
+        model_data: ModelData,
+        n_trials: int = Config.TUNING_TRIALS,
+        min_epochs: int = Config.TUNING_MIN_EPOCHS,
+        max_epochs: int = Config.EPOCHS,
+        eta: int = Config.TUNING_ETA,
+        max_workers: int = Config.TUNING_WORKERS
+) -> Optional[Tuple[Dict[str, Any], float]]:
+    """
+    Подбор гиперпараметров для данных одной модели.
+
+    Returns:
+        (лучшая конфигурация, ее val_loss) или None, если ни одно
+        испытание не завершилось
+    """
+    with tempfile.TemporaryDirectory(prefix='keras_tuning_') as tmp_dir:
+        # Данные пишутся один раз, процессы читают их из файла
+        data_path = os.path.join(tmp_dir, 'data.npz')
+        np.savez(
+            data_path,
+            X_train=model_data.X_train, y_train=model_data.y_train,
+            X_val=model_data.X_test, y_val=model_data.y_test
+        )
+
+        candidates = sample_configs(n_trials)
+        epochs = min_epochs
+        scores: List[float] = []
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=get_context('spawn')) as pool:
+            while True:
+                futures = [
+                    pool.submit(
+                        _run_trial, data_path, model_data.task_type, model_data.num_classes,
+                        params, epochs, Config.RANDOM_STATE
+                    )
+                    for params in candidates
+                ]
+                scores = []
+                for params, future in zip(candidates, futures):
+                    try:
+                        scores.append(future.result())
+                    except Exception as e:
+                        logger.warning(f'Испытание {params} завершилось ошибкой: {e}')
+                        scores.append(math.inf)
+
+                logger.info(
+                    f'Раунд: {len(candidates)} конфигураций по {epochs} эпох, '
+                    f'лучший val_loss {min(scores):.4f}'
+                )
+                # Последний раунд: следующий оставил бы одну конфигурацию
+                if len(candidates) <= eta or epochs >= max_epochs:
+                    break
+
+                keep = max(1, len(candidates) // eta)
+                order = np.argsort(scores, kind='stable')[:keep]
+                candidates = [candidates[index] for index in order]
+                epochs = min(max_epochs, epochs * eta)
+
+    best = int(np.argmin(scores))
+    if not math.isfinite(scores[best]):
+        return None
+    return candidates[best], scores[best]
+
+
+def tune_championship(
+        models_dir: str,
+        processed_data: Dict[str, ModelData],
+        feature_config: Dict[str, FeatureConfig],
+        force: bool = False
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Подбор гиперпараметров чемпионата по группам (типам моделей).
+
+    Для каждого типа моделей без сохраненной конфигурации (или при force)
+    подбор выполняется на данных первой модели группы, результат
+    дописывается в Config.get_tuning_path(models_dir).
+
+    Returns:
+        Подобранные конфигурации по типам моделей
+    """
+    tuned = Config.get_tuned_configs(models_dir)
+
+    groups: Dict[str, str] = {}
+    for model_name, model_data in processed_data.items():
+        task_type = feature_config[model_name].task_type
+        if model_data.label_encoder is None:
+            groups.setdefault(task_type, model_name)
+
+    changed = False
+    for task_type, model_name in groups.items():
+        if task_type in tuned and not force:
+            continue
+        logger.info(f'Подбор гиперпараметров ({task_type}) на модели {model_name}')
+        result = successive_halving(processed_data[model_name])
+        if result is None:
+            logger.warning(f'Подбор гиперпараметров ({task_type}) не дал результата')
+            continue
+
+        params, val_loss = result
+        tuned[task_type] = {
+            **{key: params[key] for key in Config.TUNED_KEYS},
+            'units': list(params['units']),
+            'val_loss': val_loss,
+            'model_name': model_name,
+            'tuned_at': datetime.now().isoformat()
+        }
+        changed = True
+        logger.info(f'Гиперпараметры ({task_type}): {tuned[task_type]}')
+
+    if changed:
+        os.makedirs(models_dir, exist_ok=True)
+        path = Config.get_tuning_path(models_dir)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(tuned, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+    return tuned
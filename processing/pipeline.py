@@ -5,12 +5,13 @@
 
 import logging
 from abc import ABC, abstractmethod
-from multiprocessing import JoinableQueue
+from multiprocessing import JoinableQueue, Queue
 from typing import Any, Dict, List, Optional
 import pandas as pd
 
 from core.constants import ACTION_MODEL
 from core.consumer import Consumer
+from core.telemetry import get_tracer
 from .datasource import DataSource
 from .balancing_config import DataProcessor
 from .datastorage import DataStorage
@@ -62,13 +63,16 @@ class EmbeddingCalculationPipeline:
             List[int]: Список ID обработанных турниров
         """
         is_create_model = action == ACTION_MODEL[0]
-        self.data_source.retrieve(is_create_model)
+        tracer = get_tracer()
+        with tracer.span('retrieve'):
+            self.data_source.retrieve(is_create_model)
 
         if not self.data_source.tournaments_id:
             logger.warning('Нет турниров для обработки')
             return []
 
-        self._process_tournaments_parallel(action)
+        with tracer.span('tournaments', count=len(self.data_source.tournaments_id)):
+            self._process_tournaments_parallel(action)
         
         # Возвращаем список ID турниров для дальнейшего использования
         return self.data_source.tournaments_id.copy()
@@ -76,11 +80,12 @@ class EmbeddingCalculationPipeline:
     def _process_tournaments_parallel(self, action: str) -> None:
         """Многопроцессорная обработка турниров."""
         tasks = JoinableQueue()
+        results = Queue()
 
         # Создание потребителей
         number_consumers = min(10, len(self.data_source.tournaments_id))
         consumers = [
-            Consumer(tasks, None) for _ in range(number_consumers)
+            Consumer(tasks, results) for _ in range(number_consumers)
         ]
 
         for consumer in consumers:
@@ -102,7 +107,10 @@ class EmbeddingCalculationPipeline:
             tasks.put(None)
 
         tasks.join()
-        
+
+        # Телеметрия турниров (до join, чтобы очередь результатов не блокировала выход)
+        get_tracer().collect(results, len(self.data_source.tournaments_id))
+
         # Ждем завершения всех потребителей
         for consumer in consumers:
             consumer.join()
@@ -126,6 +134,7 @@ class TournamentTask:
         self.data_processor = data_processor
         self.data_storage = data_storage
         self.tournament_id = tournament_id
+        self.rows = 0
 
     def process(self) -> None:
         """Обработка одного турнира."""
@@ -137,6 +146,7 @@ class TournamentTask:
 
                 # Выборка данных турнира
                 df_match = self.data_source.select_data(self.tournament_id)
+                self.rows = len(df_match)
 
                 if df_match.empty:
                     logger.warning(
@@ -3,6 +3,7 @@
 Модуль для работы с предсказаниями на Keras с интеграцией мониторинга.
 """
 
+import os
 import logging
 import json
 from typing import Any, Dict, Optional, List
@@ -16,8 +17,9 @@ from core.evaluation import NumpyEncoder, ModelEvaluator, DataQualityMonitor
 from core.utils import prepare_features_and_targets
 from .keras_manager import KerasModelManager
 from .keras_builder import KerasModelBuilder
-from .keras_preprocessor import DataPreprocessor
+from .keras_preprocessor import DataPreprocessor, make_dataset
 from .keras_config import Config
+from .keras_tuner import tune_championship
 from db.queries.match import get_match_id_pool
 from db.storage.metric import save_metrics
 
@@ -29,11 +31,18 @@ def train_and_save_keras(
         df_feature: pd.DataFrame,
         df_target: pd.DataFrame,
         feature_config: Dict[str, FeatureConfig],
-        championship_info: Optional[Dict[str, Any]] = None
+        championship_info: Optional[Dict[str, Any]] = None,
+        multitask: Optional[bool] = None
 ) -> Dict[str, Any]:
     """
     Обучение и сохранение моделей Keras с интеграцией мониторинга.
+
+    При multitask (по умолчанию Config.MULTITASK_ENABLED) обучается одна
+    многозадачная модель с головой на каждую целевую переменную.
     """
+    if multitask is None:
+        multitask = Config.MULTITASK_ENABLED
+
     try:
         logger.info("Начинаем train_and_save_keras")
         
@@ -72,8 +81,17 @@ def train_and_save_keras(
         preprocessor = DataPreprocessor(
             df_feature_cleaned,
             df_target_validated,
-            feature_config
+            feature_config,
+            feature_cache_dir=(
+                os.path.join(models_dir, Config.FEATURE_CACHE_DIRNAME)
+                if Config.FEATURE_MMAP_ENABLED else None
+            )
         )
+        if multitask:
+            return _train_and_save_multitask(
+                models_dir, preprocessor, feature_config, championship_info
+            )
+
         # logger.info("Вызываем preprocess_data")
         processed_data = preprocessor.preprocess_data()
         # logger.info(f"preprocess_data завершен: {len(processed_data)} моделей")
@@ -84,6 +102,9 @@ def train_and_save_keras(
             )
             return {}
 
+        if Config.TUNING_ENABLED:
+            tune_championship(models_dir, processed_data, feature_config)
+
         trained_models = {}
         # logger.info("Создаем KerasModelManager")
         model_manager = KerasModelManager(models_dir, feature_config)
@@ -144,7 +165,7 @@ def train_and_save_keras(
         # Сохранение моделей
         logger.info(f"Сохраняем {len(trained_models)} моделей")
         if trained_models:
-            model_manager.save_models(models_dir, trained_models)
+            model_manager.save_models(models_dir, trained_models, feature_config)
 
         # logger.info("train_and_save_keras завершен успешно")
         return trained_models
@@ -154,6 +175,87 @@ def train_and_save_keras(
         return {}
 
 
+def _train_and_save_multitask(
+        models_dir: str,
+        preprocessor: DataPreprocessor,
+        feature_config: Dict[str, FeatureConfig],
+        championship_info: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Обучение многозадачной модели: общий ствол, по голове на модель из
+    feature_config. Результат - словарь в формате train_and_save_keras
+    (одна запись на голову).
+    """
+    data = preprocessor.preprocess_multitask()
+    if data is None:
+        logger.warning("Нет данных для обучения многозадачной модели")
+        return {}
+
+    heads = list(data.task_types)
+    model_config = Config.get_model_config('classification', models_dir)
+    logger.info(f"Обучаем многозадачную модель: {len(heads)} голов")
+
+    model = KerasModelBuilder.create_multitask_model(
+        input_shape=data.X_train.shape[1],
+        heads=data.task_types,
+        l1_reg=model_config['l1_reg'],
+        l2_reg=model_config['l2_reg'],
+        dropout_rate=model_config['dropout_rate'],
+        initial_learning_rate=model_config['learning_rate'],
+        regression_loss_weight=Config.MULTITASK_REGRESSION_LOSS_WEIGHT,
+        trunk_units=model_config['units']
+    )
+    callbacks_list = KerasModelBuilder.create_callbacks(
+        models_dir, Config.MULTITASK_MODEL_NAME,
+        patience=model_config['patience'],
+        min_delta=model_config['min_delta']
+    )
+    model.fit(
+        data.X_train,
+        [data.y_train[name] for name in heads],
+        validation_data=(data.X_test, [data.y_test[name] for name in heads]),
+        epochs=Config.EPOCHS,
+        batch_size=model_config['batch_size'],
+        callbacks=callbacks_list,
+        verbose=0
+    )
+
+    y_pred = model.predict(data.X_test, verbose=0)
+    if len(heads) == 1:
+        y_pred = [y_pred]
+
+    evaluator = ModelEvaluator()
+    trained_models = {}
+    training_date = datetime.now().isoformat()
+    for name, head_pred in zip(heads, y_pred):
+        if data.task_types[name] == 'classification':
+            metrics = evaluator.evaluate_classification(
+                data.y_test[name], (head_pred[:, 0] > 0.5).astype(int), name
+            )
+        else:
+            metrics = evaluator.evaluate_regression(
+                data.y_test[name], head_pred.flatten(), name
+            )
+
+        trained_models[name] = {
+            'model': model,
+            'processed_data': data,
+            'metrics': metrics,
+            'sample_size': len(data.X_train) + len(data.X_test),
+            'feature_count': len(data.features),
+            'training_date': training_date,
+            'model_type': data.task_types[name]
+        }
+
+        if Config.MONITORING_ENABLED and championship_info:
+            _save_training_metrics_for_monitoring(
+                name, metrics, trained_models[name], championship_info
+            )
+
+    KerasModelManager.save_multitask_model(models_dir, model, data, trained_models)
+    return trained_models
+
+
 def _create_and_train_model(
         model_name: str,
         model_data: Any,
@@ -164,7 +266,7 @@ def _create_and_train_model(
     try:
         # Получаем конфигурацию для типа модели из feature_config
         model_type = feature_config[model_name].task_type
-        model_config = Config.get_model_config(model_type)
+        model_config = Config.get_model_config(model_type, models_dir)
 
         # Определяем num_classes для классификации
         num_classes = None
@@ -180,7 +282,8 @@ def _create_and_train_model(
             l1_reg=model_config['l1_reg'],
             l2_reg=model_config['l2_reg'],
             dropout_rate=model_config['dropout_rate'],
-            initial_learning_rate=model_config['learning_rate']
+            initial_learning_rate=model_config['learning_rate'],
+            units=model_config['units']
         )
 
         callbacks_list = KerasModelBuilder.create_callbacks(
@@ -205,15 +308,25 @@ def _create_and_train_model(
             # y_train уже должен быть encoded (целые числа)
             pass
 
-        history = model.fit(
-            X_train,
-            y_train,
-            validation_data=(X_val, y_val),
-            epochs=Config.EPOCHS,
-            batch_size=Config.BATCH_SIZE,
-            callbacks=callbacks_list,
-            verbose=0
-        )
+        if isinstance(X_train, np.memmap):
+            # Признаки на диске: батчи читаются из memmap через tf.data
+            history = model.fit(
+                make_dataset(X_train, y_train, model_config['batch_size'], shuffle=True),
+                validation_data=make_dataset(X_val, y_val, model_config['batch_size']),
+                epochs=Config.EPOCHS,
+                callbacks=callbacks_list,
+                verbose=0
+            )
+        else:
+            history = model.fit(
+                X_train,
+                y_train,
+                validation_data=(X_val, y_val),
+                epochs=Config.EPOCHS,
+                batch_size=model_config['batch_size'],
+                callbacks=callbacks_list,
+                verbose=0
+            )
 
         return model
 
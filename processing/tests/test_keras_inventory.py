@@ -0,0 +1,72 @@
+# tests/test_keras_inventory.py
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from processing.keras_inventory import diff_inventory, load_inventory, update_inventory
+
+NOW = datetime(2025, 6, 1, 12, 0)
+
+
+def entry(feature_hash="h1", days_ago=0):
+    return {
+        "file": "model.keras",
+        "feature_hash": feature_hash,
+        "training_date": (NOW - timedelta(days=days_ago)).isoformat(),
+    }
+
+
+def test_update_inventory_replaces_removes_and_keeps(tmp_path):
+    models_dir = str(tmp_path / "models")
+    update_inventory(models_dir, {"a": entry(), "b": entry(), "c": entry()}, bundle_version="v1")
+
+    inventory = update_inventory(models_dir, {"a": entry("h2")}, removed=["c"], bundle_version="v2")
+
+    assert inventory == load_inventory(models_dir)
+    assert set(inventory["models"]) == {"a", "b"}
+    assert inventory["models"]["a"]["feature_hash"] == "h2"
+    assert inventory["bundle_version"] == "v2"
+
+
+def test_update_inventory_serializes_numpy_metrics(tmp_path):
+    metrics = {"accuracy": np.float32(0.5), "confusion": np.array([[1, 2], [3, 4]])}
+    update_inventory(str(tmp_path), {"a": dict(entry(), metrics=metrics)})
+
+    loaded = load_inventory(str(tmp_path))["models"]["a"]["metrics"]
+    assert loaded == {"accuracy": 0.5, "confusion": [[1, 2], [3, 4]]}
+
+
+def test_load_inventory_missing_or_corrupt(tmp_path):
+    assert load_inventory(str(tmp_path)) is None
+    (tmp_path / "inventory.json").write_text("{broken", encoding="utf-8")
+    assert load_inventory(str(tmp_path)) is None
+
+
+def test_diff_missing_models():
+    inventory = {"models": {"a": entry()}}
+
+    missing, stale = diff_inventory(inventory, ["a", "b", "c"], now=NOW)
+
+    assert missing == ["b", "c"]
+    assert stale == []
+
+
+def test_diff_stale_by_feature_hash():
+    # Последнее обучение чемпионата задает текущий набор признаков
+    inventory = {"models": {"a": entry("h2", days_ago=0), "b": entry("h1", days_ago=3)}}
+
+    missing, stale = diff_inventory(inventory, ["a", "b"], now=NOW)
+
+    assert missing == []
+    assert stale == ["b"]
+
+
+def test_diff_stale_by_age():
+    inventory = {"models": {"a": entry(days_ago=1), "b": entry(days_ago=40)}}
+
+    assert diff_inventory(inventory, ["a", "b"], max_age_days=30, now=NOW) == ([], ["b"])
+    assert diff_inventory(inventory, ["a", "b"], now=NOW) == ([], [])
+
+
+def test_diff_empty_inventory():
+    assert diff_inventory({}, ["a"], now=NOW) == (["a"], [])
@@ -13,6 +13,7 @@ sys.path.append('.')
 
 from publisher.simple_service import SimplePublisherService
 from publisher.cli import PublisherCLI
+from core import telemetry
 
 logger = logging.getLogger(__name__)
 
@@ -32,7 +33,8 @@ def main():
         cli.log_run_header(time_frame, year)
         
         # Выполняем режим
-        service.execute_mode(time_frame, year)
+        with telemetry.run('publisher', mode=time_frame):
+            service.execute_mode(time_frame, year)
         
         # Выводим сообщение о завершении
         cli.log_completion()
@@ -0,0 +1,471 @@
+# izhbet/publisher/bus.py
+"""
+Асинхронная шина публикации отчетов.
+
+Отчет ставится в очередь один раз и параллельно рассылается во все
+приемники (sinks): Telegram, VK и файловые публикаторы. Для каждого
+приемника задаются лимит длины сообщения (разбиение на части), частота
+отправки, число одновременных отправок и повторы с экспоненциальной
+задержкой. Отправленные части отмечаются в журнале доставки (SQLite)
+по ключу идемпотентности, поэтому повторный запуск не дублирует посты.
+
+Переменные окружения:
+    PUBLICATION_BUS - 0, чтобы публиковать синхронно без шины
+    PUBLICATION_DELIVERY_LOG - файл журнала доставки
+    TELEGRAM_TOKEN, TELEGRAM_CHAT_ID, TELEGRAM_API_URL - приемник Telegram
+    VK_TOKEN, VK_GROUP_ID, VK_API_URL - приемник VK
+"""
+
+import asyncio
+import atexit
+import hashlib
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from publisher.conformal_sending import ConformalPublisher
+
+logger = logging.getLogger(__name__)
+
+# Поля сообщения, которые не являются текстом отчета
+MESSAGE_META_FIELDS = {'date', 'report_type', 'folder_type', 'tournament_id'}
+
+
+class RetryableError(Exception):
+    """Временная ошибка приемника (лимит запросов, ошибка сервера, сеть)."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def message_text(message: Any) -> str:
+    """Текст отчета из сообщения публикатора (строка или словарь с отчетами)."""
+    if isinstance(message, dict):
+        return ''.join(
+            str(value) for name, value in message.items()
+            if name not in MESSAGE_META_FIELDS and value
+        )
+    return str(message)
+
+
+def split_message(text: str, limit: Optional[int]) -> List[str]:
+    """
+    Делит текст на части не длиннее limit.
+
+    Части режутся по пустым строкам между блоками, затем по строкам и
+    только в крайнем случае - посередине строки.
+    """
+    if not text:
+        return []
+    if not limit or len(text) <= limit:
+        return [text]
+
+    parts: List[str] = []
+    current = ''
+    for block in text.split('\n\n'):
+        block = block + '\n\n'
+        pieces = [block] if len(block) <= limit else _split_long(block, limit)
+        for piece in pieces:
+            if current and len(current) + len(piece) > limit:
+                parts.append(current)
+                current = ''
+            current += piece
+    if current:
+        parts.append(current)
+    return [part.rstrip('\n') for part in parts if part.strip()]
+
+
+def _split_long(block: str, limit: int) -> List[str]:
+    """Делит блок длиннее limit по строкам (длинные строки - по limit символов)."""
+    pieces = []
+    for line in block.splitlines(keepends=True):
+        while len(line) > limit:
+            pieces.append(line[:limit])
+            line = line[limit:]
+        if line:
+            pieces.append(line)
+    return pieces
+
+
+class RateLimiter:
+    """Ограничивает частоту отправок приемника: не чаще rate в секунду."""
+
+    def __init__(self, rate: Optional[float]):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next_at = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_at - now
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_at = max(now, self._next_at) + self.interval
+
+
+class DeliveryLog:
+    """Журнал доставленных частей сообщений (ключи идемпотентности) в SQLite."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS deliveries ('
+            'sink TEXT NOT NULL, key TEXT NOT NULL, part INTEGER NOT NULL, '
+            'delivered_at REAL NOT NULL, PRIMARY KEY (sink, key, part))'
+        )
+
+    def is_delivered(self, sink: str, key: str, part: int) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT 1 FROM deliveries WHERE sink = ? AND key = ? AND part = ?', (sink, key, part)
+            ).fetchone()
+        return row is not None
+
+    def mark_delivered(self, sink: str, key: str, part: int) -> None:
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO deliveries (sink, key, part, delivered_at) VALUES (?, ?, ?, ?)',
+                (sink, key, part, time.time())
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class Sink:
+    """
+    Приемник публикаций.
+
+    prepare() превращает сообщение в последовательность частей, deliver()
+    отправляет одну часть. Части одного сообщения отправляются по порядку.
+    """
+
+    name = 'sink'
+    # Приемник сам по себе идемпотентен (перезапись файла) - журнал не нужен
+    idempotent = False
+
+    def __init__(
+        self,
+        max_length: Optional[int] = None,
+        rate: Optional[float] = None,
+        concurrency: int = 1,
+        max_attempts: int = 4,
+        backoff: float = 1.0,
+        max_backoff: float = 60.0
+    ):
+        self.max_length = max_length
+        self.limiter = RateLimiter(rate)
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    def prepare(self, message: Any) -> List[Any]:
+        return split_message(message_text(message), self.max_length)
+
+    def part_key(self, part: Any) -> str:
+        """Ключ идемпотентности части по ее содержимому."""
+        return hashlib.sha256(str(part).encode('utf-8')).hexdigest()
+
+    async def deliver(self, part: Any) -> None:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+class PublisherSink(Sink):
+    """Синхронный публикатор (файловый и т.п.), вызываемый в пуле потоков."""
+
+    idempotent = True
+
+    def __init__(self, publisher: Any, name: Optional[str] = None, concurrency: int = 4, **kwargs):
+        super().__init__(concurrency=concurrency, **kwargs)
+        self.publisher = publisher
+        self.name = name or type(publisher).__name__
+
+    def prepare(self, message: Any) -> List[Any]:
+        return [message]
+
+    async def deliver(self, part: Any) -> None:
+        await asyncio.to_thread(self.publisher.publish, part)
+
+
+class HttpSink(Sink):
+    """Приемник с HTTP API (aiohttp-сессия создается в цикле шины)."""
+
+    def __init__(self, base_url: str, timeout: float = 30.0, **kwargs):
+        super().__init__(**kwargs)
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self._session = None
+
+    async def _post(self, url: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        import aiohttp
+
+        if self._session is None:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout))
+        try:
+            async with self._session.post(url, data=data) as response:
+                try:
+                    payload = await response.json(content_type=None)
+                except ValueError:
+                    payload = {}
+                if response.status == 429 or response.status >= 500:
+                    retry_after = response.headers.get('Retry-After')
+                    raise RetryableError(
+                        f'{self.name}: HTTP {response.status}',
+                        float(retry_after) if retry_after else None
+                    )
+                if response.status >= 400:
+                    raise RuntimeError(f'{self.name}: HTTP {response.status} {payload}')
+                return payload or {}
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise RetryableError(f'{self.name}: {e}') from e
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+class TelegramSink(HttpSink):
+    """Публикация в канал/чат Telegram (Bot API sendMessage)."""
+
+    name = 'telegram'
+
+    def __init__(self, token: str, chat_id: str, base_url: str = 'https://api.telegram.org',
+                 rate: float = 1.0, **kwargs):
+        super().__init__(base_url, max_length=4096, rate=rate, **kwargs)
+        self.token = token
+        self.chat_id = chat_id
+        self.name = f'telegram:{chat_id}'
+
+    async def deliver(self, part: str) -> None:
+        payload = await self._post(
+            f'{self.base_url}/bot{self.token}/sendMessage',
+            {'chat_id': self.chat_id, 'text': part, 'disable_web_page_preview': 'true'}
+        )
+        if not payload.get('ok', True):
+            raise RuntimeError(f'{self.name}: {payload.get("description")}')
+
+
+class VkSink(HttpSink):
+    """Публикация на стену группы VK (wall.post)."""
+
+    name = 'vk'
+    # Коды VK API: слишком много запросов, внутренняя ошибка, flood control
+    RETRYABLE_ERRORS = {6, 9, 10}
+
+    def __init__(self, token: str, group_id: int, base_url: str = 'https://api.vk.com/method',
+                 api_version: str = '5.199', rate: float = 3.0, **kwargs):
+        super().__init__(base_url, max_length=15000, rate=rate, **kwargs)
+        self.token = token
+        self.group_id = int(group_id)
+        self.api_version = api_version
+        self.name = f'vk:{group_id}'
+
+    async def deliver(self, part: str) -> None:
+        payload = await self._post(f'{self.base_url}/wall.post', {
+            'owner_id': -self.group_id,
+            'from_group': 1,
+            'message': part,
+            'access_token': self.token,
+            'v': self.api_version
+        })
+        error = payload.get('error')
+        if error:
+            if error.get('error_code') in self.RETRYABLE_ERRORS:
+                raise RetryableError(f'{self.name}: {error.get("error_msg")}')
+            raise RuntimeError(f'{self.name}: {error.get("error_msg")}')
+
+
+class PublicationBus:
+    """
+    Шина публикации: очередь на каждый приемник и concurrency обработчиков.
+
+    publish() ставит сообщение во все очереди (ожидает, только если очередь
+    приемника заполнена), close() дожидается доставки и останавливает шину.
+    """
+
+    def __init__(self, sinks: Sequence[Sink], delivery_log: Optional[DeliveryLog] = None, queue_size: int = 100):
+        self.sinks = list(sinks)
+        self.delivery_log = delivery_log
+        self.queue_size = queue_size
+        self.stats: Dict[str, Dict[str, int]] = {
+            sink.name: {'delivered': 0, 'skipped': 0, 'retries': 0, 'failed': 0} for sink in self.sinks
+        }
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._workers: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        for sink in self.sinks:
+            queue = asyncio.Queue(maxsize=self.queue_size)
+            self._queues[sink.name] = queue
+            self._workers.extend(
+                asyncio.create_task(self._worker(sink, queue)) for _ in range(max(1, sink.concurrency))
+            )
+
+    async def publish(self, message: Any, key: Optional[str] = None) -> None:
+        """Ставит сообщение в очереди всех приемников."""
+        for sink in self.sinks:
+            await self._queues[sink.name].put((message, key))
+
+    async def join(self) -> None:
+        """Ожидает обработки всех поставленных сообщений."""
+        for queue in self._queues.values():
+            await queue.join()
+
+    async def close(self) -> None:
+        await self.join()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        for sink in self.sinks:
+            await sink.close()
+
+    async def _worker(self, sink: Sink, queue: asyncio.Queue) -> None:
+        while True:
+            message, key = await queue.get()
+            try:
+                await self._deliver_message(sink, message, key)
+            except Exception as e:
+                logger.error(f'Ошибка подготовки сообщения для {sink.name}: {e}')
+                self.stats[sink.name]['failed'] += 1
+            finally:
+                queue.task_done()
+
+    async def _deliver_message(self, sink: Sink, message: Any, key: Optional[str]) -> None:
+        parts = await asyncio.to_thread(sink.prepare, message)
+        log = None if sink.idempotent else self.delivery_log
+        for index, part in enumerate(parts):
+            part_key = key or sink.part_key(part)
+            if log is not None and log.is_delivered(sink.name, part_key, index):
+                self.stats[sink.name]['skipped'] += 1
+                continue
+            if not await self._deliver_part(sink, part):
+                # Остальные части не отправляются, чтобы не нарушить порядок
+                return
+            if log is not None:
+                log.mark_delivered(sink.name, part_key, index)
+            self.stats[sink.name]['delivered'] += 1
+
+    async def _deliver_part(self, sink: Sink, part: Any) -> bool:
+        for attempt in range(1, sink.max_attempts + 1):
+            await sink.limiter.wait()
+            try:
+                await sink.deliver(part)
+                return True
+            except RetryableError as e:
+                if attempt == sink.max_attempts:
+                    logger.error(f'Не удалось опубликовать через {sink.name} после {attempt} попыток: {e}')
+                    break
+                delay = e.retry_after or min(sink.max_backoff, sink.backoff * 2 ** (attempt - 1))
+                delay *= 1 + random.random() * 0.1
+                self.stats[sink.name]['retries'] += 1
+                logger.warning(f'Повтор публикации через {sink.name} через {delay:.1f} с: {e}')
+                await asyncio.sleep(delay)
+            except Exception as e:
+                logger.error(f'Ошибка публикации через {sink.name}: {e}')
+                break
+        self.stats[sink.name]['failed'] += 1
+        return False
+
+
+class BackgroundPublicationBus:
+    """
+    Шина публикации в фоновом потоке с собственным циклом asyncio.
+
+    Синхронный код (генерация отчетов) ставит сообщения через submit() и
+    продолжает работу; блокировка возможна только при заполненной очереди.
+    """
+
+    def __init__(self, bus: PublicationBus):
+        self.bus = bus
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='publication-bus', daemon=True)
+        self._thread.start()
+        self._call(self.bus.start())
+        self._closed = False
+        # Недоставленные сообщения не теряются при выходе без close()
+        atexit.register(self.close)
+
+    def _call(self, coroutine, timeout: Optional[float] = None):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result(timeout)
+
+    def submit(self, message: Any, key: Optional[str] = None) -> None:
+        """Ставит сообщение в очередь всех приемников."""
+        self._call(self.bus.publish(message, key))
+
+    def close(self, timeout: Optional[float] = None) -> Dict[str, Dict[str, int]]:
+        """Дожидается доставки, останавливает цикл и возвращает статистику приемников."""
+        if not self._closed:
+            self._closed = True
+            try:
+                self._call(self.bus.close(), timeout)
+            finally:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._thread.join()
+                self._loop.close()
+                if self.bus.delivery_log is not None:
+                    self.bus.delivery_log.close()
+            logger.info(f'Шина публикации остановлена: {self.bus.stats}')
+        return self.bus.stats
+
+
+class BusPublisher(ConformalPublisher):
+    """Публикатор-адаптер: передает сообщения в фоновую шину."""
+
+    def __init__(self, bus: BackgroundPublicationBus):
+        self.bus = bus
+
+    def publish(self, message: dict):
+        self.bus.submit(message)
+
+
+def create_sinks_from_env(publishers: Sequence[Any] = ()) -> List[Sink]:
+    """Приемники: переданные синхронные публикаторы плюс Telegram/VK из окружения."""
+    sinks: List[Sink] = [PublisherSink(publisher) for publisher in publishers]
+
+    telegram_token, telegram_chat = os.getenv('TELEGRAM_TOKEN'), os.getenv('TELEGRAM_CHAT_ID')
+    if telegram_token and telegram_chat:
+        sinks.append(TelegramSink(
+            telegram_token, telegram_chat,
+            base_url=os.getenv('TELEGRAM_API_URL', 'https://api.telegram.org')
+        ))
+
+    vk_token, vk_group = os.getenv('VK_TOKEN'), os.getenv('VK_GROUP_ID')
+    if vk_token and vk_group:
+        sinks.append(VkSink(
+            vk_token, int(vk_group),
+            base_url=os.getenv('VK_API_URL', 'https://api.vk.com/method')
+        ))
+    return sinks
+
+
+def create_publication_bus(publishers: Sequence[Any] = ()) -> BackgroundPublicationBus:
+    """Создает и запускает фоновую шину публикации по настройкам окружения."""
+    sinks = create_sinks_from_env(publishers)
+    delivery_log = None
+    if any(not sink.idempotent for sink in sinks):
+        delivery_log = DeliveryLog(os.getenv('PUBLICATION_DELIVERY_LOG', 'results/cache/publications.sqlite'))
+    logger.info(f'Шина публикации: приемники {[sink.name for sink in sinks]}')
+    return BackgroundPublicationBus(PublicationBus(sinks, delivery_log))
@@ -4,13 +4,22 @@
 
 import logging
 from datetime import date
-from typing import List, Dict
+from typing import Any, List, Dict, Optional
+
+import pandas as pd
 
 from publisher.forecast_helpers import get_feature_description
+from publisher.formatters.report_renderer import RenderedReport, render_report, format_fixed, lookup_unique
 from db.queries.statistics_cache import get_complete_statistics_cached as get_complete_statistics
 
 logger = logging.getLogger(__name__)
 
+# Метрики исторической точности, присоединяемые к строкам отчета
+_ACCURACY_COLUMNS = [
+    'historical_correct', 'historical_total', 'historical_accuracy',
+    'recent_correct', 'recent_accuracy'
+]
+
 
 def get_feature_sort_order(feature: int) -> int:
     """Возвращает порядок сортировки для feature."""
@@ -30,6 +39,66 @@ def get_forecast_type_sort_order(forecast_type: str) -> int:
     return order_map.get(forecast_type.lower() if forecast_type else '', 99)
 
 
+def _forecast_rows(forecasts_data: List[Dict], keys: Dict[str, Any], values: List[str]) -> pd.DataFrame:
+    """
+    Разворачивает прогнозы всех матчей в одну таблицу.
+    
+    Колонка match_pos - позиция матча в forecasts_data; ключевые колонки
+    keys остаются object, чтобы значения выводились как в исходных словарях,
+    колонки values приводятся к числам.
+    """
+    records = [
+        (position, forecast)
+        for position, item in enumerate(forecasts_data)
+        for forecast in item['forecasts']
+    ]
+    if not records:
+        return pd.DataFrame()
+    
+    rows = pd.DataFrame({'match_pos': [position for position, _ in records]})
+    for name, default in keys.items():
+        rows[name] = pd.Series([forecast.get(name, default) for _, forecast in records], dtype=object)
+    for name in values:
+        rows[name] = pd.to_numeric(pd.Series([forecast.get(name) for _, forecast in records], dtype=object),
+                                   errors='coerce')
+    return rows
+
+
+def _with_flag(stats: Dict, extra: Optional[Dict] = None) -> Dict:
+    """Добавляет к статистике признак ее наличия."""
+    return {**(stats or {}), **(extra or {}), 'has_statistics': bool(stats)}
+
+
+def _scaled(values: pd.Series) -> pd.Series:
+    """Доля в процентах; пустые и нулевые значения - 0."""
+    return values.fillna(0) * 100
+
+
+def _percent_text(values: pd.Series) -> pd.Series:
+    """Форматирует проценты как '{:.1f}%'."""
+    return pd.to_numeric(values, errors='coerce').fillna(0).astype(float).map('{:.1f}%'.format)
+
+
+def _count_text(values: pd.Series) -> pd.Series:
+    """Целые счетчики как текст (пустые - 0)."""
+    return pd.to_numeric(values, errors='coerce').fillna(0).astype('int64').astype(str)
+
+
+def _add_accuracy_texts(rows: pd.DataFrame) -> None:
+    """Добавляет иконки и тексты исторической и последней точности."""
+    historical = rows['historical_accuracy'].fillna(0).astype(float)
+    recent = rows['recent_accuracy'].fillna(0).astype(float)
+    rows['historical_mark'] = (historical >= 0.7).map({True: '📊', False: '📉'})
+    rows['recent_mark'] = (recent >= 0.7).map({True: '🔥', False: '❄️'})
+    rows['historical_text'] = (
+        _count_text(rows['historical_correct']) + '/' + _count_text(rows['historical_total'])
+        + ' (' + (historical * 100).map('{:.1f}'.format) + '%)'
+    )
+    rows['recent_text'] = (
+        _count_text(rows['recent_correct']) + '/10 (' + (recent * 100).map('{:.1f}'.format) + '%)'
+    )
+
+
 class ForecastFormatter:
     """Класс для форматирования прогнозов в текстовый отчет."""
     
@@ -44,52 +113,51 @@ class ForecastFormatter:
         Returns:
             str: Отформатированный отчет
         """
-        report = f"📊 ОБЫЧНЫЕ ПРОГНОЗЫ - {target_date.strftime('%d.%m.%Y')}\n\n"
+        return str(self.render_daily_forecasts_regular(forecasts_data, target_date))
+    
+    def render_daily_forecasts_regular(self, forecasts_data: List[Dict], target_date: date) -> RenderedReport:
+        """
+        Готовит regular отчет к рендерингу шаблоном today_regular_forecasts.
         
-        for item in forecasts_data:
-            match = item['match']
-            forecasts = item['forecasts']
-            
-            # Сортируем прогнозы по заданному порядку
-            sorted_forecasts = sorted(forecasts, key=lambda x: get_feature_sort_order(x.get('feature', 0)))
+        Статистика запрашивается один раз на уникальную пару (feature, outcome).
+        
+        Args:
+            forecasts_data: Список с прогнозами и информацией о матчах
+            target_date: Дата для заголовка
             
-            report += f"🆔 Match ID: {match['id']}\n"
-            report += f"🏆 {match.get('sportName', 'Unknown')} - {match.get('championshipName', 'Unknown')}\n"
-            report += f"⚽ {match.get('team_home_name', 'Unknown')} vs {match.get('team_away_name', 'Unknown')}\n"
-            report += f"🕐 {match.get('gameData', '').strftime('%H:%M') if match.get('gameData') else 'TBD'}\n\n"
-            report += f"📊 ДЕТАЛЬНАЯ СТАТИСТИКА ПРОГНОЗА:\n\n"
+        Returns:
+            RenderedReport: Отчет для потоковой записи
+        """
+        rows = _forecast_rows(
+            forecasts_data, {'feature': 0, 'outcome': ''},
+            ['probability', 'confidence', 'uncertainty', 'lower_bound', 'upper_bound']
+        )
+        if not rows.empty:
+            rows['_order'] = rows['feature'].map(get_feature_sort_order)
+            rows = rows.sort_values(['match_pos', '_order'], kind='mergesort')
             
-            for forecast in sorted_forecasts:
-                feature = forecast.get('feature', 0)
-                outcome = forecast.get('outcome', '')
-                probability = forecast.get('probability', 0) * 100 if forecast.get('probability') else 0
-                confidence = forecast.get('confidence', 0) * 100 if forecast.get('confidence') else 0
-                uncertainty = forecast.get('uncertainty', 0) * 100 if forecast.get('uncertainty') else 0
-                lower_bound = forecast.get('lower_bound', 0)
-                upper_bound = forecast.get('upper_bound', 0)
-                
-                # Получаем расширенную статистику
-                hist_stats = self._get_extended_statistics_for_feature(feature, outcome)
-                feature_desc = get_feature_description(feature, outcome)
-                
-                report += f"• {feature_desc}: {outcome}\n"
-                report += f"  🎯 Вероятность: {probability:.1f}% | 🔒 Уверенность: {confidence:.1f}% | 📊 Неопределенность: {uncertainty:.1f}%\n"
-                report += f"  📈 Границы: [{lower_bound:.2f} - {upper_bound:.2f}]"
-                
-                if hist_stats:
-                    report += f" | ⚖️ Калибровка: {hist_stats.get('calibration', 0):.1f}% | 🛡️ Стабильность: {hist_stats.get('stability', 0):.1f}%\n"
-                    
-                    acc_mark = "📊" if hist_stats.get('historical_accuracy', 0) >= 0.7 else "📉"
-                    report += f"  {acc_mark} Историческая точность: {hist_stats.get('historical_correct', 0)}/{hist_stats.get('historical_total', 0)} ({hist_stats.get('historical_accuracy', 0)*100:.1f}%)"
-                    
-                    recent_mark = "🔥" if hist_stats.get('recent_accuracy', 0) >= 0.7 else "❄️"
-                    report += f" | {recent_mark} Последние 10: {hist_stats.get('recent_correct', 0)}/10 ({hist_stats.get('recent_accuracy', 0)*100:.1f}%)\n"
-                else:
-                    report += "\n"
-                
-            report += "\n"
+            stats = lookup_unique(
+                rows, ['feature', 'outcome'],
+                lambda feature, outcome: _with_flag(self._get_extended_statistics_for_feature(feature, outcome), {
+                    'description': get_feature_description(feature, outcome)
+                }),
+                ['description', 'has_statistics', 'calibration', 'stability', *_ACCURACY_COLUMNS]
+            )
+            rows = rows.join(stats)
+            for name in ('probability', 'confidence', 'uncertainty'):
+                rows[f'{name}_text'] = _percent_text(_scaled(rows[name]))
+            rows['lower_bound_text'] = format_fixed(rows['lower_bound'].fillna(0))
+            rows['upper_bound_text'] = format_fixed(rows['upper_bound'].fillna(0))
+            rows['calibration_text'] = _percent_text(rows['calibration'])
+            rows['stability_text'] = _percent_text(rows['stability'])
+            _add_accuracy_texts(rows)
         
-        return report
+        return self._render(
+            'today_regular_forecasts.txt.j2', forecasts_data, target_date, rows,
+            ['description', 'outcome', 'probability_text', 'confidence_text', 'uncertainty_text',
+             'lower_bound_text', 'upper_bound_text', 'has_statistics', 'calibration_text', 'stability_text',
+             'historical_mark', 'historical_text', 'recent_mark', 'recent_text']
+        )
     
     def format_daily_forecasts_quality(self, forecasts_data: List[Dict], target_date: date) -> str:
         """
@@ -102,51 +170,81 @@ class ForecastFormatter:
         Returns:
             str: Отформатированный отчет
         """
-        report = f"🌟 КАЧЕСТВЕННЫЕ ПРОГНОЗЫ - {target_date.strftime('%d.%m.%Y')}\n\n"
+        return str(self.render_daily_forecasts_quality(forecasts_data, target_date))
+    
+    def render_daily_forecasts_quality(self, forecasts_data: List[Dict], target_date: date) -> RenderedReport:
+        """
+        Готовит quality отчет к рендерингу шаблоном today_quality_forecasts.
         
-        for item in forecasts_data:
-            match = item['match']
-            forecasts = item['forecasts']
+        Статистика запрашивается один раз на уникальную пару
+        (forecast_type, forecast_subtype).
+        
+        Args:
+            forecasts_data: Список с прогнозами и информацией о матчах
+            target_date: Дата для заголовка
             
-            # Сортируем прогнозы по заданному порядку (по forecast_type для quality)
-            sorted_forecasts = sorted(forecasts, key=lambda x: get_forecast_type_sort_order(x.get('forecast_type', '')))
+        Returns:
+            RenderedReport: Отчет для потоковой записи
+        """
+        rows = _forecast_rows(
+            forecasts_data, {'forecast_type': '', 'forecast_subtype': ''}, ['prediction_accuracy']
+        )
+        if not rows.empty:
+            rows['_order'] = rows['forecast_type'].map(get_forecast_type_sort_order)
+            rows = rows.sort_values(['match_pos', '_order'], kind='mergesort')
             
-            report += f"🏆 {match.get('sportName', 'Unknown')} - {match.get('championshipName', 'Unknown')}\n"
-            report += f"🆔 Match ID: {match['id']}\n"
-            report += f"⚽ {match.get('team_home_name', 'Unknown')} vs {match.get('team_away_name', 'Unknown')}\n"
-            report += f"🕐 {match.get('gameData', '').strftime('%H:%M') if match.get('gameData') else 'TBD'}\n\n"
-            report += f"📊 ДЕТАЛЬНАЯ СТАТИСТИКА ПРОГНОЗА:\n\n"
+            stats = lookup_unique(
+                rows, ['forecast_type', 'forecast_subtype'],
+                lambda forecast_type, forecast_subtype: _with_flag(
+                    self._get_historical_statistics(forecast_type, forecast_subtype)
+                ),
+                ['has_statistics', 'confidence', 'uncertainty', 'calibration', 'stability', *_ACCURACY_COLUMNS]
+            )
+            rows = rows.join(stats)
+            rows['accuracy_text'] = _percent_text(_scaled(rows['prediction_accuracy']))
+            for name in ('confidence', 'uncertainty', 'calibration', 'stability'):
+                rows[f'{name}_text'] = _percent_text(rows[name] * 100)
+            _add_accuracy_texts(rows)
+        
+        return self._render(
+            'today_quality_forecasts.txt.j2', forecasts_data, target_date, rows,
+            ['forecast_type', 'forecast_subtype', 'accuracy_text', 'has_statistics',
+             'confidence_text', 'uncertainty_text', 'calibration_text', 'stability_text',
+             'historical_mark', 'historical_text', 'recent_mark', 'recent_text']
+        )
+    
+    def _render(
+        self,
+        template_name: str,
+        forecasts_data: List[Dict],
+        target_date: date,
+        rows: pd.DataFrame,
+        row_columns: List[str]
+    ) -> RenderedReport:
+        """Собирает блоки матчей (в порядке forecasts_data) для шаблона."""
+        def context() -> Dict:
+            records = rows[row_columns].to_dict('records') if not rows.empty else []
+            positions = rows['match_pos'].to_numpy() if not rows.empty else []
+            rows_by_match: Dict[int, List[Dict]] = {}
+            for position, record in zip(positions, records):
+                rows_by_match.setdefault(position, []).append(record)
             
-            for stat in sorted_forecasts:
-                forecast_type = stat.get('forecast_type', '')
-                forecast_subtype = stat.get('forecast_subtype', '')
-                accuracy = stat.get('prediction_accuracy', 0) * 100 if stat.get('prediction_accuracy') else 0
-                
-                # Получаем расширенную статистику
-                from publisher.forecast_helpers import get_forecast_type_subtype
-                hist_stats = self._get_historical_statistics(forecast_type, forecast_subtype)
-                
-                report += f"• {forecast_type}: {forecast_subtype}\n"
-                report += f"  🎯 Точность модели: {accuracy:.1f}%\n"
-                
-                if hist_stats:
-                    confidence = hist_stats.get('confidence', 0) * 100
-                    uncertainty = hist_stats.get('uncertainty', 0) * 100
-                    calibration = hist_stats.get('calibration', 0) * 100
-                    stability = hist_stats.get('stability', 0) * 100
-                    
-                    report += f"  🔒 Уверенность: {confidence:.1f}% | 📊 Неопределенность: {uncertainty:.1f}%\n"
-                    report += f"  ⚖️ Калибровка: {calibration:.1f}% | 🛡️ Стабильность: {stability:.1f}%\n"
-                    
-                    acc_mark = "📊" if hist_stats.get('historical_accuracy', 0) >= 0.7 else "📉"
-                    report += f"  {acc_mark} Историческая точность: {hist_stats.get('historical_correct', 0)}/{hist_stats.get('historical_total', 0)} ({hist_stats.get('historical_accuracy', 0)*100:.1f}%)"
-                    
-                    recent_mark = "🔥" if hist_stats.get('recent_accuracy', 0) >= 0.7 else "❄️"
-                    report += f" | {recent_mark} Последние 10: {hist_stats.get('recent_correct', 0)}/10 ({hist_stats.get('recent_accuracy', 0)*100:.1f}%)\n"
-                
-            report += "\n"
+            matches = []
+            for position, item in enumerate(forecasts_data):
+                match = item['match']
+                game_data = match.get('gameData')
+                matches.append({
+                    'id': match['id'],
+                    'sportName': match.get('sportName', 'Unknown'),
+                    'championshipName': match.get('championshipName', 'Unknown'),
+                    'team_home_name': match.get('team_home_name', 'Unknown'),
+                    'team_away_name': match.get('team_away_name', 'Unknown'),
+                    'match_time': game_data.strftime('%H:%M') if game_data else 'TBD',
+                    'rows': rows_by_match.get(position, [])
+                })
+            return {'report_date': target_date.strftime('%d.%m.%Y'), 'matches': matches}
         
-        return report
+        return render_report(template_name, context)
     
     def _get_extended_statistics_for_feature(self, feature: int, outcome: str = '') -> Dict:
         """
@@ -69,8 +69,10 @@ class OutcomeFormatter:
                 feature = outcome.get('feature', 0)
                 outcome_value = outcome.get('outcome', '')
                 
-                # Определяем статус прогноза
-                status = self._determine_prediction_status(feature, outcome_value, match['id'])
+                # Определяем статус прогноза (предзагруженный статус дня, если есть)
+                status = outcome.get('prediction_status') or self._determine_prediction_status(
+                    feature, outcome_value, match['id']
+                )
                 feature_desc = get_feature_description(feature, outcome_value)
                 
                 report += f"{status} • {feature_desc}: {outcome_value}\n"
@@ -0,0 +1,183 @@
+"""
+Рендеринг текстовых отчетов через шаблоны Jinja2.
+
+Поля строк отчета (описание прогноза, иконка статуса, форматированные
+вероятности, историческая статистика) рассчитываются векторно колонками
+DataFrame, после чего шаблон из publisher/formatters/templates выводит
+готовые значения. Отчет рендерится по частям (RenderedReport) и может
+записываться в файл потоково, не собирая весь текст в памяти.
+"""
+
+import logging
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+TEMPLATES_DIR = Path(__file__).resolve().parent / 'templates'
+
+_environment = None
+
+
+def get_environment():
+    """Возвращает окружение Jinja2 для шаблонов отчетов."""
+    global _environment
+    if _environment is None:
+        from jinja2 import Environment, FileSystemLoader, StrictUndefined
+
+        _environment = Environment(
+            loader=FileSystemLoader(str(TEMPLATES_DIR)),
+            trim_blocks=True,
+            lstrip_blocks=True,
+            keep_trailing_newline=True,
+            autoescape=False,
+            undefined=StrictUndefined
+        )
+    return _environment
+
+
+class RenderedReport:
+    """
+    Отчет, который рендерится при каждой итерации.
+
+    Контекст шаблона создается фабрикой, поэтому отчет можно обойти
+    несколько раз (например, несколькими публикаторами).
+    """
+
+    def __init__(self, template_name: str, context_factory: Callable[[], Dict[str, Any]], empty: bool = False):
+        self.template_name = template_name
+        self.context_factory = context_factory
+        self.empty = empty
+
+    def __iter__(self) -> Iterator[str]:
+        if self.empty:
+            return iter(())
+        template = get_environment().get_template(self.template_name)
+        return template.generate(**self.context_factory())
+
+    def __bool__(self) -> bool:
+        return not self.empty
+
+    def __str__(self) -> str:
+        return ''.join(self)
+
+
+def render_report(template_name: str, context_factory: Callable[[], Dict[str, Any]],
+                  empty: bool = False) -> RenderedReport:
+    """Создает ленивый отчет по шаблону."""
+    return RenderedReport(template_name, context_factory, empty)
+
+
+def column(df: pd.DataFrame, name: str, default: Any = 0) -> pd.Series:
+    """Колонка DataFrame или константа default, если колонки нет."""
+    if name in df.columns:
+        return df[name]
+    return pd.Series(default, index=df.index)
+
+
+def format_percent(values: pd.Series) -> pd.Series:
+    """Форматирует доли как '{:.1%}'."""
+    return pd.to_numeric(values, errors='coerce').astype(float).map('{:.1%}'.format)
+
+
+def format_fixed(values: pd.Series, digits: int = 2) -> pd.Series:
+    """Форматирует числа с фиксированным количеством знаков."""
+    return pd.to_numeric(values, errors='coerce').astype(float).map(f'{{:.{digits}f}}'.format)
+
+
+def format_time(values: pd.Series) -> pd.Series:
+    """Время матча HH:MM (None для пустых значений)."""
+    times = pd.to_datetime(values, errors='coerce').dt.strftime('%H:%M')
+    return times.astype(object).where(times.notna(), None)
+
+
+def lookup_unique(
+    df: pd.DataFrame,
+    key_columns: Sequence[str],
+    func: Callable[..., Dict[str, Any]],
+    result_columns: Sequence[str]
+) -> pd.DataFrame:
+    """
+    Вызывает func один раз на уникальную комбинацию key_columns и
+    присоединяет результат к строкам df.
+
+    Args:
+        df: Строки отчета
+        key_columns: Колонки-аргументы func
+        func: Функция от значений ключа, возвращающая словарь
+        result_columns: Нужные ключи результата
+
+    Returns:
+        pd.DataFrame: Колонки result_columns с индексом df
+    """
+    keys = df[list(key_columns)]
+    # Номера групп в порядке первого появления совпадают с порядком drop_duplicates
+    codes = keys.groupby(list(key_columns), sort=False, dropna=False).ngroup().to_numpy()
+    unique_keys = keys.drop_duplicates()
+    results = [func(*key) for key in unique_keys.itertuples(index=False, name=None)]
+    lookup = pd.DataFrame(
+        [[result.get(name) for name in result_columns] for result in results],
+        columns=list(result_columns)
+    )
+    joined = lookup.iloc[codes].reset_index(drop=True)
+    joined.index = df.index
+    return joined
+
+
+def iter_match_blocks(
+    df: pd.DataFrame,
+    header_columns: Sequence[str],
+    row_columns: Sequence[str],
+    key: str = 'match_id'
+) -> Iterator[Dict[str, Any]]:
+    """
+    Делит строки отчета на блоки матчей в порядке возрастания key.
+
+    Порядок строк внутри матча сохраняется.
+
+    Yields:
+        Dict: Поля заголовка матча и список строк 'rows'
+    """
+    df = df[df[key].notna()].sort_values(key, kind='mergesort')
+    if df.empty:
+        return
+    keys = df[key].to_numpy()
+    boundaries = np.flatnonzero(keys[1:] != keys[:-1]) + 1
+    starts = np.concatenate(([0], boundaries))
+    ends = np.concatenate((boundaries, [len(df)]))
+
+    headers = df.iloc[starts][list(header_columns)].to_dict('records')
+    rows: List[Dict[str, Any]] = df[list(row_columns)].to_dict('records')
+    for header, start, end in zip(headers, starts, ends):
+        header['rows'] = rows[start:end]
+        yield header
+
+
+def header_frame(df: pd.DataFrame, defaults: Dict[str, Any], time_column: Optional[str] = None) -> pd.DataFrame:
+    """
+    Возвращает колонки заголовка матча с подстановкой default для
+    отсутствующих колонок и отформатированным временем матча.
+    """
+    headers = pd.DataFrame(index=df.index)
+    for name, default in defaults.items():
+        headers[name] = column(df, name, default)
+    if time_column is not None:
+        headers['match_time'] = format_time(df[time_column]) if time_column in df.columns else None
+    return headers
+
+
+def accuracy_text(correct: pd.Series, total: Any, accuracy: pd.Series) -> pd.Series:
+    """Текст точности вида 'correct/total (xx.x%)'."""
+    total_text = total.astype(str) if isinstance(total, pd.Series) else str(total)
+    return (
+        correct.astype(str) + '/' + total_text + ' ('
+        + pd.to_numeric(accuracy, errors='coerce').astype(float).mul(100).map('{:.1f}'.format) + '%)'
+    )
+
+
+def accuracy_mark(accuracy: pd.Series, high: str, low: str, threshold: float = 0.7) -> np.ndarray:
+    """Иконка точности: high при accuracy >= threshold, иначе low."""
+    return np.where(pd.to_numeric(accuracy, errors='coerce').fillna(0) >= threshold, high, low)
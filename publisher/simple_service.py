@@ -69,12 +69,16 @@ class SimplePublisherService:
         """
         logger.info(f'Выполнение режима {time_frame} с параметром {year or "по умолчанию"}')
         
-        if time_frame == 'TODAY':
-            self.execute_today()
-        elif time_frame == 'ALL_TIME':
-            self.execute_all_time(year)
-        else:
-            raise ValueError(f'Неподдерживаемый режим: {time_frame}')
+        try:
+            if time_frame == 'TODAY':
+                self.execute_today()
+            elif time_frame == 'ALL_TIME':
+                self.execute_all_time(year)
+            else:
+                raise ValueError(f'Неподдерживаемый режим: {time_frame}')
+        finally:
+            # Дожидаемся отправки отчетов, поставленных в шину публикации
+            self.publisher.close()
 
 
 def create_simple_service() -> SimplePublisherService:
@@ -5,36 +5,38 @@
 """
 
 import logging
+import os
 from datetime import datetime, timedelta, date
 from typing import List, Dict, Optional, Any
+import numpy as np
 import pandas as pd
 
 from db.models.outcome import Outcome
 from db.models.prediction import Prediction
 from db.queries.statistics import (
-    get_statistics_for_today, get_statistics_for_date, get_statistics_for_period, get_all_statistics,
-    get_predictions_for_today, get_all_predictions,
-)
-from db.queries.outcome import get_outcomes_for_date as get_outcomes_for_date_outcome, get_all_outcomes
-from db.queries.match import get_matches_for_date, get_statistics_for_match
-from db.queries.statistics_metrics import (
-    get_historical_accuracy_regular,
-    get_recent_accuracy,
-    get_calibration,
-    get_stability,
-    get_confidence_bounds
+    get_statistics_for_today, get_statistics_for_date, get_predictions_for_today,
 )
+from db.queries.outcome import get_outcomes_for_date as get_outcomes_for_date_outcome
 from db.queries.statistics_cache import (
     get_complete_statistics_cached as get_complete_statistics,
     clear_statistics_cache,
     get_cache_info
 )
-from db.queries.target import get_target_by_match_id
+from db.queries.target import get_target_by_match_id, get_targets_frame
+from db.queries.publisher import load_publication_day, iter_all_time_days
 from db.storage.publisher import save_conformal_report
 from publisher.sending import Publisher
 from publisher.conformal_sending import ConformalPublisher, ConformalDailyPublisher
+from publisher.bus import BackgroundPublicationBus, BusPublisher, create_publication_bus
 from publisher.formatters import ForecastFormatter, OutcomeFormatter, ReportBuilder
-from core.prediction_validator import get_prediction_status_from_target
+from publisher.formatters.report_renderer import (
+    RenderedReport, render_report, column, format_percent, format_fixed,
+    header_frame, iter_match_blocks, lookup_unique
+)
+from core.prediction_validator import (
+    get_prediction_status_from_target, get_prediction_statuses, align_targets
+)
+from core.types import AllTimeDay, PublicationDay
 from config import Session_pool
 
 
@@ -109,6 +111,7 @@ class StatisticsPublisher:
         self.forecast_formatter = ForecastFormatter()
         self.outcome_formatter = OutcomeFormatter()
         self.report_builder = ReportBuilder()
+        self.publication_bus: Optional[BackgroundPublicationBus] = None
         self._setup_publishers()
     
     def _setup_publishers(self) -> None:
@@ -116,16 +119,23 @@ class StatisticsPublisher:
         logger.info('Настройка публикаторов для статистики')
         
         # Добавляем файловый публикатор
-        self.conformal_publishers.append(
-            ConformalDailyPublisher(file='results')
-        )
+        file_publisher = ConformalDailyPublisher(file='results')
         
-        # Добавляем другие публикаторы при необходимости
-        # self.publishers.append(TelegramPublisher(...))
-        # self.publishers.append(VkPublisher(...))
+        # Файлы и каналы Telegram/VK (из окружения) обслуживает фоновая шина
+        if os.getenv('PUBLICATION_BUS', '1') != '0':
+            self.publication_bus = create_publication_bus([file_publisher])
+            self.conformal_publishers.append(BusPublisher(self.publication_bus))
+        else:
+            self.conformal_publishers.append(file_publisher)
         
         logger.info('Публикаторы настроены')
     
+    def close(self) -> None:
+        """Дожидается доставки поставленных в шину публикаций."""
+        if self.publication_bus is not None:
+            self.publication_bus.close()
+            self.publication_bus = None
+    
     def publish_today_forecasts_and_outcomes(self) -> bool:
         """
         Публикует прогнозы на сегодня и итоги вчера с разделением на regular и quality.
@@ -143,28 +153,31 @@ class StatisticsPublisher:
             today = datetime.now().date()
             yesterday = today - timedelta(days=1)
             
-            # Загружаем матчи за вчера и сегодня
-            matches_today = get_matches_for_date(today)
-            matches_yesterday = get_matches_for_date(yesterday)
+            # Загружаем матчи и все связанные данные за вчера и сегодня разом
+            day_data = load_publication_day([yesterday, today])
+            self._annotate_prediction_statuses(day_data)
+            matches_today = day_data.matches_for_date(today)
+            matches_yesterday = day_data.matches_for_date(yesterday)
             
             logger.info(f'Найдено матчей на сегодня ({today}): {len(matches_today)}')
             logger.info(f'Найдено матчей за вчера ({yesterday}): {len(matches_yesterday)}')
             
             # 1. Формируем прогнозы на сегодня
             if len(matches_today) > 0:
-                self._publish_forecasts_for_matches(matches_today, today)
+                self._publish_forecasts_for_matches(matches_today, today, day_data)
             else:
                 logger.warning(f'Нет матчей на {today} для формирования прогнозов')
             
             # 2. Формируем итоги за вчера
             if len(matches_yesterday) > 0:
-                self._publish_outcomes_for_matches(matches_yesterday, yesterday)
+                self._publish_outcomes_for_matches(matches_yesterday, yesterday, day_data)
             else:
                 logger.warning(f'Нет матчей за {yesterday} для формирования итогов')
             
             # Логируем статистику кеша
             cache_info = get_cache_info()
-            logger.info(f'Кеш статистики: {cache_info["hits"]} попаданий, {cache_info["misses"]} промахов, эффективность {cache_info["hit_rate"]*100:.1f}%')
+            logger.info(f'Кеш статистики ({cache_info.get("backend")}): {cache_info["hits"]} попаданий, {cache_info["misses"]} промахов, '
+                        f'{cache_info.get("stale_serves", 0)} устаревших, эффективность {cache_info["hit_rate"]*100:.1f}%')
             
             logger.info('Публикация прогнозов и итогов завершена')
             return True
@@ -173,16 +186,21 @@ class StatisticsPublisher:
             logger.error(f'Ошибка при публикации прогнозов и итогов: {e}', exc_info=True)
             return False
     
-    def _publish_forecasts_for_matches(self, matches: List[Dict], target_date: date) -> None:
+    def _publish_forecasts_for_matches(self, matches: List[Dict], target_date: date,
+                                       day_data: Optional[PublicationDay] = None) -> None:
         """
         Формирует и публикует прогнозы для списка матчей.
         
         Args:
             matches: Список матчей
             target_date: Дата для группировки файлов
+            day_data: Предзагруженные данные дня (если None - загружаются за target_date)
         """
         logger.info(f'Формирование прогнозов для {len(matches)} матчей на {target_date}')
         
+        if day_data is None:
+            day_data = load_publication_day([target_date])
+        
         # Группируем прогнозы по типам
         regular_forecasts = []
         quality_forecasts = []
@@ -191,14 +209,14 @@ class StatisticsPublisher:
             match_id = match['id']
             
             # Получаем regular прогнозы из таблицы outcomes
-            regular_data = self._get_outcomes_for_match(match_id)
+            regular_data = day_data.outcomes.get(match_id, [])
             if regular_data:
                 regular_forecasts.append({'match': match, 'forecasts': regular_data})
             else:
                 logger.warning(f'Нет regular прогнозов (outcomes) для матча ID {match_id} ({match.get("team_home_name")} vs {match.get("team_away_name")})')
             
             # Получаем quality прогнозы из таблицы statistics
-            quality_data = get_statistics_for_match(match_id)
+            quality_data = day_data.statistics.get(match_id, [])
             if quality_data:
                 quality_forecasts.append({'match': match, 'forecasts': quality_data})
             else:
@@ -214,16 +232,22 @@ class StatisticsPublisher:
             self._publish_daily_forecasts_quality(quality_forecasts, target_date)
             logger.info(f'Опубликовано {len(quality_forecasts)} quality прогнозов на {target_date}')
     
-    def _publish_outcomes_for_matches(self, matches: List[Dict], target_date: date) -> None:
+    def _publish_outcomes_for_matches(self, matches: List[Dict], target_date: date,
+                                      day_data: Optional[PublicationDay] = None) -> None:
         """
         Формирует и публикует итоги для списка завершенных матчей.
         
         Args:
             matches: Список матчей
             target_date: Дата для группировки файлов
+            day_data: Предзагруженные данные дня (если None - загружаются за target_date)
         """
         logger.info(f'Формирование итогов для {len(matches)} матчей за {target_date}')
         
+        if day_data is None:
+            day_data = load_publication_day([target_date])
+            self._annotate_prediction_statuses(day_data)
+        
         # Фильтруем только завершенные матчи
         completed_matches = [m for m in matches if m.get('typeOutcome') is not None]
         logger.info(f'Из них завершенных: {len(completed_matches)}')
@@ -236,14 +260,14 @@ class StatisticsPublisher:
             match_id = match['id']
             
             # Получаем regular итоги из таблицы outcomes
-            regular_data = self._get_outcomes_for_match(match_id)
+            regular_data = day_data.outcomes.get(match_id, [])
             if regular_data:
                 regular_outcomes.append({'match': match, 'outcomes': regular_data})
             else:
                 logger.warning(f'Нет regular итогов (outcomes) для завершенного матча ID {match_id} ({match.get("team_home_name")} vs {match.get("team_away_name")})')
             
             # Получаем quality итоги из таблицы statistics
-            quality_data = get_statistics_for_match(match_id)
+            quality_data = day_data.statistics.get(match_id, [])
             if quality_data:
                 quality_outcomes.append({'match': match, 'outcomes': quality_data})
             else:
@@ -274,6 +298,62 @@ class StatisticsPublisher:
             result = query.all()
             return [row.to_dict() if hasattr(row, 'to_dict') else row.__dict__ for row in result]
     
+    def _annotate_prediction_statuses(self, day_data: PublicationDay) -> None:
+        """
+        Проставляет статус (✅/❌/⏳) каждому outcome дня по предзагруженным targets.
+        
+        Args:
+            day_data: Данные дня; статус записывается в поле prediction_status
+        """
+        records = [record for rows in day_data.outcomes.values() for record in rows]
+        if not records:
+            return
+        
+        frame = pd.DataFrame({
+            'match_id': [record['match_id'] for record in records],
+            'feature': [record.get('feature') for record in records],
+            'outcome': [record.get('outcome') for record in records],
+        })
+        statuses = self._get_prediction_statuses(frame, day_data.targets)
+        for record, status in zip(records, statuses):
+            record['prediction_status'] = status
+    
+    def _get_prediction_statuses(self, frame: pd.DataFrame,
+                                 targets: Optional[pd.DataFrame] = None) -> np.ndarray:
+        """
+        Векторно определяет статусы прогнозов (колонки match_id, feature, outcome).
+        
+        Args:
+            frame: Прогнозы
+            targets: Targets матчей (если None - загружаются одним запросом)
+            
+        Returns:
+            np.ndarray: Статусы '✅' / '❌' / '⏳' по строкам frame
+        """
+        if frame.empty:
+            return np.array([], dtype=object)
+        
+        match_ids = frame['match_id'].to_numpy()
+        try:
+            if targets is None:
+                with Session_pool() as session:
+                    targets = get_targets_frame(session, [int(m) for m in pd.unique(match_ids)])
+            aligned = align_targets(match_ids, targets)
+            aligned['feature'] = frame['feature'].to_numpy()
+            aligned['outcome'] = frame['outcome'].to_numpy()
+            return get_prediction_statuses(aligned, 'feature', 'outcome')
+        except Exception as e:
+            logger.error(f'Ошибка при определении статусов прогнозов: {e}')
+            return np.full(len(frame), '❌', dtype=object)
+    
+    def _with_prediction_status(self, df_day: pd.DataFrame) -> pd.DataFrame:
+        """Добавляет колонку prediction_status, если ее еще нет (один запрос targets на день)."""
+        if 'prediction_status' in df_day.columns or df_day.empty:
+            return df_day
+        df_day = df_day.copy()
+        df_day['prediction_status'] = self._get_prediction_statuses(df_day)
+        return df_day
+    
 
     def _publish_daily_forecasts_regular(self, forecasts_data: List[Dict], target_date: date) -> None:
         """
@@ -284,7 +364,7 @@ class StatisticsPublisher:
             target_date: Дата для файла
         """
         # Форматируем отчет через форматтер
-        report = self.forecast_formatter.format_daily_forecasts_regular(forecasts_data, target_date)
+        report = self.forecast_formatter.render_daily_forecasts_regular(forecasts_data, target_date)
         
         # Сохраняем отчет
         save_conformal_report(report, 'regular', target_date)
@@ -299,7 +379,7 @@ class StatisticsPublisher:
             target_date: Дата для файла
         """
         # Форматируем отчет через форматтер
-        report = self.forecast_formatter.format_daily_forecasts_quality(forecasts_data, target_date)
+        report = self.forecast_formatter.render_daily_forecasts_quality(forecasts_data, target_date)
         
         # Сохраняем отчет
         save_conformal_report(report, 'quality', target_date)
@@ -350,7 +430,9 @@ class StatisticsPublisher:
                 
                 # Определяем правильность прогноза
                 # Используем outcome_value (категория), а не forecast_value (вероятность)
-                status = self._determine_prediction_status(feature, outcome_value, match['id'])
+                status = outcome.get('prediction_status') or self._determine_prediction_status(
+                    feature, outcome_value, match['id']
+                )
                 
                 feature_desc = self._get_feature_description_from_outcome(feature, outcome_value)
                 
@@ -626,6 +708,9 @@ class StatisticsPublisher:
         """
         Публикует прогнозы и итоги за весь период с разделением по дням.
         
+        Данные читаются потоково по дням (iter_all_time_days), отчеты дня
+        публикуются сразу, поэтому память не растет с длиной истории.
+        
         Args:
             year: Год для фильтрации (опционально)
             
@@ -635,56 +720,74 @@ class StatisticsPublisher:
         logger.info(f'Публикация прогнозов и итогов за весь период {year or "все время"} с разделением по дням')
         
         try:
-            # Загружаем качественные прогнозы за период
+            start_date = end_date = None
             if year:
                 # Фильтруем по году
                 start_date = datetime.strptime(f'{year}-01-01', '%Y-%m-%d').date()
                 end_date = datetime.strptime(f'{year}-12-31', '%Y-%m-%d').date()
-                df_quality_statistics = get_statistics_for_period(start_date, end_date)
-            else:
-                # За весь период - загружаем все данные
-                df_quality_statistics = get_all_statistics()
             
-            # Загружаем обычные прогнозы за весь период (из таблицы outcomes для прошедших матчей)
-            df_regular_outcomes = get_all_outcomes()
+            published_days = 0
+            for day in iter_all_time_days(start_date, end_date):
+                self._publish_all_time_day(day)
+                published_days += 1
+                if published_days % 30 == 0:
+                    logger.info(f'ALL_TIME: опубликовано {published_days} дней (последний {day.date})')
             
-            # Загружаем обычные прогнозы для будущих матчей (из таблицы predictions)
-            df_regular_predictions = get_all_predictions()
-            
-            # Объединяем outcomes и predictions для полного набора regular прогнозов
-            if not df_regular_predictions.empty:
-                # Преобразуем predictions в формат outcomes
-                df_regular_predictions_formatted = self._convert_predictions_to_outcomes_format(df_regular_predictions)
-                
-                # Исключаем матчи, которые уже есть в outcomes (чтобы избежать дублей)
-                if not df_regular_outcomes.empty:
-                    existing_match_ids = df_regular_outcomes['match_id'].unique()
-                    df_regular_predictions_formatted = df_regular_predictions_formatted[
-                        ~df_regular_predictions_formatted['match_id'].isin(existing_match_ids)
-                    ]
-                    logger.info(f'Исключено {len(df_regular_predictions) - len(df_regular_predictions_formatted)} predictions, которые уже есть в outcomes')
-                
-                # Объединяем с outcomes
-                df_regular_outcomes = pd.concat([df_regular_outcomes, df_regular_predictions_formatted], ignore_index=True)
-            
-            if df_quality_statistics.empty and df_regular_outcomes.empty:
+            if published_days == 0:
                 logger.warning('Нет прогнозов за указанный период (ни качественных, ни обычных)')
                 return True  # Не ошибка, просто нет данных
             
-            # Публикуем прогнозы по дням
-            self._publish_daily_reports(df_quality_statistics, df_regular_outcomes, year)
-            
-            # Публикуем итоги по дням (только для прошедших матчей)
-            # Передаем regular outcomes и quality statistics в правильном порядке
-            self._publish_daily_outcomes(df_regular_outcomes, df_quality_statistics, year)
-            
-            logger.info('Прогнозы и итоги за весь период опубликованы с разделением по дням')
+            logger.info(f'Прогнозы и итоги за весь период опубликованы с разделением по дням ({published_days} дней)')
             return True
             
         except Exception as e:
             logger.error(f'Ошибка при публикации прогнозов и итогов за весь период: {e}')
             return False
     
+    def _publish_all_time_day(self, day: AllTimeDay) -> None:
+        """
+        Публикует прогнозы и итоги одного дня ALL_TIME публикации.
+        
+        Args:
+            day: Данные дня (statistics, outcomes и predictions)
+        """
+        df_regular = self._merge_regular_forecasts(day.outcomes, day.predictions)
+        
+        if not day.quality.empty:
+            self._publish_daily_quality_report(day.quality, day.date)
+        if not df_regular.empty:
+            self._publish_daily_regular_report(df_regular, day.date)
+            self._publish_daily_regular_outcome_report(df_regular, day.date)
+        if not day.quality.empty:
+            self._publish_daily_quality_outcome_report(day.quality, day.date)
+    
+    def _merge_regular_forecasts(self, df_outcomes: pd.DataFrame, df_predictions: pd.DataFrame) -> pd.DataFrame:
+        """
+        Объединяет outcomes и predictions (для матчей без outcomes) в обычные прогнозы.
+        
+        Args:
+            df_outcomes: Строки таблицы outcomes
+            df_predictions: Строки таблицы predictions
+            
+        Returns:
+            pd.DataFrame: Обычные прогнозы в формате outcomes
+        """
+        if df_predictions.empty:
+            return df_outcomes
+        
+        # Преобразуем predictions в формат outcomes
+        df_predictions_formatted = self._convert_predictions_to_outcomes_format(df_predictions)
+        if df_predictions_formatted.empty:
+            return df_outcomes
+        
+        # Исключаем матчи, которые уже есть в outcomes (чтобы избежать дублей)
+        if not df_outcomes.empty:
+            df_predictions_formatted = df_predictions_formatted[
+                ~df_predictions_formatted['match_id'].isin(df_outcomes['match_id'].unique())
+            ]
+        
+        return pd.concat([df_outcomes, df_predictions_formatted], ignore_index=True)
+    
     def _format_forecast_report(self, df: pd.DataFrame, period: str) -> str:
         """
         Форматирует отчет по прогнозам.
@@ -1035,6 +1138,9 @@ class StatisticsPublisher:
         """
         Преобразует данные из таблицы predictions в формат таблицы outcomes.
         
+        Для каждого матча берется самый вероятный исход WIN_DRAW_LOSS (feature 1),
+        OZ (feature 2) и TOTAL (feature 5); выбор выполняется векторно по колонкам.
+        
         Args:
             df_predictions: DataFrame из таблицы predictions
             
@@ -1042,220 +1148,77 @@ class StatisticsPublisher:
             pd.DataFrame: DataFrame в формате outcomes
         """
         try:
-            outcomes_list = []
-            
-            for _, row in df_predictions.iterrows():
-                match_id = row['match_id']
-                
-                # WIN_DRAW_LOSS (feature 1) - берем только самый вероятный исход
-                win_prob = row.get('win_draw_loss_home_win', 0)
-                draw_prob = row.get('win_draw_loss_draw', 0) 
-                away_prob = row.get('win_draw_loss_away_win', 0)
-                
-                max_prob = max(win_prob, draw_prob, away_prob)
-                if max_prob == win_prob:
-                    outcome = 'п1'
-                    forecast = win_prob
-                elif max_prob == draw_prob:
-                    outcome = 'х'
-                    forecast = draw_prob
-                else:
-                    outcome = 'п2'
-                    forecast = away_prob
-                
-                if pd.notna(forecast) and forecast > 0:
-                    forecast_float = float(forecast)
-                    outcomes_list.append({
-                        'match_id': match_id,
-                        'feature': 1,
-                        'forecast': forecast_float,
-                        'outcome': outcome,
-                        'probability': forecast_float,
-                        'confidence': 0.5,
-                        'uncertainty': 1.0 - forecast_float,
-                        'lower_bound': max(0, forecast_float - 0.1),
-                        'upper_bound': min(1, forecast_float + 0.1),
-                        'gameData': row['gameData'],
-                        'team_home_name': row['team_home_name'],
-                        'team_away_name': row['team_away_name'],
-                        'championshipName': row['championshipName'],
-                        'sportName': row['sportName'],
-                        'numOfHeadsHome': row.get('numOfHeadsHome', 0),
-                        'numOfHeadsAway': row.get('numOfHeadsAway', 0)
-                    })
-                
-                # OZ (feature 2) - берем более вероятный исход
-                oz_yes = row.get('oz_yes', 0)
-                oz_no = row.get('oz_no', 0)
-                
-                if oz_yes > oz_no and pd.notna(oz_yes) and oz_yes > 0:
-                    oz_yes_float = float(oz_yes)
-                    outcomes_list.append({
-                        'match_id': match_id,
-                        'feature': 2,
-                        'forecast': oz_yes_float,
-                        'outcome': 'обе забьют - да',
-                        'probability': oz_yes_float,
-                        'confidence': 0.5,
-                        'uncertainty': 1.0 - oz_yes_float,
-                        'lower_bound': max(0, oz_yes_float - 0.1),
-                        'upper_bound': min(1, oz_yes_float + 0.1),
-                        'gameData': row['gameData'],
-                        'team_home_name': row['team_home_name'],
-                        'team_away_name': row['team_away_name'],
-                        'championshipName': row['championshipName'],
-                        'sportName': row['sportName'],
-                        'numOfHeadsHome': row.get('numOfHeadsHome', 0),
-                        'numOfHeadsAway': row.get('numOfHeadsAway', 0)
-                    })
-                elif oz_no > oz_yes and pd.notna(oz_no) and oz_no > 0:
-                    oz_no_float = float(oz_no)
-                    outcomes_list.append({
-                        'match_id': match_id,
-                        'feature': 2,
-                        'forecast': oz_no_float,
-                        'outcome': 'обе забьют - нет',
-                        'probability': oz_no_float,
-                        'confidence': 0.5,
-                        'uncertainty': 1.0 - oz_no_float,
-                        'lower_bound': max(0, oz_no_float - 0.1),
-                        'upper_bound': min(1, oz_no_float + 0.1),
-                        'gameData': row['gameData'],
-                        'team_home_name': row['team_home_name'],
-                        'team_away_name': row['team_away_name'],
-                        'championshipName': row['championshipName'],
-                        'sportName': row['sportName'],
-                        'numOfHeadsHome': row.get('numOfHeadsHome', 0),
-                        'numOfHeadsAway': row.get('numOfHeadsAway', 0)
-                    })
-                
-                # TOTAL (feature 5)
-                total_yes = row.get('total_yes', 0)
-                total_no = row.get('total_no', 0)
-                
-                if total_yes > total_no and pd.notna(total_yes) and total_yes > 0:
-                    total_yes_float = float(total_yes)
-                    outcomes_list.append({
-                        'match_id': match_id,
-                        'feature': 5,
-                        'forecast': total_yes_float,
-                        'outcome': 'тб',
-                        'probability': total_yes_float,
-                        'confidence': 0.5,
-                        'uncertainty': 1.0 - total_yes_float,
-                        'lower_bound': max(0, total_yes_float - 0.1),
-                        'upper_bound': min(1, total_yes_float + 0.1),
-                        'gameData': row['gameData'],
-                        'team_home_name': row['team_home_name'],
-                        'team_away_name': row['team_away_name'],
-                        'championshipName': row['championshipName'],
-                        'sportName': row['sportName'],
-                        'numOfHeadsHome': row.get('numOfHeadsHome', 0),
-                        'numOfHeadsAway': row.get('numOfHeadsAway', 0)
-                    })
-                elif total_no > total_yes and pd.notna(total_no) and total_no > 0:
-                    total_no_float = float(total_no)
-                    outcomes_list.append({
-                        'match_id': match_id,
-                        'feature': 5,
-                        'forecast': total_no_float,
-                        'outcome': 'тм',
-                        'probability': total_no_float,
-                        'confidence': 0.5,
-                        'uncertainty': 1.0 - total_no_float,
-                        'lower_bound': max(0, total_no_float - 0.1),
-                        'upper_bound': min(1, total_no_float + 0.1),
-                        'gameData': row['gameData'],
-                        'team_home_name': row['team_home_name'],
-                        'team_away_name': row['team_away_name'],
-                        'championshipName': row['championshipName'],
-                        'sportName': row['sportName'],
-                        'numOfHeadsHome': row.get('numOfHeadsHome', 0),
-                        'numOfHeadsAway': row.get('numOfHeadsAway', 0)
-                    })
-                
-            return pd.DataFrame(outcomes_list)
+            if df_predictions.empty:
+                return pd.DataFrame()
+            
+            df = df_predictions.reset_index(drop=True)
+            
+            def probabilities(name: str) -> np.ndarray:
+                return pd.to_numeric(column(df, name, 0), errors='coerce').to_numpy(dtype=float)
+            
+            # WIN_DRAW_LOSS - первый максимальный исход (как max() по п1, х, п2)
+            win, draw, away = (probabilities(name) for name in (
+                'win_draw_loss_home_win', 'win_draw_loss_draw', 'win_draw_loss_away_win'
+            ))
+            best = np.where(draw > win, draw, win)
+            best = np.where(away > best, away, best)
+            wdl_outcome = np.where(best == win, 'п1', np.where(best == draw, 'х', 'п2'))
+            wdl_forecast = np.where(best == win, win, np.where(best == draw, draw, away))
+            
+            # OZ и TOTAL - более вероятный из двух исходов
+            oz_yes, oz_no = probabilities('oz_yes'), probabilities('oz_no')
+            total_yes, total_no = probabilities('total_yes'), probabilities('total_no')
+            
+            candidates = [
+                (1, wdl_outcome, wdl_forecast, ~np.isnan(wdl_forecast) & (wdl_forecast > 0)),
+                (2, 'обе забьют - да', oz_yes, (oz_yes > oz_no) & (oz_yes > 0)),
+                (2, 'обе забьют - нет', oz_no, (oz_no > oz_yes) & (oz_no > 0)),
+                (5, 'тб', total_yes, (total_yes > total_no) & (total_yes > 0)),
+                (5, 'тм', total_no, (total_no > total_yes) & (total_no > 0)),
+            ]
+            
+            match_columns = {
+                'gameData': df['gameData'],
+                'team_home_name': df['team_home_name'],
+                'team_away_name': df['team_away_name'],
+                'championshipName': df['championshipName'],
+                'sportName': df['sportName'],
+                'numOfHeadsHome': column(df, 'numOfHeadsHome', 0),
+                'numOfHeadsAway': column(df, 'numOfHeadsAway', 0)
+            }
+            
+            frames = []
+            for order, (feature, outcome, forecast, mask) in enumerate(candidates):
+                if not mask.any():
+                    continue
+                forecast = forecast[mask]
+                frames.append(pd.DataFrame({
+                    'match_id': df['match_id'].to_numpy()[mask],
+                    'feature': feature,
+                    'forecast': forecast,
+                    'outcome': outcome[mask] if isinstance(outcome, np.ndarray) else outcome,
+                    'probability': forecast,
+                    'confidence': 0.5,
+                    'uncertainty': 1.0 - forecast,
+                    'lower_bound': np.maximum(0, forecast - 0.1),
+                    'upper_bound': np.minimum(1, forecast + 0.1),
+                    **{name: values.to_numpy()[mask] for name, values in match_columns.items()},
+                    '_row': np.flatnonzero(mask),
+                    '_order': order
+                }))
+            
+            if not frames:
+                return pd.DataFrame()
+            
+            # Порядок как при построчном обходе: матч за матчем, внутри - по feature
+            outcomes = pd.concat(frames, ignore_index=True)
+            outcomes = outcomes.sort_values(['_row', '_order'], kind='mergesort')
+            return outcomes.drop(columns=['_row', '_order']).reset_index(drop=True)
             
         except Exception as e:
             logger.error(f'Ошибка при преобразовании predictions в формат outcomes: {e}')
             return pd.DataFrame()
     
-    def _publish_daily_reports(self, df_quality: pd.DataFrame, df_regular: pd.DataFrame, year: Optional[str] = None) -> None:
-        """
-        Публикует отчеты по дням с разделением на качественные и обычные прогнозы.
-        
-        Args:
-            df_quality: DataFrame с качественными прогнозами (из таблицы statistics)
-            df_regular: DataFrame с обычными прогнозами (из таблицы outcomes)
-            year: Год для фильтрации (опционально)
-        """
-        try:
-            logger.info('Публикация отчетов по дням с разделением на качественные и обычные')
-            
-            # Обрабатываем качественные прогнозы
-            if not df_quality.empty:
-                df_quality['match_date'] = pd.to_datetime(df_quality['match_date'], errors='coerce')
-                quality_dates = df_quality['match_date'].dt.date.dropna().unique()
-                
-                for date in sorted(quality_dates):
-                    day_quality = df_quality[df_quality['match_date'].dt.date == date]
-                    self._publish_daily_quality_report(day_quality, date)
-            
-            # Обрабатываем обычные прогнозы (из таблицы outcomes)
-            if not df_regular.empty:
-                df_regular['gameData'] = pd.to_datetime(df_regular['gameData'], errors='coerce')
-                regular_dates = df_regular['gameData'].dt.date.dropna().unique()
-                
-                for date in sorted(regular_dates):
-                    day_regular = df_regular[df_regular['gameData'].dt.date == date]
-                    self._publish_daily_regular_report(day_regular, date)
-            
-            logger.info('Отчеты по дням опубликованы')
-            
-        except Exception as e:
-            logger.error(f'Ошибка при публикации отчетов по дням: {e}')
-    
-    def _publish_daily_outcomes(self, df_regular: pd.DataFrame, df_quality: pd.DataFrame, year: Optional[str] = None) -> None:
-        """
-        Публикует итоги по дням с разделением на качественные и обычные итоги.
-        
-        Args:
-            df_regular: DataFrame с обычными прогнозами (из таблицы outcomes)
-            df_quality: DataFrame с качественными прогнозами (из таблицы statistics)
-            year: Год для фильтрации (опционально)
-        """
-        try:
-            logger.info('Публикация итогов по дням с разделением на качественные и обычные')
-            
-            today = datetime.now().date()
-            
-            # Обрабатываем качественные итоги (только прошедшие матчи)
-            if not df_quality.empty:
-                df_quality['match_date'] = pd.to_datetime(df_quality['match_date'], errors='coerce')
-                # Фильтруем только прошедшие матчи
-                df_quality_past = df_quality[df_quality['match_date'].dt.date < today]
-                quality_dates = df_quality_past['match_date'].dt.date.dropna().unique()
-                
-                for date in sorted(quality_dates):
-                    day_quality = df_quality_past[df_quality_past['match_date'].dt.date == date]
-                    self._publish_daily_quality_outcome_report(day_quality, date)
-            
-            # Обрабатываем обычные итоги (только прошедшие матчи)
-            if not df_regular.empty:
-                df_regular['gameData'] = pd.to_datetime(df_regular['gameData'], errors='coerce')
-                # Фильтруем только прошедшие матчи
-                df_regular_past = df_regular[df_regular['gameData'].dt.date < today]
-                regular_dates = df_regular_past['gameData'].dt.date.dropna().unique()
-                
-                for date in sorted(regular_dates):
-                    day_regular = df_regular_past[df_regular_past['gameData'].dt.date == date]
-                    self._publish_daily_regular_outcome_report(day_regular, date)
-            
-            logger.info('Итоги по дням опубликованы')
-            
-        except Exception as e:
-            logger.error(f'Ошибка при публикации итогов по дням: {e}')
-    
     def _publish_daily_quality_report(self, df_day: pd.DataFrame, date: datetime.date) -> None:
         """
         Публикует качественный отчет за конкретный день.
@@ -1268,7 +1231,7 @@ class StatisticsPublisher:
             logger.info(f'Публикация качественного отчета за {date}')
             
             # Форматируем отчет
-            report = self._format_daily_quality_report(df_day, date)
+            report = self._render_daily_quality_report(df_day, date)
             
             if report:
                 # Создаем сообщение для публикации
@@ -1301,7 +1264,7 @@ class StatisticsPublisher:
             logger.info(f'Публикация обычного отчета за {date}')
             
             # Форматируем отчет для прогнозов из outcomes БЕЗ иконок статуса
-            report = self._format_daily_regular_forecasts_from_outcomes(df_day, date)
+            report = self._render_daily_regular_forecasts_from_outcomes(df_day, date)
             
             if report:
                 # Создаем сообщение для публикации
@@ -1334,7 +1297,7 @@ class StatisticsPublisher:
             logger.info(f'Публикация качественного отчета по итогам за {date}')
             
             # Форматируем отчет (данные из таблицы statistics)
-            report = self._format_daily_quality_outcome_report(df_day, date)
+            report = self._render_daily_quality_outcome_report(df_day, date)
             
             if report:
                 # Создаем сообщение для публикации
@@ -1405,6 +1368,11 @@ class StatisticsPublisher:
             
             report = f'📊 ОБЫЧНЫЕ ПРОГНОЗЫ - {date.strftime("%d.%m.%Y")}\n\n'
             
+            # Статусы, регрессия и точность дня загружаются один раз на день
+            df_day = self._with_prediction_status(df_day)
+            regression_by_match = self._get_regression_data_for_matches(df_day['match_id'].unique().tolist())
+            daily_accuracy = self._calculate_daily_accuracy_regular(df_day)
+            
             # Группируем по матчам
             for match_id, match_group in df_day.groupby('match_id'):
                 match_info = match_group.iloc[0]
@@ -1421,8 +1389,7 @@ class StatisticsPublisher:
                 
                 report += f'\n📊 ДЕТАЛЬНАЯ СТАТИСТИКА ПРОГНОЗА:\n\n'
                 
-                # Получаем данные регрессии из predictions для этого матча (один раз на матч)
-                regression_data = self._get_regression_data_for_match(match_id)
+                regression_data = regression_by_match.get(match_id)
                 
                 # Прогнозы и их результаты
                 for _, outcome_row in match_group.iterrows():
@@ -1439,7 +1406,7 @@ class StatisticsPublisher:
                     feature_description = self._get_feature_description_from_outcome(feature, outcome)
                     
                     # Определяем правильность прогноза на основе результата матча
-                    status_icon = self._determine_prediction_status(feature, outcome, match_id)
+                    status_icon = outcome_row['prediction_status']
                     
                     # Получаем историческую статистику для regular прогнозов
                     forecast_type, forecast_subtype = self._get_forecast_type_subtype_from_feature(feature, outcome)
@@ -1478,7 +1445,6 @@ class StatisticsPublisher:
                 report += f'🏆 Лучший прогноз: {best_worst["best"]} | 💥 Худший прогноз: {best_worst["worst"]}\n'
                 
                 # Средняя точность дня
-                daily_accuracy = self._calculate_daily_accuracy_regular(df_day)
                 report += f'📈 Средняя точность дня: {daily_accuracy:.1%}\n\n'
             
             return report
@@ -1499,59 +1465,123 @@ class StatisticsPublisher:
             str: Отформатированный отчет
         """
         try:
-            if df_day.empty:
-                return ''
-            
-            report = f'🌟 КАЧЕСТВЕННЫЕ ПРОГНОЗЫ - {date.strftime("%d.%m.%Y")}\n\n'
-            
-            # Группируем по матчам
-            for match_id, match_group in df_day.groupby('match_id'):
-                match_info = match_group.iloc[0]
-                
-                # Заголовок матча с match_id
-                report += f'🏆 {match_info.get("sportName", "Soccer")} - {match_info.get("championshipName", "Unknown")}\n'
-                report += f'🆔 Match ID: {match_id}\n'
-                report += f'⚽ {match_info.get("team_home_name", "Home")} vs {match_info.get("team_away_name", "Away")}\n'
-                
-                # Время матча
-                if 'match_date' in match_info and pd.notna(match_info['match_date']):
-                    match_time = pd.to_datetime(match_info['match_date'])
-                    report += f'🕐 {match_time.strftime("%H:%M")}\n'
-                
-                report += f'\n📊 ДЕТАЛЬНАЯ СТАТИСТИКА ПРОГНОЗА:\n\n'
-                
-                # Прогнозы по типам
-                for _, forecast_row in match_group.iterrows():
-                    forecast_type = forecast_row.get('forecast_type', 'Unknown')
-                    forecast_subtype = forecast_row.get('forecast_subtype', '')
-                    probability = forecast_row.get('probability', 0) or forecast_row.get('prediction_accuracy', 0)
-                    confidence = forecast_row.get('confidence', 0)
-                    uncertainty = forecast_row.get('uncertainty', 0)
-                    lower_bound = forecast_row.get('lower_bound', 0)
-                    upper_bound = forecast_row.get('upper_bound', 0)
-                    actual_value = forecast_row.get('actual_value', '')
-                    is_correct = forecast_row.get('prediction_correct', False)
-                    
-                    # Форматируем тип прогноза
-                    forecast_display = self._format_forecast_type(forecast_type, forecast_subtype, actual_value)
-                    
-                    # Получаем историческую статистику
-                    historical_stats = self._get_historical_statistics(forecast_type, forecast_subtype)
-                    
-                    # Расширенная статистика (БЕЗ иконок статуса - это прогнозы, а не итоги)
-                    report += f'• {forecast_display}\n'
-                    report += f'  🎯 Вероятность: {probability or 0:.1%} | 🔒 Уверенность: {confidence or 0:.1%} | 📊 Неопределенность: {uncertainty or 0:.1%}\n'
-                    report += f'  📈 Границы: [{lower_bound or 0:.2f} - {upper_bound or 0:.2f}] | ⚖️ Калибровка: {historical_stats["calibration"]:.1%} | 🛡️ Стабильность: {historical_stats["stability"]:.1%}\n'
-                    report += f'  Историческая точность: {historical_stats["historical_accuracy"]} | 🔥 Последние 10: {historical_stats["recent_accuracy"]}\n\n'
-                
-                # Итоги матча удалены по запросу пользователя - в прогнозах не должно быть итогов
-            
-            return report
-            
+            return str(self._render_daily_quality_report(df_day, date))
         except Exception as e:
             logger.error(f'Ошибка при форматировании качественного отчета за {date}: {e}')
             return f'❌ Ошибка форматирования качественного отчета за {date}: {e}'
     
+    def _render_daily_quality_report(self, df_day: pd.DataFrame, date: datetime.date) -> RenderedReport:
+        """
+        Готовит качественный отчет за день (прогнозы из таблицы statistics) к рендерингу.
+        
+        Args:
+            df_day: DataFrame с данными за день
+            date: Дата отчета
+            
+        Returns:
+            RenderedReport: Отчет для потоковой записи
+        """
+        template = 'daily_quality_forecasts.txt.j2'
+        if df_day.empty:
+            return render_report(template, dict, empty=True)
+        
+        rows = pd.DataFrame(index=df_day.index)
+        rows['forecast_type'] = column(df_day, 'forecast_type', 'Unknown')
+        rows['forecast_subtype'] = column(df_day, 'forecast_subtype', '')
+        
+        def describe(forecast_type: str, forecast_subtype: str) -> Dict[str, Any]:
+            stats = self._get_historical_statistics(forecast_type, forecast_subtype)
+            return {
+                'description': self._format_forecast_type(forecast_type, forecast_subtype, ''),
+                'calibration_text': f'{stats["calibration"]:.1%}',
+                'stability_text': f'{stats["stability"]:.1%}',
+                'historical_text': f'{stats["historical_accuracy"]}',
+                'recent_text': f'{stats["recent_accuracy"]}'
+            }
+        
+        lookup_columns = ['description', 'calibration_text', 'stability_text', 'historical_text', 'recent_text']
+        rows[lookup_columns] = lookup_unique(rows, ['forecast_type', 'forecast_subtype'], describe, lookup_columns)
+        
+        # Вероятность из probability, при нуле - из prediction_accuracy
+        probability = pd.to_numeric(column(df_day, 'probability', 0), errors='coerce')
+        accuracy = pd.to_numeric(column(df_day, 'prediction_accuracy', 0), errors='coerce')
+        rows['probability_text'] = format_percent(probability.mask(probability == 0, accuracy))
+        rows['confidence_text'] = format_percent(column(df_day, 'confidence', 0))
+        rows['uncertainty_text'] = format_percent(column(df_day, 'uncertainty', 0))
+        rows['lower_bound_text'] = format_fixed(column(df_day, 'lower_bound', 0))
+        rows['upper_bound_text'] = format_fixed(column(df_day, 'upper_bound', 0))
+        
+        headers = header_frame(df_day, {
+            'sportName': 'Soccer', 'championshipName': 'Unknown',
+            'team_home_name': 'Home', 'team_away_name': 'Away'
+        }, time_column='match_date')
+        
+        return self._match_blocks_report(template, date, df_day, headers, rows)
+    
+    def _match_blocks_report(self, template: str, date: datetime.date, df_day: pd.DataFrame,
+                             headers: pd.DataFrame, rows: pd.DataFrame) -> RenderedReport:
+        """
+        Собирает отчет по блокам матчей из колонок заголовков и строк.
+        
+        Args:
+            template: Имя шаблона
+            date: Дата отчета
+            df_day: Исходные данные дня (для match_id)
+            headers: Колонки заголовка матча
+            rows: Колонки строк прогнозов
+            
+        Returns:
+            RenderedReport: Отчет для потоковой записи
+        """
+        view = pd.concat([df_day[['match_id']], headers, rows], axis=1)
+        header_columns = ['match_id', *headers.columns]
+        row_columns = list(rows.columns)
+        report_date = date.strftime('%d.%m.%Y')
+        
+        return render_report(template, lambda: {
+            'report_date': report_date,
+            'matches': iter_match_blocks(view, header_columns, row_columns)
+        })
+    
+    def _regular_statistics_columns(self, df_day: pd.DataFrame) -> pd.DataFrame:
+        """
+        Рассчитывает колонки строк regular прогнозов (из таблицы outcomes).
+        
+        Описание прогноза и историческая статистика запрашиваются один раз
+        на уникальную пару (feature, outcome).
+        
+        Args:
+            df_day: DataFrame с данными за день из таблицы outcomes
+            
+        Returns:
+            pd.DataFrame: Колонки строк с индексом df_day
+        """
+        rows = pd.DataFrame(index=df_day.index)
+        rows['feature'] = pd.to_numeric(column(df_day, 'feature', 0), errors='coerce').fillna(0).astype(int)
+        rows['outcome'] = column(df_day, 'outcome', '')
+        
+        def describe(feature: int, outcome: str) -> Dict[str, Any]:
+            forecast_type, forecast_subtype = self._get_forecast_type_subtype_from_feature(feature, outcome)
+            stats = self._get_historical_statistics_regular(forecast_type, forecast_subtype)
+            return {
+                'description': self._get_feature_description_from_outcome(feature, outcome),
+                'calibration_text': f'{stats["calibration"]:.1%}',
+                'stability_text': f'{stats["stability"]:.1%}',
+                'historical_text': stats['historical_accuracy'],
+                'recent_text': stats['recent_accuracy']
+            }
+        
+        lookup_columns = ['description', 'calibration_text', 'stability_text', 'historical_text', 'recent_text']
+        rows[lookup_columns] = lookup_unique(rows, ['feature', 'outcome'], describe, lookup_columns)
+        
+        rows['probability_text'] = format_percent(column(df_day, 'probability', 0))
+        rows['confidence_text'] = format_percent(column(df_day, 'confidence', 0))
+        rows['uncertainty_text'] = format_percent(column(df_day, 'uncertainty', 0))
+        rows['lower_bound_text'] = format_fixed(column(df_day, 'lower_bound', 0))
+        rows['upper_bound_text'] = format_fixed(column(df_day, 'upper_bound', 0))
+        return rows
+    
+
     def _format_daily_regular_forecasts_from_outcomes(self, df_day: pd.DataFrame, date: datetime.date) -> str:
         """
         Форматирует обычные прогнозы за день на основе данных из таблицы outcomes БЕЗ иконок статуса.
@@ -1564,69 +1594,34 @@ class StatisticsPublisher:
             str: Отформатированный отчет
         """
         try:
-            if df_day.empty:
-                return ''
-            
-            report = f'📊 ОБЫЧНЫЕ ПРОГНОЗЫ - {date.strftime("%d.%m.%Y")}\n\n'
-            
-            # Группируем по матчам
-            for match_id, match_group in df_day.groupby('match_id'):
-                match_info = match_group.iloc[0]
-                
-                # Заголовок матча
-                report += f'🆔 Match ID: {match_id}\n'
-                report += f'🏆 {match_info.get("sportName", "Unknown")} - {match_info.get("championshipName", "Unknown")}\n'
-                report += f'⚽ {match_info.get("team_home_name", "Unknown")} vs {match_info.get("team_away_name", "Unknown")}\n'
-                
-                # Время матча
-                if 'gameData' in match_info and pd.notna(match_info['gameData']):
-                    match_time = pd.to_datetime(match_info['gameData'])
-                    report += f'🕐 {match_time.strftime("%H:%M")}\n\n'
-                else:
-                    report += '\n'
-                
-                report += f'📊 ДЕТАЛЬНАЯ СТАТИСТИКА ПРОГНОЗА:\n\n'
-                
-                # Прогнозы
-                processed_count = 0
-                for _, outcome_row in match_group.iterrows():
-                    try:
-                        feature = int(outcome_row['feature']) if pd.notna(outcome_row['feature']) else 0
-                        outcome = outcome_row.get('outcome', '')
-                        
-                        
-                        probability = outcome_row.get('probability', 0)
-                        confidence = outcome_row.get('confidence', 0)
-                        uncertainty = outcome_row.get('uncertainty', 0)
-                        lower_bound = outcome_row.get('lower_bound', 0)
-                        upper_bound = outcome_row.get('upper_bound', 0)
-                        
-                        # Получаем описание прогноза
-                        feature_desc = self._get_feature_description_from_outcome(feature, outcome)
-                        
-                        # Получаем расширенную статистику
-                        forecast_type, forecast_subtype = self._get_forecast_type_subtype_from_feature(feature, outcome)
-                        historical_stats = self._get_historical_statistics_regular(forecast_type, forecast_subtype)
-                        
-                        # Форматируем прогноз БЕЗ иконки статуса
-                        report += f'• {feature_desc}: {outcome}\n'
-                        report += f'  🎯 Вероятность: {probability:.1%} | 🔒 Уверенность: {confidence:.1%} | 📊 Неопределенность: {uncertainty:.1%}\n'
-                        report += f'  📈 Границы: [{lower_bound:.2f} - {upper_bound:.2f}] | ⚖️ Калибровка: {historical_stats["calibration"]:.1%} | 🛡️ Стабильность: {historical_stats["stability"]:.1%}\n'
-                        report += f'  Историческая точность: {historical_stats["historical_accuracy"]} | 🔥 Последние 10: {historical_stats["recent_accuracy"]}\n\n'
-                        processed_count += 1
-                    except Exception as e:
-                        logger.error(f'Ошибка при форматировании прогноза для матча {match_id}, feature {feature}: {e}', exc_info=True)
-                        continue
-                
-                
-                # НЕ добавляем блок "ИТОГИ МАТЧА" - это прогнозы, а не итоги
-            
-            return report
-            
+            return str(self._render_daily_regular_forecasts_from_outcomes(df_day, date))
         except Exception as e:
             logger.error(f'Ошибка при форматировании обычных прогнозов за {date}: {e}')
             return f'❌ Ошибка форматирования обычных прогнозов за {date}: {e}'
     
+    def _render_daily_regular_forecasts_from_outcomes(self, df_day: pd.DataFrame, date: datetime.date) -> RenderedReport:
+        """
+        Готовит обычные прогнозы за день (из таблицы outcomes) к рендерингу.
+        
+        Args:
+            df_day: DataFrame с данными за день из таблицы outcomes
+            date: Дата отчета
+            
+        Returns:
+            RenderedReport: Отчет для потоковой записи
+        """
+        template = 'daily_regular_forecasts.txt.j2'
+        if df_day.empty:
+            return render_report(template, dict, empty=True)
+        
+        rows = self._regular_statistics_columns(df_day)
+        headers = header_frame(df_day, {
+            'sportName': 'Unknown', 'championshipName': 'Unknown',
+            'team_home_name': 'Unknown', 'team_away_name': 'Unknown'
+        }, time_column='gameData')
+        
+        return self._match_blocks_report(template, date, df_day, headers, rows)
+    
     def _format_daily_regular_report(self, df_day: pd.DataFrame, date: datetime.date) -> str:
         """
         Форматирует обычный отчет за день с расширенной статистикой.
@@ -1884,56 +1879,56 @@ class StatisticsPublisher:
         try:
             if df_quality.empty:
                 return ''
-            
-            report = '🌟 КАЧЕСТВЕННЫЕ ПРОГНОЗЫ:\n\n'
-            
-            # Группируем по датам
-            df_quality['match_date'] = pd.to_datetime(df_quality['match_date'], errors='coerce')
-            df_quality = df_quality.sort_values(['match_date', 'match_id'])
-            
-            for date, day_group in df_quality.groupby(df_quality['match_date'].dt.date):
-                report += f'📅 {date.strftime("%d.%m.%Y")}\n'
-                
-                # Группируем по матчам
-                for match_id, match_group in day_group.groupby('match_id'):
-                    match_info = match_group.iloc[0]
-                    
-                    # Заголовок матча
-                    report += f'🏆 {match_info.get("sportName", "Soccer")} - {match_info.get("championshipName", "Unknown")}\n'
-                    report += f'⚽ {match_info.get("team_home_name", "Home")} vs {match_info.get("team_away_name", "Away")}\n'
-                    
-                    # Время матча (если есть)
-                    if 'match_date' in match_info and pd.notna(match_info['match_date']):
-                        match_time = pd.to_datetime(match_info['match_date'])
-                        report += f'🕐 {match_time.strftime("%H:%M")}\n'
-                    
-                    # Прогнозы по типам
-                    for _, forecast_row in match_group.iterrows():
-                        forecast_type = forecast_row.get('forecast_type', 'Unknown')
-                        forecast_subtype = forecast_row.get('forecast_subtype', '')
-                        probability = forecast_row.get('prediction_accuracy', 0)
-                        actual_value = forecast_row.get('actual_value', '')
-                        is_correct = forecast_row.get('prediction_correct', False)
-                        
-                        # Форматируем тип прогноза
-                        forecast_display = self._format_forecast_type(forecast_type, forecast_subtype, actual_value)
-                        
-                        # Статус прогноза
-                        status_icon = '✅' if is_correct else '❌'
-                        
-                        # Форматируем как в примере пользователя
-                        report += f'  • {forecast_display} | 🎯 {probability:.1%} | 📊 {probability:.1%} | 📈 {probability:.1%}\n'
-                    
-                    report += '\n'
-                
-                report += '\n'
-            
-            return report
-            
+            return str(self._render_detailed_quality_forecasts(df_quality))
         except Exception as e:
             logger.error(f'Ошибка при форматировании детальных качественных прогнозов: {e}')
             return f'❌ Ошибка форматирования качественных прогнозов: {e}'
     
+    def _render_detailed_quality_forecasts(self, df_quality: pd.DataFrame) -> RenderedReport:
+        """
+        Готовит детальные качественные прогнозы по дням к рендерингу.
+        
+        Args:
+            df_quality: DataFrame с качественными прогнозами
+            
+        Returns:
+            RenderedReport: Отчет для потоковой записи
+        """
+        match_dates = pd.to_datetime(column(df_quality, 'match_date', None), errors='coerce')
+        df_quality = df_quality.assign(match_date=match_dates).sort_values('match_date', kind='mergesort')
+        
+        rows = pd.DataFrame(index=df_quality.index)
+        rows['forecast_type'] = column(df_quality, 'forecast_type', 'Unknown')
+        rows['forecast_subtype'] = column(df_quality, 'forecast_subtype', '')
+        rows['actual_value'] = column(df_quality, 'actual_value', '')
+        rows[['description']] = lookup_unique(
+            rows, ['forecast_type', 'forecast_subtype', 'actual_value'],
+            lambda forecast_type, forecast_subtype, actual_value: {
+                'description': self._format_forecast_type(forecast_type, forecast_subtype, actual_value)
+            },
+            ['description']
+        )
+        rows['probability_text'] = format_percent(column(df_quality, 'prediction_accuracy', 0))
+        rows = rows[['description', 'probability_text']]
+        
+        headers = header_frame(df_quality, {
+            'sportName': 'Soccer', 'championshipName': 'Unknown',
+            'team_home_name': 'Home', 'team_away_name': 'Away'
+        }, time_column='match_date')
+        view = pd.concat([df_quality[['match_id']], headers, rows], axis=1)
+        view['match_day'] = df_quality['match_date'].dt.date
+        header_columns = ['match_id', *headers.columns]
+        row_columns = list(rows.columns)
+        
+        def days():
+            for match_day, day_view in view[view['match_day'].notna()].groupby('match_day', sort=True):
+                yield {
+                    'report_date': match_day.strftime('%d.%m.%Y'),
+                    'matches': iter_match_blocks(day_view, header_columns, row_columns)
+                }
+        
+        return render_report('detailed_quality_forecasts.txt.j2', lambda: {'days': days()})
+    
     def _format_detailed_regular_forecasts(self, df_regular: pd.DataFrame) -> str:
         """
         Форматирует детальные обычные прогнозы по дням.
@@ -2357,152 +2352,70 @@ class StatisticsPublisher:
         try:
             if df_quality.empty and df_regular.empty:
                 return f'❌ Нет итогов за {period}'
-            
-            report = f'📊 Итоги матчей за {period}\n\n'
-            
-            # Качественные итоги
-            if not df_quality.empty:
-                report += f'🌟 КАЧЕСТВЕННЫЕ ИТОГИ ({len(df_quality)} шт.):\n'
-                for match_id, group in df_quality.groupby('match_id'):
-                    match_info = group.iloc[0]
-                    report += f'⚽ {match_info.get("team_home_name", "Домашняя")} vs {match_info.get("team_away_name", "Гостевая")}\n'
-                    report += f'📅 {match_info.get("match_date", "Дата")}\n'
-                    report += f'🏆 Счет: {match_info.get("actual_value", "Неизвестно")}\n'
-                    
-                    correct_predictions = group[group['prediction_correct'] == True]
-                    total_predictions = len(group)
-                    correct_count = len(correct_predictions)
-                    
-                    report += f'✅ Правильных прогнозов: {correct_count}/{total_predictions}\n'
-                    
-                    if correct_count > 0:
-                        report += '  Правильные прогнозы:\n'
-                        for _, row in correct_predictions.iterrows():
-                            forecast_type = row.get('forecast_type', 'Неизвестно')
-                            forecast_subtype = row.get('forecast_subtype', '')
-                            report += f'    • {forecast_type} {forecast_subtype}\n'
-                    
-                    report += '\n'
-            
-            # Обычные итоги
-            if not df_regular.empty:
-                report += f'📈 ОБЫЧНЫЕ ИТОГИ ({len(df_regular)} шт.):\n'
-                for match_id, group in df_regular.groupby('match_id'):
-                    match_info = group.iloc[0]
-                    report += f'⚽ {match_info.get("team_home_name", "Домашняя")} vs {match_info.get("team_away_name", "Гостевая")}\n'
-                    report += f'📅 {match_info.get("gameData", "Дата")}\n'
-                    report += f'🏆 Счет: {match_info.get("numOfHeadsHome", "?")}:{match_info.get("numOfHeadsAway", "?")}\n'
-                    report += f'📊 Прогнозы созданы: {len(group)} шт.\n\n'
-            
-            return report
-            
+            return str(self._render_combined_outcome_report(df_quality, df_regular, period))
         except Exception as e:
             logger.error(f'Ошибка при форматировании объединенного отчета по итогам: {e}')
             return f'❌ Ошибка форматирования: {e}'
     
-    def _format_combined_all_time_report(self, df_quality: pd.DataFrame, df_regular: pd.DataFrame, year: Optional[str] = None) -> str:
+    def _render_combined_outcome_report(self, df_quality: pd.DataFrame, df_regular: pd.DataFrame,
+                                        period: str) -> RenderedReport:
         """
-        Форматирует объединенный отчет по статистике за весь период (качественные + обычные).
+        Готовит объединенный отчет по итогам матчей к рендерингу.
         
-        Args:
-            df_quality: DataFrame с качественной статистикой
-            df_regular: DataFrame с обычной статистикой
-            year: Год для фильтрации (опционально)
-            
-        Returns:
-            str: Отформатированный отчет
-        """
-        try:
-            if df_quality.empty and df_regular.empty:
-                return f'❌ Нет данных в статистике за {year or "весь период"}'
-            
-            period_title = f'за {year}' if year else 'за весь период'
-            report = f'📊 Статистика прогнозов {period_title}\n\n'
-            
-            # Общая статистика
-            total_quality = len(df_quality)
-            total_regular = len(df_regular)
-            total_predictions = total_quality + total_regular
-            
-            if total_quality > 0:
-                correct_quality = len(df_quality[df_quality['prediction_correct'] == True])
-                accuracy_quality = (correct_quality / total_quality * 100) if total_quality > 0 else 0
-            else:
-                correct_quality = 0
-                accuracy_quality = 0
-            
-            report += f'📈 Общая статистика:\n'
-            report += f'  • Всего качественных прогнозов: {total_quality}\n'
-            report += f'  • Всего обычных прогнозов: {total_regular}\n'
-            report += f'  • Общее количество: {total_predictions}\n'
-            
-            if total_quality > 0:
-                report += f'  • Правильных качественных: {correct_quality}\n'
-                report += f'  • Точность качественных: {accuracy_quality:.1f}%\n'
-            
-            report += '\n'
-            
-            # Статистика по типам качественных прогнозов
-            if not df_quality.empty:
-                forecast_types = df_quality['forecast_type'].value_counts()
-                report += f'📊 Статистика по типам качественных прогнозов:\n'
-                for forecast_type, count in forecast_types.items():
-                    type_df = df_quality[df_quality['forecast_type'] == forecast_type]
-                    type_correct = len(type_df[type_df['prediction_correct'] == True])
-                    type_accuracy = (type_correct / count * 100) if count > 0 else 0
-                    report += f'  • {forecast_type}: {type_correct}/{count} ({type_accuracy:.1f}%)\n'
-                
-                report += '\n'
-            
-            # Статистика по турнирам
-            if not df_regular.empty:
-                tournaments = df_regular['championshipName'].value_counts()
-                report += f'🏆 Статистика по турнирам (обычные прогнозы):\n'
-                for tournament, count in tournaments.head(10).items():
-                    report += f'  • {tournament}: {count} прогнозов\n'
-                
-                report += '\n'
-            
-            return report
-            
-        except Exception as e:
-            logger.error(f'Ошибка при форматировании объединенного отчета по статистике: {e}')
-            return f'❌ Ошибка форматирования: {e}'
-    
-    def _publish_daily_outcomes(self, df_regular_outcomes: pd.DataFrame, df_quality_statistics: pd.DataFrame, year: Optional[str] = None) -> None:
-        """
-        Публикует итоги по дням с разделением на regular и quality.
+        Счетчики прогнозов по матчу рассчитываются групповыми агрегатами,
+        правильные прогнозы отбираются в шаблоне по колонке is_correct.
         
         Args:
-            df_regular_outcomes: DataFrame с обычными итогами из таблицы outcomes
-            df_quality_statistics: DataFrame с качественными итогами из таблицы statistics
-            year: Год для фильтрации (опционально)
-        """
-        try:
-            logger.info('Публикация итогов по дням с разделением на regular и quality')
-            
-            # Обрабатываем regular итоги (из таблицы outcomes)
-            if not df_regular_outcomes.empty:
-                df_regular_outcomes['gameData'] = pd.to_datetime(df_regular_outcomes['gameData'], errors='coerce')
-                regular_dates = df_regular_outcomes['gameData'].dt.date.dropna().unique()
-                
-                for date_item in sorted(regular_dates):
-                    day_regular_outcomes = df_regular_outcomes[df_regular_outcomes['gameData'].dt.date == date_item]
-                    self._publish_daily_regular_outcome_report(day_regular_outcomes, date_item)
-            
-            # Обрабатываем quality итоги (из таблицы statistics)
-            if not df_quality_statistics.empty:
-                df_quality_statistics['match_date'] = pd.to_datetime(df_quality_statistics['match_date'], errors='coerce')
-                quality_dates = df_quality_statistics['match_date'].dt.date.dropna().unique()
-                
-                for date_item in sorted(quality_dates):
-                    day_quality_outcomes = df_quality_statistics[df_quality_statistics['match_date'].dt.date == date_item]
-                    self._publish_daily_quality_outcome_report(day_quality_outcomes, date_item)
-            
-            logger.info('Итоги по дням опубликованы с разделением на regular и quality')
+            df_quality: DataFrame с качественными итогами
+            df_regular: DataFrame с обычными итогами
+            period: Период (сегодня, вчера, etc.)
             
-        except Exception as e:
-            logger.error(f'Ошибка при публикации итогов по дням: {e}')
+        Returns:
+            RenderedReport: Отчет для потоковой записи
+        """
+        quality_view = None
+        if not df_quality.empty:
+            quality_view = header_frame(df_quality, {
+                'team_home_name': 'Домашняя', 'team_away_name': 'Гостевая',
+                'match_date': 'Дата', 'actual_value': 'Неизвестно'
+            })
+            quality_view.insert(0, 'match_id', df_quality['match_id'])
+            quality_view['is_correct'] = (df_quality['prediction_correct'] == True).to_numpy()
+            by_match = quality_view.groupby('match_id')['is_correct']
+            quality_view['correct_count'] = by_match.transform('sum').fillna(0).astype(int)
+            quality_view['total_count'] = by_match.transform('size').fillna(0).astype(int)
+            quality_view['forecast_type'] = column(df_quality, 'forecast_type', 'Неизвестно')
+            quality_view['forecast_subtype'] = column(df_quality, 'forecast_subtype', '')
+        
+        regular_view = None
+        if not df_regular.empty:
+            regular_view = header_frame(df_regular, {
+                'team_home_name': 'Домашняя', 'team_away_name': 'Гостевая',
+                'gameData': 'Дата', 'numOfHeadsHome': '?', 'numOfHeadsAway': '?'
+            })
+            regular_view.insert(0, 'match_id', df_regular['match_id'])
+            regular_view['total_count'] = regular_view.groupby('match_id')['match_id'].transform('size')
+        
+        quality_headers = [
+            'match_id', 'team_home_name', 'team_away_name', 'match_date', 'actual_value',
+            'correct_count', 'total_count'
+        ]
+        regular_headers = [
+            'match_id', 'team_home_name', 'team_away_name', 'gameData',
+            'numOfHeadsHome', 'numOfHeadsAway', 'total_count'
+        ]
+        
+        return render_report('combined_outcomes.txt.j2', lambda: {
+            'period': period,
+            'quality_count': len(df_quality),
+            'quality_matches': None if quality_view is None else iter_match_blocks(
+                quality_view, quality_headers, ['is_correct', 'forecast_type', 'forecast_subtype']
+            ),
+            'regular_count': len(df_regular),
+            'regular_matches': None if regular_view is None else iter_match_blocks(
+                regular_view, regular_headers, []
+            )
+        })
     
     def _publish_daily_regular_outcome_report(self, df_day: pd.DataFrame, date: datetime.date) -> None:
         """
@@ -2516,7 +2429,7 @@ class StatisticsPublisher:
             logger.info(f'Публикация отчета с обычными итогами за {date}')
             
             # Форматируем отчет
-            report = self._format_daily_outcome_report(df_day, date)
+            report = self._render_daily_outcome_report(df_day, date)
             
             if report:
                 # Создаем сообщение для публикации
@@ -2549,7 +2462,7 @@ class StatisticsPublisher:
             logger.info(f'Публикация отчета с качественными итогами за {date}')
             
             # Форматируем отчет
-            report = self._format_daily_quality_outcome_report(df_day, date)
+            report = self._render_daily_quality_outcome_report(df_day, date)
             
             if report:
                 # Создаем сообщение для публикации
@@ -2582,7 +2495,7 @@ class StatisticsPublisher:
             logger.info(f'Публикация отчета с итогами за {date}')
             
             # Форматируем отчет
-            report = self._format_daily_outcome_report(df_day, date)
+            report = self._render_daily_outcome_report(df_day, date)
             
             if report:
                 # Создаем сообщение для публикации
@@ -2615,84 +2528,92 @@ class StatisticsPublisher:
             str: Отформатированный отчет
         """
         try:
-            if df_day.empty:
-                return ''
-            
-            report = f'🏁 ИТОГИ МАТЧЕЙ - {date.strftime("%d.%m.%Y")}\n\n'
-            
-            # Группируем по матчам
-            for match_id, match_group in df_day.groupby('match_id'):
-                match_info = match_group.iloc[0]
-                
-                # Заголовок матча с match_id
-                report += f'🆔 Match ID: {match_id}\n'
-                report += f'🏆 {match_info.get("sportName", "Soccer")} - {match_info.get("championshipName", "Unknown")}\n'
-                report += f'⚽ {match_info.get("team_home_name", "Home")} vs {match_info.get("team_away_name", "Away")}\n'
-                
-                # Результат матча
-                home_goals = match_info.get('numOfHeadsHome', 0)
-                away_goals = match_info.get('numOfHeadsAway', 0)
-                report += f'📊 Результат: {home_goals}:{away_goals}\n'
-                
-                # Время матча
-                if 'gameData' in match_info and pd.notna(match_info['gameData']):
-                    match_time = pd.to_datetime(match_info['gameData'])
-                    report += f'🕐 {match_time.strftime("%H:%M")}\n'
-                
-                # Получаем данные регрессии из predictions для этого матча (один раз на матч)
-                regression_data = self._get_regression_data_for_match(match_id)
-                
-                # Прогнозы и их результаты
-                for _, outcome_row in match_group.iterrows():
-                    feature = int(outcome_row['feature']) if pd.notna(outcome_row['feature']) else 0
-                    forecast = outcome_row.get('forecast', 'Unknown')
-                    outcome = outcome_row.get('outcome', 'Unknown')
-                    probability = outcome_row.get('probability', 0)
-                    confidence = outcome_row.get('confidence', 0)
-                    uncertainty = outcome_row.get('uncertainty', 0)
-                    lower_bound = outcome_row.get('lower_bound', 0)
-                    upper_bound = outcome_row.get('upper_bound', 0)
-                    
-                    # Используем реальное описание прогноза из поля outcome
-                    feature_description = self._get_feature_description_from_outcome(feature, outcome)
-                    
-                    # Определяем правильность прогноза на основе результата матча
-                    status_icon = self._determine_prediction_status(feature, outcome, match_id)
-                    
-                    # Получаем историческую статистику для regular прогнозов
-                    forecast_type, forecast_subtype = self._get_forecast_type_subtype_from_feature(feature, outcome)
-                    historical_stats = self._get_historical_statistics_regular(forecast_type, forecast_subtype)
-                    
-                    # Для регрессионных прогнозов добавляем точное значение из predictions
-                    regression_info = ''
-                    if feature == 8 and regression_data and 'forecast_total_amount' in regression_data:
-                        home_goals_val = match_info.get('numOfHeadsHome', 0) or 0
-                        away_goals_val = match_info.get('numOfHeadsAway', 0) or 0
-                        actual_total = float(home_goals_val) + float(away_goals_val) if home_goals_val is not None and away_goals_val is not None else None
-                        regression_info = f' (прогноз: {regression_data["forecast_total_amount"]:.2f}, факт: {actual_total:.1f})' if actual_total is not None else f' (прогноз: {regression_data["forecast_total_amount"]:.2f})'
-                    elif feature == 9 and regression_data and 'forecast_total_home_amount' in regression_data:
-                        home_goals_val = match_info.get('numOfHeadsHome', 0) or 0
-                        actual_home = float(home_goals_val) if home_goals_val is not None else None
-                        regression_info = f' (прогноз: {regression_data["forecast_total_home_amount"]:.2f}, факт: {actual_home:.1f})' if actual_home is not None else f' (прогноз: {regression_data["forecast_total_home_amount"]:.2f})'
-                    elif feature == 10 and regression_data and 'forecast_total_away_amount' in regression_data:
-                        away_goals_val = match_info.get('numOfHeadsAway', 0) or 0
-                        actual_away = float(away_goals_val) if away_goals_val is not None else None
-                        regression_info = f' (прогноз: {regression_data["forecast_total_away_amount"]:.2f}, факт: {actual_away:.1f})' if actual_away is not None else f' (прогноз: {regression_data["forecast_total_away_amount"]:.2f})'
-                    
-                    # Расширенная статистика
-                    report += f'{status_icon} • {feature_description}: {outcome}{regression_info}\n'
-                    report += f'  🎯 Вероятность: {probability:.1%} | 🔒 Уверенность: {confidence:.1%} | 📊 Неопределенность: {uncertainty:.1%}\n'
-                    report += f'  📈 Границы: [{lower_bound:.2f} - {upper_bound:.2f}] | ⚖️ Калибровка: {historical_stats["calibration"]:.1%} | 🛡️ Стабильность: {historical_stats["stability"]:.1%}\n'
-                    report += f'  Историческая точность: {historical_stats["historical_accuracy"]} | 🔥 Последние 10: {historical_stats["recent_accuracy"]}\n'
-                
-                report += '\n'
-            
-            return report
-            
+            return str(self._render_daily_outcome_report(df_day, date))
         except Exception as e:
             logger.error(f'Ошибка при форматировании отчета с итогами за {date}: {e}')
             return f'❌ Ошибка форматирования отчета с итогами за {date}: {e}'
     
+    def _render_daily_outcome_report(self, df_day: pd.DataFrame, date: datetime.date) -> RenderedReport:
+        """
+        Готовит отчет с итогами за день (из таблицы outcomes) к рендерингу.
+        
+        Статусы прогнозов и данные регрессии загружаются один раз на день.
+        
+        Args:
+            df_day: DataFrame с данными за день
+            date: Дата отчета
+            
+        Returns:
+            RenderedReport: Отчет для потоковой записи
+        """
+        template = 'daily_regular_outcomes.txt.j2'
+        if df_day.empty:
+            return render_report(template, dict, empty=True)
+        
+        df_day = self._with_prediction_status(df_day)
+        rows = self._regular_statistics_columns(df_day)
+        rows['prediction_status'] = df_day['prediction_status']
+        rows['regression_text'] = self._regression_texts(df_day, rows['feature'])
+        
+        headers = header_frame(df_day, {
+            'sportName': 'Soccer', 'championshipName': 'Unknown',
+            'team_home_name': 'Home', 'team_away_name': 'Away',
+            'numOfHeadsHome': 0, 'numOfHeadsAway': 0
+        }, time_column='gameData')
+        
+        return self._match_blocks_report(template, date, df_day, headers, rows)
+    
+    def _regression_texts(self, df_day: pd.DataFrame, features: pd.Series) -> pd.Series:
+        """
+        Возвращает пояснения для регрессионных прогнозов (features 8, 9, 10):
+        прогноз из таблицы predictions и фактическое значение.
+        
+        Args:
+            df_day: DataFrame с данными за день
+            features: Коды feature строк
+            
+        Returns:
+            pd.Series: Текст пояснения ('' для остальных прогнозов)
+        """
+        forecast_columns = {
+            8: 'forecast_total_amount',
+            9: 'forecast_total_home_amount',
+            10: 'forecast_total_away_amount'
+        }
+        texts = pd.Series('', index=df_day.index, dtype=object)
+        regression_mask = features.isin(list(forecast_columns))
+        if not regression_mask.any():
+            return texts
+        
+        regression_by_match = self._get_regression_data_for_matches(
+            df_day.loc[regression_mask, 'match_id'].unique().tolist()
+        )
+        if not regression_by_match:
+            return texts
+        
+        regression = pd.DataFrame.from_dict(regression_by_match, orient='index').reindex(
+            columns=list(forecast_columns.values())
+        ).apply(pd.to_numeric, errors='coerce')
+        # Счет матча берется из первой строки матча (как в заголовке)
+        first_rows = df_day.drop_duplicates('match_id').set_index('match_id')
+        home_goals = df_day['match_id'].map(pd.to_numeric(column(first_rows, 'numOfHeadsHome', 0), errors='coerce'))
+        away_goals = df_day['match_id'].map(pd.to_numeric(column(first_rows, 'numOfHeadsAway', 0), errors='coerce'))
+        actual_by_feature = {8: home_goals + away_goals, 9: home_goals, 10: away_goals}
+        
+        predicted = pd.Series(np.nan, index=df_day.index)
+        actual = pd.Series(np.nan, index=df_day.index)
+        for feature, name in forecast_columns.items():
+            mask = features == feature
+            predicted[mask] = df_day.loc[mask, 'match_id'].map(regression[name])
+            actual[mask] = actual_by_feature[feature][mask]
+        
+        has_forecast = predicted.notna()
+        texts[has_forecast] = (
+            ' (прогноз: ' + format_fixed(predicted[has_forecast]) +
+            ', факт: ' + format_fixed(actual[has_forecast], 1) + ')'
+        )
+        return texts
+    
     def _format_daily_quality_outcome_report(self, df_day: pd.DataFrame, date: datetime.date) -> str:
         """
         Форматирует отчет с качественными итогами за день (из таблицы statistics).
@@ -2705,70 +2626,64 @@ class StatisticsPublisher:
             str: Отформатированный отчет
         """
         try:
-            if df_day.empty:
-                return ''
-            
-            report = f'🏁 КАЧЕСТВЕННЫЕ ИТОГИ МАТЧЕЙ - {date.strftime("%d.%m.%Y")}\n\n'
-            
-            # Группируем по матчам
-            for match_id, match_group in df_day.groupby('match_id'):
-                match_info = match_group.iloc[0]
-                
-                # Заголовок матча с match_id
-                report += f'🆔 Match ID: {match_id}\n'
-                report += f'🏆 {match_info.get("sportName", "Soccer")} - {match_info.get("championshipName", "Unknown")}\n'
-                report += f'⚽ {match_info.get("team_home_name", "Home")} vs {match_info.get("team_away_name", "Away")}\n'
-                
-                # Результат матча
-                home_goals = match_info.get('numOfHeadsHome', 0)
-                away_goals = match_info.get('numOfHeadsAway', 0)
-                report += f'📊 Результат: {home_goals}:{away_goals}\n'
-                
-                # Время матча
-                if 'gameData' in match_info and pd.notna(match_info['gameData']):
-                    match_time = pd.to_datetime(match_info['gameData'])
-                    report += f'🕐 {match_time.strftime("%H:%M")}\n'
-                
-                # Прогнозы и их результаты
-                for _, stat_row in match_group.iterrows():
-                    forecast_type = stat_row.get('forecast_type', 'Unknown')
-                    forecast_subtype = stat_row.get('forecast_subtype', 'Unknown')
-                    actual_value = stat_row.get('actual_value', 0)
-                    prediction_correct = stat_row.get('prediction_correct', False)
-                    probability = stat_row.get('probability', 0)
-                    confidence = stat_row.get('confidence', 0)
-                    uncertainty = stat_row.get('uncertainty', 0)
-                    lower_bound = stat_row.get('lower_bound', 0)
-                    upper_bound = stat_row.get('upper_bound', 0)
-                    
-                    # Форматируем описание прогноза с итоговым прогнозом
-                    forecast_description = f'{forecast_type.upper()}: {forecast_subtype}'
-                    
-                    # Статус прогноза
-                    status_icon = '✅' if prediction_correct else '❌'
-                    
-                    # Получаем историческую статистику для quality прогнозов
-                    historical_stats = self._get_historical_statistics(forecast_type, forecast_subtype)
-                    
-                    # Расширенная статистика - выводим forecast_subtype как итоговый прогноз
-                    report += f'{status_icon} • {forecast_description}\n'
-                    report += f'  🎯 Вероятность: {probability:.1%} | 🔒 Уверенность: {confidence:.1%} | 📊 Неопределенность: {uncertainty:.1%}\n'
-                    report += f'  📈 Границы: [{lower_bound:.2f} - {upper_bound:.2f}] | ⚖️ Калибровка: {historical_stats["calibration"]:.1%} | 🛡️ Стабильность: {historical_stats["stability"]:.1%}\n'
-                    
-                    # Форматируем историческую точность с иконками
-                    acc_mark = "📊" if historical_stats.get('historical_accuracy', 0) >= 0.7 else "📉"
-                    recent_mark = "🔥" if historical_stats.get('recent_accuracy', 0) >= 0.7 else "❄️"
-                    report += f'  {acc_mark} Историческая точность: {historical_stats["historical_correct"]}/{historical_stats["historical_total"]} ({historical_stats["historical_accuracy"]*100:.1f}%)'
-                    report += f' | {recent_mark} Последние 10: {historical_stats["recent_correct"]}/10 ({historical_stats["recent_accuracy"]*100:.1f}%)\n'
-                
-                report += '\n'
-            
-            return report
-            
+            return str(self._render_daily_quality_outcome_report(df_day, date))
         except Exception as e:
             logger.error(f'Ошибка при форматировании отчета с качественными итогами за {date}: {e}')
             return f'❌ Ошибка форматирования отчета с качественными итогами за {date}: {e}'
     
+    def _render_daily_quality_outcome_report(self, df_day: pd.DataFrame, date: datetime.date) -> RenderedReport:
+        """
+        Готовит отчет с качественными итогами за день (из таблицы statistics) к рендерингу.
+        
+        Args:
+            df_day: DataFrame с данными за день из таблицы statistics
+            date: Дата отчета
+            
+        Returns:
+            RenderedReport: Отчет для потоковой записи
+        """
+        template = 'daily_quality_outcomes.txt.j2'
+        if df_day.empty:
+            return render_report(template, dict, empty=True)
+        
+        rows = pd.DataFrame(index=df_day.index)
+        rows['forecast_type'] = column(df_day, 'forecast_type', 'Unknown')
+        rows['forecast_subtype'] = column(df_day, 'forecast_subtype', 'Unknown')
+        
+        def describe(forecast_type: str, forecast_subtype: str) -> Dict[str, Any]:
+            stats = self._get_historical_statistics(forecast_type, forecast_subtype)
+            return {
+                'calibration_text': f'{stats["calibration"]:.1%}',
+                'stability_text': f'{stats["stability"]:.1%}',
+                'historical_mark': '📊' if stats.get('historical_accuracy', 0) >= 0.7 else '📉',
+                'recent_mark': '🔥' if stats.get('recent_accuracy', 0) >= 0.7 else '❄️',
+                'historical_text': f'{stats["historical_correct"]}/{stats["historical_total"]} ({stats["historical_accuracy"]*100:.1f}%)',
+                'recent_text': f'{stats["recent_correct"]}/10 ({stats["recent_accuracy"]*100:.1f}%)'
+            }
+        
+        lookup_columns = [
+            'calibration_text', 'stability_text', 'historical_mark', 'recent_mark',
+            'historical_text', 'recent_text'
+        ]
+        rows[lookup_columns] = lookup_unique(rows, ['forecast_type', 'forecast_subtype'], describe, lookup_columns)
+        
+        rows['description'] = rows['forecast_type'].astype(str).str.upper() + ': ' + rows['forecast_subtype'].astype(str)
+        correct = column(df_day, 'prediction_correct', False).fillna(False).astype(bool)
+        rows['prediction_status'] = np.where(correct, '✅', '❌')
+        rows['probability_text'] = format_percent(column(df_day, 'probability', 0))
+        rows['confidence_text'] = format_percent(column(df_day, 'confidence', 0))
+        rows['uncertainty_text'] = format_percent(column(df_day, 'uncertainty', 0))
+        rows['lower_bound_text'] = format_fixed(column(df_day, 'lower_bound', 0))
+        rows['upper_bound_text'] = format_fixed(column(df_day, 'upper_bound', 0))
+        
+        headers = header_frame(df_day, {
+            'sportName': 'Soccer', 'championshipName': 'Unknown',
+            'team_home_name': 'Home', 'team_away_name': 'Away',
+            'numOfHeadsHome': 0, 'numOfHeadsAway': 0
+        }, time_column='gameData')
+        
+        return self._match_blocks_report(template, date, df_day, headers, rows)
+    
     def _get_feature_description(self, feature: int, match_info: dict) -> str:
         """
         Получает описание прогноза по feature коду.
@@ -2990,6 +2905,38 @@ class StatisticsPublisher:
             logger.error(f'Ошибка при получении данных регрессии для матча {match_id}: {e}')
             return None
     
+    def _get_regression_data_for_matches(self, match_ids: List[int]) -> Dict[int, Dict[str, float]]:
+        """
+        Получает данные регрессии из таблицы predictions для списка матчей одним запросом.
+        
+        Args:
+            match_ids: ID матчей
+            
+        Returns:
+            Dict[int, Dict[str, float]]: {match_id: данные регрессии}
+        """
+        if not match_ids:
+            return {}
+        try:
+            with Session_pool() as session:
+                rows = session.query(
+                    Prediction.match_id,
+                    Prediction.forecast_total_amount,
+                    Prediction.forecast_total_home_amount,
+                    Prediction.forecast_total_away_amount
+                ).filter(
+                    Prediction.match_id.in_([int(m) for m in match_ids])
+                ).order_by(Prediction.id).all()
+            
+            regression: Dict[int, Dict[str, float]] = {}
+            for row in rows:
+                record = row._asdict()
+                regression.setdefault(record.pop('match_id'), record)
+            return regression
+        except Exception as e:
+            logger.error(f'Ошибка при получении данных регрессии для {len(match_ids)} матчей: {e}')
+            return {}
+    
     def _determine_prediction_status(self, feature: int, outcome: str, match_id: int) -> str:
         """
         Определяет правильность прогноза на основе target из БД.
@@ -3119,30 +3066,6 @@ class StatisticsPublisher:
             logger.error(f'Ошибка при определении лучшего/худшего прогноза: {e}')
             return {'best': 'N/A', 'worst': 'N/A'}
 
-    def _calculate_daily_accuracy(self, df_day: pd.DataFrame) -> float:
-        """
-        Рассчитывает среднюю точность за день.
-        
-        Args:
-            df_day: DataFrame с данными за день
-            
-        Returns:
-            float: Средняя точность в процентах
-        """
-        try:
-            if df_day.empty:
-                return 0.0
-            
-            # Считаем общую точность
-            correct_predictions = df_day['prediction_correct'].sum()
-            total_predictions = len(df_day)
-            
-            return correct_predictions / total_predictions if total_predictions > 0 else 0.0
-            
-        except Exception as e:
-            logger.error(f'Ошибка при расчете дневной точности: {e}')
-            return 0.0
-
     def _get_historical_statistics_regular(self, forecast_type: str, forecast_subtype: str) -> Dict[str, Any]:
         """
         Получает историческую статистику для regular прогнозов по типу и подтипу прогноза.
@@ -3155,22 +3078,22 @@ class StatisticsPublisher:
             Dict[str, Any]: Словарь с исторической статистикой
         """
         try:
-            # Получаем реальные данные из БД
-            hist = get_historical_accuracy_regular(forecast_type, forecast_subtype)
-            recent = get_recent_accuracy(forecast_type, forecast_subtype, limit=10)
-            calibration = get_calibration(forecast_type, forecast_subtype)
-            stability = get_stability(forecast_type, forecast_subtype)
-            bounds = get_confidence_bounds(forecast_type, forecast_subtype)
+            # Метрики из сводки statistics_rollups (кешируются)
+            stats = get_complete_statistics(forecast_type, forecast_subtype)
+            hist_correct = stats['historical_correct']
+            hist_total = stats['historical_total']
+            recent_correct = stats['recent_correct']
+            recent_total = stats.get('recent_total') or 10
             
             return {
-                'calibration': calibration,
-                'stability': stability,
-                'confidence': bounds['confidence'],
-                'uncertainty': bounds['uncertainty'],
-                'lower_bound': bounds['lower_bound'],
-                'upper_bound': bounds['upper_bound'],
-                'historical_accuracy': hist['formatted'],
-                'recent_accuracy': recent['formatted']
+                'calibration': stats['calibration'],
+                'stability': stats['stability'],
+                'confidence': stats['confidence'],
+                'uncertainty': stats['uncertainty'],
+                'lower_bound': stats['lower_bound'],
+                'upper_bound': stats['upper_bound'],
+                'historical_accuracy': f"{hist_correct}/{hist_total} ({stats['historical_accuracy']*100:.1f}%)",
+                'recent_accuracy': f"{recent_correct}/{recent_total} ({stats['recent_accuracy']*100:.1f}%)"
             }
             
         except Exception as e:
@@ -3201,18 +3124,8 @@ class StatisticsPublisher:
                 return 0.0
             
             # Считаем количество правильных прогнозов на основе статуса
-            correct_count = 0
             total_count = len(match_group)
-            
-            for _, row in match_group.iterrows():
-                feature = row.get('feature', 0)
-                outcome = row.get('outcome', '')
-                match_id = row.get('match_id', row.get('id', 0))
-                
-                # Определяем правильность прогноза
-                status = self._determine_prediction_status(feature, outcome, match_id)
-                if status == '✅':
-                    correct_count += 1
+            correct_count = int((self._with_prediction_status(match_group)['prediction_status'] == '✅').sum())
             
             # Базовое качество на основе точности
             base_quality = (correct_count / total_count) * 10 if total_count > 0 else 0
@@ -3287,18 +3200,8 @@ class StatisticsPublisher:
                 return 0.0
             
             # Считаем общую точность на основе статуса прогнозов
-            correct_count = 0
             total_count = len(df_day)
-            
-            for _, row in df_day.iterrows():
-                feature = row.get('feature', default=0)
-                outcome = row.get('outcome', default='')
-                match_id = row.get('match_id', row.get('id', default=0))
-                
-                # Определяем правильность прогноза
-                status = self._determine_prediction_status(feature, outcome, match_id)
-                if status == '✅':
-                    correct_count += 1
+            correct_count = int((self._with_prediction_status(df_day)['prediction_status'] == '✅').sum())
             
             return correct_count / total_count if total_count > 0 else 0.0
             
@@ -0,0 +1,188 @@
+# tests/test_bus.py
+import asyncio
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from publisher import bus as bus_module
+from publisher.bus import (
+    DeliveryLog, PublicationBus, RetryableError, Sink, TelegramSink, split_message
+)
+
+
+class FakeSink(Sink):
+    """Приемник в памяти: errors - исключения для первых попыток отправки."""
+
+    def __init__(self, name, errors=(), **kwargs):
+        kwargs.setdefault("backoff", 1.0)
+        super().__init__(**kwargs)
+        self.name = name
+        self.errors = list(errors)
+        self.attempts = 0
+        self.delivered = []
+
+    async def deliver(self, part):
+        self.attempts += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        self.delivered.append(part)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Задержки повторов записываются вместо ожидания, без случайной добавки."""
+    delays = []
+    real_sleep = asyncio.sleep
+
+    async def fake_sleep(delay, result=None):
+        # sleep(0) - передача управления внутри aiohttp, не задержка повтора
+        if delay:
+            delays.append(delay)
+        return await real_sleep(0, result)
+
+    monkeypatch.setattr(bus_module.asyncio, "sleep", fake_sleep)
+    monkeypatch.setattr(bus_module.random, "random", lambda: 0.0)
+    return delays
+
+
+def run_bus(sinks, messages, delivery_log=None):
+    async def scenario():
+        bus = PublicationBus(sinks, delivery_log)
+        await bus.start()
+        for message in messages:
+            await bus.publish(message)
+        await bus.close()
+        return bus.stats
+
+    return asyncio.run(scenario())
+
+
+def test_split_message_respects_limit():
+    text = "\n\n".join(f"block {i} " + "x" * 20 for i in range(5))
+    parts = split_message(text, 40)
+    assert all(len(part) <= 40 for part in parts)
+    assert "".join(parts).replace("\n", "") == text.replace("\n", "")
+
+
+def test_delivers_parts_in_order(sleeps):
+    sink = FakeSink("fake", max_length=30)
+    message = {"date": "2024-01-01", "report": "first block\n\nsecond block\n\nthird block"}
+    stats = run_bus([sink], [message])
+
+    assert sink.delivered == ["first block\n\nsecond block", "third block"]
+    assert stats["fake"] == {"delivered": 2, "skipped": 0, "retries": 0, "failed": 0}
+    assert sleeps == []
+
+
+def test_retries_with_exponential_backoff(sleeps):
+    sink = FakeSink("fake", errors=[RetryableError("429"), RetryableError("503")], max_attempts=4)
+    stats = run_bus([sink], ["report"])
+
+    assert sink.delivered == ["report"]
+    assert sink.attempts == 3
+    assert sleeps == [1.0, 2.0]
+    assert stats["fake"]["retries"] == 2
+    assert stats["fake"]["failed"] == 0
+
+
+def test_retry_after_and_max_backoff(sleeps):
+    sink = FakeSink(
+        "fake",
+        errors=[RetryableError("429", retry_after=7.0), RetryableError("503"), RetryableError("503")],
+        backoff=3.0, max_backoff=5.0
+    )
+    run_bus([sink], ["report"])
+    assert sleeps == [7.0, 5.0, 5.0]
+
+
+def test_gives_up_after_max_attempts_and_keeps_order(sleeps):
+    sink = FakeSink("fake", errors=[RetryableError("503")] * 3, max_attempts=3, max_length=10)
+    stats = run_bus([sink], ["part one\n\npart two"])
+
+    # Первая часть не доставлена - следующие не отправляются
+    assert sink.delivered == []
+    assert sink.attempts == 3
+    assert stats["fake"]["failed"] == 1
+    assert stats["fake"]["delivered"] == 0
+
+
+def test_non_retryable_error_is_not_retried(sleeps):
+    sink = FakeSink("fake", errors=[RuntimeError("bad request")])
+    stats = run_bus([sink], ["report"])
+
+    assert sink.attempts == 1
+    assert sleeps == []
+    assert stats["fake"]["failed"] == 1
+
+
+def test_failing_sink_does_not_affect_others(sleeps):
+    broken = FakeSink("broken", errors=[RuntimeError("down")] * 10)
+    flaky = FakeSink("flaky", errors=[RetryableError("503")])
+    healthy = FakeSink("healthy")
+    stats = run_bus([broken, flaky, healthy], ["first", "second"])
+
+    assert broken.delivered == []
+    assert stats["broken"]["failed"] == 2
+    assert sorted(flaky.delivered) == ["first", "second"]
+    assert healthy.delivered == ["first", "second"]
+    assert stats["healthy"]["failed"] == 0
+
+
+def test_prepare_error_is_isolated(sleeps):
+    class BrokenPrepare(FakeSink):
+        def prepare(self, message):
+            raise ValueError("cannot render")
+
+    broken = BrokenPrepare("broken")
+    healthy = FakeSink("healthy")
+    stats = run_bus([broken, healthy], ["report"])
+
+    assert stats["broken"]["failed"] == 1
+    assert healthy.delivered == ["report"]
+
+
+def test_delivery_log_skips_delivered_parts(sleeps, tmp_path):
+    log = DeliveryLog(str(tmp_path / "publications.sqlite"))
+    first = FakeSink("fake")
+    run_bus([first], ["report"], log)
+
+    second = FakeSink("fake")
+    stats = run_bus([second], ["report", "new report"], log)
+    log.close()
+
+    assert first.delivered == ["report"]
+    assert second.delivered == ["new report"]
+    assert stats["fake"]["skipped"] == 1
+
+
+def test_telegram_sink_retries_on_http_429(sleeps):
+    requests = []
+
+    async def send_message(request):
+        data = await request.post()
+        requests.append(dict(data))
+        if len(requests) == 1:
+            return web.json_response(
+                {"ok": False, "description": "Too Many Requests"}, status=429,
+                headers={"Retry-After": "3"}
+            )
+        return web.json_response({"ok": True})
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_post("/bottoken/sendMessage", send_message)
+        async with TestServer(app) as server:
+            sink = TelegramSink("token", "42", base_url=str(server.make_url("")), rate=None)
+            bus = PublicationBus([sink])
+            await bus.start()
+            await bus.publish("report")
+            await bus.close()
+            return bus.stats
+
+    stats = asyncio.run(scenario())
+
+    assert [request["text"] for request in requests] == ["report", "report"]
+    assert requests[0]["chat_id"] == "42"
+    assert sleeps == [3.0]
+    assert stats["telegram:42"] == {"delivered": 1, "skipped": 0, "retries": 1, "failed": 0}
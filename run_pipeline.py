@@ -9,6 +9,7 @@ import logging
 import sys
 from datetime import datetime
 
+from core import telemetry
 from core.integration_service import IntegrationService
 
 # Настройка логирования
@@ -34,12 +35,16 @@ def main():
   python run_pipeline.py forecast       # Только этап forecast
   python run_pipeline.py publisher      # Только этап publisher
   python run_pipeline.py status         # Статус всех компонентов
+  python run_pipeline.py status --perf  # Телеметрия последних запусков
+  python run_pipeline.py settle --date-from 2025-08-01 --date-to 2025-10-01
+                                        # Пересчет результатов прогнозов
+  python run_pipeline.py rollup --full  # Полный пересчет сводки statistics_rollups
         """
     )
     
     parser.add_argument(
         'mode',
-        choices=['today', 'all_time', 'processing', 'forecast', 'publisher', 'status'],
+        choices=['today', 'all_time', 'processing', 'forecast', 'publisher', 'status', 'settle', 'rollup'],
         help='Режим работы пайплайна'
     )
     
@@ -49,6 +54,43 @@ def main():
         help='Подробный вывод'
     )
     
+    parser.add_argument(
+        '--date-from',
+        type=lambda value: datetime.strptime(value, '%Y-%m-%d').date(),
+        help='Начальная дата матчей для settle (YYYY-MM-DD)'
+    )
+
+    parser.add_argument(
+        '--date-to',
+        type=lambda value: datetime.strptime(value, '%Y-%m-%d').date(),
+        help='Конечная дата матчей для settle (YYYY-MM-DD)'
+    )
+
+    parser.add_argument(
+        '--match-ids',
+        type=lambda value: [int(item) for item in value.split(',') if item],
+        help='ID матчей для settle/rollup через запятую'
+    )
+
+    parser.add_argument(
+        '--full',
+        action='store_true',
+        help='Полный пересчет сводки statistics_rollups (rollup)'
+    )
+
+    parser.add_argument(
+        '--perf',
+        action='store_true',
+        help='Отчет о производительности последних запусков (status)'
+    )
+
+    parser.add_argument(
+        '--runs',
+        type=int,
+        default=5,
+        help='Количество запусков в отчете --perf'
+    )
+
     args = parser.parse_args()
     
     if args.verbose:
@@ -74,6 +116,12 @@ def main():
             run_publisher_only(integration_service)
         elif args.mode == 'status':
             show_status(integration_service)
+            if args.perf:
+                show_perf_report(args.runs)
+        elif args.mode == 'settle':
+            run_settlement(args.match_ids, args.date_from, args.date_to)
+        elif args.mode == 'rollup':
+            run_rollup_refresh(args.match_ids, args.full)
         
         # Выводим сообщение о завершении
         print_completion()
@@ -181,6 +229,56 @@ def run_publisher_only(integration_service: IntegrationService) -> None:
         sys.exit(1)
 
 
+def run_settlement(match_ids, date_from, date_to) -> None:
+    """Пересчитывает результаты прогнозов завершенных матчей в statistics."""
+    from db.storage.statistic import settle_match_results
+
+    logger.info('Запуск пакетного расчета результатов прогнозов')
+
+    with telemetry.run('settle', kind='run') as span:
+        updated = settle_match_results(
+            match_ids=match_ids,
+            start_date=date_from,
+            end_date=date_to
+        )
+        span.add_rows(updated or 0)
+        if updated is None:
+            span.status = 'error'
+
+    if updated is None:
+        logger.error('Ошибка пакетного расчета результатов прогнозов')
+        sys.exit(1)
+
+    print("📊 РЕЗУЛЬТАТЫ РАСЧЕТА")
+    print("=" * 50)
+    print(f"✅ Обновлено записей statistics: {updated}")
+    print()
+
+
+def run_rollup_refresh(match_ids, full: bool) -> None:
+    """Пересчитывает сводку statistics_rollups (полностью или по матчам)."""
+    from db.storage.statistics_rollup import refresh_statistics_rollup_for_matches
+
+    logger.info('Запуск пересчета сводки statistics_rollups')
+
+    with telemetry.run('rollup', mode='full' if full or not match_ids else 'matches', kind='run') as span:
+        written = refresh_statistics_rollup_for_matches(
+            None if full or not match_ids else match_ids
+        )
+        span.add_rows(written or 0)
+        if written is None:
+            span.status = 'error'
+
+    if written is None:
+        logger.error('Ошибка пересчета сводки statistics_rollups')
+        sys.exit(1)
+
+    print("📊 РЕЗУЛЬТАТЫ ПЕРЕСЧЕТА СВОДКИ")
+    print("=" * 50)
+    print(f"✅ Записано строк statistics_rollups: {written}")
+    print()
+
+
 def show_status(integration_service: IntegrationService) -> None:
     """Показывает статус всех компонентов."""
     logger.info('Получение статуса всех компонентов')
@@ -201,6 +299,51 @@ def show_status(integration_service: IntegrationService) -> None:
     print(f"⏰ Время проверки: {status['timestamp'].strftime('%Y-%m-%d %H:%M:%S')}")
 
 
+def show_perf_report(limit: int) -> None:
+    """Показывает телеметрию последних запусков: этапы, строки, SQL-запросы."""
+    report = telemetry.perf_report(telemetry.get_store(), limit)
+    runs = report['runs']
+
+    print()
+    print("⏱️  ПРОИЗВОДИТЕЛЬНОСТЬ ПОСЛЕДНИХ ЗАПУСКОВ")
+    print("=" * 80)
+
+    if runs.empty:
+        print("Телеметрия запусков отсутствует")
+        return
+
+    for run in runs.itertuples(index=False):
+        started = datetime.fromtimestamp(run.started_at).strftime('%Y-%m-%d %H:%M:%S')
+        duration = f"{run.duration:.1f} с" if run.duration == run.duration else "выполняется"
+        print(f"🔧 {run.name} [{run.mode or '-'}] {started}  {duration}  статус: {run.status}")
+
+        stages = report['stages'][report['stages']['run_id'] == run.run_id]
+        if not stages.empty:
+            print(f"   {'Этап':<14}{'Время, с':>10}{'Строк':>12}{'Запросов':>10}{'SQL, с':>10}  Статус")
+            for stage in stages.itertuples(index=False):
+                print(
+                    f"   {stage.name:<14}{stage.duration:>10.1f}{stage.rows:>12}"
+                    f"{stage.queries:>10}{stage.query_time:>10.1f}  {stage.status}"
+                )
+
+        tasks = report['tasks'][report['tasks']['run_id'] == run.run_id]
+        for task in tasks.itertuples(index=False):
+            print(
+                f"   турниры {task.stage}: {task.count} шт., "
+                f"p50 {task.p50:.1f} с, p95 {task.p95:.1f} с, max {task.max:.1f} с, "
+                f"запросов {task.queries}, ошибок {task.errors}"
+            )
+        print()
+
+    slowest = report['slowest']
+    if not slowest.empty:
+        print("🐢 САМЫЕ ДОЛГИЕ ТУРНИРЫ ПОСЛЕДНЕГО ЗАПУСКА")
+        print("=" * 50)
+        for task in slowest.itertuples(index=False):
+            print(f"   {task.stage:<14}{task.attrs:<30}{task.duration:>8.1f} с  запросов {task.queries}")
+        print()
+
+
 def print_results_summary(results: dict) -> None:
     """Выводит сводку результатов выполнения."""
     print("📊 СВОДКА РЕЗУЛЬТАТОВ")
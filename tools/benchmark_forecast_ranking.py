@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк ранжирования и группировки конформных прогнозов.
+
+Генерирует синтетический игровой день (по умолчанию 100 000 прогнозов,
+10 типов на матч) и замеряет время этапов ConformalForecastGenerator:
+рейтинг, выбор лучших прогнозов, лучшие прогнозы по матчам, группировка
+по матчам и формирование отчета.
+
+Пример:
+    python tools/benchmark_forecast_ranking.py --forecasts 100000 --repeat 3
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Callable, Dict
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FEATURE_MAPPING = {
+    1: 'win_draw_loss',
+    2: 'oz',
+    3: 'goal_home',
+    4: 'goal_away',
+    5: 'total',
+    6: 'total_home',
+    7: 'total_away',
+    8: 'total_amount',
+    9: 'total_home_amount',
+    10: 'total_away_amount'
+}
+
+
+def make_synthetic_day(n_forecasts: int, seed: int = 42) -> pd.DataFrame:
+    """Создает синтетический день прогнозов в формате load_date_forecasts."""
+    rng = np.random.default_rng(seed)
+    n_features = len(FEATURE_MAPPING)
+    n_matches = max(1, n_forecasts // n_features)
+    n = n_matches * n_features
+
+    match_ids = np.repeat(np.arange(1, n_matches + 1), n_features)
+    features = np.tile(np.arange(1, n_features + 1), n_matches)
+    lower = rng.uniform(0.0, 0.5, n)
+
+    return pd.DataFrame({
+        'id': np.arange(1, n + 1),
+        'match_id': match_ids,
+        'feature': features,
+        'forecast_type': pd.Series(features).map(FEATURE_MAPPING).to_numpy(),
+        'forecast': rng.uniform(0.0, 4.0, n),
+        'outcome': rng.choice(['п1', 'х', 'п2', 'да', 'нет', 'больше', 'меньше'], n),
+        'probability': rng.uniform(0.3, 1.0, n),
+        'confidence': rng.uniform(0.3, 1.0, n),
+        'uncertainty': rng.uniform(0.0, 0.5, n),
+        'lower_bound': lower,
+        'upper_bound': lower + rng.uniform(0.0, 0.5, n),
+        'gameData': pd.Timestamp('2025-05-17 18:00') + pd.to_timedelta(match_ids % 600, unit='m'),
+        'tournament_id': match_ids % 150 + 1,
+        'teamHome_id': match_ids * 2,
+        'teamAway_id': match_ids * 2 + 1,
+        'teamHome_name': [f'Home {m}' for m in match_ids],
+        'teamAway_name': [f'Away {m}' for m in match_ids],
+        'championshipName': [f'Championship {m % 150 + 1}' for m in match_ids],
+        'sportName': np.where(match_ids % 3 == 0, 'Ice Hockey', 'Soccer'),
+        'numOfHeadsHome': rng.integers(0, 5, n),
+        'numOfHeadsAway': rng.integers(0, 5, n),
+        'typeOutcome': None,
+        'gameComment': None,
+    })
+
+
+def measure(func: Callable, repeat: int) -> float:
+    """Возвращает лучшее время выполнения функции в секундах."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmark(n_forecasts: int, repeat: int) -> Dict[str, float]:
+    """Запускает бенчмарк и возвращает время этапов."""
+    from forecast.conformal_publication import ConformalForecastGenerator
+
+    generator = ConformalForecastGenerator(cache_dir=None)
+    df = make_synthetic_day(n_forecasts)
+    grouped = generator.group_forecasts_by_match(df)
+
+    return {
+        'forecasts': len(df),
+        'matches': df['match_id'].nunique(),
+        'rating': measure(lambda: generator._calculate_forecast_rating(df), repeat),
+        'select_best': measure(lambda: generator.select_best_forecasts(df, max_forecasts=10), repeat),
+        'best_per_match': measure(lambda: generator.select_best_forecasts_per_match(df, 3), repeat),
+        'group_by_match': measure(lambda: generator.group_forecasts_by_match(df), repeat),
+        'forecast_report': measure(lambda: generator.generate_conformal_forecast_report(grouped), repeat),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк ранжирования конформных прогнозов')
+    parser.add_argument('--forecasts', type=int, default=100_000, help='Количество прогнозов в дне')
+    parser.add_argument('--repeat', type=int, default=3, help='Количество повторов (берется лучшее время)')
+    args = parser.parse_args()
+
+    results = run_benchmark(args.forecasts, args.repeat)
+
+    print("=" * 60)
+    print(f"Прогнозов: {results.pop('forecasts')}, матчей: {results.pop('matches')}")
+    print("=" * 60)
+    for stage, seconds in results.items():
+        print(f"{stage:<20} {seconds * 1000:>10.1f} мс")
+
+
+if __name__ == '__main__':
+    main()
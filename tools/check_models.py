@@ -1,13 +1,21 @@
 #!/usr/bin/env python3
 """
 Скрипт для проверки наличия всех моделей по турнирам.
+
+Режим --diff сравнивает с ожидаемым набором описи моделей чемпионатов
+(inventory.json, ведется при сохранении моделей) без обхода директорий и
+записывает задания на переобучение (турнир, модель) в retrain_jobs.txt.
 """
 
 import os
 import sys
-from typing import Dict, List, Set, Tuple
+import argparse
+from typing import Dict, List, Optional, Set, Tuple
 from sqlalchemy import create_engine, text
 from config import settings
+from processing.keras_inventory import diff_inventory, load_inventory
+
+RETRAIN_JOBS_FILE = 'retrain_jobs.txt'
 
 # Ожидаемые типы моделей (из feature_config)
 EXPECTED_MODELS = [
@@ -67,13 +75,17 @@ def get_tournaments_with_models() -> Dict[int, Dict[str, any]]:
     return tournaments
 
 
-def check_models_for_tournament(tournament_info: Dict) -> Tuple[List[str], List[str], int, int]:
-    """Проверить наличие моделей для турнира."""
+def get_models_dir(tournament_info: Dict) -> str:
+    """Директория моделей чемпионата."""
     sport = tournament_info['sport'].replace(' ', '_')
     country = tournament_info['country'].replace(' ', '_')
     championship = tournament_info['championship'].replace(' ', '_')
-    
-    models_dir = f'./models/{sport}/{country}/{championship}'
+    return f'./models/{sport}/{country}/{championship}'
+
+
+def check_models_for_tournament(tournament_info: Dict) -> Tuple[List[str], List[str], int, int]:
+    """Проверить наличие моделей для турнира."""
+    models_dir = get_models_dir(tournament_info)
     
     existing_models = []
     missing_models = []
@@ -82,7 +94,7 @@ def check_models_for_tournament(tournament_info: Dict) -> Tuple[List[str], List[
     if os.path.exists(models_dir):
         # Получаем список файлов моделей
         files = os.listdir(models_dir)
-        total_files = len([f for f in files if f.endswith(('.keras', '.joblib'))])
+        total_files = len([f for f in files if f.endswith(('.keras', '.joblib', '.npz'))])
         
         existing_model_names = set()
         
@@ -100,14 +112,81 @@ def check_models_for_tournament(tournament_info: Dict) -> Tuple[List[str], List[
     else:
         missing_models = EXPECTED_MODELS.copy()
     
-    # Ожидаем 54 файла: 18 моделей × 3 файла (model.keras, scaler.joblib, label_encoder.joblib)
-    expected_files = len(EXPECTED_MODELS) * 3
+    # Ожидаем 19 файлов: 18 моделей (model.keras) и общий preprocessing.npz
+    # со скалерами и label encoder'ами
+    expected_files = len(EXPECTED_MODELS) + 1
     
     return existing_models, missing_models, total_files, expected_files
 
 
+def diff_models_for_tournament(
+        tournament_info: Dict,
+        max_age_days: Optional[int] = None
+) -> Tuple[List[str], List[str], bool]:
+    """
+    Отсутствующие и устаревшие модели турнира по описи.
+
+    Returns:
+        (отсутствующие, устаревшие, есть ли опись); без описи (модели
+        сохранены до ее появления) - проверка по файлам директории
+    """
+    inventory = load_inventory(get_models_dir(tournament_info))
+    if inventory is None:
+        _, missing, _, _ = check_models_for_tournament(tournament_info)
+        return missing, [], False
+    missing, stale = diff_inventory(inventory, EXPECTED_MODELS, max_age_days)
+    return missing, stale, True
+
+
+def diff_main(max_age_days: Optional[int], jobs_file: str) -> None:
+    """Сравнение описей моделей и запись заданий на переобучение."""
+    tournaments = get_tournaments_with_models()
+    jobs = []
+    without_inventory = 0
+
+    for tournament_id, info in tournaments.items():
+        missing, stale, has_inventory = diff_models_for_tournament(info, max_age_days)
+        without_inventory += not has_inventory
+        if not missing and not stale:
+            continue
+
+        print(f"🔴 ID: {tournament_id:4d} | {info['sport']:12s} | {info['country']:20s} | {info['championship']}")
+        if missing:
+            print(f"   ❌ Отсутствуют ({len(missing)}): {', '.join(missing)}")
+        if stale:
+            print(f"   ⏳ Устарели ({len(stale)}): {', '.join(stale)}")
+        jobs.extend((tournament_id, model_name) for model_name in missing + stale)
+
+    print()
+    print(f"Турниров: {len(tournaments)}, без описи моделей: {without_inventory}")
+    print(f"Заданий на переобучение: {len(jobs)}")
+
+    with open(jobs_file, 'w') as f:
+        for tournament_id, model_name in jobs:
+            f.write(f"{tournament_id},{model_name}\n")
+    print(f"📝 Задания (турнир,модель) сохранены в файл: {jobs_file}")
+
+
 def main():
     """Основная функция проверки."""
+    parser = argparse.ArgumentParser(description='Проверка наличия моделей по турнирам')
+    parser.add_argument(
+        '--diff', action='store_true',
+        help='сравнить описи моделей и записать задания на переобучение'
+    )
+    parser.add_argument(
+        '--max-age-days', type=int, default=None,
+        help='считать устаревшими модели старше N дней (для --diff)'
+    )
+    parser.add_argument(
+        '--jobs-file', default=RETRAIN_JOBS_FILE,
+        help='файл заданий на переобучение (для --diff)'
+    )
+    args = parser.parse_args()
+    if args.diff:
+        diff_main(args.max_age_days, args.jobs_file)
+        return
+
     print("=" * 80)
     print("ПРОВЕРКА НАЛИЧИЯ МОДЕЛЕЙ ПО ТУРНИРАМ")
     print("=" * 80)
@@ -161,7 +240,7 @@ def main():
             info = t['info']
             print(f"\n🔴 ID: {t['id']:4d} | {info['sport']:12s} | {info['country']:20s} | {info['championship']}")
             print(f"   Матчей: {info['match_count']}")
-            print(f"   Файлов: {t['total_files']}/{t['expected_files']} (ожидается 54)")
+            print(f"   Файлов: {t['total_files']}/{t['expected_files']}")
             print(f"   Моделей создано: {len(t['existing'])}/{len(EXPECTED_MODELS)}")
             
             if t['existing']:
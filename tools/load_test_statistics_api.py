@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Нагрузочный тест HTTP-сервера статистики (api/server.py).
+
+Создает локальную базу SQLite со сводкой statistics_rollups (по умолчанию
+2 года, 40 чемпионатов, 10 типов прогнозов, 3 модели), поднимает сервер
+в отдельном потоке и отправляет запросы эндпоинтов дашборда в несколько
+потоков. Часть запросов повторяется с If-None-Match, как при опросе
+фронтендом. Выводит RPS, перцентили задержки, коды ответов и счетчики
+кэша сервера.
+
+Пример:
+    python tools/load_test_statistics_api.py --requests 5000 --concurrency 16
+    python tools/load_test_statistics_api.py --no-cache
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FORECAST_TYPES = [
+    'win_draw_loss', 'oz', 'goal_home', 'goal_away', 'total',
+    'total_home', 'total_away', 'total_amount', 'total_home_amount', 'total_away_amount'
+]
+MODELS = [('keras_v1', '1.0', 'keras'), ('keras_v2', '2.0', 'keras'), ('conformal', '1.0', 'conformal')]
+SPORTS = 3
+
+
+def _required_defaults(table) -> Dict[str, object]:
+    """Значения для обязательных колонок модели, которые тест не заполняет."""
+    defaults = {}
+    for column in table.columns:
+        if column.nullable or column.primary_key or column.default is not None:
+            continue
+        python_type = getattr(column.type, 'python_type', str)
+        if python_type is datetime:
+            defaults[column.name] = datetime(2025, 1, 1)
+        elif python_type is date:
+            defaults[column.name] = date(2025, 1, 1)
+        elif python_type in (int, float, bool):
+            defaults[column.name] = python_type(0)
+        else:
+            defaults[column.name] = ''
+    return defaults
+
+
+def build_standin(path: str, days: int, championships: int, seed: int = 42) -> int:
+    """
+    Создает базу SQLite со сводкой statistics_rollups и справочниками.
+
+    Returns:
+        int: Количество строк сводки
+    """
+    from sqlalchemy import create_engine, insert
+    from db.models.championship import ChampionShip
+    from db.models.sport import Sport
+    from db.queries.statistics_rollup import statistics_rollups
+
+    if os.path.exists(path):
+        os.remove(path)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    engine = create_engine(f'sqlite:///{path}')
+    for table in (Sport.__table__, ChampionShip.__table__, statistics_rollups):
+        table.create(engine)
+
+    rng = np.random.default_rng(seed)
+    end_date = date.today()
+    rows = []
+    for day in range(days):
+        match_date = end_date - timedelta(days=day)
+        # Матчи есть примерно у трети чемпионатов в день
+        for championship_id in np.flatnonzero(rng.random(championships) < 0.35) + 1:
+            matches = int(rng.integers(1, 9))
+            for forecast_type in FORECAST_TYPES:
+                for model_name, model_version, model_type in MODELS:
+                    correct = int(rng.binomial(matches, 0.55))
+                    accuracy = rng.uniform(0.3, 0.9, matches)
+                    rows.append({
+                        'id': len(rows) + 1,
+                        'forecast_type': forecast_type,
+                        'forecast_subtype': forecast_type,
+                        'championship_id': int(championship_id),
+                        'sport_id': int(championship_id) % SPORTS + 1,
+                        'match_date': match_date,
+                        'model_name': model_name,
+                        'model_version': model_version,
+                        'model_type': model_type,
+                        'row_count': matches,
+                        'match_count': matches,
+                        'total_count': matches,
+                        'correct_count': correct,
+                        'accuracy_count': matches,
+                        'accuracy_sum': float(accuracy.sum()),
+                        'accuracy_min': float(accuracy.min()),
+                        'accuracy_max': float(accuracy.max()),
+                        'error_count': matches,
+                        'error_sum': float(rng.uniform(0, 2, matches).sum()),
+                        'residual_count': matches,
+                        'residual_sum': float(rng.normal(0, 1, matches).sum()),
+                        'updated_at': datetime.now()
+                    })
+
+    with engine.begin() as connection:
+        sport_defaults = _required_defaults(Sport.__table__)
+        connection.execute(insert(Sport.__table__), [
+            {**sport_defaults, 'id': sport_id, 'sportName': f'Sport {sport_id}'}
+            for sport_id in range(1, SPORTS + 1)
+        ])
+        championship_defaults = _required_defaults(ChampionShip.__table__)
+        connection.execute(insert(ChampionShip.__table__), [
+            {**championship_defaults, 'id': championship_id, 'championshipName': f'Championship {championship_id}'}
+            for championship_id in range(1, championships + 1)
+        ])
+        for start in range(0, len(rows), 50_000):
+            connection.execute(insert(statistics_rollups), rows[start:start + 50_000])
+    engine.dispose()
+    return len(rows)
+
+
+def make_urls(base_url: str, championships: int, n: int, seed: int = 7) -> List[str]:
+    """Набор URL, которые опрашивает дашборд (повторяющиеся периоды и фильтры)."""
+    rng = random.Random(seed)
+    today = date.today()
+    periods = [(today - timedelta(days=days), today) for days in (7, 30, 90, 365)]
+    urls = []
+    for _ in range(n):
+        start_date, end_date = rng.choice(periods)
+        query = f'start_date={start_date}&end_date={end_date}'
+        if rng.random() < 0.5:
+            query += f'&championship_id={rng.randint(1, min(championships, 10))}'
+        endpoint = rng.choice([
+            'statistics/summary', 'statistics/types', 'statistics/models', 'statistics/daily',
+            'championships', 'sports'
+        ])
+        if endpoint in ('championships', 'sports'):
+            urls.append(f'{base_url}/api/{endpoint}')
+        else:
+            urls.append(f'{base_url}/api/{endpoint}?{query}')
+    return urls
+
+
+def run_load(urls: List[str], concurrency: int, conditional: float) -> Tuple[List[float], Counter, float]:
+    """Отправляет запросы и возвращает задержки (сек), коды ответов и общее время."""
+    etags: Dict[str, str] = {}
+    lock = threading.Lock()
+    rng = random.Random(11)
+    plan = [(url, rng.random() < conditional) for url in urls]
+
+    def fetch(item) -> Tuple[float, int]:
+        url, revalidate = item
+        headers = {'Accept-Encoding': 'gzip'}
+        with lock:
+            etag = etags.get(url)
+        if revalidate and etag:
+            headers['If-None-Match'] = etag
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(urllib.request.Request(url, headers=headers)) as response:
+                body = response.read()
+                if response.headers.get('Content-Encoding') == 'gzip':
+                    body = gzip.decompress(body)
+                json.loads(body)
+                status = response.status
+                new_etag = response.headers.get('ETag')
+        except urllib.error.HTTPError as e:
+            status = e.code
+            new_etag = e.headers.get('ETag')
+        elapsed = time.perf_counter() - started
+        if new_etag:
+            with lock:
+                etags[url] = new_etag
+        return elapsed, status
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(fetch, plan))
+    total = time.perf_counter() - started
+    return [elapsed for elapsed, _ in results], Counter(status for _, status in results), total
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Нагрузочный тест HTTP-сервера статистики')
+    parser.add_argument('--db', default='results/loadtest/statistics_api.sqlite', help='Файл базы SQLite')
+    parser.add_argument('--days', type=int, default=730, help='Дней истории в сводке')
+    parser.add_argument('--championships', type=int, default=40, help='Количество чемпионатов')
+    parser.add_argument('--requests', type=int, default=3000, help='Количество запросов')
+    parser.add_argument('--concurrency', type=int, default=16, help='Количество потоков клиента')
+    parser.add_argument('--conditional', type=float, default=0.5,
+                        help='Доля запросов с If-None-Match')
+    parser.add_argument('--no-cache', action='store_true', help='Отключить кэш ответов сервера')
+    parser.add_argument('--reuse-db', action='store_true', help='Не пересоздавать базу')
+    args = parser.parse_args()
+
+    # config требует настройки MySQL, хотя тест работает с SQLite
+    for name, value in {
+        'DATABASE_USER': 'loadtest', 'DATABASE_PASSWORD': 'loadtest', 'DATABASE_HOST': 'localhost',
+        'DATABASE_PORT': '3306', 'DATABASE_NAME': 'loadtest', 'DATABASE_CHARSET': 'utf8mb4',
+        'DATABSE_USE_UNICODE': 'True', 'CONTAINER_NAME': 'loadtest'
+    }.items():
+        os.environ.setdefault(name, value)
+
+    from werkzeug.serving import make_server
+    from api.server import create_app
+
+    if not (args.reuse_db and os.path.exists(args.db)):
+        started = time.perf_counter()
+        rows = build_standin(args.db, args.days, args.championships)
+        print(f'База {args.db}: {rows} строк сводки за {time.perf_counter() - started:.1f} с')
+
+    app = create_app(database_url=f'sqlite:///{args.db}', cache_ttl=0 if args.no_cache else None)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_url = f'http://127.0.0.1:{server.server_port}'
+
+    try:
+        urls = make_urls(base_url, args.championships, args.requests)
+        latencies, statuses, total = run_load(urls, args.concurrency, args.conditional)
+        with urllib.request.urlopen(f'{base_url}/health') as response:
+            health = json.loads(response.read())
+    finally:
+        server.shutdown()
+
+    latencies_ms = np.array(latencies) * 1000
+    print('=' * 60)
+    print(f'Запросов: {len(latencies)}, потоков: {args.concurrency}, '
+          f'кэш: {"выключен" if args.no_cache else "включен"}')
+    print('=' * 60)
+    print(f'RPS                  {len(latencies) / total:>10.1f}')
+    for percentile in (50, 95, 99):
+        print(f'p{percentile:<19} {np.percentile(latencies_ms, percentile):>10.1f} мс')
+    print(f'max                  {latencies_ms.max():>10.1f} мс')
+    print(f'Коды ответов         {dict(sorted(statuses.items()))}')
+    print(f'Попаданий в кэш      {health["cache_hits"]}')
+    print(f'Ответов 304          {health["not_modified"]}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,24 @@
 #!/usr/bin/env python3
 """
 Скрипт для обработки турниров с неполным набором моделей.
+
+Если есть retrain_jobs.txt (check_models.py --diff), переобучаются только
+перечисленные модели турниров, иначе - все модели турниров из
+incomplete_tournaments.txt. После запуска задания сверяются с описью
+моделей (inventory.json): невыполненные остаются в retrain_jobs.txt, а
+полностью выполненный файл переименовывается в retrain_jobs.txt.done,
+чтобы следующий запуск не повторял его.
 """
 
+import os
 import sys
 import logging
-from typing import List
+from datetime import datetime
+from typing import Dict, List, Optional, Set
 
+from check_models import get_models_dir, get_tournaments_with_models
 from core.constants import ACTION_MODEL
+from processing.keras_inventory import diff_inventory, load_inventory
 from processing.pipeline import EmbeddingCalculationPipeline
 from processing.datasource import DatabaseSource
 from processing.balancing_config import ProcessFeatures
@@ -25,20 +36,79 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+RETRAIN_JOBS_FILE = 'retrain_jobs.txt'
+
+
+def load_retrain_jobs(jobs_file: str = RETRAIN_JOBS_FILE) -> Dict[int, Set[str]]:
+    """Задания на переобучение: турнир -> модели."""
+    jobs: Dict[int, Set[str]] = {}
+    with open(jobs_file, 'r') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            tournament_id, model_name = line.strip().split(',', 1)
+            jobs.setdefault(int(tournament_id), set()).add(model_name)
+    return jobs
+
+
+def save_retrain_jobs(jobs: Dict[int, Set[str]], jobs_file: str = RETRAIN_JOBS_FILE) -> None:
+    """Запись заданий на переобучение в формате check_models.py --diff."""
+    tmp_path = f'{jobs_file}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f:
+        for tournament_id in sorted(jobs):
+            for model_name in sorted(jobs[tournament_id]):
+                f.write(f'{tournament_id},{model_name}\n')
+    os.replace(tmp_path, jobs_file)
+
+
+def remaining_retrain_jobs(jobs: Dict[int, Set[str]], started_at: datetime) -> Dict[int, Set[str]]:
+    """
+    Задания, не выполненные запуском.
 
-def process_specific_tournaments(tournament_ids: List[int]) -> None:
+    Ошибки обучения турнира конвейер только логирует, поэтому выполнение
+    проверяется по описи: модель должна быть в описи, не устаревшей и
+    обученной после started_at.
+    """
+    tournaments = get_tournaments_with_models()
+    started = started_at.isoformat()
+    remaining: Dict[int, Set[str]] = {}
+
+    for tournament_id, model_names in jobs.items():
+        info = tournaments.get(tournament_id)
+        inventory = load_inventory(get_models_dir(info)) if info else None
+        if inventory is None:
+            remaining[tournament_id] = set(model_names)
+            continue
+
+        missing, stale = diff_inventory(inventory, model_names)
+        models = inventory.get('models', {})
+        not_retrained = {
+            name for name in model_names
+            if (models.get(name, {}).get('training_date') or '') < started
+        }
+        left = set(missing) | set(stale) | not_retrained
+        if left:
+            remaining[tournament_id] = left
+    return remaining
+
+
+def process_specific_tournaments(
+        tournament_ids: List[int],
+        model_filter: Optional[Dict[int, Set[str]]] = None
+) -> None:
     """
     Обработка конкретных турниров.
     
     Args:
         tournament_ids: Список ID турниров для обработки
+        model_filter: Турнир -> модели для обучения (None - все модели)
     """
     try:
         logger.info(f'Начало обработки {len(tournament_ids)} турниров: {tournament_ids}')
         
         # Создание компонентов pipeline
         data_source = DatabaseSource()
-        data_processor = ProcessFeatures(ACTION_MODEL[0])  # CREATE_MODEL
+        data_processor = ProcessFeatures(ACTION_MODEL[0], model_filter)  # CREATE_MODEL
         data_storage = FileStorage()
         
         # Переопределяем список турниров
@@ -62,6 +132,39 @@ def process_specific_tournaments(tournament_ids: List[int]) -> None:
 
 def main():
     """Основная функция."""
+    if os.path.exists(RETRAIN_JOBS_FILE):
+        try:
+            jobs = load_retrain_jobs()
+            if not jobs:
+                logger.warning(f'Файл {RETRAIN_JOBS_FILE} пуст')
+            else:
+                logger.info(
+                    f'Загружено {sum(len(models) for models in jobs.values())} заданий '
+                    f'на переобучение для {len(jobs)} турниров'
+                )
+                started_at = datetime.now()
+                process_specific_tournaments(list(jobs), jobs)
+
+                remaining = remaining_retrain_jobs(jobs, started_at)
+                if remaining:
+                    save_retrain_jobs(remaining)
+                    logger.warning(
+                        f'Не выполнено {sum(len(models) for models in remaining.values())} заданий '
+                        f'для {len(remaining)} турниров, они оставлены в {RETRAIN_JOBS_FILE}'
+                    )
+                    return
+            # Выполненные задания не должны подменять incomplete_tournaments.txt
+            # при следующих запусках
+            os.replace(RETRAIN_JOBS_FILE, f'{RETRAIN_JOBS_FILE}.done')
+            logger.info(
+                f'Задания выполнены, файл переименован в {RETRAIN_JOBS_FILE}.done. '
+                'Запустите check_models.py --diff для проверки.'
+            )
+        except Exception as e:
+            logger.error(f'Критическая ошибка: {e}')
+            sys.exit(1)
+        return
+
     # Читаем ID турниров из файла
     try:
         with open('incomplete_tournaments.txt', 'r') as f: